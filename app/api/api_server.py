@@ -36,6 +36,7 @@ from app.api.webapp_api import router as webapp_router
 from app.api.webapp_api import set_db_instance
 from app.api.merchant_webhooks import router as merchant_webhooks_router, set_merchant_db
 from app.api.rate_limit import limiter
+from app.core.fast_runtime import USE_UVLOOP, runtime_summary
 
 logger = logging.getLogger(__name__)
 
@@ -486,4 +487,5 @@ if __name__ == "__main__":
 
     app = create_api_app(db, offer_service, bot_token)
     port = int(os.getenv("API_PORT", "8000"))
-    uvicorn.run(app, host="0.0.0.0", port=port)
+    logger.info(f"⚡ Runtime: {runtime_summary()}")
+    uvicorn.run(app, host="0.0.0.0", port=port, loop="uvloop" if USE_UVLOOP else "asyncio")
@@ -2,17 +2,23 @@
 Order Tracking API for Telegram Mini App
 Provides real-time order status, QR codes, and delivery tracking
 """
-import base64
-import io
 import logging
 import math
 import os
 from datetime import datetime, timedelta
 from typing import Any
 
-import qrcode
 from aiogram import Bot
-from fastapi import APIRouter, Depends, File, HTTPException, Request, UploadFile
+from fastapi import (
+    APIRouter,
+    Depends,
+    File,
+    HTTPException,
+    Query,
+    Request,
+    Response,
+    UploadFile,
+)
 from pydantic import BaseModel, Field, AliasChoices
 
 from app.api.webapp.common import get_current_user
@@ -25,9 +31,11 @@ from app.core.order_math import (
     calc_total_price,
     parse_cart_items,
 )
+from app.core.qr_generator import QR_MEDIA_TYPES, get_qr_data_uri, get_qr_image, qr_etag
 from app.core.utils import UZB_TZ, get_uzb_time, to_uzb_datetime
 from app.services.unified_order_service import OrderStatus as UnifiedOrderStatus, PaymentStatus
 from app.api.rate_limit import limiter
+from database_pg_module.mixins.archive import ORDER_HISTORY_COLUMNS, history_source
 
 router = APIRouter(prefix="/api/v1/orders", tags=["orders"])
 
@@ -70,24 +78,28 @@ def get_bot() -> Bot:
     return _bot_instance
 
 
-async def _bookings_archive_exists(db) -> bool:
-    """Check if bookings_archive table exists (optional migration)."""
-    try:
-        if hasattr(db, "execute"):
-            result = await db.execute("SELECT to_regclass('public.bookings_archive')")
-            return bool(result and result[0] and result[0][0])
-        if hasattr(db, "sync") and hasattr(db.sync, "get_connection"):
-            def _check(sync_db) -> bool:
-                with sync_db.get_connection() as conn:
-                    cursor = conn.cursor()
-                    cursor.execute("SELECT to_regclass('public.bookings_archive')")
-                    row = cursor.fetchone()
-                    return bool(row and row[0])
-
-            return bool(await db.run(_check, db.sync))
-    except Exception:
-        return False
-    return False
+async def _get_archived_entity(db, entity_id: int, user_id: int) -> Any | None:
+    """Order or booking moved to the history archive (see ArchiveMixin).
+
+    Orders and bookings have separate id sequences, so an archived order can
+    share the id of the user's archived booking. The user's own row wins;
+    a foreign row is returned only when nothing else matches (callers 403).
+    """
+    foreign = None
+    for method in ("get_archived_order", "get_archived_booking"):
+        if not hasattr(db, method):
+            continue
+        try:
+            row = await getattr(db, method)(entity_id)
+        except Exception as e:
+            logger.warning("Archived lookup %s failed for id=%s: %s", method, entity_id, e)
+            continue
+        if not row:
+            continue
+        if int(dict(row).get("user_id") or 0) == user_id:
+            return row
+        foreign = foreign or row
+    return foreign
 
 
 def _require_user_id(user: dict) -> int:
@@ -182,8 +194,8 @@ class DeliveryResult(BaseModel):
 # ==================== HELPERS ====================
 
 
-def generate_qr_code(booking_code: str) -> str:
-    """Generate QR code as base64 PNG.
+async def generate_qr_code(booking_code: str) -> str:
+    """Generate QR code as base64 PNG (cached, rendered off the event loop).
 
     Args:
         booking_code: Booking code to encode
@@ -191,24 +203,7 @@ def generate_qr_code(booking_code: str) -> str:
     Returns:
         Base64 encoded PNG image
     """
-    qr = qrcode.QRCode(
-        version=1,
-        error_correction=qrcode.constants.ERROR_CORRECT_L,
-        box_size=10,
-        border=4,
-    )
-    qr.add_data(booking_code)
-    qr.make(fit=True)
-
-    img = qr.make_image(fill_color="black", back_color="white")
-
-    # Convert to base64
-    buffer = io.BytesIO()
-    img.save(buffer, format="PNG")
-    img_bytes = buffer.getvalue()
-    img_base64 = base64.b64encode(img_bytes).decode("utf-8")
-
-    return f"data:image/png;base64,{img_base64}"
+    return await get_qr_data_uri(booking_code)
 
 
 def _parse_coord(value: Any) -> float | None:
@@ -450,7 +445,7 @@ async def format_booking_to_order_status(booking: Any, db) -> OrderStatus:
     # Generate QR code only for pickup orders when the code is available
     qr_code = None
     if order_type == "pickup" and status in ["preparing", "confirmed", "ready"] and booking_code:
-        qr_code = generate_qr_code(booking_code)
+        qr_code = await generate_qr_code(booking_code)
 
     items_total_value = float(items_total or 0)
     total_with_delivery = items_total_value + float(delivery_cost or 0)
@@ -491,21 +486,27 @@ async def format_booking_to_order_status(booking: Any, db) -> OrderStatus:
 @limiter.limit("60/minute")
 async def get_user_orders(
     request: Request,
+    include_archive: bool = Query(False),
     db=Depends(get_db),
     user: dict = Depends(get_current_user),
 ):
-    """Get user's orders from unified orders table (pickup + delivery)."""
+    """Get user's orders from unified orders table (pickup + delivery).
+
+    ``include_archive`` adds orders moved to the history archive.
+    """
     user_id = _require_user_id(user)
 
     orders: list[dict[str, Any]] = []
     raw_orders: list[Any] = []
 
     try:
+        source = history_source("orders", ORDER_HISTORY_COLUMNS, include_archive)
+
         def _fetch_orders(sync_db, uid: int) -> list[Any]:
             with sync_db.get_connection() as conn:
                 cursor = conn.cursor()
                 cursor.execute(
-                    """
+                    f"""
                     SELECT
                         o.order_id,
                         o.order_status,
@@ -530,7 +531,7 @@ async def get_user_orders(
                         off.title AS offer_title,
                         off.discount_price AS offer_price,
                         off.photo_id AS offer_photo_id
-                    FROM orders o
+                    FROM {source} o
                     LEFT JOIN stores s ON o.store_id = s.store_id
                     LEFT JOIN offers off ON o.offer_id = off.offer_id
                     WHERE o.user_id = %s
@@ -704,25 +705,13 @@ async def get_order_status(
                 raise HTTPException(status_code=403, detail="Access denied")
             return await format_booking_to_order_status(booking, db)
     
-    # Fallback: check archived bookings for old orders (optional table)
-    if await _bookings_archive_exists(db):
-        try:
-            booking = await db.execute(
-                "SELECT * FROM bookings_archive WHERE booking_id = %s",
-                (booking_id,)
-            )
-            if booking:
-                booking_dict = dict(booking[0]) if not isinstance(booking[0], dict) else booking[0]
-                if int(booking_dict.get("user_id") or 0) != user_id:
-                    raise HTTPException(status_code=403, detail="Access denied")
-                return await format_booking_to_order_status(booking[0], db)
-        except Exception as e:
-            logger.warning(
-                "Failed to fetch bookings_archive status for booking_id=%s: %s",
-                booking_id,
-                e,
-            )
-    
+    # Old orders/bookings are moved to the history archive
+    archived = await _get_archived_entity(db, booking_id, user_id)
+    if archived:
+        if int(archived.get("user_id") or 0) != user_id:
+            raise HTTPException(status_code=403, detail="Access denied")
+        return await format_booking_to_order_status(archived, db)
+
     raise HTTPException(status_code=404, detail="Заказ не найден")
 
 
@@ -751,22 +740,9 @@ async def get_order_timeline(
     order = await db.get_order(booking_id)
     if not order and hasattr(db, "get_booking"):
         order = await db.get_booking(booking_id)
-    if not order and await _bookings_archive_exists(db):
-        # Fallback: check archived bookings
-        try:
-            result = await db.execute(
-                "SELECT * FROM bookings_archive WHERE booking_id = %s",
-                (booking_id,)
-            )
-            if result:
-                order = result[0]
-        except Exception as e:
-            logger.warning(
-                "Failed to fetch bookings_archive timeline for booking_id=%s: %s",
-                booking_id,
-                e,
-            )
-    
+    if not order:
+        order = await _get_archived_entity(db, booking_id, user_id)
+
     if not order:
         raise HTTPException(status_code=404, detail="Заказ не найден")
 
@@ -912,48 +888,20 @@ async def calculate_delivery(
     )
 
 
-@router.get("/{booking_id}/qr")
-@limiter.limit("60/minute")
-async def get_order_qr_code(
-    request: Request,
-    booking_id: int,
-    db=Depends(get_db),
-    user: dict = Depends(get_current_user),
-):
-    """Get QR code for order pickup (standalone endpoint).
-
-    Args:
-        booking_id: Booking ID (v24+ order_id from unified orders table)
-
-    Returns:
-        JSON with base64 QR code
+async def load_order_pickup_code(db: Any, booking_id: int, user_id: int) -> str:
+    """Pickup code of the user's confirmed order, for QR rendering.
 
     Raises:
-        404: Order not found
-        400: QR code not available for this status
+        HTTPException: 404/403 for unknown or foreign orders, 400 when the
+            order has no pickup QR (yet)
     """
-    user_id = _require_user_id(user)
-
     # v24+: try unified orders table first
     order = await db.get_order(booking_id)
     if not order and hasattr(db, "get_booking"):
         order = await db.get_booking(booking_id)
-    if not order and await _bookings_archive_exists(db):
-        # Fallback: check archived bookings
-        try:
-            result = await db.execute(
-                "SELECT * FROM bookings_archive WHERE booking_id = %s",
-                (booking_id,)
-            )
-            if result:
-                order = result[0]
-        except Exception as e:
-            logger.warning(
-                "Failed to fetch bookings_archive QR for booking_id=%s: %s",
-                booking_id,
-                e,
-            )
-    
+    if not order:
+        order = await _get_archived_entity(db, booking_id, user_id)
+
     if not order:
         raise HTTPException(status_code=404, detail="Заказ не найден")
 
@@ -972,12 +920,64 @@ async def get_order_qr_code(
 
     if not pickup_code:
         raise HTTPException(status_code=400, detail="Код заказа не найден")
+    return str(pickup_code)
+
+
+@router.get("/{booking_id}/qr")
+@limiter.limit("60/minute")
+async def get_order_qr_code(
+    request: Request,
+    booking_id: int,
+    db=Depends(get_db),
+    user: dict = Depends(get_current_user),
+):
+    """Get QR code for order pickup (standalone endpoint).
+
+    Args:
+        booking_id: Booking ID (v24+ order_id from unified orders table)
 
-    qr_code = generate_qr_code(pickup_code)
+    Returns:
+        JSON with base64 QR code
+
+    Raises:
+        404: Order not found
+        400: QR code not available for this status
+    """
+    user_id = _require_user_id(user)
+    pickup_code = await load_order_pickup_code(db, booking_id, user_id)
+    qr_code = await generate_qr_code(pickup_code)
 
     return {
         "booking_id": booking_id,
         "booking_code": pickup_code,
         "qr_code": qr_code,
+        "qr_url": f"{router.prefix}/{booking_id}/qr.png",
         "message": "Покажите этот QR код в магазине",
     }
+
+
+@router.get("/{booking_id}/qr.{fmt}")
+@limiter.limit("120/minute")
+async def get_order_qr_image(
+    request: Request,
+    booking_id: int,
+    fmt: str,
+    db=Depends(get_db),
+    user: dict = Depends(get_current_user),
+):
+    """Get the pickup QR code as an image (``png`` or ``svg``).
+
+    Pickup codes never change, so the response carries a strong ETag and a
+    matching ``If-None-Match`` gets 304 without touching the image cache.
+    """
+    if fmt not in QR_MEDIA_TYPES:
+        raise HTTPException(status_code=404, detail="Unsupported QR format")
+    user_id = _require_user_id(user)
+    pickup_code = await load_order_pickup_code(db, booking_id, user_id)
+
+    etag = qr_etag(pickup_code, fmt=fmt)
+    headers = {"ETag": etag, "Cache-Control": "private, max-age=86400"}
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+    body = await get_qr_image(pickup_code, fmt=fmt)
+    return Response(content=body, media_type=QR_MEDIA_TYPES[fmt], headers=headers)
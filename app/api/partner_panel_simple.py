@@ -2,10 +2,10 @@
 Partner Panel API endpoints for Telegram Mini App
 Simplified version using Database class with raw SQL
 """
-import csv
+import asyncio
+import base64
 import hashlib
 import hmac
-import io
 import os
 import re
 import urllib.parse
@@ -14,6 +14,7 @@ import json
 from typing import Any, Optional
 
 import pytz
+from cachetools import TTLCache
 from fastapi import (
     APIRouter,
     File,
@@ -28,12 +29,15 @@ from fastapi import (
 )
 
 from app.core.async_db import AsyncDBProxy
+from app.core.init_data_cache import get_webapp_secret_key, init_data_cache
 from app.core.sanitize import sanitize_phone
 from app.core.security import validator
 from app.core.utils import normalize_city
 from app.domain.offer_rules import MIN_OFFER_DISCOUNT_MESSAGE, validate_offer_prices
 from database_pg_module.mixins.offers import canonicalize_geo_slug
 from app.api.websocket_manager import get_connection_manager
+from app.core.websocket import WS_IDLE_TIMEOUT_SECONDS
+from app.services.offer_import import import_offers_csv
 from app.services.stats import PartnerTotals, Period, get_partner_stats
 from aiogram import Bot
 
@@ -58,6 +62,11 @@ _legacy_bot_token: str | None = (
     or os.getenv("PHOTO_FALLBACK_BOT_TOKEN")
 )
 
+# Short-lived cache of (user, store) per partner: every panel call resolves
+# the partner first, which otherwise costs two or three queries.
+_PARTNER_CACHE_TTL = float(os.getenv("PARTNER_CONTEXT_CACHE_TTL_SECONDS", "30"))
+_partner_cache: TTLCache = TTLCache(maxsize=2048, ttl=max(_PARTNER_CACHE_TTL, 0.001))
+
 # Get base URL for photo links
 API_BASE_URL = os.getenv("RAILWAY_PUBLIC_DOMAIN") or os.getenv("PUBLIC_URL") or ""
 if API_BASE_URL and not API_BASE_URL.startswith("http"):
@@ -74,6 +83,7 @@ def _is_dev_env() -> bool:
 def set_partner_db(db: DatabaseProtocol, bot_token: str = None):
     """Set database instance and bot token for partner panel."""
     global _db, _bot_token
+    _partner_cache.clear()
     if db is None:
         _db = None
     else:
@@ -86,6 +96,18 @@ def set_partner_db(db: DatabaseProtocol, bot_token: str = None):
         _bot_token = os.getenv("BOT_TOKEN")
 
 
+def invalidate_partner_cache(telegram_id: int | None = None) -> None:
+    """Drop cached partner context (all partners when telegram_id is None)."""
+    if telegram_id is None:
+        _partner_cache.clear()
+    else:
+        _partner_cache.pop(telegram_id, None)
+
+
+def _copy_partner_context(user: dict, store: Any) -> tuple[dict, Any]:
+    return dict(user), dict(store) if isinstance(store, dict) else store
+
+
 def get_db() -> DatabaseProtocol:
     """Get database instance."""
     if _db is None:
@@ -119,6 +141,11 @@ async def get_partner_with_store(telegram_id: int) -> tuple[dict, dict]:
     """
     import logging
 
+    if _PARTNER_CACHE_TTL > 0:
+        cached = _partner_cache.get(telegram_id)
+        if cached is not None:
+            return _copy_partner_context(*cached)
+
     db = get_db()
     if _is_dev_env():
         logging.debug(f"get_partner_with_store called for telegram_id={telegram_id}")
@@ -159,7 +186,9 @@ async def get_partner_with_store(telegram_id: int) -> tuple[dict, dict]:
         logging.debug(
             f"Partner resolved: user_id={user.get('user_id')}, store_id={store_id_val}"
         )
-    return user, store
+    if _PARTNER_CACHE_TTL > 0:
+        _partner_cache[telegram_id] = (user, store)
+    return _copy_partner_context(user, store)
 
 
 async def _load_json_payload(request: Request) -> dict:
@@ -199,6 +228,13 @@ def _to_kopeks(price_in_sums: int | float | None) -> int | None:
         raise HTTPException(status_code=400, detail="Invalid price value") from exc
 
 
+def _parse_import_price(value: str | None) -> int | None:
+    """Parse a CSV price cell; empty cells are None, garbage raises ValueError."""
+    if value is None or not str(value).strip():
+        return None
+    return int(round(float(str(value).replace(" ", "").replace(",", "."))))
+
+
 def _to_sums(price_in_kopeks: int | float | None) -> int:
     """Normalize price from DB to sums for API responses."""
     if price_in_kopeks is None:
@@ -299,6 +335,10 @@ def verify_telegram_webapp(authorization: str) -> int:
     if not bot_token:
         raise HTTPException(status_code=500, detail="Bot token not configured")
 
+    cached_user_id = init_data_cache.get("partner", bot_token, init_data)
+    if cached_user_id is not None:
+        return cached_user_id
+
     try:
         parsed = dict(urllib.parse.parse_qsl(init_data))
 
@@ -357,7 +397,7 @@ def verify_telegram_webapp(authorization: str) -> int:
                 data_check_string_parts.append(f"{key}={parsed[key]}")
 
         data_check_string = "\n".join(data_check_string_parts)
-        secret_key = hmac.new(b"WebAppData", bot_token.encode(), hashlib.sha256).digest()
+        secret_key = get_webapp_secret_key(bot_token)
         calculated_hash = hmac.new(
             secret_key, data_check_string.encode(), hashlib.sha256
         ).hexdigest()
@@ -379,6 +419,9 @@ def verify_telegram_webapp(authorization: str) -> int:
         if user_id <= 0:
             raise HTTPException(status_code=401, detail="Invalid user ID in token")
 
+        init_data_cache.set(
+            "partner", bot_token, init_data, user_id, auth_timestamp + max_auth_age
+        )
         return user_id
     except HTTPException:
         raise
@@ -482,30 +525,36 @@ async def websocket_partner(
             return
 
     try:
-        await manager.connect(store_id, websocket)
+        client = await manager.connect(store_id, websocket)
         logging.info(f"✅ WebSocket connected: store_id={store_id}")
 
         # Send connection confirmation
-        await websocket.send_json(
+        await client.send(
             {
                 "type": "connected",
                 "data": {"store_id": store_id, "timestamp": datetime.now().isoformat()},
             }
         )
 
-        # Keep connection alive and handle ping/pong
+        # The panel pings every 30s; a silent client is considered gone
         while True:
             try:
-                # Wait for client messages (ping/pong)
-                data = await websocket.receive_text()
+                data = await asyncio.wait_for(
+                    websocket.receive_text(), timeout=WS_IDLE_TIMEOUT_SECONDS
+                )
+                client.touch()
 
                 # Handle ping
                 if data == "ping":
-                    await websocket.send_json({"type": "pong"})
+                    client.send_text('{"type": "pong"}')
 
             except WebSocketDisconnect:
                 logging.info(f"🔌 Client disconnected: store_id={store_id}")
                 break
+            except asyncio.TimeoutError:
+                logging.info(f"🔌 WebSocket idle timeout: store_id={store_id}")
+                await client.close(code=1001)
+                break
             except Exception as e:
                 logging.error(f"❌ WebSocket error for store {store_id}: {e}")
                 break
@@ -1144,44 +1193,200 @@ async def import_csv(
     available_from_default = store_from.isoformat()
     available_until_default = store_until.isoformat()
 
-    # Read CSV
-    content = await file.read()
-    text = content.decode("utf-8-sig")
-    reader = csv.DictReader(io.StringIO(text))
-
-    imported = 0
-    errors = []
+    def map_row(row: dict[str, str]) -> dict[str, Any]:
+        title = (row.get("title") or "").strip()
+        if not title:
+            raise ValueError("title is required")
+        expiry = None
+        if row.get("expiry_date"):
+            try:
+                expiry = datetime.fromisoformat(row["expiry_date"].strip()).date()
+            except ValueError:
+                pass
+        return {
+            "title": title,
+            "description": row.get("description") or title,
+            "original_price": _parse_import_price(row.get("original_price")),
+            "discount_price": _parse_import_price(row.get("discount_price")),
+            "quantity": int(float(row.get("quantity") or 1)),
+            "available_from": available_from_default,
+            "available_until": available_until_default,
+            "expiry_date": expiry,
+            "unit": row.get("unit") or "шт",
+            "category": row.get("category") or "other",
+        }
 
-    for row_num, row in enumerate(reader, start=2):
-        try:
-            expiry = None
-            if row.get("expiry_date"):
-                try:
-                    expiry = datetime.fromisoformat(row["expiry_date"])
-                except ValueError:
-                    pass
-
-            await db.add_offer(
-                store_id=store_id,
-                title=row["title"],
-                description=row.get("description", row["title"]),
-                original_price=_to_kopeks(row.get("original_price", 0)) or None,
-                discount_price=_to_kopeks(row.get("discount_price", 0)),
-                quantity=int(row.get("quantity", 1)),
-                available_from=available_from_default,
-                available_until=available_until_default,
-                expiry_date=expiry.isoformat() if expiry else None,
-                unit=row.get("unit", "шт"),
-                category=row.get("category", "other"),
-            )
-            imported += 1
-        except Exception as e:
-            errors.append(f"Row {row_num}: {str(e)}")
+    # Streams the spooled upload instead of reading it into memory
+    result = await import_offers_csv(db, store_id, file.file, map_row)
+    errors = result.error_lines()
 
-    return {"imported": imported, "errors": errors if errors else None}
+    return {
+        "imported": result.imported,
+        "skipped": result.skipped,
+        "duplicates": result.duplicates,
+        "failed": result.failed,
+        "total_rows": result.total_rows,
+        "errors": errors if errors else None,
+    }
 
 
 # Orders endpoints
+ORDERS_PAGE_SIZE = 50
+ORDERS_MAX_PAGE_SIZE = 200
+# Legacy /orders returns a plain list; cap it so it cannot grow with history
+ORDERS_LEGACY_LIMIT = int(os.getenv("PARTNER_ORDERS_LEGACY_LIMIT", "500"))
+# Delta requests re-read this window before the sync point, so rows whose
+# transaction started before the previous sync but committed after it are
+# not missed. The client merges by order_id, so repeats are harmless.
+ORDERS_SYNC_OVERLAP = timedelta(seconds=5)
+
+
+def _encode_orders_cursor(moment: Any, order_id: int = 0) -> str:
+    raw = json.dumps([moment.isoformat() if moment else None, int(order_id)])
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def _decode_orders_cursor(token: str) -> tuple[datetime, int]:
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        moment, order_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return datetime.fromisoformat(moment), int(order_id)
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def _parse_status_filter(status: Optional[str]) -> list[str] | None:
+    """Comma-separated statuses; empty or 'all' means no filter."""
+    if not status or status == "all":
+        return None
+    statuses = [part.strip() for part in status.split(",") if part.strip()]
+    return statuses or None
+
+
+def _serialize_partner_order(order: Any) -> dict:
+    """Build the partner panel representation of one orders row."""
+    # Handle both dict and tuple formats
+    updated_at = None
+    payment_proof_photo_id = None
+    if isinstance(order, dict):
+        order_id = order.get("order_id")
+        order_status = order.get("order_status") or order.get("status")
+        order_type = order.get("order_type") or ("delivery" if order.get("delivery_address") else "pickup")
+        quantity = order.get("quantity", 1)
+        total_price = order.get("total_price", 0)
+        delivery_address = order.get("delivery_address")
+        created_at = order.get("created_at")
+        updated_at = order.get("updated_at")
+        payment_method = order.get("payment_method")
+        payment_status = order.get("payment_status")
+        payment_proof_photo_id = order.get("payment_proof_photo_id")
+        pickup_code = order.get("pickup_code") or order.get("booking_code")
+        # order_items rows (attached by get_store_orders_page) have the same
+        # title/quantity/price keys as the cart_items JSON they replace
+        cart_items_raw = order.get("items") or order.get("cart_items")
+
+        # Customer info from JOIN
+        first_name = order.get("first_name", "")
+        customer_name = first_name or "Unknown"
+        customer_phone = order.get("phone")
+
+        # Offer info from JOIN
+        offer_title = order.get("offer_title", "Unknown")
+        offer_photo_id = order.get("offer_photo_id")
+        offer_photo_url = (
+            f"{API_BASE_URL}/api/partner/photo/{offer_photo_id}" if offer_photo_id else None
+        )
+
+        # Build items list (cart orders or single item)
+        items = []
+        if cart_items_raw:
+            try:
+                cart_items = (
+                    json.loads(cart_items_raw)
+                    if isinstance(cart_items_raw, str)
+                    else cart_items_raw
+                )
+                if isinstance(cart_items, list):
+                    for it in cart_items:
+                        items.append(
+                            {
+                                "title": it.get("title") or it.get("offer_title") or offer_title,
+                                "quantity": int(it.get("quantity") or 1),
+                                "price": it.get("price") or it.get("discount_price") or 0,
+                            }
+                        )
+            except Exception:
+                items = []
+
+        if not items:
+            items = [
+                {
+                    "title": offer_title,
+                    "quantity": int(quantity or 1),
+                    "price": int(total_price or 0),
+                }
+            ]
+
+        items_count = sum(int(it.get("quantity") or 1) for it in items) if items else 0
+    else:
+        # Tuple format varies, try to extract what we can
+        order_id = order[0]
+        quantity = order[4]
+        order_type = order[5] if len(order) > 5 else "delivery"
+        order_status = order[6] if len(order) > 6 else "pending"
+        total_price = order[7] if len(order) > 7 else 0
+        delivery_address = order[8] if len(order) > 8 else None
+        created_at = order[11] if len(order) > 11 else None
+        customer_name = order[-2] if len(order) > 14 else "Unknown"
+        customer_phone = order[-1] if len(order) > 15 else None
+        offer_title = "Unknown"
+        offer_photo_url = None
+        pickup_code = None
+        payment_method = None
+        payment_status = None
+        items = [
+            {
+                "title": offer_title,
+                "quantity": int(quantity or 1),
+                "price": int(total_price or 0),
+            }
+        ]
+        items_count = int(quantity or 1)
+
+    # Determine entity type for API - 'booking' for pickup, 'order' for delivery
+    entity_type = "booking" if order_type == "pickup" else "order"
+    return {
+        "order_id": order_id,
+        "type": entity_type,  # 'booking' for pickup, 'order' for delivery
+        "offer_title": offer_title,
+        "offer_photo_url": offer_photo_url,
+        "photo_url": offer_photo_url,
+        "quantity": quantity,
+        "price": total_price,
+        "total_price": total_price,
+        "items": items,
+        "items_count": items_count,
+        "order_type": order_type,  # 'pickup' or 'delivery'
+        "status": order_status,
+        "order_status": order_status,
+        "payment_status": payment_status,
+        "payment_method": payment_method,
+        "payment_proof_photo_id": payment_proof_photo_id,
+        "payment_proof_url": (
+            f"{API_BASE_URL}/api/partner/photo/{payment_proof_photo_id}"
+            if payment_proof_photo_id
+            else None
+        ),
+        "pickup_code": pickup_code,
+        "booking_code": pickup_code,
+        "delivery_address": delivery_address,
+        "created_at": str(created_at) if created_at else None,
+        "updated_at": str(updated_at) if updated_at else None,
+        "customer_name": customer_name,
+        "customer_phone": customer_phone,
+    }
+
+
 @router.get("/orders")
 @limiter.limit("120/minute")
 async def list_orders(
@@ -1190,153 +1395,74 @@ async def list_orders(
     status: Optional[str] = None,
 ):
     """
-    List partner's orders (unified from orders table).
+    List partner's orders (unified from orders table), newest first.
     After v24 migration, all orders (pickup + delivery) are in orders table.
+
+    Kept for older panel builds; returns at most PARTNER_ORDERS_LEGACY_LIMIT
+    orders. New clients use /orders/feed.
     """
     telegram_id = verify_telegram_webapp(authorization)
     user, store = await get_partner_with_store(telegram_id)
     db = get_db()
 
-    # Get all orders from unified orders table
-    orders = await db.get_store_orders(store["store_id"])
-
-    result = []
-
-    # Process all orders from unified table
-    for order in orders:
-        # Handle both dict and tuple formats
-        if isinstance(order, dict):
-            order_id = order.get("order_id")
-            offer_id = order.get("offer_id")
-            user_id = order.get("user_id")
-            order_status = order.get("order_status") or order.get("status")
-            order_type = order.get("order_type") or ("delivery" if order.get("delivery_address") else "pickup")
-            quantity = order.get("quantity", 1)
-            total_price = order.get("total_price", 0)
-            delivery_address = order.get("delivery_address")
-            created_at = order.get("created_at")
-            payment_method = order.get("payment_method")
-            payment_status = order.get("payment_status")
-            payment_proof_photo_id = order.get("payment_proof_photo_id")
-            pickup_code = order.get("pickup_code") or order.get("booking_code")
-            cart_items_raw = order.get("cart_items")
-
-            # Customer info from JOIN
-            first_name = order.get("first_name", "")
-            customer_name = first_name or "Unknown"
-            customer_phone = order.get("phone")
-
-            # Offer info from JOIN
-            offer_title = order.get("offer_title", "Unknown")
-            offer_photo_id = order.get("offer_photo_id")
-            offer_photo_url = (
-                f"{API_BASE_URL}/api/partner/photo/{offer_photo_id}" if offer_photo_id else None
-            )
+    orders, _ = await db.get_store_orders_page(
+        store["store_id"],
+        statuses=_parse_status_filter(status),
+        limit=ORDERS_LEGACY_LIMIT,
+    )
+    return [_serialize_partner_order(order) for order in orders]
 
-            # Build items list (cart orders or single item)
-            items = []
-            if cart_items_raw:
-                try:
-                    cart_items = (
-                        json.loads(cart_items_raw)
-                        if isinstance(cart_items_raw, str)
-                        else cart_items_raw
-                    )
-                    if isinstance(cart_items, list):
-                        for it in cart_items:
-                            items.append(
-                                {
-                                    "title": it.get("title") or it.get("offer_title") or offer_title,
-                                    "quantity": int(it.get("quantity") or 1),
-                                    "price": it.get("price") or it.get("discount_price") or 0,
-                                }
-                            )
-                except Exception:
-                    items = []
-
-            if not items:
-                items = [
-                    {
-                        "title": offer_title,
-                        "quantity": int(quantity or 1),
-                        "price": int(total_price or 0),
-                    }
-                ]
-
-            items_count = sum(int(it.get("quantity") or 1) for it in items) if items else 0
-
-            # Keep unpaid orders visible for partner actions/updates
-        else:
-            # Tuple format varies, try to extract what we can
-            order_id = order[0]
-            user_id = order[1]
-            store_id = order[2]
-            offer_id = order[3]
-            quantity = order[4]
-            order_type = order[5] if len(order) > 5 else "delivery"
-            order_status = order[6] if len(order) > 6 else "pending"
-            total_price = order[7] if len(order) > 7 else 0
-            delivery_address = order[8] if len(order) > 8 else None
-            created_at = order[11] if len(order) > 11 else None
-            customer_name = order[-2] if len(order) > 14 else "Unknown"
-            customer_phone = order[-1] if len(order) > 15 else None
-            offer_title = "Unknown"
-            offer_photo_url = None
-            pickup_code = None
-            payment_method = None
-            payment_status = None
-            items = [
-                {
-                    "title": offer_title,
-                    "quantity": int(quantity or 1),
-                    "price": int(total_price or 0),
-                }
-            ]
-            items_count = int(quantity or 1)
 
-        # Filter by status if requested
-        if status and status != "all" and order_status != status:
-            continue
+@router.get("/orders/feed")
+@limiter.limit("120/minute")
+async def orders_feed(
+    request: Request,
+    authorization: str = Header(None),
+    status: Optional[str] = None,
+    limit: int = Query(ORDERS_PAGE_SIZE, ge=1, le=ORDERS_MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    updated_since: Optional[str] = None,
+):
+    """
+    Cursor-paginated order feed with delta sync.
 
-        # Determine entity type for API - 'booking' for pickup, 'order' for delivery
-        entity_type = "booking" if order_type == "pickup" else "order"
-        result.append(
-            {
-                "order_id": order_id,
-                "type": entity_type,  # 'booking' for pickup, 'order' for delivery
-                "offer_title": offer_title,
-                "offer_photo_url": offer_photo_url,
-                "photo_url": offer_photo_url,
-                "quantity": quantity,
-                "price": total_price,
-                "total_price": total_price,
-                "items": items,
-                "items_count": items_count,
-                "order_type": order_type,  # 'pickup' or 'delivery'
-                "status": order_status,
-                "order_status": order_status,
-                "payment_status": payment_status,
-                "payment_method": payment_method,
-                "payment_proof_photo_id": payment_proof_photo_id,
-                "payment_proof_url": (
-                    f"{API_BASE_URL}/api/partner/photo/{payment_proof_photo_id}"
-                    if payment_proof_photo_id
-                    else None
-                ),
-                "pickup_code": pickup_code,
-                "booking_code": pickup_code,
-                "delivery_address": delivery_address,
-                "created_at": str(created_at) if created_at else None,
-                "customer_name": customer_name,
-                "customer_phone": customer_phone,
-            }
-        )
+    Without ``updated_since`` orders are returned newest first; pass
+    ``next_cursor`` back as ``cursor`` for the next (older) page.
 
+    With ``updated_since`` (the ``sync_token`` of an earlier response) only
+    orders changed since then are returned, oldest change first, paged the
+    same way. Clients merge them by ``order_id``. The panel requests a delta
+    when the WebSocket reports a new order or status change.
+    """
+    telegram_id = verify_telegram_webapp(authorization)
+    user, store = await get_partner_with_store(telegram_id)
+    db = get_db()
 
-    # Sort by created_at descending
-    result.sort(key=lambda x: x.get("created_at") or "", reverse=True)
+    since = None
+    if updated_since:
+        since = _decode_orders_cursor(updated_since)[0] - ORDERS_SYNC_OVERLAP
+    page_cursor = _decode_orders_cursor(cursor) if cursor else None
+
+    orders, server_now = await db.get_store_orders_page(
+        store["store_id"],
+        statuses=_parse_status_filter(status),
+        limit=limit,
+        cursor=page_cursor,
+        updated_since=since,
+    )
 
-    return result
+    next_cursor = None
+    if len(orders) == limit:
+        last = orders[-1]
+        key = "updated_at" if since is not None else "created_at"
+        next_cursor = _encode_orders_cursor(last.get(key), last.get("order_id"))
+
+    return {
+        "orders": [_serialize_partner_order(order) for order in orders],
+        "next_cursor": next_cursor,
+        "sync_token": _encode_orders_cursor(server_now),
+        "mode": "delta" if since is not None else "page",
+    }
 
 
 @router.post("/orders/{order_id}/confirm")
@@ -1557,11 +1683,7 @@ async def get_stats(
         store_id=store_id,
     )
 
-    # Count active products
-    active_products = 0
-    if store_id:
-        offers = await db.get_offers_by_store(store_id)
-        active_products = len([o for o in offers if o.get("status") == "active"])
+    active_products = stats.totals.active_products
 
     # Get daily breakdown for charts (last 7 days)
     revenue_by_day = []
@@ -1570,55 +1692,19 @@ async def get_stats(
 
     try:
         def _fetch_breakdown(sync_db, store_id_val, now_val):
-            revenue = []
-            orders = []
+            # Revenue and orders by day (last 7 days) from the daily rollup
+            today = now_val.date()
+            days = [today - timedelta(days=i) for i in range(6, -1, -1)]
+            by_day = {
+                row["day"]: row
+                for row in sync_db.get_store_daily_stats([store_id_val], days[0], today)
+            }
+            revenue = [float((by_day.get(day) or {}).get("revenue") or 0) for day in days]
+            orders = [int((by_day.get(day) or {}).get("orders") or 0) for day in days]
             top = []
             with sync_db.get_connection() as conn:
                 cursor = conn.cursor()
 
-                # Revenue and orders by day (last 7 days)
-                for i in range(6, -1, -1):
-                    day_start = (now_val - timedelta(days=i)).replace(
-                        hour=0, minute=0, second=0, microsecond=0
-                    )
-                    day_end = day_start.replace(hour=23, minute=59, second=59)
-
-                    cursor.execute(
-                        """
-                        SELECT
-                            COALESCE(SUM(o.discount_price * b.quantity), 0) AS revenue,
-                            COUNT(DISTINCT b.booking_id) AS orders
-                        FROM bookings b
-                        JOIN offers o ON b.offer_id = o.offer_id
-                        WHERE o.store_id = %s
-                        AND b.status IN ('completed', 'confirmed')
-                        AND b.created_at >= %s AND b.created_at < %s
-                        """,
-                        (store_id_val, day_start, day_end),
-                    )
-                    row = cursor.fetchone() or (0, 0)
-                    bookings_revenue = float(row[0] or 0)
-                    bookings_orders = int(row[1] or 0)
-
-                    cursor.execute(
-                        """
-                        SELECT
-                            COALESCE(SUM(o.total_price), 0) AS revenue,
-                            COUNT(DISTINCT o.order_id) AS orders
-                        FROM orders o
-                        WHERE o.store_id = %s
-                        AND o.order_status = 'completed'
-                        AND o.created_at >= %s AND o.created_at < %s
-                        """,
-                        (store_id_val, day_start, day_end),
-                    )
-                    row = cursor.fetchone() or (0, 0)
-                    orders_revenue = float(row[0] or 0)
-                    orders_count = int(row[1] or 0)
-
-                    revenue.append(bookings_revenue + orders_revenue)
-                    orders.append(bookings_orders + orders_count)
-
                 # Top products (last 30 days)
                 top_map: dict[str, dict[str, float | int | str]] = {}
                 cursor.execute(
@@ -1641,22 +1727,38 @@ async def get_stats(
                     rev = float(row[2] or 0)
                     top_map[name] = {"name": name, "qty": qty, "revenue": rev}
 
+                # Cart orders count per line from order_items, single-offer
+                # orders per row; both aggregated in SQL
+                since = now_val - timedelta(days=30)
                 cursor.execute(
                     """
-                    SELECT COALESCE(off.title, o.item_title, 'Unknown') as title,
-                           COALESCE(SUM(o.quantity), 0) as qty,
-                           COALESCE(SUM(o.total_price), 0) as revenue
-                    FROM orders o
-                    LEFT JOIN offers off ON o.offer_id = off.offer_id
-                    WHERE o.store_id = %s
-                    AND o.order_status = 'completed'
-                    AND COALESCE(o.is_cart_order, 0) = 0
-                    AND o.created_at >= %s
-                    GROUP BY COALESCE(off.title, o.item_title, 'Unknown')
+                    SELECT title, COALESCE(SUM(qty), 0) as qty, COALESCE(SUM(revenue), 0) as revenue
+                    FROM (
+                        SELECT COALESCE(off.title, oi.title, 'Unknown') as title,
+                               oi.quantity as qty,
+                               oi.price * oi.quantity as revenue
+                        FROM orders o
+                        JOIN order_items oi ON oi.order_id = o.order_id
+                        LEFT JOIN offers off ON oi.offer_id = off.offer_id
+                        WHERE o.store_id = %s
+                        AND o.order_status = 'completed'
+                        AND o.created_at >= %s
+                        UNION ALL
+                        SELECT COALESCE(off.title, o.item_title, 'Unknown'),
+                               o.quantity,
+                               o.total_price
+                        FROM orders o
+                        LEFT JOIN offers off ON o.offer_id = off.offer_id
+                        WHERE o.store_id = %s
+                        AND o.order_status = 'completed'
+                        AND COALESCE(o.is_cart_order, 0) = 0
+                        AND o.created_at >= %s
+                    ) lines
+                    GROUP BY title
                     ORDER BY qty DESC
                     LIMIT 20
                     """,
-                    (store_id_val, now_val - timedelta(days=30)),
+                    (store_id_val, since, store_id_val, since),
                 )
                 for row in cursor.fetchall():
                     name = row[0] or "Unknown"
@@ -1867,6 +1969,7 @@ async def update_store(
             store["store_id"],
         ),
     )
+    invalidate_partner_cache(telegram_id)
 
     return {"status": "updated"}
 
@@ -1888,6 +1991,7 @@ async def toggle_store_status(
     await db.execute(
         "UPDATE stores SET status = %s WHERE store_id = %s", (new_status, store["store_id"])
     )
+    invalidate_partner_cache(telegram_id)
 
     return {"status": new_status, "is_open": is_open}
 
@@ -16,6 +16,7 @@ from fastapi import Header, HTTPException
 from pydantic import AliasChoices, BaseModel, Field
 
 from app.core.config import load_settings
+from app.core.init_data_cache import get_webapp_secret_key, init_data_cache
 from app.core.utils import get_uzb_time
 
 logger = logging.getLogger(__name__)
@@ -381,12 +382,28 @@ CATEGORIES = [
 # =============================================================================
 
 
+def _copy_init_data(parsed: dict[str, Any]) -> dict[str, Any]:
+    """Shallow copy so callers cannot mutate a cached verification result."""
+    result = dict(parsed)
+    if isinstance(result.get("user"), dict):
+        result["user"] = dict(result["user"])
+    return result
+
+
 def validate_init_data(init_data: str, bot_token: str) -> dict[str, Any] | None:
     """Validate Telegram WebApp initData.
 
     https://core.telegram.org/bots/webapps#validating-data-received-via-the-mini-app
+
+    Successful results are cached (see ``app.core.init_data_cache``), so repeated
+    calls with the same initData skip parsing and HMAC until auth_date expiry.
     """
-    def _auth_date_is_valid(parsed: dict[str, Any]) -> bool:
+    cached = init_data_cache.get("webapp", bot_token, init_data)
+    if cached is not None:
+        return _copy_init_data(cached)
+
+    def _auth_expires_at(parsed: dict[str, Any]) -> float | None | bool:
+        """Return expiry unix time (None = no expiry), or False if invalid."""
         auth_date = parsed.get("auth_date")
         if not auth_date:
             logger.warning("Missing auth_date in initData")
@@ -410,7 +427,7 @@ def validate_init_data(init_data: str, bot_token: str) -> dict[str, Any] | None:
         if max_age and (now_ts - auth_timestamp) > max_age:
             logger.warning("initData expired (auth_date too old)")
             return False
-        return True
+        return auth_timestamp + max_age if max_age else None
 
     try:
         parsed = dict(parse_qsl(init_data, keep_blank_values=True))
@@ -423,7 +440,7 @@ def validate_init_data(init_data: str, bot_token: str) -> dict[str, Any] | None:
         data_check_arr = sorted([f"{k}={v}" for k, v in parsed.items()])
         data_check_string = "\n".join(data_check_arr)
 
-        secret_key = hmac.new(b"WebAppData", bot_token.encode(), hashlib.sha256).digest()
+        secret_key = get_webapp_secret_key(bot_token)
 
         calculated_hash = hmac.new(
             secret_key, data_check_string.encode(), hashlib.sha256
@@ -433,13 +450,15 @@ def validate_init_data(init_data: str, bot_token: str) -> dict[str, Any] | None:
             logger.warning("Invalid initData hash")
             return None
 
-        if not _auth_date_is_valid(parsed):
+        expires_at = _auth_expires_at(parsed)
+        if expires_at is False:
             return None
 
         if "user" in parsed:
             parsed["user"] = json.loads(unquote(parsed["user"]))
 
-        return parsed
+        init_data_cache.set("webapp", bot_token, init_data, parsed, expires_at)
+        return _copy_init_data(parsed)
 
     except Exception as e:  # pragma: no cover - defensive logging
         logger.error(f"Error validating initData: {e}")
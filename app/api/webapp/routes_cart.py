@@ -8,6 +8,7 @@ from pydantic import BaseModel, Field
 
 from app.core.cart_storage import CartItem as StorageCartItem
 from app.core.cart_storage import cart_storage
+from app.core.offer_lookup import OfferLookup
 from app.core.order_math import calc_items_total, calc_quantity
 
 from .common import (
@@ -76,6 +77,12 @@ async def _db_call(db: Any, name: str, *args: Any, **kwargs: Any) -> Any:
     return await _maybe_await(getattr(db, name)(*args, **kwargs))
 
 
+async def _get_store_cached(db: Any, store_id: int, stores: dict[int, Any]) -> Any | None:
+    if store_id not in stores:
+        stores[store_id] = await _db_call(db, "get_store", store_id) if store_id else None
+    return stores[store_id]
+
+
 def _require_user_id(user: dict[str, Any]) -> int:
     user_id = int(user.get("id") or 0)
     if user_id <= 0:
@@ -192,11 +199,17 @@ def _build_storage_item(
     return StorageCartItem(**item_kwargs)
 
 
-async def _build_cart_state_response(user_id: int, db: Any) -> CartStateResponse:
+async def _build_cart_state_response(
+    user_id: int, db: Any, lookup: OfferLookup | None = None
+) -> CartStateResponse:
     raw_items = cart_storage.get_cart(user_id)
     if not raw_items:
         return CartStateResponse(items=[], total=0, items_count=0)
 
+    lookup = lookup or OfferLookup(db)
+    offers = await lookup.aload(raw_item.offer_id for raw_item in raw_items)
+    stores: dict[int, Any] = {}
+
     changed = False
     normalized_items: list[StorageCartItem] = []
     response_items: list[CartStateItem] = []
@@ -205,13 +218,13 @@ async def _build_cart_state_response(user_id: int, db: Any) -> CartStateResponse
     cart_store_id: int | None = None
 
     for raw_item in raw_items:
-        offer = await _db_call(db, "get_offer", int(raw_item.offer_id))
+        offer = offers.get(int(raw_item.offer_id))
         if not offer or not is_offer_active(offer):
             changed = True
             continue
 
         store_id = int(get_val(offer, "store_id", raw_item.store_id) or 0)
-        store = await _db_call(db, "get_store", store_id) if store_id else None
+        store = await _get_store_cached(db, store_id, stores)
 
         normalized_item = _build_storage_item(
             offer,
@@ -284,14 +297,17 @@ async def replace_cart_state(
 
         items_by_offer: dict[int, StorageCartItem] = {}
         store_id_guard: int | None = None
+        lookup = OfferLookup(db)
+        offers = await lookup.aload(req_item.offer_id for req_item in payload.items)
+        stores: dict[int, Any] = {}
 
         for req_item in payload.items:
-            offer = await _db_call(db, "get_offer", int(req_item.offer_id))
+            offer = offers.get(int(req_item.offer_id))
             if not offer or not is_offer_active(offer):
                 continue
 
             store_id = int(get_val(offer, "store_id", 0) or 0)
-            store = await _db_call(db, "get_store", store_id) if store_id else None
+            store = await _get_store_cached(db, store_id, stores)
 
             existing_qty = (
                 float(items_by_offer[req_item.offer_id].quantity)
@@ -320,7 +336,7 @@ async def replace_cart_state(
         else:
             cart_storage.clear_cart(user_id)
 
-        return await _build_cart_state_response(user_id, db)
+        return await _build_cart_state_response(user_id, db, lookup)
 
     except HTTPException:
         raise
@@ -341,6 +357,7 @@ async def calculate_cart(
         items: list[CalcCartItem] = []
         calc_items: list[dict[str, int | float]] = []
 
+        requested: list[tuple[int, float]] = []
         for item_str in offer_ids.split(","):
             if ":" not in item_str:
                 continue
@@ -352,8 +369,11 @@ async def calculate_cart(
                 continue
             if quantity <= 0:
                 continue
+            requested.append((offer_id, quantity))
 
-            offer = await _db_call(db, "get_offer", offer_id)
+        offers = await OfferLookup(db).aload(offer_id for offer_id, _ in requested)
+        for offer_id, quantity in requested:
+            offer = offers.get(offer_id)
             if offer and is_offer_active(offer):
                 price = normalize_price(get_val(offer, "discount_price", 0))
                 items.append(
@@ -5,7 +5,8 @@ import os
 from datetime import datetime, timedelta
 from typing import Any
 
-from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from pydantic import TypeAdapter
 
 from app.api.rate_limit import limiter
 from app.core.caching import get_cache_service
@@ -28,6 +29,12 @@ from .common import (
 
 router = APIRouter()
 
+# Cached list responses are stored as JSON bytes and returned without
+# re-validating them against the response model.
+_CATEGORIES_JSON = TypeAdapter(list[CategoryResponse])
+_OFFERS_JSON = TypeAdapter(list[OfferResponse])
+_OFFER_PAGE_JSON = TypeAdapter(OfferListResponse)
+
 CATEGORY_ALIASES: dict[str, list[str]] = {
     "sweets": ["sweets", "snacks"],
 }
@@ -279,9 +286,9 @@ async def get_categories(
         cache_key = (
             f"webapp:categories:{normalized_city or ''}:{normalized_region or ''}:{normalized_district or ''}"
         )
-        cached = await cache.get(cache_key)
+        cached = await cache.get_bytes(cache_key)
         if cached is not None:
-            return cached
+            return Response(content=cached, media_type="application/json")
 
     def _count_map_to_response(counts_map: dict[str, int]) -> list[CategoryResponse]:
         total_count = sum(int(value or 0) for value in counts_map.values())
@@ -370,7 +377,9 @@ async def get_categories(
             if sum(int(value or 0) for value in nearby_counts.values()) > 0:
                 result = _count_map_to_response(nearby_counts)
                 if cache and cache_key and cache_ttl > 0:
-                    await cache.set(cache_key, result, ttl=cache_ttl)
+                    await cache.set_bytes(
+                        cache_key, _CATEGORIES_JSON.dump_json(result), ttl=cache_ttl
+                    )
                 return result
 
     scopes: list[tuple[str | None, str | None, str | None]] = []
@@ -426,7 +435,7 @@ async def get_categories(
             )
 
     if cache and cache_key and cache_ttl > 0:
-        await cache.set(cache_key, result, ttl=cache_ttl)
+        await cache.set_bytes(cache_key, _CATEGORIES_JSON.dump_json(result), ttl=cache_ttl)
 
     return result
 
@@ -498,9 +507,9 @@ async def get_offers(
                 f"{storage_min_price or ''}:{storage_max_price or ''}:{min_discount or ''}:"
                 f"{limit}:{offset}:{int(include_meta)}"
             )
-            cached = await cache.get(cache_key)
+            cached = await cache.get_bytes(cache_key)
             if cached is not None:
-                return cached
+                return Response(content=cached, media_type="application/json")
         if store_id:
             raw_offers = (
                 await _db_call(
@@ -824,10 +833,6 @@ async def get_offers(
         if apply_slice:
             offers = offers[offset : offset + limit]
 
-        offers_payload: list[dict[str, Any]] | None = None
-        if cache and cache_key and cache_ttl > 0:
-            offers_payload = [o.model_dump() for o in offers]
-
         if include_meta:
             total: int | None = None
             if not store_id and not search:
@@ -892,11 +897,13 @@ async def get_offers(
                 used_fallback=used_fallback,
             )
             if cache and cache_key and cache_ttl > 0:
-                await cache.set(cache_key, response.model_dump(), ttl=cache_ttl)
+                await cache.set_bytes(
+                    cache_key, _OFFER_PAGE_JSON.dump_json(response), ttl=cache_ttl
+                )
             return response
 
-        if cache and cache_key and cache_ttl > 0 and offers_payload is not None:
-            await cache.set(cache_key, offers_payload, ttl=cache_ttl)
+        if cache and cache_key and cache_ttl > 0:
+            await cache.set_bytes(cache_key, _OFFERS_JSON.dump_json(offers), ttl=cache_ttl)
         return offers
 
     except Exception as e:  # pragma: no cover - defensive
@@ -21,6 +21,8 @@ from app.core.order_math import (
     calc_total_price,
     parse_cart_items,
 )
+from app.core.async_db import run_sync_db
+from app.core.offer_lookup import OfferLookup
 from app.core.units import format_quantity, unit_label
 from app.services.unified_order_service import (
     OrderItem,
@@ -36,6 +38,7 @@ from app.core.idempotency import (
     store_idempotency_response,
 )
 from app.api.rate_limit import limiter
+from database_pg_module.mixins.archive import ORDER_HISTORY_COLUMNS, history_source
 
 from .common import (
     CreateOrderRequest,
@@ -58,23 +61,6 @@ router = APIRouter()
 _webapp_bot: Bot | None = None
 
 
-async def _bookings_archive_exists(db) -> bool:
-    """Check if bookings_archive table exists (optional migration)."""
-    try:
-        if hasattr(db, "execute"):
-            result = await db.execute("SELECT to_regclass('public.bookings_archive')")
-            return bool(result and result[0] and result[0][0])
-        if hasattr(db, "sync") and hasattr(db.sync, "get_connection"):
-            with db.sync.get_connection() as conn:
-                cursor = conn.cursor()
-                cursor.execute("SELECT to_regclass('public.bookings_archive')")
-                row = cursor.fetchone()
-                return bool(row and row[0])
-    except Exception:
-        return False
-    return False
-
-
 def _delivery_cash_enabled() -> bool:
     return os.getenv("FUDLY_DELIVERY_CASH_ENABLED", "0").strip().lower() in {
         "1",
@@ -122,11 +108,13 @@ async def _fetch_completed_stats(
     status_field: str,
     user_id: int,
 ) -> tuple[int, float]:
+    # Lifetime totals: archived history counts too
+    source = history_source(table, ("user_id", "quantity", status_field), include_archive=True)
     query = f"""
         SELECT
             COUNT(*) AS cnt,
             COALESCE(SUM(quantity), 0) AS qty
-        FROM {table}
+        FROM {source} h
         WHERE user_id = %s
           AND LOWER(COALESCE({status_field}, '')) = ANY(%s)
     """
@@ -287,10 +275,11 @@ def _status_for_creation_error(detail: str) -> int:
 async def _load_offers_and_store(items: list[Any], db: Any) -> tuple[dict[int, Any], int]:
     if not items:
         raise HTTPException(status_code=400, detail="No items provided")
+    offers = await OfferLookup(db).aload(item.offer_id for item in items)
     offers_by_id: dict[int, Any] = {}
     store_ids: set[int] = set()
     for item in items:
-        offer = await db.get_offer(item.offer_id) if hasattr(db, "get_offer") else None
+        offer = offers.get(item.offer_id)
         if not offer or not is_offer_active(offer):
             raise HTTPException(status_code=400, detail=f"Offer not found: {item.offer_id}")
         if not is_offer_available_now(offer):
@@ -312,9 +301,8 @@ async def _load_offers_and_store(items: list[Any], db: Any) -> tuple[dict[int, A
     return offers_by_id, next(iter(store_ids))
 
 
-async def _validate_min_order(
-    db: Any,
-    store_id: int,
+def _validate_min_order(
+    store_check: Any,
     items: list[Any],
     offers_by_id: dict[int, Any],
 ) -> None:
@@ -328,7 +316,6 @@ async def _validate_min_order(
 
     total_check = calc_items_total(calc_items)
 
-    store_check = await db.get_store(store_id) if hasattr(db, "get_store") else None
     if not store_check:
         return
     min_order = normalize_price(get_val(store_check, "min_order_amount", 0))
@@ -339,8 +326,7 @@ async def _validate_min_order(
         )
 
 
-async def _validate_store_open(db: Any, store_id: int) -> None:
-    store_check = await db.get_store(store_id) if hasattr(db, "get_store") else None
+def _validate_store_open(store_check: Any) -> None:
     if not store_check:
         return
     if not is_store_open_now(store_check):
@@ -405,7 +391,9 @@ async def create_order(
             }
             idem_hash = build_request_hash(idem_payload)
             idem_db = db.sync if hasattr(db, "sync") else db
-            idem_result = check_or_reserve_key(idem_db, idem_key, user_id, idem_hash)
+            idem_result = await run_sync_db(
+                check_or_reserve_key, idem_db, idem_key, user_id, idem_hash
+            )
             if idem_result.get("status") in ("cached", "conflict", "in_progress"):
                 return JSONResponse(
                     content=idem_result.get("payload", {}),
@@ -415,7 +403,8 @@ async def create_order(
         resolved_phone = await _resolve_required_phone(db, user_id, order.phone)
 
         offers_by_id, store_id = await _load_offers_and_store(order.items, db)
-        await _validate_store_open(db, store_id)
+        store = await db.get_store(store_id) if hasattr(db, "get_store") else None
+        _validate_store_open(store)
 
         if payment_method not in ("cash", "click"):
             raise HTTPException(status_code=400, detail="Unsupported payment method")
@@ -427,7 +416,7 @@ async def create_order(
             )
 
         if is_delivery:
-            await _validate_min_order(db, store_id, order.items, offers_by_id)
+            _validate_min_order(store, order.items, offers_by_id)
 
         created_items: list[dict[str, Any]] = []
         order_items: list[OrderItem] = []
@@ -451,7 +440,6 @@ async def create_order(
                 )
                 offer_store_id = int(get_val(offer, "store_id"))
                 offer_title = get_val(offer, "title", "Tovar")
-                store = await db.get_store(offer_store_id) if hasattr(db, "get_store") else None
                 store_name = get_val(store, "name", "") if store else ""
                 store_address = get_val(store, "address", "") if store else ""
                 delivery_price = 0
@@ -565,7 +553,8 @@ async def create_order(
         ).model_dump()
         if idem_key and idem_hash:
             idem_db = db.sync if hasattr(db, "sync") else db
-            store_idempotency_response(
+            await run_sync_db(
+                store_idempotency_response,
                 idem_db,
                 idem_key,
                 user_id,
@@ -578,7 +567,8 @@ async def create_order(
     except HTTPException as exc:
         if "idem_key" in locals() and idem_key and idem_hash:
             idem_db = db.sync if hasattr(db, "sync") else db
-            store_idempotency_response(
+            await run_sync_db(
+                store_idempotency_response,
                 idem_db,
                 idem_key,
                 user_id,
@@ -600,23 +590,31 @@ async def get_orders(
     request: Request,
     limit: int = Query(100, ge=1, le=200),
     offset: int = Query(0, ge=0),
+    include_archive: bool = Query(False),
     db=Depends(get_db),
     user: dict = Depends(get_current_user),
 ):
-    """Get user's orders and bookings for WebApp."""
+    """Get user's orders and bookings for WebApp.
+
+    ``include_archive`` adds orders and bookings moved to the history archive.
+    """
     user_id = _require_user_id(user)
     page_limit = max(1, min(int(limit), 200))
     page_offset = max(0, int(offset))
 
     orders: list[dict[str, Any]] = []
     raw_orders: list[Any] = []
+    order_items: dict[int, list[dict]] = {}
 
     try:
         if hasattr(db, "sync") and hasattr(db.sync, "get_connection"):
-            def _fetch_orders_sync(sync_db, uid: int, limit: int, offset: int) -> list[Any]:
+            def _fetch_orders_sync(
+                sync_db, uid: int, limit: int, offset: int
+            ) -> tuple[list[Any], dict[int, list[dict]]]:
+                source = history_source("orders", ORDER_HISTORY_COLUMNS, include_archive)
                 with sync_db.get_connection() as conn:
                     cursor = conn.cursor()
-                    orders_query = """
+                    orders_query = f"""
                         SELECT
                             o.order_id,
                             o.order_status,
@@ -644,7 +642,7 @@ async def get_orders(
                             off.title AS offer_title,
                             off.discount_price AS offer_price,
                             off.photo_id AS offer_photo_id
-                        FROM orders o
+                        FROM {source} o
                         LEFT JOIN stores s ON o.store_id = s.store_id
                         LEFT JOIN offers off ON o.offer_id = off.offer_id
                         WHERE o.user_id = %s
@@ -703,15 +701,21 @@ async def get_orders(
                     if rows and not hasattr(rows[0], "get"):
                         columns = [col[0] for col in cursor.description or []]
                         rows = [dict(zip(columns, row)) for row in rows]
-                    return rows
+                # Lines of every cart order on the page in one query
+                cart_ids = [row.get("order_id") for row in rows if row.get("is_cart_order")]
+                items = sync_db.get_order_items(cart_ids, include_archive) if cart_ids else {}
+                return rows, items
 
-            raw_orders = await db.run(_fetch_orders_sync, db.sync, int(user_id), page_limit, page_offset)
+            raw_orders, order_items = await db.run(
+                _fetch_orders_sync, db.sync, int(user_id), page_limit, page_offset
+            )
             logger.info(
                 f"📦 Fetched {len(raw_orders)} raw orders for user {user_id} (limit={page_limit}, offset={page_offset})"
             )
     except Exception as e:
         logger.warning(f"Webapp get_orders failed to fetch orders: {e}")
         raw_orders = []
+        order_items = {}
 
     for r in raw_orders:
         if not hasattr(r, "get"):
@@ -742,8 +746,11 @@ async def get_orders(
         items_total = 0
         qty_total = 0
 
-        if is_cart and cart_items_json:
+        cart_items = order_items.get(order_id)
+        if is_cart and not cart_items and cart_items_json:
             cart_items = parse_cart_items(cart_items_json)
+
+        if is_cart and cart_items:
             items_total = calc_items_total(cart_items)
             qty_total = calc_quantity(cart_items)
 
@@ -760,7 +767,7 @@ async def get_orders(
                         "price": price,
                         "quantity": qty,
                         "store_name": r.get("store_name"),
-                        "photo": None,
+                        "photo": it.get("photo_id"),
                     }
                 )
         else:
@@ -845,7 +852,7 @@ async def get_orders(
     bookings = []
     if include_bookings and hasattr(db, "get_user_bookings"):
         try:
-            raw_bookings = await db.get_user_bookings(int(user_id)) or []
+            raw_bookings = await db.get_user_bookings(int(user_id), include_archive) or []
             for b in raw_bookings:
                 if isinstance(b, tuple):
                     offer_photo = None
@@ -879,74 +886,6 @@ async def get_orders(
             logger.warning(f"Webapp get_orders failed to fetch bookings: {e}")
             raw_bookings = []
 
-    if include_bookings and not bookings and await _bookings_archive_exists(db) and hasattr(db, "sync"):
-        try:
-            def _fetch_archived_bookings(sync_db, uid: int) -> list[Any]:
-                with sync_db.get_connection() as conn:
-                    cursor = conn.cursor()
-                    cursor.execute(
-                        """
-                        SELECT
-                            b.booking_id,
-                            b.offer_id,
-                            b.user_id,
-                            b.status,
-                            b.booking_code,
-                            b.pickup_time,
-                            COALESCE(b.quantity, 1) as quantity,
-                            b.created_at,
-                            COALESCE(o.title, 'Tovar') as title,
-                            COALESCE(o.discount_price, 0) as discount_price,
-                            o.available_until,
-                            COALESCE(s.name, 'Dokon') as name,
-                            COALESCE(s.address, '') as address,
-                            s.city
-                        FROM bookings_archive b
-                        LEFT JOIN offers o ON b.offer_id = o.offer_id
-                        LEFT JOIN stores s ON o.store_id = s.store_id
-                        WHERE b.user_id = %s
-                        ORDER BY b.created_at DESC
-                        """,
-                        (int(uid),),
-                    )
-                    return cursor.fetchall() or []
-
-            raw_bookings = await db.run(_fetch_archived_bookings, db.sync, int(user_id))
-        except Exception as e:
-            # bookings_archive is optional (only exists after v24 migration)
-            logger.debug(f"Webapp get_orders fallback bookings_archive skipped: {e}")
-            raw_bookings = []
-
-        for b in raw_bookings:
-            if isinstance(b, tuple):
-                offer_photo = None
-                if len(b) > 1 and b[1] and hasattr(db, "get_offer"):
-                    try:
-                        offer = await db.get_offer(b[1])
-                        if offer:
-                            offer_photo = get_val(offer, "photo") or get_val(offer, "photo_id")
-                    except Exception:
-                        pass
-
-                booking_payload = {
-                    "booking_id": b[0] if len(b) > 0 else None,
-                    "offer_id": b[1] if len(b) > 1 else None,
-                    "user_id": b[2] if len(b) > 2 else None,
-                    "status": b[3] if len(b) > 3 else "pending",
-                    "booking_code": b[4] if len(b) > 4 else None,
-                    "pickup_time": b[5] if len(b) > 5 else None,
-                    "quantity": b[6] if len(b) > 6 else 1.0,
-                    "created_at": b[7] if len(b) > 7 else None,
-                    "title": b[8] if len(b) > 8 else None,
-                    "discount_price": b[9] if len(b) > 9 else 0,
-                    "name": b[11] if len(b) > 11 else None,
-                    "address": b[12] if len(b) > 12 else None,
-                    "offer_photo": offer_photo,
-                }
-                bookings.append(_normalize_booking_payload(booking_payload))
-            elif isinstance(b, dict):
-                bookings.append(_normalize_booking_payload(dict(b)))
-
     logger.info(
         f"📊 get_orders result for user {user_id}: {len(orders)} orders, {len(bookings)} bookings"
     )
@@ -977,16 +916,9 @@ async def get_orders_summary(
         db, "bookings", "status", user_id
     )
 
-    archive_count = 0
-    archive_qty = 0.0
-    if await _bookings_archive_exists(db):
-        archive_count, archive_qty = await _fetch_completed_stats(
-            db, "bookings_archive", "status", user_id
-        )
-
     return OrdersSummaryResponse(
-        completed_orders=orders_count + bookings_count + archive_count,
-        completed_quantity=orders_qty + bookings_qty + archive_qty,
+        completed_orders=orders_count + bookings_count,
+        completed_quantity=orders_qty + bookings_qty,
         saved_weight_kg=None,
     )
 
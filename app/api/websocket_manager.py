@@ -6,116 +6,127 @@ Handles:
 - New order notifications
 - Order status updates
 - Real-time updates for web panel
+
+Connections are registered in the process-wide hub
+(``app.core.websocket.WebSocketManager``) as ``kind="partner"`` clients, so
+routing, queuing and metrics are shared with the aiohttp ``/ws`` endpoint.
 """
 import logging
-from typing import Dict, Set, Any
-from fastapi import WebSocket, WebSocketDisconnect
+from typing import Any
+
+from fastapi import WebSocket
+
+from app.core.websocket import WebSocketClient, WebSocketManager, get_websocket_manager
 
 logger = logging.getLogger(__name__)
 
 
+class StarletteSocket:
+    """aiohttp-style ``send_str``/``close``/``closed`` over a FastAPI WebSocket."""
+
+    __slots__ = ("_ws", "closed")
+
+    def __init__(self, websocket: WebSocket):
+        self._ws = websocket
+        self.closed = False
+
+    async def send_str(self, text: str) -> None:
+        try:
+            await self._ws.send_text(text)
+        except Exception:
+            self.closed = True
+            raise
+
+    async def close(self, code: int = 1000) -> None:
+        if self.closed:
+            return
+        self.closed = True
+        try:
+            await self._ws.close(code=code)
+        except Exception:
+            pass
+
+
 class ConnectionManager:
     """Manage WebSocket connections for partners."""
-    
-    def __init__(self):
-        # store_id → set of WebSocket connections
-        self.active_connections: Dict[int, Set[WebSocket]] = {}
+
+    def __init__(self, hub: WebSocketManager | None = None):
+        self._hub = hub
+        self._clients: dict[WebSocket, WebSocketClient] = {}
         logger.info("✅ ConnectionManager initialized")
-    
-    async def connect(self, store_id: int, websocket: WebSocket):
+
+    @property
+    def hub(self) -> WebSocketManager:
+        return self._hub or get_websocket_manager()
+
+    async def connect(self, store_id: int, websocket: WebSocket) -> WebSocketClient:
         """Connect a partner's WebSocket."""
         await websocket.accept()
-        
-        if store_id not in self.active_connections:
-            self.active_connections[store_id] = set()
-        
-        self.active_connections[store_id].add(websocket)
-        logger.info(f"🔌 Partner connected: store_id={store_id}, total={len(self.active_connections[store_id])}")
-    
+
+        client = WebSocketClient(ws=StarletteSocket(websocket), store_id=store_id, kind="partner")
+        self._clients[websocket] = self.hub.register(client)
+        logger.info(f"🔌 Partner connected: store_id={store_id}")
+        return client
+
     def disconnect(self, store_id: int, websocket: WebSocket):
         """Disconnect a partner's WebSocket."""
-        if store_id in self.active_connections:
-            self.active_connections[store_id].discard(websocket)
-            
-            # Clean up empty sets
-            if not self.active_connections[store_id]:
-                del self.active_connections[store_id]
-            
+        client = self._clients.pop(websocket, None)
+        if client is not None:
+            self.hub.unregister(client)
+            client.discard_pending()
+            client.ws.closed = True
             logger.info(f"🔌 Partner disconnected: store_id={store_id}")
-    
-    async def notify_store(self, store_id: int, message: Dict[str, Any]) -> int:
+
+    async def notify_store(self, store_id: int, message: dict[str, Any]) -> int:
         """Send notification to all connections for a specific store."""
-        if store_id not in self.active_connections:
+        sent = await self.hub.send_to_store(store_id, message, kind="partner")
+        if sent:
+            logger.info(f"📤 Sent notification to {sent} connections (store {store_id})")
+        else:
             logger.debug(f"📡 No active connections for store {store_id}")
-            return 0
-        
-        sent = 0
-        dead_connections: list[WebSocket] = []
-        
-        for websocket in self.active_connections[store_id]:
-            try:
-                await websocket.send_json(message)
-                sent += 1
-            except WebSocketDisconnect:
-                dead_connections.append(websocket)
-            except Exception as e:
-                logger.error(f"❌ Failed to send to store {store_id}: {e}")
-                dead_connections.append(websocket)
-        
-        # Clean up dead connections
-        for ws in dead_connections:
-            self.disconnect(store_id, ws)
-        
-        logger.info(f"📤 Sent notification to {sent} connections (store {store_id})")
         return sent
-    
-    async def notify_new_order(self, store_id: int, order_data: Dict[str, Any]) -> int:
+
+    async def notify_new_order(self, store_id: int, order_data: dict[str, Any]) -> int:
         """Notify store about new order."""
-        message: Dict[str, Any] = {
-            "type": "new_order",
-            "data": order_data
-        }
+        message: dict[str, Any] = {"type": "new_order", "data": order_data}
         return await self.notify_store(store_id, message)
-    
+
     async def notify_order_status(
         self,
         store_id: int,
         order_id: int,
         new_status: str,
-        unified: Dict[str, Any] | None = None,
+        unified: dict[str, Any] | None = None,
     ) -> int:
         """Notify store about order status change."""
-        message: Dict[str, Any] = {
+        message: dict[str, Any] = {
             "type": "order_status_changed",
             "data": {
                 "order_id": order_id,
                 "status": new_status,
-            }
+            },
         }
         if unified:
             message["data"]["unified"] = unified
         return await self.notify_store(store_id, message)
-    
+
     async def notify_order_cancelled(self, store_id: int, order_id: int, reason: str) -> int:
         """Notify store about order cancellation."""
-        message: Dict[str, Any] = {
+        message: dict[str, Any] = {
             "type": "order_cancelled",
-            "data": {
-                "order_id": order_id,
-                "reason": reason
-            }
+            "data": {"order_id": order_id, "reason": reason},
         }
         return await self.notify_store(store_id, message)
-    
-    def get_stats(self) -> Dict[str, Any]:
+
+    def get_stats(self) -> dict[str, Any]:
         """Get connection statistics."""
+        stores: dict[int, int] = {}
+        for client in self._clients.values():
+            stores[client.store_id] = stores.get(client.store_id, 0) + 1
         return {
-            "total_stores": len(self.active_connections),
-            "total_connections": sum(len(conns) for conns in self.active_connections.values()),
-            "stores": {
-                store_id: len(conns) 
-                for store_id, conns in self.active_connections.items()
-            }
+            "total_stores": len(stores),
+            "total_connections": len(self._clients),
+            "stores": stores,
         }
 
 
@@ -1,12 +1,34 @@
 """Async helper wrappers for sync database adapters."""
 from __future__ import annotations
 
+import os
 from typing import Any, Callable, TypeVar
 
 import anyio
 
 T = TypeVar("T")
 
+# Cap on sync DB calls running in worker threads at once. Defaults to the
+# connection pool size so extra callers queue here instead of in the pool.
+DB_THREAD_LIMIT = int(os.getenv("DB_THREAD_LIMIT") or os.getenv("DB_MAX_CONN") or 20)
+
+_db_limiter: anyio.CapacityLimiter | None = None
+
+
+def get_db_limiter() -> anyio.CapacityLimiter:
+    """Return the shared limiter used for off-loop DB calls."""
+    global _db_limiter
+    if _db_limiter is None:
+        _db_limiter = anyio.CapacityLimiter(max(1, DB_THREAD_LIMIT))
+    return _db_limiter
+
+
+async def run_sync_db(func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """Run a sync DB callable in a worker thread with bounded concurrency."""
+    return await anyio.to_thread.run_sync(
+        lambda: func(*args, **kwargs), limiter=get_db_limiter()
+    )
+
 
 class AsyncDBProxy:
     """Proxy that runs sync DB calls in a thread pool."""
@@ -21,7 +43,7 @@ class AsyncDBProxy:
 
     async def run(self, func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
         """Run a sync callable in a worker thread."""
-        return await anyio.to_thread.run_sync(lambda: func(*args, **kwargs))
+        return await run_sync_db(func, *args, **kwargs)
 
     def __getattr__(self, name: str):
         attr = getattr(self._db, name)
@@ -29,7 +51,6 @@ class AsyncDBProxy:
             return attr
 
         async def _call(*args: Any, **kwargs: Any):
-            return await anyio.to_thread.run_sync(lambda: attr(*args, **kwargs))
+            return await run_sync_db(attr, *args, **kwargs)
 
         return _call
-
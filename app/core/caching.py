@@ -574,6 +574,26 @@ class CacheService:
         """Delete cached value."""
         return await self._backend.delete(key)
 
+    async def get_bytes(self, key: str) -> bytes | None:
+        """Get a pre-serialized payload stored with ``set_bytes``."""
+        value = await self._backend.get(self._bytes_key(key))
+        return value if isinstance(value, bytes) else None
+
+    async def set_bytes(
+        self, key: str, body: bytes, ttl: int | None = None, tags: list[str] | None = None
+    ) -> bool:
+        """
+        Cache an already serialized response body.
+
+        Hits can be sent as-is, skipping validation and JSON encoding; the
+        separate key namespace keeps them apart from ``set`` values.
+        """
+        return await self.set(self._bytes_key(key), body, ttl, tags)
+
+    @staticmethod
+    def _bytes_key(key: str) -> str:
+        return f"{key}:bytes"
+
     async def invalidate_tag(self, tag: str) -> int:
         """Invalidate all entries with tag."""
         count = await self._backend.delete_by_tag(tag)
@@ -0,0 +1,112 @@
+"""Optional high-performance runtime: uvloop event loop and orjson encoding.
+
+Both libraries are optional. With ``FAST_RUNTIME=auto`` (the default) each is
+used when installed; ``FAST_RUNTIME=0`` keeps the default asyncio loop and
+stdlib ``json`` (useful for A/B runs of ``load_tests/run_api_load_test.py``).
+uvloop ignores ``loop.slow_callback_duration``, so it is also skipped while
+``LOOP_ASYNCIO_DEBUG`` is on to keep the asyncio slow-callback report working.
+
+FastAPI routes with a response model are already serialized by pydantic-core
+and keep the default response class; the helpers here cover the aiohttp
+webhook server and payloads that are serialized once and cached as bytes.
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+from datetime import date
+from decimal import Decimal
+from typing import Any
+
+from aiohttp import web
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+try:
+    import uvloop
+except ImportError:  # pragma: no cover - optional dependency
+    uvloop = None
+
+FAST_RUNTIME_ENABLED = os.getenv("FAST_RUNTIME", "auto").strip().lower() not in {
+    "0",
+    "false",
+    "no",
+    "off",
+}
+ASYNCIO_DEBUG_ENABLED = os.getenv("LOOP_ASYNCIO_DEBUG", "0").strip().lower() in {
+    "1",
+    "true",
+    "yes",
+    "on",
+}
+USE_ORJSON = FAST_RUNTIME_ENABLED and orjson is not None
+USE_UVLOOP = FAST_RUNTIME_ENABLED and uvloop is not None and not ASYNCIO_DEBUG_ENABLED
+
+
+def _default(obj: Any) -> Any:
+    # DB numerics, timestamps and tag sets; everything else is a bug in the caller.
+    # orjson encodes datetime/date itself; the stdlib path must match it.
+    if isinstance(obj, date):
+        return obj.isoformat()
+    if isinstance(obj, Decimal):
+        return float(obj)
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def dumps(obj: Any) -> bytes:
+    """Serialize to UTF-8 JSON bytes."""
+    if USE_ORJSON:
+        return orjson.dumps(obj, default=_default, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(obj, default=_default).encode()
+
+
+def loads(data: bytes | str) -> Any:
+    """Parse JSON from bytes or text."""
+    if USE_ORJSON:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def json_response(
+    data: Any = None,
+    *,
+    status: int = 200,
+    reason: str | None = None,
+    headers: Any = None,
+) -> web.Response:
+    """Drop-in replacement for ``aiohttp.web.json_response``."""
+    return raw_json_response(dumps(data), status=status, reason=reason, headers=headers)
+
+
+def raw_json_response(
+    body: bytes,
+    *,
+    status: int = 200,
+    reason: str | None = None,
+    headers: Any = None,
+) -> web.Response:
+    """Response for an already serialized JSON payload (e.g. from the cache)."""
+    return web.Response(
+        body=body, status=status, reason=reason, headers=headers, content_type="application/json"
+    )
+
+
+def install_event_loop() -> str:
+    """Switch asyncio to uvloop when enabled; call before ``asyncio.run``."""
+    if USE_UVLOOP:
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+        return "uvloop"
+    return "asyncio"
+
+
+def runtime_summary() -> str:
+    return (
+        f"loop={'uvloop' if USE_UVLOOP else 'asyncio'}, "
+        f"json={'orjson' if USE_ORJSON else 'stdlib'}"
+    )
@@ -2,17 +2,35 @@
 Idempotency helpers for order creation.
 
 Stores request hashes and cached responses to prevent duplicate orders.
+
+Keys live in Redis when it is configured: a reservation is one atomic
+``SET NX`` with a TTL and the response is stored as bytes under the same
+key, so neither needs a Postgres round trip. Without Redis (or when a Redis
+call fails) the ``idempotency_keys`` table is used; a reservation there is a
+single statement, and ``purge_expired_idempotency_keys`` removes expired
+rows in batches.
 """
 from __future__ import annotations
 
 import hashlib
 import json
 import logging
+import os
 from typing import Any
 
+from app.core.redis_cache import REDIS_AVAILABLE, redis
+
 logger = logging.getLogger(__name__)
 
+# auto: Redis when REDIS_URL is set and reachable, otherwise Postgres
+IDEMPOTENCY_BACKEND = os.getenv("IDEMPOTENCY_BACKEND", "auto").strip().lower()
+IDEMPOTENCY_TTL_SECONDS = int(os.getenv("IDEMPOTENCY_TTL_SECONDS", str(24 * 3600)))
+IDEMPOTENCY_PURGE_BATCH = int(os.getenv("IDEMPOTENCY_PURGE_BATCH", "1000"))
+_REDIS_STORE_ATTEMPTS = 2
+
 _IDEMPOTENCY_READY = False
+_redis_client: Any = None
+_redis_checked = False
 
 
 def normalize_idempotency_key(value: str | None) -> str | None:
@@ -74,29 +92,247 @@ def _row_value(row: Any, key: str, index: int) -> Any:
         return None
 
 
-def _fetch_idempotency_record(db: Any, key: str, user_id: int) -> tuple[str | None, str | None, int | None] | None:
-    with db.get_connection() as conn:
-        cursor = conn.cursor()
-        cursor.execute(
-            """
-            SELECT request_hash, response_body, status_code
-            FROM idempotency_keys
-            WHERE idempotency_key = %s AND user_id = %s
-            """,
-            (key, int(user_id)),
+def _result_for_existing(
+    request_hash: str,
+    stored_hash: str | None,
+    response_body: str | bytes | None,
+    status_code: int | None,
+) -> dict[str, Any]:
+    if stored_hash and stored_hash != request_hash:
+        return {
+            "status": "conflict",
+            "payload": {"detail": "Idempotency key reuse with different payload"},
+            "status_code": 409,
+        }
+    if response_body and status_code is not None:
+        try:
+            payload = json.loads(response_body)
+        except Exception:
+            payload = {"detail": "Cached response unavailable"}
+        return {"status": "cached", "payload": payload, "status_code": int(status_code)}
+    return {
+        "status": "in_progress",
+        "payload": {"detail": "Request in progress"},
+        "status_code": 409,
+    }
+
+
+class PostgresIdempotencyStore:
+    """Idempotency keys in the ``idempotency_keys`` table."""
+
+    # Reserve a new (or expired) key, or return the stored one, in one
+    # round trip. No row at all means a concurrent reservation that this
+    # statement's snapshot cannot see yet.
+    _RESERVE_SQL = """
+        WITH reserved AS (
+            INSERT INTO idempotency_keys (idempotency_key, user_id, request_hash)
+            VALUES (%(key)s, %(user_id)s, %(request_hash)s)
+            ON CONFLICT (idempotency_key, user_id) DO UPDATE
+            SET request_hash = EXCLUDED.request_hash,
+                response_body = NULL,
+                status_code = NULL,
+                created_at = CURRENT_TIMESTAMP
+            WHERE idempotency_keys.created_at
+                < CURRENT_TIMESTAMP - make_interval(secs => %(ttl)s)
+            RETURNING 1
         )
-        row = cursor.fetchone()
-        if not row:
-            return None
-        request_hash = _row_value(row, "request_hash", 0)
-        response_body = _row_value(row, "response_body", 1)
-        status_code = _row_value(row, "status_code", 2)
-        return (
-            str(request_hash) if request_hash is not None else None,
-            str(response_body) if response_body is not None else None,
+        SELECT TRUE AS reserved, NULL::text AS request_hash,
+               NULL::text AS response_body, NULL::integer AS status_code
+        FROM reserved
+        UNION ALL
+        SELECT FALSE, request_hash, response_body, status_code
+        FROM idempotency_keys
+        WHERE idempotency_key = %(key)s AND user_id = %(user_id)s
+          AND NOT EXISTS (SELECT 1 FROM reserved)
+    """
+
+    def __init__(self, db: Any, ttl: int = IDEMPOTENCY_TTL_SECONDS):
+        self._db = db
+        self._ttl = ttl
+
+    def reserve(self, key: str, user_id: int, request_hash: str) -> dict[str, Any]:
+        if not _ensure_idempotency_table(self._db):
+            return {"status": "skip"}
+        try:
+            with self._db.get_connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute(
+                    self._RESERVE_SQL,
+                    {
+                        "key": key,
+                        "user_id": int(user_id),
+                        "request_hash": request_hash,
+                        "ttl": self._ttl,
+                    },
+                )
+                row = cursor.fetchone()
+        except Exception as exc:
+            logger.warning("Failed to reserve idempotency key: %s", exc)
+            return {"status": "skip"}
+
+        if row is None:
+            return _result_for_existing(request_hash, None, None, None)
+        if _row_value(row, "reserved", 0):
+            return {"status": "reserved", "key": key}
+        status_code = _row_value(row, "status_code", 3)
+        return _result_for_existing(
+            request_hash,
+            _row_value(row, "request_hash", 1),
+            _row_value(row, "response_body", 2),
             int(status_code) if status_code is not None else None,
         )
 
+    def store(
+        self, key: str, user_id: int, request_hash: str, response_body: str, status_code: int
+    ) -> None:
+        if not _ensure_idempotency_table(self._db):
+            return
+        try:
+            with self._db.get_connection() as conn:
+                cursor = conn.cursor()
+                # Upsert: the key may have been reserved in Redis instead
+                cursor.execute(
+                    """
+                    INSERT INTO idempotency_keys
+                        (idempotency_key, user_id, request_hash, response_body, status_code)
+                    VALUES (%s, %s, %s, %s, %s)
+                    ON CONFLICT (idempotency_key, user_id) DO UPDATE
+                    SET response_body = EXCLUDED.response_body,
+                        status_code = EXCLUDED.status_code
+                    WHERE idempotency_keys.request_hash = EXCLUDED.request_hash
+                    """,
+                    (
+                        key,
+                        int(user_id),
+                        request_hash,
+                        response_body,
+                        int(status_code),
+                    ),
+                )
+        except Exception as exc:
+            logger.warning("Failed to store idempotency response: %s", exc)
+
+    def purge_expired(self, batch_size: int = IDEMPOTENCY_PURGE_BATCH) -> int:
+        """Delete expired keys in short batches (one transaction each)."""
+        if not hasattr(self._db, "get_connection"):
+            return 0
+        deleted = 0
+        while True:
+            with self._db.get_connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute(
+                    """
+                    DELETE FROM idempotency_keys
+                    WHERE ctid = ANY(ARRAY(
+                        SELECT ctid FROM idempotency_keys
+                        WHERE created_at < CURRENT_TIMESTAMP - make_interval(secs => %s)
+                        LIMIT %s
+                    ))
+                    """,
+                    (self._ttl, int(batch_size)),
+                )
+                batch = cursor.rowcount or 0
+            deleted += batch
+            if batch < batch_size:
+                return deleted
+
+
+class RedisIdempotencyStore:
+    """Idempotency keys in Redis, falling back to Postgres on Redis errors.
+
+    The value is ``request_hash|status_code|response_body`` (status and body
+    empty while the request is in progress) and expires after the TTL.
+    """
+
+    def __init__(
+        self,
+        client: Any,
+        fallback: PostgresIdempotencyStore | None = None,
+        ttl: int = IDEMPOTENCY_TTL_SECONDS,
+    ):
+        self._client = client
+        self._fallback = fallback
+        self._ttl = ttl
+
+    @staticmethod
+    def _key(key: str, user_id: int) -> str:
+        return f"idempotency:{int(user_id)}:{key}"
+
+    def reserve(self, key: str, user_id: int, request_hash: str) -> dict[str, Any]:
+        redis_key = self._key(key, user_id)
+        try:
+            for _ in range(2):
+                if self._client.set(redis_key, f"{request_hash}||", nx=True, ex=self._ttl):
+                    return {"status": "reserved", "key": key}
+                raw = self._client.get(redis_key)
+                if raw is not None:
+                    break
+            else:
+                return _result_for_existing(request_hash, None, None, None)
+        except Exception as exc:
+            logger.warning("Redis idempotency reserve failed, using Postgres: %s", exc)
+            if self._fallback is None:
+                return {"status": "skip"}
+            return self._fallback.reserve(key, user_id, request_hash)
+
+        if isinstance(raw, str):
+            raw = raw.encode("utf-8")
+        stored_hash, _, rest = raw.partition(b"|")
+        status_raw, _, response_body = rest.partition(b"|")
+        return _result_for_existing(
+            request_hash,
+            stored_hash.decode("utf-8"),
+            response_body,
+            int(status_raw) if status_raw else None,
+        )
+
+    def store(
+        self, key: str, user_id: int, request_hash: str, response_body: str, status_code: int
+    ) -> None:
+        redis_key = self._key(key, user_id)
+        value = f"{request_hash}|{int(status_code)}|".encode() + response_body.encode("utf-8")
+        stored = False
+        for attempt in range(_REDIS_STORE_ATTEMPTS):
+            try:
+                stored = self._client.set(redis_key, value, xx=True, keepttl=True)
+                break
+            except Exception as exc:
+                logger.warning(
+                    "Redis idempotency store failed (attempt %s): %s", attempt + 1, exc
+                )
+        # The request's side effect is committed, so the reservation is never
+        # released: a retry gets "in progress" until the TTL ends instead of
+        # running again. The response still goes to Postgres.
+        if not stored and self._fallback is not None:
+            self._fallback.store(key, user_id, request_hash, response_body, status_code)
+
+
+def _get_redis_client() -> Any:
+    global _redis_client, _redis_checked
+    if _redis_checked:
+        return _redis_client
+    _redis_checked = True
+    url = os.getenv("IDEMPOTENCY_REDIS_URL") or os.getenv("REDIS_URL")
+    if IDEMPOTENCY_BACKEND == "postgres" or not url or not REDIS_AVAILABLE:
+        return None
+    try:
+        client = redis.from_url(url, socket_connect_timeout=2, socket_timeout=2)
+        client.ping()
+        _redis_client = client
+        logger.info("Idempotency keys stored in Redis")
+    except Exception as exc:
+        logger.warning("Redis idempotency store unavailable, using Postgres: %s", exc)
+    return _redis_client
+
+
+def get_idempotency_store(db: Any) -> PostgresIdempotencyStore | RedisIdempotencyStore:
+    """Configured idempotency backend for ``db``."""
+    postgres = PostgresIdempotencyStore(db)
+    client = _get_redis_client()
+    if client is None:
+        return postgres
+    return RedisIdempotencyStore(client, fallback=postgres)
+
 
 def check_or_reserve_key(
     db: Any,
@@ -108,49 +344,7 @@ def check_or_reserve_key(
     key = normalize_idempotency_key(key)
     if not key:
         return {"status": "skip"}
-    if not _ensure_idempotency_table(db):
-        return {"status": "skip"}
-
-    for _ in range(2):
-        existing = _fetch_idempotency_record(db, key, user_id)
-        if existing:
-            stored_hash, response_body, status_code = existing
-            if stored_hash and stored_hash != request_hash:
-                return {
-                    "status": "conflict",
-                    "payload": {"detail": "Idempotency key reuse with different payload"},
-                    "status_code": 409,
-                }
-            if response_body and status_code is not None:
-                try:
-                    payload = json.loads(response_body)
-                except Exception:
-                    payload = {"detail": "Cached response unavailable"}
-                return {"status": "cached", "payload": payload, "status_code": int(status_code)}
-            return {
-                "status": "in_progress",
-                "payload": {"detail": "Request in progress"},
-                "status_code": 409,
-            }
-
-        try:
-            with db.get_connection() as conn:
-                cursor = conn.cursor()
-                cursor.execute(
-                    """
-                    INSERT INTO idempotency_keys (idempotency_key, user_id, request_hash)
-                    VALUES (%s, %s, %s)
-                    ON CONFLICT DO NOTHING
-                    """,
-                    (key, int(user_id), request_hash),
-                )
-                if cursor.rowcount > 0:
-                    return {"status": "reserved", "key": key}
-        except Exception as exc:
-            logger.warning("Failed to reserve idempotency key: %s", exc)
-            return {"status": "skip"}
-
-    return {"status": "conflict", "payload": {"detail": "Idempotency conflict"}, "status_code": 409}
+    return get_idempotency_store(db).reserve(key, user_id, request_hash)
 
 
 def store_idempotency_response(
@@ -164,29 +358,15 @@ def store_idempotency_response(
     key = normalize_idempotency_key(key)
     if not key:
         return
-    if not _ensure_idempotency_table(db):
-        return
     try:
         response_body = json.dumps(payload, ensure_ascii=False, default=str)
     except Exception:
         return
+    get_idempotency_store(db).store(key, user_id, request_hash, response_body, status_code)
 
-    try:
-        with db.get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute(
-                """
-                UPDATE idempotency_keys
-                SET response_body = %s, status_code = %s
-                WHERE idempotency_key = %s AND user_id = %s AND request_hash = %s
-                """,
-                (
-                    response_body,
-                    int(status_code),
-                    key,
-                    int(user_id),
-                    request_hash,
-                ),
-            )
-    except Exception as exc:
-        logger.warning("Failed to store idempotency response: %s", exc)
+
+def purge_expired_idempotency_keys(db: Any, batch_size: int = IDEMPOTENCY_PURGE_BATCH) -> int:
+    """Delete expired Postgres keys in batches; Redis keys expire by TTL."""
+    if not _ensure_idempotency_table(db):
+        return 0
+    return PostgresIdempotencyStore(db).purge_expired(batch_size)
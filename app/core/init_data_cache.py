@@ -0,0 +1,81 @@
+"""Cache of verified Telegram WebApp initData.
+
+A Mini App session sends the same signed initData with every API call.
+Verifying it means parsing the query string and computing two HMAC-SHA256
+digests, so successful verifications are cached by a digest of the initData.
+An entry never outlives the ``auth_date`` expiry it was verified against.
+Failed verifications are never cached.
+"""
+from __future__ import annotations
+
+import hashlib
+import hmac
+import os
+import threading
+import time
+from functools import lru_cache
+from typing import Any
+
+from cachetools import TTLCache
+
+
+@lru_cache(maxsize=8)
+def get_webapp_secret_key(bot_token: str) -> bytes:
+    """HMAC key for initData signatures (depends only on the bot token)."""
+    return hmac.new(b"WebAppData", bot_token.encode(), hashlib.sha256).digest()
+
+
+class VerifiedInitDataCache:
+    """Bounded TTL cache of verification results keyed by initData digest."""
+
+    def __init__(self, maxsize: int = 4096, ttl: float = 300.0):
+        self.ttl = ttl
+        self._entries: TTLCache = TTLCache(maxsize=maxsize, ttl=ttl) if ttl > 0 else None
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(namespace: str, bot_token: str, init_data: str) -> tuple[str, bytes]:
+        digest = hashlib.blake2b(init_data.encode(), key=bot_token.encode()[:64]).digest()
+        return namespace, digest
+
+    def get(self, namespace: str, bot_token: str, init_data: str) -> Any | None:
+        """Return the cached result, or None when missing or auth_date expired."""
+        if self._entries is None or not init_data:
+            return None
+        key = self._key(namespace, bot_token, init_data)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at is not None and time.time() > expires_at:
+                self._entries.pop(key, None)
+                return None
+            return value
+
+    def set(
+        self,
+        namespace: str,
+        bot_token: str,
+        init_data: str,
+        value: Any,
+        expires_at: float | None,
+    ) -> None:
+        """Cache a verified result until ``expires_at`` (unix time) at the latest."""
+        if self._entries is None or not init_data:
+            return
+        with self._lock:
+            self._entries[self._key(namespace, bot_token, init_data)] = (value, expires_at)
+
+    def clear(self) -> None:
+        """Drop all cached verifications."""
+        if self._entries is None:
+            return
+        with self._lock:
+            self._entries.clear()
+
+
+init_data_cache = VerifiedInitDataCache(
+    maxsize=int(os.getenv("INIT_DATA_CACHE_SIZE", "4096")),
+    ttl=float(os.getenv("INIT_DATA_CACHE_TTL_SECONDS", "300")),
+)
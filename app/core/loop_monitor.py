@@ -0,0 +1,271 @@
+"""Event loop lag monitor and blocking-call detector.
+
+Samples how late a periodic timer fires on the running event loop. When the
+delay exceeds the threshold, something ran synchronously on the loop for that
+long (a blocking DB call, sync Redis, heavy JSON work, etc.). Handlers wrapped
+with ``track()`` are reported as the suspects that were in flight at the time.
+
+Two optional diagnostics build on top of the sampler:
+
+- a watchdog thread that notices a stalled loop *while* it is stalled and logs
+  the loop thread's stack, pointing at the exact blocking call;
+- asyncio debug mode with ``slow_callback_duration``, which reports every slow
+  callback through the ``asyncio`` logger (more overhead, use for short runs).
+
+Lag samples and stalls are exported as histograms in ``app.core.metrics``.
+"""
+from __future__ import annotations
+
+import asyncio
+import itertools
+import logging
+import os
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from collections.abc import Iterator
+from contextlib import contextmanager
+from typing import Any
+
+from aiohttp import web
+
+from app.core.metrics import metrics
+
+try:
+    from logging_config import logger
+except ImportError:  # pragma: no cover - fallback for standalone usage
+    logger = logging.getLogger(__name__)
+
+
+def _env_flag(name: str, default: str = "1") -> bool:
+    return os.getenv(name, default).strip().lower() in {"1", "true", "yes", "on"}
+
+
+class EventLoopLagMonitor:
+    """Periodically measure event loop lag and report blocking handlers."""
+
+    def __init__(
+        self,
+        interval: float = 0.5,
+        threshold: float = 0.1,
+        capture_stacks: bool = False,
+        stack_limit: int = 20,
+    ):
+        self.interval = interval
+        self.threshold = threshold
+        self.capture_stacks = capture_stacks
+        self.stack_limit = stack_limit
+        self.last_lag = 0.0
+        self.max_lag = 0.0
+        self.stalls = 0
+        self.last_stack: str | None = None
+        self._inflight: dict[int, tuple[str, float]] = {}
+        self._finished: deque[tuple[str, float, float]] = deque(maxlen=64)
+        self._ids = itertools.count()
+        self._task: asyncio.Task | None = None
+        self._heartbeat = time.monotonic()
+        self._loop_thread_id: int | None = None
+        self._watchdog: threading.Thread | None = None
+        self._watchdog_stop = threading.Event()
+
+    @contextmanager
+    def track(self, label: str) -> Iterator[None]:
+        """Mark a handler as in flight for lag attribution."""
+        token = next(self._ids)
+        started = time.monotonic()
+        self._inflight[token] = (label, started)
+        try:
+            yield
+        finally:
+            self._inflight.pop(token, None)
+            self._finished.append((label, started, time.monotonic()))
+
+    def suspects(self, since: float) -> list[tuple[str, float]]:
+        """Return (label, seconds running) for handlers active after ``since``."""
+        now = time.monotonic()
+        result = [(label, now - started) for label, started in list(self._inflight.values())]
+        result.extend(
+            (label, finished - started)
+            for label, started, finished in list(self._finished)
+            if finished >= since
+        )
+        return result
+
+    def record(self, lag: float, suspects: list[tuple[str, float]]) -> None:
+        """Record one lag sample; log and export stalls above the threshold."""
+        self.last_lag = lag
+        self.max_lag = max(self.max_lag, lag)
+        metrics.event_loop_lag.observe(lag)
+        if lag < self.threshold:
+            return
+        self.stalls += 1
+        # Attribute the stall to the longest-running suspect
+        culprit = max(suspects, key=lambda item: item[1])[0] if suspects else "unknown"
+        metrics.event_loop_blocked.observe(lag, handler=culprit)
+        if suspects:
+            names = ", ".join(f"{label} ({age * 1000:.0f}ms)" for label, age in suspects)
+        else:
+            names = "no tracked handler"
+        logger.warning(f"Event loop blocked for {lag * 1000:.0f}ms; in flight: {names}")
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            since = time.monotonic()
+            self._heartbeat = since
+            expected = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, loop.time() - expected)
+            self._heartbeat = time.monotonic()
+            self.record(lag, self.suspects(since) if lag >= self.threshold else [])
+
+    def _capture_loop_stack(self) -> str | None:
+        if self._loop_thread_id is None:
+            return None
+        frame = sys._current_frames().get(self._loop_thread_id)
+        if frame is None:
+            return None
+        return "".join(traceback.format_stack(frame, limit=self.stack_limit))
+
+    def _watch(self) -> None:
+        """Watchdog thread: dump the loop stack while the loop is stalled."""
+        check_every = max(self.threshold / 2, 0.01)
+        reported_beat = 0.0
+        while not self._watchdog_stop.wait(check_every):
+            beat = self._heartbeat
+            stalled_for = time.monotonic() - beat - self.interval
+            if stalled_for < self.threshold or beat == reported_beat:
+                continue
+            reported_beat = beat  # one report per stall
+            stack = self._capture_loop_stack()
+            if not stack:
+                continue
+            self.last_stack = stack
+            metrics.slow_callbacks_total.inc(source="watchdog")
+            suspects = ", ".join(label for label, _ in self.suspects(beat)) or "unknown"
+            logger.warning(
+                f"Event loop stalled >{stalled_for * 1000:.0f}ms "
+                f"(in flight: {suspects}); loop thread stack:\n{stack}"
+            )
+
+    def start(self) -> None:
+        """Start sampling on the running loop (idempotent)."""
+        if self._task is None or self._task.done():
+            self._loop_thread_id = threading.get_ident()
+            self._heartbeat = time.monotonic()
+            self._task = asyncio.create_task(self._run())
+        if self.capture_stacks and (self._watchdog is None or not self._watchdog.is_alive()):
+            self._watchdog_stop.clear()
+            self._watchdog = threading.Thread(
+                target=self._watch, name="loop-lag-watchdog", daemon=True
+            )
+            self._watchdog.start()
+
+    async def stop(self) -> None:
+        """Stop sampling."""
+        self._watchdog_stop.set()
+        self._watchdog = None
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    def get_stats(self) -> dict[str, Any]:
+        """Return lag stats for health/metrics endpoints."""
+        return {
+            "last_lag_ms": round(self.last_lag * 1000, 1),
+            "max_lag_ms": round(self.max_lag * 1000, 1),
+            "p99_lag_ms": round(metrics.event_loop_lag.get_percentile(99) * 1000, 1),
+            "stalls": self.stalls,
+            "threshold_ms": round(self.threshold * 1000, 1),
+            "last_stack": self.last_stack,
+        }
+
+
+class _SlowCallbackHandler(logging.Handler):
+    """Count asyncio debug-mode "Executing ... took" reports."""
+
+    def emit(self, record: logging.LogRecord) -> None:
+        if "took" in str(record.msg):
+            metrics.slow_callbacks_total.inc(source="asyncio_debug")
+
+
+def enable_slow_callback_report(
+    loop: asyncio.AbstractEventLoop | None = None, threshold: float | None = None
+) -> None:
+    """Turn on asyncio debug slow-callback reporting for ``loop``.
+
+    Debug mode adds per-callback overhead, so this is opt-in
+    (``LOOP_ASYNCIO_DEBUG=1``) for investigating a specific slowdown.
+    """
+    loop = loop or asyncio.get_running_loop()
+    loop.slow_callback_duration = threshold or get_loop_monitor().threshold
+    loop.set_debug(True)
+    asyncio_logger = logging.getLogger("asyncio")
+    if not any(isinstance(h, _SlowCallbackHandler) for h in asyncio_logger.handlers):
+        asyncio_logger.addHandler(_SlowCallbackHandler())
+    logger.info(
+        f"asyncio slow callback report enabled (>{loop.slow_callback_duration * 1000:.0f}ms)"
+    )
+
+
+_monitor: EventLoopLagMonitor | None = None
+
+
+def get_loop_monitor() -> EventLoopLagMonitor:
+    """Get or create the process-wide loop lag monitor."""
+    global _monitor
+    if _monitor is None:
+        _monitor = EventLoopLagMonitor(
+            interval=float(os.getenv("LOOP_LAG_INTERVAL_MS", "500")) / 1000,
+            threshold=float(os.getenv("LOOP_LAG_THRESHOLD_MS", "100")) / 1000,
+            capture_stacks=_env_flag("LOOP_LAG_STACKS", "1"),
+        )
+    return _monitor
+
+
+def start_loop_diagnostics() -> EventLoopLagMonitor | None:
+    """Start loop diagnostics on the running loop according to env settings."""
+    if not _env_flag("LOOP_LAG_MONITOR", "1"):
+        return None
+    monitor = get_loop_monitor()
+    monitor.start()
+    if _env_flag("LOOP_ASYNCIO_DEBUG", "0") and not asyncio.get_running_loop().get_debug():
+        enable_slow_callback_report()
+    return monitor
+
+
+def _handler_label(request: web.Request) -> str:
+    handler = getattr(request.match_info, "handler", None)
+    name = getattr(handler, "__name__", None)
+    return f"{request.method} {name or request.path}"
+
+
+def setup_loop_monitor(app: web.Application) -> EventLoopLagMonitor | None:
+    """Attach lag monitor + handler tracking middleware to an aiohttp app."""
+    if not _env_flag("LOOP_LAG_MONITOR", "1"):
+        return None
+    monitor = get_loop_monitor()
+
+    @web.middleware
+    async def loop_lag_middleware(request: web.Request, handler):
+        with monitor.track(_handler_label(request)):
+            return await handler(request)
+
+    async def _on_startup(_: web.Application) -> None:
+        start_loop_diagnostics()
+
+    async def _on_cleanup(_: web.Application) -> None:
+        await monitor.stop()
+
+    app.middlewares.insert(0, loop_lag_middleware)
+    app.on_startup.append(_on_startup)
+    app.on_cleanup.append(_on_cleanup)
+    app["loop_monitor"] = monitor
+    return monitor
@@ -16,6 +16,8 @@ from datetime import datetime, timezone
 from functools import wraps
 from typing import Any
 
+from app.core.async_db import run_sync_db
+
 try:
     from logging_config import logger
 except ImportError:
@@ -178,6 +180,12 @@ class Histogram:
         return result
 
 
+# Event loop lag is interesting from a few ms up to multi-second stalls
+LOOP_LAG_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, float("inf"))
+# Outbox relay lag: sub-second when woken, up to the retry backoff otherwise
+ORDER_EVENT_LAG_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 300, float("inf"))
+
+
 class MetricsRegistry:
     """Central registry for all metrics."""
 
@@ -240,6 +248,55 @@ class MetricsRegistry:
             "fudly_cache_misses_total", "Cache miss count", ["cache_type"]
         )
 
+        # === Event Loop Diagnostics ===
+        self.event_loop_lag = self.histogram(
+            "fudly_event_loop_lag_seconds",
+            "Delay of the event loop lag sampler timer",
+            buckets=LOOP_LAG_BUCKETS,
+        )
+
+        self.event_loop_blocked = self.histogram(
+            "fudly_event_loop_blocked_seconds",
+            "Event loop stalls above threshold by suspected handler",
+            ["handler"],
+            buckets=LOOP_LAG_BUCKETS,
+        )
+
+        self.slow_callbacks_total = self.counter(
+            "fudly_slow_callbacks_total",
+            "Loop callbacks slower than the threshold (asyncio debug / watchdog)",
+            ["source"],
+        )
+
+        # === Order Events ===
+        self.order_events_relayed = self.counter(
+            "fudly_order_events_relayed_total",
+            "Outbox events handled by the order event relay",
+            ["event_type", "result"],
+        )
+
+        self.order_events_lag = self.histogram(
+            "fudly_order_events_lag_seconds",
+            "Seconds from writing an outbox event to relaying it",
+            ["event_type"],
+            buckets=ORDER_EVENT_LAG_BUCKETS,
+        )
+
+        self.order_event_consumer_errors = self.counter(
+            "fudly_order_event_consumer_errors_total",
+            "Failed deliveries of outbox events by consumer",
+            ["consumer"],
+        )
+
+        self.order_events_total = self.counter(
+            "fudly_order_events_total", "Order lifecycle events", ["event_type", "status"]
+        )
+
+        # === Startup ===
+        self.startup_seconds = self.gauge(
+            "fudly_startup_seconds", "Seconds from process start to startup stage", ["stage"]
+        )
+
     def counter(self, name: str, description: str, labels: list[str] = None) -> Counter:
         """Create or get a counter metric."""
         if name not in self._metrics:
@@ -305,6 +362,8 @@ class MetricsRegistry:
             "active_offers": sum(v for v in self.offers_active._values.values()),
             "avg_request_duration_ms": round(self.request_duration.get_avg() * 1000, 2),
             "p95_request_duration_ms": round(self.request_duration.get_percentile(95) * 1000, 2),
+            "p99_event_loop_lag_ms": round(self.event_loop_lag.get_percentile(99) * 1000, 2),
+            "event_loop_stalls": sum(v for v in self.event_loop_blocked._totals.values()),
         }
 
 
@@ -410,14 +469,22 @@ def track_cache_miss(cache_type: str = "default"):
 
 
 async def update_business_metrics(db) -> None:
-    """Update business metrics from database (call periodically)."""
+    """Update business metrics from database (call periodically).
+
+    Reads the shared platform stats snapshot, so it costs no table scans
+    while the snapshot is fresh.
+    """
     try:
-        # Update active offers count
-        # This would query the database for current counts
-        # Example (implement based on your DB structure):
-        # offers = db.get_active_offers_count_by_city()
-        # for city, count in offers.items():
-        #     metrics.offers_active.set(count, city=city)
-        pass
+        snapshot = await run_sync_db(db.get_platform_stats_snapshot)
+        for role in ("seller", "customer"):
+            metrics.users_total.set(snapshot[f"users_{role}s"], role=role, city="all")
+        for status in ("active", "pending", "rejected"):
+            metrics.stores_total.set(snapshot[f"stores_{status}"], city="all", status=status)
+        metrics.offers_active.set(snapshot["offers_active"], city="all")
+        metrics.bookings_active.set(
+            snapshot["bookings_pending"] + snapshot["bookings_active"]
+            + snapshot["bookings_confirmed"],
+            city="all",
+        )
     except Exception as e:
         logger.error(f"Failed to update business metrics: {e}")
@@ -18,6 +18,8 @@ from datetime import datetime
 from enum import Enum
 from typing import Any, Optional
 
+from app.core.utils import normalize_city
+
 logger = logging.getLogger(__name__)
 
 
@@ -58,6 +60,8 @@ class Notification:
     data: dict[str, Any] = field(default_factory=dict)
     created_at: datetime = field(default_factory=datetime.utcnow)
     priority: int = 0  # 0=normal, 1=high, 2=urgent
+    # WebSocket frame, built once and shared by every client it is sent to
+    _ws_text: str | None = field(default=None, init=False, repr=False, compare=False)
 
     def to_dict(self) -> dict[str, Any]:
         """Convert to dictionary for JSON serialization."""
@@ -75,6 +79,19 @@ class Notification:
         """Convert to JSON string."""
         return json.dumps(self.to_dict())
 
+    def to_ws_text(self) -> str:
+        """WebSocket ``notification`` frame (serialized once per notification)."""
+        if self._ws_text is None:
+            self._ws_text = _ws_frame(self.to_json())
+        return self._ws_text
+
+    @classmethod
+    def from_json(cls, raw: str) -> "Notification":
+        """Create from ``to_json`` output, reusing it for the WebSocket frame."""
+        notification = cls.from_dict(json.loads(raw))
+        notification._ws_text = _ws_frame(raw)
+        return notification
+
     @classmethod
     def from_dict(cls, data: dict[str, Any]) -> "Notification":
         """Create from dictionary."""
@@ -89,10 +106,33 @@ class Notification:
         )
 
 
+def _ws_frame(notification_json: str) -> str:
+    return f'{{"type": "notification", "payload": {notification_json}}}'
+
+
 # Type for notification handlers
 NotificationHandler = Callable[[Notification], Awaitable[None]]
 
 
+async def _call_handler(
+    channel: str, handler: NotificationHandler, notification: Notification
+) -> None:
+    try:
+        await handler(notification)
+    except Exception as e:
+        logger.error(f"Handler error in channel {channel}: {e}")
+
+
+async def _fan_out(
+    channel: str, handlers: list[NotificationHandler], notification: Notification
+) -> None:
+    """Deliver to all handlers concurrently so one slow handler cannot stall the rest."""
+    if len(handlers) == 1:
+        await _call_handler(channel, handlers[0], notification)
+    elif handlers:
+        await asyncio.gather(*(_call_handler(channel, h, notification) for h in handlers))
+
+
 class PubSubBackend(ABC):
     """Abstract base for pub/sub backends."""
 
@@ -126,13 +166,7 @@ class InMemoryPubSub(PubSubBackend):
 
     async def publish(self, channel: str, notification: Notification) -> None:
         """Publish to in-memory subscribers."""
-        handlers = self._subscribers.get(channel, set()).copy()
-
-        for handler in handlers:
-            try:
-                await handler(notification)
-            except Exception as e:
-                logger.error(f"Handler error in channel {channel}: {e}")
+        await _fan_out(channel, list(self._subscribers.get(channel, ())), notification)
 
     async def subscribe(self, channel: str, handler: NotificationHandler) -> None:
         """Subscribe to channel."""
@@ -156,13 +190,20 @@ class InMemoryPubSub(PubSubBackend):
 
 
 class RedisPubSub(PubSubBackend):
-    """Redis-based pub/sub for multi-instance deployments."""
+    """Redis-based pub/sub for multi-instance deployments.
+
+    Each process holds one pattern subscription per channel family
+    (``user:*``, ``store:*``, ...) and a single listener task, instead of one
+    Redis subscription per connected user or store. Messages for channels
+    without a local subscriber are skipped before they are decoded.
+    """
 
     def __init__(self, redis_url: str):
         self._redis_url = redis_url
         self._redis = None
         self._pubsub = None
         self._subscribers: dict[str, set[NotificationHandler]] = {}
+        self._patterns: set[str] = set()
         self._listener_task: asyncio.Task | None = None
         self._running = False
 
@@ -178,31 +219,30 @@ class RedisPubSub(PubSubBackend):
                 logger.warning("redis package not installed, falling back to in-memory")
                 raise
 
+    @staticmethod
+    def _pattern_for(channel: str) -> str:
+        """``user:42`` -> ``user:*``; channels without a prefix are used as is."""
+        prefix, sep, _ = channel.partition(":")
+        return f"{prefix}:*" if sep else channel
+
     async def _listen(self) -> None:
         """Listen for Redis pub/sub messages."""
         while self._running and self._pubsub:
             try:
-                if not self._subscribers:
-                    await asyncio.sleep(0.5)
-                    continue
-                message = await self._pubsub.get_message(
-                    ignore_subscribe_messages=True, timeout=1.0
-                )
-                if message and message["type"] == "message":
-                    channel = (
-                        message["channel"].decode()
-                        if isinstance(message["channel"], bytes)
-                        else message["channel"]
-                    )
-                    data = json.loads(message["data"])
-                    notification = Notification.from_dict(data)
-
-                    handlers = self._subscribers.get(channel, set()).copy()
-                    for handler in handlers:
-                        try:
-                            await handler(notification)
-                        except Exception as e:
-                            logger.error(f"Handler error: {e}")
+                async for message in self._pubsub.listen():
+                    if message["type"] not in ("message", "pmessage"):
+                        continue
+                    channel = message["channel"]
+                    if isinstance(channel, bytes):
+                        channel = channel.decode()
+                    handlers = self._subscribers.get(channel)
+                    if not handlers:
+                        continue
+                    data = message["data"]
+                    if isinstance(data, bytes):
+                        data = data.decode()
+                    await _fan_out(channel, list(handlers), Notification.from_json(data))
+                await asyncio.sleep(0.5)
             except asyncio.CancelledError:
                 break
             except Exception as e:
@@ -218,23 +258,25 @@ class RedisPubSub(PubSubBackend):
         """Subscribe to Redis channel."""
         await self._ensure_connected()
 
-        if channel not in self._subscribers:
-            self._subscribers[channel] = set()
-            await self._pubsub.subscribe(channel)
+        self._subscribers.setdefault(channel, set()).add(handler)
+        pattern = self._pattern_for(channel)
+        if pattern not in self._patterns:
+            self._patterns.add(pattern)
+            if pattern == channel:
+                await self._pubsub.subscribe(channel)
+            else:
+                await self._pubsub.psubscribe(pattern)
 
-        self._subscribers[channel].add(handler)
         if not self._listener_task or self._listener_task.done():
             self._running = True
             self._listener_task = asyncio.create_task(self._listen())
 
     async def unsubscribe(self, channel: str, handler: NotificationHandler) -> None:
-        """Unsubscribe from Redis channel."""
+        """Unsubscribe handler; the shared pattern subscription stays."""
         if channel in self._subscribers:
             self._subscribers[channel].discard(handler)
             if not self._subscribers[channel]:
                 del self._subscribers[channel]
-                if self._pubsub:
-                    await self._pubsub.unsubscribe(channel)
 
     async def close(self) -> None:
         """Close Redis connections."""
@@ -249,6 +291,7 @@ class RedisPubSub(PubSubBackend):
             await self._pubsub.close()
         if self._redis:
             await self._redis.close()
+        self._patterns.clear()
 
 
 class NotificationService:
@@ -342,6 +385,14 @@ class NotificationService:
         if store_id in self._store_handlers:
             self._store_handlers[store_id].discard(handler)
 
+    async def subscribe_city(self, city: str, handler: NotificationHandler) -> None:
+        """Subscribe to city-wide notifications."""
+        await self._backend.subscribe(self.city_channel(normalize_city(city)), handler)
+
+    async def unsubscribe_city(self, city: str, handler: NotificationHandler) -> None:
+        """Unsubscribe from city-wide notifications."""
+        await self._backend.unsubscribe(self.city_channel(normalize_city(city)), handler)
+
     async def subscribe_global(self, handler: NotificationHandler) -> None:
         """Subscribe to global notifications."""
         await self._backend.subscribe(self.global_channel(), handler)
@@ -364,7 +415,7 @@ class NotificationService:
 
     async def notify_city(self, city: str, notification: Notification) -> None:
         """Send notification to all users in a city."""
-        channel = self.city_channel(city)
+        channel = self.city_channel(normalize_city(city))
         await self._backend.publish(channel, notification)
 
     async def broadcast(self, notification: Notification) -> None:
@@ -0,0 +1,94 @@
+"""Batched offer lookups for cart and checkout paths.
+
+``fetch_offers_by_ids`` loads every offer of a cart together with its store
+fields in one query (``OfferMixin.get_offers_by_ids``), so validating a cart
+costs the same number of DB round trips whatever its size. ``OfferLookup``
+adds a per-request memo on top for handlers that read the same offers more
+than once.
+"""
+from __future__ import annotations
+
+from collections.abc import Iterable
+from typing import Any
+
+from app.core.async_db import AsyncDBProxy, run_sync_db
+
+
+def _unique_ids(offer_ids: Iterable[Any]) -> list[int]:
+    ids: dict[int, None] = {}
+    for offer_id in offer_ids:
+        try:
+            value = int(offer_id)
+        except (TypeError, ValueError):
+            continue
+        if value > 0:
+            ids[value] = None
+    return list(ids)
+
+
+def fetch_offers_by_ids(db: Any, offer_ids: Iterable[Any]) -> dict[int, Any]:
+    """Offers keyed by ID (blocking); missing offers are absent.
+
+    Adapters without the batch query fall back to one ``get_offer`` per ID.
+    """
+    ids = _unique_ids(offer_ids)
+    if not ids:
+        return {}
+    if hasattr(db, "get_offers_by_ids"):
+        return dict(db.get_offers_by_ids(ids) or {})
+    if not hasattr(db, "get_offer"):
+        return {}
+    offers: dict[int, Any] = {}
+    for offer_id in ids:
+        offer = db.get_offer(offer_id)
+        if offer:
+            offers[offer_id] = offer
+    return offers
+
+
+class OfferLookup:
+    """Per-request memo over ``fetch_offers_by_ids``.
+
+    Only IDs not seen before hit the database, and misses are remembered
+    too. Create one per request: the memo never expires, so it must not
+    outlive the request it was created for.
+    """
+
+    def __init__(self, db: Any):
+        self._db = db.sync if isinstance(db, AsyncDBProxy) else db
+        self._offers: dict[int, Any | None] = {}
+
+    def _missing(self, ids: list[int]) -> list[int]:
+        return [offer_id for offer_id in ids if offer_id not in self._offers]
+
+    def _remember(self, ids: list[int], found: dict[int, Any]) -> None:
+        for offer_id in ids:
+            self._offers[offer_id] = found.get(offer_id)
+
+    def _pick(self, ids: list[int]) -> dict[int, Any]:
+        return {
+            offer_id: self._offers[offer_id]
+            for offer_id in ids
+            if self._offers.get(offer_id) is not None
+        }
+
+    def load(self, offer_ids: Iterable[Any]) -> dict[int, Any]:
+        """Offers keyed by ID, querying only the ones not loaded yet (blocking)."""
+        ids = _unique_ids(offer_ids)
+        missing = self._missing(ids)
+        if missing:
+            self._remember(missing, fetch_offers_by_ids(self._db, missing))
+        return self._pick(ids)
+
+    async def aload(self, offer_ids: Iterable[Any]) -> dict[int, Any]:
+        """Async ``load``: the query runs in the DB worker pool."""
+        ids = _unique_ids(offer_ids)
+        missing = self._missing(ids)
+        if missing:
+            found = await run_sync_db(fetch_offers_by_ids, self._db, missing)
+            self._remember(missing, found)
+        return self._pick(ids)
+
+    def get(self, offer_id: int) -> Any | None:
+        """An offer loaded earlier; never queries."""
+        return self._offers.get(int(offer_id))
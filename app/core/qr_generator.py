@@ -1,20 +1,24 @@
 """
-QR Code generator for booking confirmations.
-Generates QR codes that link to bot for easy order verification.
+QR code generator for pickup codes and booking confirmations.
+
+Pickup codes never change, so rendered images are cached by
+(data, style, format): first in a bounded in-process LRU, then in the
+shared cache service (Redis when configured). Rendering itself is CPU-bound
+and runs in a small worker-thread pool so it never blocks the event loop.
 """
 from __future__ import annotations
 
+import base64
+import hashlib
+import importlib.util
 import io
 import os
+from dataclasses import dataclass
 
-try:
-    import qrcode
-    from qrcode.image.styledpil import StyledPilImage
-    from qrcode.image.styles.moduledrawers import RoundedModuleDrawer
+import anyio
+from cachetools import LRUCache
 
-    QR_AVAILABLE = True
-except ImportError:
-    QR_AVAILABLE = False
+from app.core.caching import get_cache_service
 
 try:
     from logging_config import logger
@@ -24,9 +28,154 @@ except ImportError:
     logger = logging.getLogger(__name__)
 
 
+QR_AVAILABLE = importlib.util.find_spec("qrcode") is not None
+
 # Bot username for deep links - can be overridden via parameter
 DEFAULT_BOT_USERNAME = os.environ.get("BOT_USERNAME", "fudlyuzbot")
 
+QR_CACHE_SIZE = int(os.getenv("QR_CACHE_SIZE", "512"))
+QR_CACHE_TTL = int(os.getenv("QR_CACHE_TTL_SECONDS", str(7 * 24 * 3600)))
+QR_RENDER_THREADS = int(os.getenv("QR_RENDER_THREADS", "2"))
+# Bump when the rendering changes so cached images and ETags are refreshed
+QR_RENDER_VERSION = 1
+
+QR_MEDIA_TYPES = {"png": "image/png", "svg": "image/svg+xml"}
+
+
+@dataclass(frozen=True)
+class QrStyle:
+    error_correction: str
+    box_size: int
+    border: int
+    fill_color: str = "black"
+    rounded: bool = False
+
+
+QR_STYLES = {
+    # Pickup code shown in the Mini App and scanned by the store
+    "pickup": QrStyle("L", box_size=10, border=4),
+    # Bot deep link sent with booking confirmations
+    "booking": QrStyle("M", box_size=10, border=2, fill_color="#2E7D32", rounded=True),
+    "simple": QrStyle("L", box_size=8, border=2),
+}
+
+_images: LRUCache[str, bytes] = LRUCache(maxsize=max(1, QR_CACHE_SIZE))
+_render_limiter: anyio.CapacityLimiter | None = None
+
+
+def _get_render_limiter() -> anyio.CapacityLimiter:
+    global _render_limiter
+    if _render_limiter is None:
+        _render_limiter = anyio.CapacityLimiter(max(1, QR_RENDER_THREADS))
+    return _render_limiter
+
+
+def _cache_key(data: str, style: str, fmt: str) -> str:
+    digest = hashlib.sha256(data.encode("utf-8")).hexdigest()[:32]
+    return f"qr:v{QR_RENDER_VERSION}:{style}:{fmt}:{digest}"
+
+
+def qr_etag(data: str, style: str = "pickup", fmt: str = "png") -> str:
+    """Strong ETag for a QR image; known without rendering it."""
+    return f'"{hashlib.sha1(_cache_key(data, style, fmt).encode()).hexdigest()}"'
+
+
+def render_qr(data: str, style: str = "pickup", fmt: str = "png") -> bytes:
+    """Render a QR image (blocking, CPU-bound).
+
+    Raises:
+        RuntimeError: if the qrcode package is not installed
+        ValueError: for an unknown style or format
+    """
+    if not QR_AVAILABLE:
+        raise RuntimeError("qrcode package is not installed")
+    if style not in QR_STYLES or fmt not in QR_MEDIA_TYPES:
+        raise ValueError(f"Unsupported QR style/format: {style}/{fmt}")
+
+    import qrcode
+
+    spec = QR_STYLES[style]
+    qr = qrcode.QRCode(
+        version=1,
+        error_correction=getattr(qrcode.constants, f"ERROR_CORRECT_{spec.error_correction}"),
+        box_size=spec.box_size,
+        border=spec.border,
+    )
+    qr.add_data(data)
+    qr.make(fit=True)
+
+    buffer = io.BytesIO()
+    if fmt == "svg":
+        # Vector output skips raster encoding entirely
+        from qrcode.image.svg import SvgPathImage
+
+        qr.make_image(image_factory=SvgPathImage).save(buffer)
+        return buffer.getvalue()
+
+    img = None
+    if spec.rounded:
+        try:
+            from qrcode.image.styledpil import StyledPilImage
+            from qrcode.image.styles.moduledrawers import RoundedModuleDrawer
+
+            img = qr.make_image(
+                image_factory=StyledPilImage,
+                module_drawer=RoundedModuleDrawer(),
+                fill_color=spec.fill_color,
+                back_color="white",
+            )
+        except Exception:
+            # Fallback to simple image if styled fails
+            img = None
+    if img is None:
+        img = qr.make_image(fill_color="black", back_color="white")
+    img.save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+async def get_qr_image(data: str, style: str = "pickup", fmt: str = "png") -> bytes:
+    """Cached QR image: in-process LRU, then the shared cache, then a render.
+
+    Raises the same errors as ``render_qr``.
+    """
+    key = _cache_key(data, style, fmt)
+    body = _images.get(key)
+    if body is not None:
+        return body
+
+    cache = None
+    try:
+        cache = get_cache_service(os.getenv("REDIS_URL"))
+        body = await cache.get_bytes(key)
+    except Exception as e:
+        logger.debug(f"QR cache read failed: {e}")
+    if body is None:
+        body = await anyio.to_thread.run_sync(
+            render_qr, data, style, fmt, limiter=_get_render_limiter()
+        )
+        if cache is not None:
+            try:
+                await cache.set_bytes(key, body, ttl=QR_CACHE_TTL)
+            except Exception as e:
+                logger.debug(f"QR cache write failed: {e}")
+    _images[key] = body
+    return body
+
+
+def to_data_uri(body: bytes, fmt: str = "png") -> str:
+    encoded = base64.b64encode(body).decode("ascii")
+    return f"data:{QR_MEDIA_TYPES[fmt]};base64,{encoded}"
+
+
+async def get_qr_data_uri(data: str, style: str = "pickup", fmt: str = "png") -> str:
+    """Cached QR image as a ``data:`` URI for JSON payloads."""
+    return to_data_uri(await get_qr_image(data, style, fmt), fmt)
+
+
+def booking_deep_link(booking_code: str, bot_username: str | None = None) -> str:
+    """Deep link t.me/BotName?start=pickup_CODE that opens the pickup flow."""
+    return f"https://t.me/{bot_username or DEFAULT_BOT_USERNAME}?start=pickup_{booking_code}"
+
 
 def generate_booking_qr(
     booking_code: str, booking_id: int, bot_username: str | None = None
@@ -49,50 +198,13 @@ def generate_booking_qr(
         logger.warning("QR code generation not available - qrcode package not installed")
         return None
 
-    username = bot_username or DEFAULT_BOT_USERNAME
-    logger.info(
-        f"🔗 QR generating for booking {booking_code} with bot_username: '{username}' (passed: '{bot_username}', default: '{DEFAULT_BOT_USERNAME}')"
-    )
-
     try:
-        # Create deep link for Telegram bot
-        # Format: t.me/BotName?start=pickup_CODE
-        deep_link = f"https://t.me/{username}?start=pickup_{booking_code}"
-        logger.info(f"🔗 QR deep link: {deep_link}")
-
-        # Create QR code with nice styling
-        qr = qrcode.QRCode(
-            version=1,
-            error_correction=qrcode.constants.ERROR_CORRECT_M,
-            box_size=10,
-            border=2,
-        )
-        qr.add_data(deep_link)
-        qr.make(fit=True)
-
-        # Create styled image
-        try:
-            img = qr.make_image(
-                image_factory=StyledPilImage,
-                module_drawer=RoundedModuleDrawer(),
-                fill_color="#2E7D32",  # Green color matching Fudly brand
-                back_color="white",
-            )
-        except Exception:
-            # Fallback to simple image if styled fails
-            img = qr.make_image(fill_color="black", back_color="white")
-
-        # Save to BytesIO
-        buffer = io.BytesIO()
-        img.save(buffer, format="PNG")
-        buffer.seek(0)
-
-        logger.info(f"Generated QR for booking {booking_id} ({booking_code})")
-        return buffer
-
+        body = render_qr(booking_deep_link(booking_code, bot_username), "booking")
     except Exception as e:
         logger.error(f"Failed to generate QR code: {e}")
         return None
+    logger.info(f"Generated QR for booking {booking_id} ({booking_code})")
+    return io.BytesIO(body)
 
 
 def generate_simple_qr(data: str) -> io.BytesIO | None:
@@ -109,23 +221,7 @@ def generate_simple_qr(data: str) -> io.BytesIO | None:
         return None
 
     try:
-        qr = qrcode.QRCode(
-            version=1,
-            error_correction=qrcode.constants.ERROR_CORRECT_L,
-            box_size=8,
-            border=2,
-        )
-        qr.add_data(data)
-        qr.make(fit=True)
-
-        img = qr.make_image(fill_color="black", back_color="white")
-
-        buffer = io.BytesIO()
-        img.save(buffer, format="PNG")
-        buffer.seek(0)
-
-        return buffer
-
+        return io.BytesIO(render_qr(data, "simple"))
     except Exception as e:
         logger.error(f"Failed to generate simple QR: {e}")
         return None
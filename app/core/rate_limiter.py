@@ -0,0 +1,195 @@
+"""Async fixed-window rate limiter shared by the bot and the webhook API.
+
+All windows for one request are checked and incremented by a single Lua
+script, so a check costs one async Redis round trip and counts hold across
+replicas. Identities that are far below every limit are counted locally and
+flushed to Redis in batches, which keeps Redis off the hot path for normal
+users. Without Redis (or while it is unreachable) the local counters are
+authoritative, matching the previous in-memory behaviour.
+"""
+from __future__ import annotations
+
+import logging
+import os
+import time
+from collections.abc import Sequence
+from dataclasses import dataclass
+from typing import Any
+
+from cachetools import TTLCache
+
+logger = logging.getLogger(__name__)
+
+try:
+    import redis.asyncio as aioredis
+
+    REDIS_AVAILABLE = True
+except ImportError:  # pragma: no cover - redis is an optional dependency
+    aioredis = None  # type: ignore
+    REDIS_AVAILABLE = False
+
+# KEYS: one counter per window; ARGV: (amount, window_ms) pairs.
+# Returns a flat list of (count, ttl_ms) pairs.
+_HIT_SCRIPT = """
+local out = {}
+for i, key in ipairs(KEYS) do
+  local amount = tonumber(ARGV[i * 2 - 1])
+  local window_ms = tonumber(ARGV[i * 2])
+  local count = redis.call('INCRBY', key, amount)
+  local ttl = redis.call('PTTL', key)
+  if ttl < 0 then
+    redis.call('PEXPIRE', key, window_ms)
+    ttl = window_ms
+  end
+  out[#out + 1] = count
+  out[#out + 1] = ttl
+end
+return out
+"""
+
+
+@dataclass(frozen=True)
+class RateLimitRule:
+    """Allow ``limit`` hits per ``window`` seconds."""
+
+    name: str
+    limit: int
+    window: int
+
+
+@dataclass
+class _Window:
+    reset_at: float
+    known: int = 0  # last count reported by Redis
+    pending: int = 0  # hits allowed locally, not yet flushed
+
+
+class AsyncRateLimiter:
+    """Rate limiter with one Redis round trip per check and local batching."""
+
+    def __init__(
+        self,
+        redis_url: str | None = None,
+        key_prefix: str = "ratelimit",
+        local_fraction: float = 0.5,
+        sync_every: int = 10,
+        retry_backoff: float = 5.0,
+        maxsize: int = 10000,
+    ):
+        """Initialize the limiter.
+
+        Args:
+            redis_url: Redis URL; ``None`` keeps all counters in process
+            key_prefix: Prefix for Redis keys
+            local_fraction: Count locally while below this share of the limit
+            sync_every: Flush local hits to Redis at least this often
+            retry_backoff: Seconds to stay in local mode after a Redis error
+            maxsize: Maximum number of tracked identities per window
+        """
+        self.redis_url = redis_url
+        self.key_prefix = key_prefix
+        self.local_fraction = local_fraction
+        self.sync_every = max(1, sync_every)
+        self.retry_backoff = retry_backoff
+        self._windows: TTLCache = TTLCache(maxsize=maxsize, ttl=3600)
+        self._client: Any = None
+        self._script: Any = None
+        self._redis_down_until = 0.0
+
+    def _get_script(self) -> Any:
+        if self._script is None:
+            self._client = aioredis.from_url(
+                self.redis_url,
+                decode_responses=True,
+                socket_connect_timeout=1,
+                socket_timeout=1,
+            )
+            self._script = self._client.register_script(_HIT_SCRIPT)
+        return self._script
+
+    def _redis_enabled(self, now: float) -> bool:
+        return bool(self.redis_url) and REDIS_AVAILABLE and now >= self._redis_down_until
+
+    def _windows_for(
+        self, identity: str, rules: Sequence[RateLimitRule], now: float
+    ) -> list[_Window]:
+        windows = []
+        for rule in rules:
+            key = (rule.name, identity)
+            window = self._windows.get(key)
+            if window is None or now >= window.reset_at:
+                window = _Window(reset_at=now + rule.window)
+                self._windows[key] = window
+            windows.append(window)
+        return windows
+
+    @staticmethod
+    def _denied(
+        rules: Sequence[RateLimitRule], windows: list[_Window], now: float, extra: int
+    ) -> tuple[str, int] | None:
+        for rule, window in zip(rules, windows):
+            if window.known + window.pending + extra > rule.limit:
+                return rule.name, max(1, int(window.reset_at - now + 0.999))
+        return None
+
+    async def hit(
+        self, identity: str | int, rules: Sequence[RateLimitRule]
+    ) -> tuple[bool, str | None, int]:
+        """Count one request for ``identity`` against every rule.
+
+        Returns:
+            Tuple of (is_allowed, name of the exceeded rule, retry_after seconds)
+        """
+        identity = str(identity)
+        now = time.monotonic()
+        windows = self._windows_for(identity, rules, now)
+
+        needs_sync = any(
+            window.known + window.pending + 1 > rule.limit * self.local_fraction
+            or window.pending + 1 >= self.sync_every
+            for rule, window in zip(rules, windows)
+        )
+        if needs_sync and self._redis_enabled(now):
+            synced = await self._sync(identity, rules, windows, now)
+            if synced is not None:
+                return synced
+
+        # Local path: far below the limit, or Redis is unavailable
+        denied = self._denied(rules, windows, now, extra=1)
+        if denied:
+            return False, denied[0], denied[1]
+        for window in windows:
+            window.pending += 1
+        return True, None, 0
+
+    async def _sync(
+        self,
+        identity: str,
+        rules: Sequence[RateLimitRule],
+        windows: list[_Window],
+        now: float,
+    ) -> tuple[bool, str | None, int] | None:
+        keys = [f"{self.key_prefix}:{rule.name}:{identity}" for rule in rules]
+        args: list[int] = []
+        for rule, window in zip(rules, windows):
+            args.extend((window.pending + 1, rule.window * 1000))
+        try:
+            result = await self._get_script()(keys=keys, args=args)
+        except Exception as e:
+            logger.warning(f"Redis rate limiter unavailable, counting locally: {e}")
+            self._redis_down_until = now + self.retry_backoff
+            return None
+
+        for index, window in enumerate(windows):
+            window.known = int(result[index * 2])
+            window.pending = 0
+            window.reset_at = now + int(result[index * 2 + 1]) / 1000
+        denied = self._denied(rules, windows, now, extra=0)
+        if denied:
+            return False, denied[0], denied[1]
+        return True, None, 0
+
+
+def get_rate_limit_redis_url() -> str | None:
+    """Redis URL for rate limiting, or ``None`` for in-process counters."""
+    return os.getenv("RATE_LIMIT_REDIS_URL") or os.getenv("REDIS_URL") or None
@@ -0,0 +1,54 @@
+"""Startup timing: how long a fresh process takes to become useful.
+
+Stages are measured from the process start time (``/proc`` on Linux, module
+import elsewhere) so interpreter start-up and imports are included. Each
+stage is logged once and exported as the ``fudly_startup_seconds`` gauge.
+``first_update`` - launch until the first Telegram update was handled -
+is the number that matters for deploys and restarts.
+"""
+from __future__ import annotations
+
+import os
+import time
+
+from app.core.metrics import metrics
+
+try:
+    from logging_config import logger
+except ImportError:  # pragma: no cover - fallback for standalone usage
+    import logging
+
+    logger = logging.getLogger(__name__)
+
+
+def _process_start_time() -> float:
+    """Wall-clock start of this process, or now if it cannot be determined."""
+    try:
+        with open("/proc/self/stat") as f:
+            # Fields after the "(comm)" start at #3; starttime is #22
+            start_ticks = int(f.read().rsplit(")", 1)[1].split()[19])
+        with open("/proc/uptime") as f:
+            uptime = float(f.read().split()[0])
+        return time.time() - uptime + start_ticks / os.sysconf("SC_CLK_TCK")
+    except (OSError, ValueError, IndexError):
+        return time.time()
+
+
+PROCESS_STARTED_AT = _process_start_time()
+_stages: dict[str, float] = {}
+
+
+def mark_startup(stage: str) -> float:
+    """Record and log the seconds since process start for ``stage`` (first call wins)."""
+    if stage in _stages:
+        return _stages[stage]
+    elapsed = max(0.0, time.time() - PROCESS_STARTED_AT)
+    _stages[stage] = elapsed
+    metrics.startup_seconds.set(elapsed, stage=stage)
+    logger.info(f"⏱️ Startup: {stage} after {elapsed:.2f}s")
+    return elapsed
+
+
+def startup_stages() -> dict[str, float]:
+    """Stages reached so far, in order."""
+    return dict(_stages)
@@ -6,39 +6,46 @@ from typing import Any
 
 from aiohttp import web
 
+from app.core.async_db import AsyncDBProxy
+from app.core.fast_runtime import json_response
+from app.core.offer_lookup import OfferLookup
 from app.core.webhook_api_utils import add_cors_headers
 from app.core.webhook_helpers import _is_offer_active, get_offer_value
 from logging_config import logger
 
 
 def build_cart_handlers(db: Any):
+    async_db = AsyncDBProxy(db)
+
     async def api_calculate_cart(request: web.Request) -> web.Response:
         """GET /api/v1/cart/calculate - Calculate cart totals."""
         offer_ids = request.query.get("offer_ids", "")
         if not offer_ids:
-            return add_cors_headers(web.json_response({"error": "offer_ids required"}, status=400))
+            return add_cors_headers(json_response({"error": "offer_ids required"}, status=400))
 
         price_unit = os.getenv("PRICE_STORAGE_UNIT", "sums").lower()
         convert = (lambda v: float(v or 0) / 100) if price_unit == "kopeks" else (
             lambda v: float(v or 0)
         )
 
+        requested: list[tuple[int, int]] = []
+        for item_str in offer_ids.split(","):
+            if ":" not in item_str:
+                continue
+            offer_id_str, qty_str = item_str.split(":", 1)
+            try:
+                requested.append((int(offer_id_str), int(qty_str)))
+            except (TypeError, ValueError):
+                continue
+
         items = []
         total = 0.0
         items_count = 0
 
         try:
-            for item_str in offer_ids.split(","):
-                if ":" not in item_str:
-                    continue
-                offer_id_str, qty_str = item_str.split(":", 1)
-                try:
-                    offer_id = int(offer_id_str)
-                    quantity = int(qty_str)
-                except (TypeError, ValueError):
-                    continue
-
-                offer = db.get_offer(offer_id) if hasattr(db, "get_offer") else None
+            offers = await OfferLookup(async_db).aload(offer_id for offer_id, _ in requested)
+            for offer_id, quantity in requested:
+                offer = offers.get(offer_id)
                 if not offer or not _is_offer_active(offer):
                     continue
 
@@ -57,9 +64,9 @@ def build_cart_handlers(db: Any):
                 items_count += quantity
 
             payload = {"items": items, "total": total, "items_count": items_count}
-            return add_cors_headers(web.json_response(payload))
+            return add_cors_headers(json_response(payload))
         except Exception as e:
             logger.error(f"API cart calculate error: {e}")
-            return add_cors_headers(web.json_response({"error": str(e)}, status=500))
+            return add_cors_headers(json_response({"error": str(e)}, status=500))
 
     return api_calculate_cart
@@ -5,6 +5,8 @@ from typing import Any
 
 from aiohttp import web
 
+from app.core.async_db import AsyncDBProxy
+from app.core.fast_runtime import json_response
 from app.core.location_search import build_nearby_radius_steps
 from app.core.utils import normalize_city
 from app.core.webhook_api_utils import add_cors_headers
@@ -13,6 +15,8 @@ from logging_config import logger
 
 
 def build_discovery_handlers(db: Any):
+    async_db = AsyncDBProxy(db)
+
     async def api_categories(request: web.Request) -> web.Response:
         """GET /api/v1/categories - List categories."""
         def _parse_float(value: str | None) -> float | None:
@@ -106,84 +110,87 @@ def build_discovery_handlers(db: Any):
                 )
             return 0
 
-        if (
-            lat is not None
-            and lon is not None
-            and hasattr(db, "count_nearby_offers_by_category_grouped")
-        ):
-            for radius_km in nearby_radius_steps:
-                try:
-                    nearby_counts = (
-                        db.count_nearby_offers_by_category_grouped(
-                            latitude=lat,
-                            longitude=lon,
-                            max_distance_km=radius_km,
+        def _build_payload() -> list[dict[str, int | str]]:
+            if (
+                lat is not None
+                and lon is not None
+                and hasattr(db, "count_nearby_offers_by_category_grouped")
+            ):
+                for radius_km in nearby_radius_steps:
+                    try:
+                        nearby_counts = (
+                            db.count_nearby_offers_by_category_grouped(
+                                latitude=lat,
+                                longitude=lon,
+                                max_distance_km=radius_km,
+                            )
+                            or {}
                         )
-                        or {}
-                    )
-                except Exception:
-                    nearby_counts = {}
+                    except Exception:
+                        nearby_counts = {}
 
-                if sum(int(value or 0) for value in nearby_counts.values()) > 0:
-                    return add_cors_headers(web.json_response(_map_counts_to_payload(nearby_counts)))
+                    if sum(int(value or 0) for value in nearby_counts.values()) > 0:
+                        return _map_counts_to_payload(nearby_counts)
 
-        scopes: list[tuple[str | None, str | None, str | None]] = []
-        if normalized_district:
-            scopes.append((None, normalized_region, normalized_district))
-        if normalized_region:
-            scopes.append((None, normalized_region, None))
-        if normalized_city:
-            scopes.append((normalized_city, None, None))
-            if not normalized_region:
-                scopes.append((None, normalized_city, None))
-        if not scopes:
-            scopes.append((None, None, None))
+            scopes: list[tuple[str | None, str | None, str | None]] = []
+            if normalized_district:
+                scopes.append((None, normalized_region, normalized_district))
+            if normalized_region:
+                scopes.append((None, normalized_region, None))
+            if normalized_city:
+                scopes.append((normalized_city, None, None))
+                if not normalized_region:
+                    scopes.append((None, normalized_city, None))
+            if not scopes:
+                scopes.append((None, None, None))
 
-        result: list[dict[str, int | str]] = []
-        if hasattr(db, "count_offers_by_category_grouped"):
-            counts_map: dict[str, int] = {}
-            for city_scope, region_scope, district_scope in scopes:
-                try:
-                    counts_map = (
-                        db.count_offers_by_category_grouped(
-                            city=city_scope,
-                            region=region_scope,
-                            district=district_scope,
-                        )
-                        or {}
-                    )
-                except Exception:
-                    counts_map = {}
-                if sum(int(value or 0) for value in counts_map.values()) > 0:
-                    break
-            result = _map_counts_to_payload(counts_map)
-        else:
-            for cat in API_CATEGORIES:
-                count = 0
-                category_filter = expand_category_filter(cat["id"])
-                try:
-                    for city_scope, region_scope, district_scope in scopes:
-                        count = _count_for_scope(
-                            category_filter if cat["id"] != "all" else None,
-                            city_scope,
-                            region_scope,
-                            district_scope,
+            result: list[dict[str, int | str]] = []
+            if hasattr(db, "count_offers_by_category_grouped"):
+                counts_map: dict[str, int] = {}
+                for city_scope, region_scope, district_scope in scopes:
+                    try:
+                        counts_map = (
+                            db.count_offers_by_category_grouped(
+                                city=city_scope,
+                                region=region_scope,
+                                district=district_scope,
+                            )
+                            or {}
                         )
-                        if count:
-                            break
-                except Exception:
-                    pass
+                    except Exception:
+                        counts_map = {}
+                    if sum(int(value or 0) for value in counts_map.values()) > 0:
+                        break
+                result = _map_counts_to_payload(counts_map)
+            else:
+                for cat in API_CATEGORIES:
+                    count = 0
+                    category_filter = expand_category_filter(cat["id"])
+                    try:
+                        for city_scope, region_scope, district_scope in scopes:
+                            count = _count_for_scope(
+                                category_filter if cat["id"] != "all" else None,
+                                city_scope,
+                                region_scope,
+                                district_scope,
+                            )
+                            if count:
+                                break
+                    except Exception:
+                        pass
 
-                result.append(
-                    {
-                        "id": cat["id"],
-                        "name": cat["name"],
-                        "emoji": cat["emoji"],
-                        "count": count,
-                    }
-                )
+                    result.append(
+                        {
+                            "id": cat["id"],
+                            "name": cat["name"],
+                            "emoji": cat["emoji"],
+                            "count": count,
+                        }
+                    )
+            return result
 
-        return add_cors_headers(web.json_response(result))
+        result = await async_db.run(_build_payload)
+        return add_cors_headers(json_response(result))
 
     async def api_search_suggestions(request: web.Request) -> web.Response:
         """GET /api/v1/search/suggestions - Search autocomplete suggestions."""
@@ -198,7 +205,7 @@ def build_discovery_handlers(db: Any):
             limit = 5
 
         if not query or len(query) < 2:
-            return add_cors_headers(web.json_response([]))
+            return add_cors_headers(json_response([]))
 
         city = city.strip() if isinstance(city, str) else city
         city = city or None
@@ -315,21 +322,24 @@ def build_discovery_handlers(db: Any):
                                 return True
                 return len(suggestions) >= limit
 
-            _fill_from_scope(normalized_city, normalized_region, normalized_district)
+            def _collect() -> None:
+                _fill_from_scope(normalized_city, normalized_region, normalized_district)
 
-            if len(suggestions) < limit:
-                seen_scopes: set[tuple[str | None, str | None, str | None]] = set()
-                for scope in fallback_scopes:
-                    if scope in seen_scopes:
-                        continue
-                    seen_scopes.add(scope)
-                    if _fill_from_scope(*scope):
-                        break
+                if len(suggestions) < limit:
+                    seen_scopes: set[tuple[str | None, str | None, str | None]] = set()
+                    for scope in fallback_scopes:
+                        if scope in seen_scopes:
+                            continue
+                        seen_scopes.add(scope)
+                        if _fill_from_scope(*scope):
+                            break
+
+            await async_db.run(_collect)
         except Exception as exc:
             logger.error("API search suggestions error: %s", exc)
             suggestions = []
 
-        return add_cors_headers(web.json_response(suggestions[:limit]))
+        return add_cors_headers(json_response(suggestions[:limit]))
 
     async def api_hot_deals_stats(request: web.Request) -> web.Response:
         """GET /api/v1/stats/hot-deals - Stats for hot deals."""
@@ -345,7 +355,7 @@ def build_discovery_handlers(db: Any):
 
         try:
             if hasattr(db, "get_hot_offers"):
-                offers = db.get_hot_offers(normalized_city, limit=1000) or []
+                offers = await async_db.get_hot_offers(normalized_city, limit=1000) or []
                 stats["total_offers"] = len(offers)
                 discounts: list[float] = []
                 for offer in offers:
@@ -356,11 +366,11 @@ def build_discovery_handlers(db: Any):
                     stats["max_discount"] = round(max(discounts), 1)
 
             if hasattr(db, "get_stores_by_city"):
-                stores = db.get_stores_by_city(normalized_city)
+                stores = await async_db.get_stores_by_city(normalized_city)
                 stats["total_stores"] = len(stores or [])
         except Exception as exc:
             logger.error("API hot deals stats error: %s", exc)
 
-        return add_cors_headers(web.json_response(stats))
+        return add_cors_headers(json_response(stats))
 
     return api_categories, api_search_suggestions, api_hot_deals_stats
@@ -6,28 +6,32 @@ from typing import Any
 
 from aiohttp import web
 
+from app.core.async_db import AsyncDBProxy
+from app.core.fast_runtime import json_response
 from app.core.webhook_api_utils import add_cors_headers
 from app.core.webhook_helpers import get_photo_url
 from logging_config import logger
 
 
 def build_media_handlers(bot: Any, db: Any):
+    async_db = AsyncDBProxy(db)
+
     async def api_get_photo(request: web.Request) -> web.Response:
         """GET /api/v1/photo/{file_id} - Get photo URL from Telegram file_id and redirect."""
         file_id = request.match_info.get("file_id")
         if not file_id:
-            return add_cors_headers(web.json_response({"error": "file_id required"}, status=400))
+            return add_cors_headers(json_response({"error": "file_id required"}, status=400))
 
         try:
             photo_url = await get_photo_url(bot, file_id)
             if photo_url:
                 raise web.HTTPFound(location=photo_url)
-            return add_cors_headers(web.json_response({"error": "File not found"}, status=404))
+            return add_cors_headers(json_response({"error": "File not found"}, status=404))
         except web.HTTPFound:
             raise  # Re-raise redirect
         except Exception as e:
             logger.error(f"API get photo error: {e}")
-            return add_cors_headers(web.json_response({"error": str(e)}, status=500))
+            return add_cors_headers(json_response({"error": str(e)}, status=500))
 
     async def api_get_payment_card(request: web.Request) -> web.Response:
         """GET /api/v1/payment-card/{store_id} - Get payment card for store."""
@@ -39,7 +43,7 @@ def build_media_handlers(bot: Any, db: Any):
 
             if not init_data and not is_dev:
                 return add_cors_headers(
-                    web.json_response({"detail": "Authentication required"}, status=401)
+                    json_response({"detail": "Authentication required"}, status=401)
                 )
             if init_data:
                 try:
@@ -54,7 +58,7 @@ def build_media_handlers(bot: Any, db: Any):
                 if not isinstance(user, dict) or not user.get("id"):
                     if not is_dev:
                         return add_cors_headers(
-                            web.json_response(
+                            json_response(
                                 {"detail": "Invalid Telegram initData"}, status=401
                             )
                         )
@@ -65,7 +69,7 @@ def build_media_handlers(bot: Any, db: Any):
             # Try store-specific payment card first
             if store_id and hasattr(db, "get_payment_card"):
                 try:
-                    store_payment = db.get_payment_card(int(store_id))
+                    store_payment = await async_db.get_payment_card(int(store_id))
                     if store_payment:
                         payment_card = store_payment
                         if isinstance(store_payment, dict):
@@ -75,7 +79,7 @@ def build_media_handlers(bot: Any, db: Any):
 
             # Fallback to platform payment card
             if not payment_card and hasattr(db, "get_platform_payment_card"):
-                payment_card = db.get_platform_payment_card()
+                payment_card = await async_db.get_platform_payment_card()
 
             # Default payment card if not configured
             if not payment_card:
@@ -99,7 +103,7 @@ def build_media_handlers(bot: Any, db: Any):
                 card_holder = ""
 
             return add_cors_headers(
-                web.json_response(
+                json_response(
                     {
                         "card_number": card_number,
                         "card_holder": card_holder,
@@ -109,6 +113,6 @@ def build_media_handlers(bot: Any, db: Any):
             )
         except Exception as e:
             logger.error(f"API get payment card error: {e}")
-            return add_cors_headers(web.json_response({"error": str(e)}, status=500))
+            return add_cors_headers(json_response({"error": str(e)}, status=500))
 
     return api_get_photo, api_get_payment_card
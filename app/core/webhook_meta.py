@@ -7,11 +7,20 @@ from typing import Any
 
 from aiohttp import web
 
+from app.core.async_db import run_sync_db
+from app.core.fast_runtime import json_response
+from app.core.loop_monitor import get_loop_monitor
 from app.core.metrics import metrics as app_metrics
 from logging_config import logger
 
 
 def build_health_check(db: Any, metrics: dict[str, int]):
+    def _ping_db() -> None:
+        with db.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT 1")
+            cursor.fetchone()
+
     async def health_check(request: web.Request) -> web.Response:
         """Comprehensive health check endpoint."""
         try:
@@ -19,10 +28,7 @@ def build_health_check(db: Any, metrics: dict[str, int]):
             db_healthy = True
             db_error = None
             try:
-                with db.get_connection() as conn:
-                    cursor = conn.cursor()
-                    cursor.execute("SELECT 1")
-                    cursor.fetchone()
+                await run_sync_db(_ping_db)
             except Exception as e:
                 db_healthy = False
                 db_error = str(e)
@@ -56,11 +62,11 @@ def build_health_check(db: Any, metrics: dict[str, int]):
             # Always return 200 for deployment health checks
             # Deployment platforms need 200 to pass health checks
             # The status field indicates actual health state
-            return web.json_response(status, status=200)
+            return json_response(status, status=200)
         except Exception as e:
             logger.error(f"Health check failed: {e}")
             # Return 200 even on error to keep service up during transient issues
-            return web.json_response(
+            return json_response(
                 {"status": "error", "error": str(e), "bot": "Fudly"}, status=200
             )
 
@@ -70,7 +76,7 @@ def build_health_check(db: Any, metrics: dict[str, int]):
 def build_version_info():
     async def version_info(request: web.Request) -> web.Response:
         """Return version and configuration info."""
-        return web.json_response(
+        return json_response(
             {"app": "Fudly", "mode": "webhook", "ts": datetime.now().isoformat(timespec="seconds")}
         )
 
@@ -95,7 +101,8 @@ def build_metrics_json(metrics: dict[str, int]):
         # Combine old metrics with new summary
         combined = dict(metrics)
         combined.update(app_metrics.get_summary())
-        return web.json_response(combined)
+        combined["event_loop"] = get_loop_monitor().get_stats()
+        return json_response(combined)
 
     return metrics_json
 
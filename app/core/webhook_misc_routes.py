@@ -7,6 +7,8 @@ from typing import Any
 
 from aiohttp import web
 
+from app.core.async_db import run_sync_db
+from app.core.fast_runtime import json_response
 from app.core.webhook_api_utils import add_cors_headers
 
 def build_misc_handlers(db: Any):
@@ -15,9 +17,9 @@ def build_misc_handlers(db: Any):
         # Security: only allow in non-production environments
         environment = os.getenv("ENVIRONMENT", "production").lower()
         if environment not in ("development", "dev", "local", "test"):
-            return web.json_response({"error": "Not available"}, status=404)
+            return json_response({"error": "Not available"}, status=404)
 
-        try:
+        def _collect_info() -> dict:
             info = {
                 "db_type": type(db).__name__,
                 "has_get_hot_offers": hasattr(db, "get_hot_offers"),
@@ -55,14 +57,18 @@ def build_misc_handlers(db: Any):
             except Exception as e:
                 info["photo_check_error"] = str(e)
 
-            return add_cors_headers(web.json_response(info))
+            return info
+
+        try:
+            info = await run_sync_db(_collect_info)
+            return add_cors_headers(json_response(info))
         except Exception as e:
-            return add_cors_headers(web.json_response({"error": str(e)}, status=500))
+            return add_cors_headers(json_response({"error": str(e)}, status=500))
 
     async def api_health(request: web.Request) -> web.Response:
         """GET /api/v1/health - API health check."""
         return add_cors_headers(
-            web.json_response(
+            json_response(
                 {
                     "status": "ok",
                     "service": "fudly-webapp-api",
@@ -8,6 +8,8 @@ from typing import Any
 
 from aiohttp import web
 
+from app.core.async_db import AsyncDBProxy
+from app.core.fast_runtime import json_response
 from app.core.location_search import build_nearby_radius_steps
 from app.core.utils import normalize_city
 from app.core.webhook_api_utils import add_cors_headers
@@ -23,6 +25,8 @@ from logging_config import logger
 
 
 def build_offer_store_handlers(bot: Any, db: Any):
+    async_db = AsyncDBProxy(db)
+
     async def api_offers(request: web.Request) -> web.Response:
         """GET /api/v1/offers - List offers."""
 
@@ -77,93 +81,127 @@ def build_offer_store_handlers(bot: Any, db: Any):
         logger.info(f"API /offers request: city={city}, category={category}, limit={limit}")
 
         try:
-            raw_offers: list[Any] = []
-            location_strategy: str | None = None
-            used_radius_km: float | None = None
-            used_fallback = False
-            selected_scope_for_count: tuple[str | None, str | None, str | None] | None = None
-
-            if store_id:
-                if hasattr(db, "get_store_offers"):
-                    raw_offers = db.get_store_offers(int(store_id)) or []
-                    logger.info(f"get_store_offers({store_id}) returned {len(raw_offers)} items")
-                location_strategy = "store"
-            elif search:
-                if hasattr(db, "search_offers"):
-
-                    def _search_scoped(
-                        city_scope: str | None,
-                        region_scope: str | None,
-                        district_scope: str | None,
-                    ) -> list[Any]:
-                        return (
-                            db.search_offers(
-                                search,
-                                city_scope,
-                                limit=limit,
-                                offset=offset,
-                                region=region_scope,
-                                district=district_scope,
-                                min_price=min_price,
-                                max_price=max_price,
-                                min_discount=min_discount,
-                                category=category_filter,
-                                sort_by=sort_by,
-                            )
-                            or []
-                        )
-
-                    raw_offers = _search_scoped(city, region, district)
-                    if not raw_offers:
-                        scopes: list[tuple[str | None, str | None, str | None]] = []
-                        if district:
-                            scopes.append((None, region, district))
-                        if region:
-                            scopes.append((None, region, None))
-                        if city:
-                            scopes.append((city, None, None))
-                            if not region:
-                                scopes.append((None, city, None))
-                        scopes.append((None, None, None))
-
-                        seen: set[tuple[str | None, str | None, str | None]] = set()
-                        for scope in scopes:
-                            if scope in seen:
-                                continue
-                            seen.add(scope)
-                            raw_offers = _search_scoped(*scope)
-                            if raw_offers:
-                                break
-                    logger.info(f"search_offers returned {len(raw_offers)} items")
-                location_strategy = "search"
-            else:
-
-                def _fetch_scoped_offers(
-                    city_scope: str | None, region_scope: str | None, district_scope: str | None
-                ) -> list[Any]:
-                    if category_filter:
-                        if hasattr(db, "get_offers_by_city_and_category"):
+            def _select_offers() -> tuple[
+                list[Any],
+                str | None,
+                float | None,
+                bool,
+                tuple[str | None, str | None, str | None] | None,
+            ]:
+                raw_offers: list[Any] = []
+                location_strategy: str | None = None
+                used_radius_km: float | None = None
+                used_fallback = False
+                selected_scope_for_count: tuple[str | None, str | None, str | None] | None = None
+
+                if store_id:
+                    if hasattr(db, "get_store_offers"):
+                        raw_offers = db.get_store_offers(int(store_id)) or []
+                        logger.info(f"get_store_offers({store_id}) returned {len(raw_offers)} items")
+                    location_strategy = "store"
+                elif search:
+                    if hasattr(db, "search_offers"):
+
+                        def _search_scoped(
+                            city_scope: str | None,
+                            region_scope: str | None,
+                            district_scope: str | None,
+                        ) -> list[Any]:
                             return (
-                                db.get_offers_by_city_and_category(
+                                db.search_offers(
+                                    search,
                                     city_scope,
-                                    category_filter,
                                     limit=limit,
                                     offset=offset,
                                     region=region_scope,
                                     district=district_scope,
-                                    sort_by=sort_by,
                                     min_price=min_price,
                                     max_price=max_price,
                                     min_discount=min_discount,
+                                    category=category_filter,
+                                    sort_by=sort_by,
                                 )
                                 or []
                             )
+
+                        raw_offers = _search_scoped(city, region, district)
+                        if not raw_offers:
+                            scopes: list[tuple[str | None, str | None, str | None]] = []
+                            if district:
+                                scopes.append((None, region, district))
+                            if region:
+                                scopes.append((None, region, None))
+                            if city:
+                                scopes.append((city, None, None))
+                                if not region:
+                                    scopes.append((None, city, None))
+                            scopes.append((None, None, None))
+
+                            seen: set[tuple[str | None, str | None, str | None]] = set()
+                            for scope in scopes:
+                                if scope in seen:
+                                    continue
+                                seen.add(scope)
+                                raw_offers = _search_scoped(*scope)
+                                if raw_offers:
+                                    break
+                        logger.info(f"search_offers returned {len(raw_offers)} items")
+                    location_strategy = "search"
+                else:
+
+                    def _fetch_scoped_offers(
+                        city_scope: str | None, region_scope: str | None, district_scope: str | None
+                    ) -> list[Any]:
+                        if category_filter:
+                            if hasattr(db, "get_offers_by_city_and_category"):
+                                return (
+                                    db.get_offers_by_city_and_category(
+                                        city_scope,
+                                        category_filter,
+                                        limit=limit,
+                                        offset=offset,
+                                        region=region_scope,
+                                        district=district_scope,
+                                        sort_by=sort_by,
+                                        min_price=min_price,
+                                        max_price=max_price,
+                                        min_discount=min_discount,
+                                    )
+                                    or []
+                                )
+                            if hasattr(db, "get_hot_offers"):
+                                all_offers = (
+                                    db.get_hot_offers(
+                                        city_scope,
+                                        limit=100,
+                                        offset=0,
+                                        region=region_scope,
+                                        district=district_scope,
+                                        sort_by=sort_by,
+                                        min_price=min_price,
+                                        max_price=max_price,
+                                        min_discount=min_discount,
+                                    )
+                                    or []
+                                )
+                                if isinstance(category_filter, (list, tuple)):
+                                    return [
+                                        o
+                                        for o in all_offers
+                                        if get_offer_value(o, "category") in category_filter
+                                    ][:limit]
+                                return [
+                                    o
+                                    for o in all_offers
+                                    if get_offer_value(o, "category") == category_filter
+                                ][:limit]
+                            return []
                         if hasattr(db, "get_hot_offers"):
-                            all_offers = (
+                            return (
                                 db.get_hot_offers(
                                     city_scope,
-                                    limit=100,
-                                    offset=0,
+                                    limit=limit,
+                                    offset=offset,
                                     region=region_scope,
                                     district=district_scope,
                                     sort_by=sort_by,
@@ -173,104 +211,93 @@ def build_offer_store_handlers(bot: Any, db: Any):
                                 )
                                 or []
                             )
-                            if isinstance(category_filter, (list, tuple)):
-                                return [
-                                    o
-                                    for o in all_offers
-                                    if get_offer_value(o, "category") in category_filter
-                                ][:limit]
-                            return [
-                                o
-                                for o in all_offers
-                                if get_offer_value(o, "category") == category_filter
-                            ][:limit]
                         return []
-                    if hasattr(db, "get_hot_offers"):
-                        return (
-                            db.get_hot_offers(
-                                city_scope,
-                                limit=limit,
-                                offset=offset,
-                                region=region_scope,
-                                district=district_scope,
-                                sort_by=sort_by,
-                                min_price=min_price,
-                                max_price=max_price,
-                                min_discount=min_discount,
-                            )
-                            or []
-                        )
-                    return []
 
-                def _fetch_nearby_offers() -> tuple[list[Any], float | None]:
-                    if lat is None or lon is None or not hasattr(db, "get_nearby_offers"):
-                        return [], None
-                    for radius_km in build_nearby_radius_steps(max_distance_km):
-                        nearby = (
-                            db.get_nearby_offers(
-                                latitude=lat,
-                                longitude=lon,
-                                limit=limit,
-                                offset=offset,
-                                category=category_filter,
-                                sort_by=sort_by,
-                                min_price=min_price,
-                                max_price=max_price,
-                                min_discount=min_discount,
-                                max_distance_km=radius_km,
+                    def _fetch_nearby_offers() -> tuple[list[Any], float | None]:
+                        if lat is None or lon is None or not hasattr(db, "get_nearby_offers"):
+                            return [], None
+                        for radius_km in build_nearby_radius_steps(max_distance_km):
+                            nearby = (
+                                db.get_nearby_offers(
+                                    latitude=lat,
+                                    longitude=lon,
+                                    limit=limit,
+                                    offset=offset,
+                                    category=category_filter,
+                                    sort_by=sort_by,
+                                    min_price=min_price,
+                                    max_price=max_price,
+                                    min_discount=min_discount,
+                                    max_distance_km=radius_km,
+                                )
+                                or []
                             )
-                            or []
-                        )
-                        if nearby:
-                            return nearby, radius_km
-                    return [], None
-
-                nearby_attempted = False
-                nearby_found = False
-                scoped_found = False
-                has_precise_location = lat is not None and lon is not None
-                if has_precise_location:
-                    nearby_attempted = True
-                    raw_offers, used_radius_km = _fetch_nearby_offers()
-                    nearby_found = bool(raw_offers)
-                    if nearby_found:
-                        location_strategy = "nearby"
-
-                scopes: list[tuple[str | None, str | None, str | None]] = []
-                if district:
-                    scopes.append((None, region, district))
-                if region:
-                    scopes.append((None, region, None))
-                if city:
-                    scopes.append((city, None, None))
-                    if not region:
-                        scopes.append((None, city, None))
-                if not scopes:
-                    scopes.append((None, None, None))
-
-                seen: set[tuple[str | None, str | None, str | None]] = set()
-                for scope in scopes:
-                    if scope in seen:
-                        continue
-                    seen.add(scope)
-                    if raw_offers:
-                        break
-                    raw_offers = _fetch_scoped_offers(*scope)
-                    if raw_offers:
-                        scoped_found = True
-                        selected_scope_for_count = scope
-                        location_strategy = "scope"
-                        break
-
-                if not raw_offers and not has_precise_location:
-                    nearby_attempted = True
-                    raw_offers, used_radius_km = _fetch_nearby_offers()
-                    nearby_found = bool(raw_offers)
-                    if nearby_found:
-                        location_strategy = "nearby"
-
-                if scoped_found and has_precise_location and nearby_attempted and not nearby_found:
-                    used_fallback = True
+                            if nearby:
+                                return nearby, radius_km
+                        return [], None
+
+                    nearby_attempted = False
+                    nearby_found = False
+                    scoped_found = False
+                    has_precise_location = lat is not None and lon is not None
+                    if has_precise_location:
+                        nearby_attempted = True
+                        raw_offers, used_radius_km = _fetch_nearby_offers()
+                        nearby_found = bool(raw_offers)
+                        if nearby_found:
+                            location_strategy = "nearby"
+
+                    scopes: list[tuple[str | None, str | None, str | None]] = []
+                    if district:
+                        scopes.append((None, region, district))
+                    if region:
+                        scopes.append((None, region, None))
+                    if city:
+                        scopes.append((city, None, None))
+                        if not region:
+                            scopes.append((None, city, None))
+                    if not scopes:
+                        scopes.append((None, None, None))
+
+                    seen: set[tuple[str | None, str | None, str | None]] = set()
+                    for scope in scopes:
+                        if scope in seen:
+                            continue
+                        seen.add(scope)
+                        if raw_offers:
+                            break
+                        raw_offers = _fetch_scoped_offers(*scope)
+                        if raw_offers:
+                            scoped_found = True
+                            selected_scope_for_count = scope
+                            location_strategy = "scope"
+                            break
+
+                    if not raw_offers and not has_precise_location:
+                        nearby_attempted = True
+                        raw_offers, used_radius_km = _fetch_nearby_offers()
+                        nearby_found = bool(raw_offers)
+                        if nearby_found:
+                            location_strategy = "nearby"
+
+                    if scoped_found and has_precise_location and nearby_attempted and not nearby_found:
+                        used_fallback = True
+
+                return (
+                    raw_offers,
+                    location_strategy,
+                    used_radius_km,
+                    used_fallback,
+                    selected_scope_for_count,
+                )
+
+            (
+                raw_offers,
+                location_strategy,
+                used_radius_km,
+                used_fallback,
+                selected_scope_for_count,
+            ) = await async_db.run(_select_offers)
 
             # Convert offers with photo URLs (parallel loading)
             async def load_offer_with_photo(o: Any) -> dict:
@@ -292,7 +319,7 @@ def build_offer_store_handlers(bot: Any, db: Any):
                         and hasattr(db, "count_nearby_offers")
                     ):
                         total = int(
-                            db.count_nearby_offers(
+                            await async_db.count_nearby_offers(
                                 latitude=lat,
                                 longitude=lon,
                                 max_distance_km=used_radius_km,
@@ -310,7 +337,7 @@ def build_offer_store_handlers(bot: Any, db: Any):
                         if location_strategy == "scope" and selected_scope_for_count is not None:
                             count_city, count_region, count_district = selected_scope_for_count
                         total = int(
-                            db.count_offers_by_filters(
+                            await async_db.count_offers_by_filters(
                                 city=count_city,
                                 region=count_region,
                                 district=count_district,
@@ -338,12 +365,12 @@ def build_offer_store_handlers(bot: Any, db: Any):
                     "used_radius_km": used_radius_km,
                     "used_fallback": used_fallback,
                 }
-                return add_cors_headers(web.json_response(payload))
-            return add_cors_headers(web.json_response(offers))
+                return add_cors_headers(json_response(payload))
+            return add_cors_headers(json_response(offers))
 
         except Exception as e:
             logger.error(f"API offers error: {e}", exc_info=True)
-            return add_cors_headers(web.json_response({"error": str(e)}, status=500))
+            return add_cors_headers(json_response({"error": str(e)}, status=500))
 
     async def api_offer_detail(request: web.Request) -> web.Response:
         """GET /api/v1/offers/{offer_id} - Get single offer."""
@@ -352,22 +379,22 @@ def build_offer_store_handlers(bot: Any, db: Any):
         try:
             offer = None
             if hasattr(db, "get_offer"):
-                offer = db.get_offer(offer_id)
+                offer = await async_db.get_offer(offer_id)
 
             if not offer:
-                return add_cors_headers(web.json_response({"error": "Not found"}, status=404))
+                return add_cors_headers(json_response({"error": "Not found"}, status=404))
             if not _is_offer_active(offer):
-                return add_cors_headers(web.json_response({"error": "Not found"}, status=404))
+                return add_cors_headers(json_response({"error": "Not found"}, status=404))
 
             # Convert photo_id to URL
             photo_id = get_offer_value(offer, "photo_id")
             photo_url = await get_photo_url(bot, photo_id) if photo_id else None
 
-            return add_cors_headers(web.json_response(offer_to_dict(offer, photo_url)))
+            return add_cors_headers(json_response(offer_to_dict(offer, photo_url)))
 
         except Exception as e:
             logger.error(f"API offer detail error: {e}")
-            return add_cors_headers(web.json_response({"error": str(e)}, status=500))
+            return add_cors_headers(json_response({"error": str(e)}, status=500))
 
     async def api_flash_deals(request: web.Request) -> web.Response:
         """GET /api/v1/flash-deals - High discount or expiring soon offers."""
@@ -386,7 +413,7 @@ def build_offer_store_handlers(bot: Any, db: Any):
         normalized_district = normalize_city(district) if district else None
         try:
             raw_offers = (
-                db.get_hot_offers(
+                await async_db.get_hot_offers(
                     normalized_city,
                     limit=100,
                     offset=0,
@@ -402,7 +429,7 @@ def build_offer_store_handlers(bot: Any, db: Any):
                 and (normalized_region or normalized_district)
                 and hasattr(db, "get_hot_offers")
             ):
-                raw_offers = db.get_hot_offers(normalized_city, limit=100, offset=0)
+                raw_offers = await async_db.get_hot_offers(normalized_city, limit=100, offset=0)
             if not raw_offers:
                 raw_offers = []
 
@@ -454,11 +481,11 @@ def build_offer_store_handlers(bot: Any, db: Any):
                 return offer_dict
 
             offers = await asyncio.gather(*[load_offer_with_photo(item) for item in selected])
-            return add_cors_headers(web.json_response(offers))
+            return add_cors_headers(json_response(offers))
 
         except Exception as e:
             logger.error(f"API flash deals error: {e}")
-            return add_cors_headers(web.json_response({"error": str(e)}, status=500))
+            return add_cors_headers(json_response({"error": str(e)}, status=500))
 
     async def api_stores(request: web.Request) -> web.Response:
         """GET /api/v1/stores - List stores."""
@@ -489,78 +516,82 @@ def build_offer_store_handlers(bot: Any, db: Any):
         district = normalize_city(district) if district else None
 
         try:
-            raw_stores: list[Any] = []
-
-            # Get stores from database with offers count
-            if hasattr(db, "get_stores_by_location"):
-
-                def _fetch_scoped_stores(
-                    city_scope: str | None, region_scope: str | None, district_scope: str | None
-                ) -> list[Any]:
-                    return db.get_stores_by_location(
-                        city=city_scope,
-                        region=region_scope,
-                        district=district_scope,
-                        business_type=business_type,
-                    )
-
-                scopes: list[tuple[str | None, str | None, str | None]] = []
-                if district:
-                    scopes.append((None, region, district))
-                if region:
-                    scopes.append((None, region, None))
-                if city:
-                    scopes.append((city, None, None))
-                    if not region:
-                        scopes.append((None, city, None))
-                if not scopes:
-                    scopes.append((None, None, None))
-
-                seen: set[tuple[str | None, str | None, str | None]] = set()
-                for scope in scopes:
-                    if scope in seen:
-                        continue
-                    seen.add(scope)
-                    raw_stores = _fetch_scoped_stores(*scope) or []
-                    if raw_stores:
-                        break
-
-                if (
-                    not raw_stores
-                    and lat is not None
-                    and lon is not None
-                    and hasattr(db, "get_nearby_stores")
-                ):
-                    raw_stores = (
-                        db.get_nearby_stores(
-                            latitude=lat,
-                            longitude=lon,
+            def _load_stores() -> list[Any]:
+                raw_stores: list[Any] = []
+
+                # Get stores from database with offers count
+                if hasattr(db, "get_stores_by_location"):
+
+                    def _fetch_scoped_stores(
+                        city_scope: str | None, region_scope: str | None, district_scope: str | None
+                    ) -> list[Any]:
+                        return db.get_stores_by_location(
+                            city=city_scope,
+                            region=region_scope,
+                            district=district_scope,
                             business_type=business_type,
-                            limit=200,
-                            offset=0,
                         )
-                        or []
-                    )
-            elif hasattr(db, "get_connection"):
-                with db.get_connection() as conn:
-                    cursor = conn.cursor()
-                    base_query = """
-                        SELECT s.*, COALESCE(oc.offer_count, 0) as offers_count
-                        FROM stores s
-                        LEFT JOIN (
-                            SELECT store_id, COUNT(*) as offer_count
-                            FROM offers
-                            WHERE status = 'active'
-                            GROUP BY store_id
-                        ) oc ON s.store_id = oc.store_id
-                        WHERE (s.status = 'active' OR s.status = 'approved')
-                    """
+
+                    scopes: list[tuple[str | None, str | None, str | None]] = []
+                    if district:
+                        scopes.append((None, region, district))
+                    if region:
+                        scopes.append((None, region, None))
                     if city:
-                        cursor.execute(base_query + " AND s.city = %s", (city,))
-                    else:
-                        cursor.execute(base_query)
-                    columns = [desc[0] for desc in cursor.description]
-                    raw_stores = [dict(zip(columns, row)) for row in cursor.fetchall()]
+                        scopes.append((city, None, None))
+                        if not region:
+                            scopes.append((None, city, None))
+                    if not scopes:
+                        scopes.append((None, None, None))
+
+                    seen: set[tuple[str | None, str | None, str | None]] = set()
+                    for scope in scopes:
+                        if scope in seen:
+                            continue
+                        seen.add(scope)
+                        raw_stores = _fetch_scoped_stores(*scope) or []
+                        if raw_stores:
+                            break
+
+                    if (
+                        not raw_stores
+                        and lat is not None
+                        and lon is not None
+                        and hasattr(db, "get_nearby_stores")
+                    ):
+                        raw_stores = (
+                            db.get_nearby_stores(
+                                latitude=lat,
+                                longitude=lon,
+                                business_type=business_type,
+                                limit=200,
+                                offset=0,
+                            )
+                            or []
+                        )
+                elif hasattr(db, "get_connection"):
+                    with db.get_connection() as conn:
+                        cursor = conn.cursor()
+                        base_query = """
+                            SELECT s.*, COALESCE(oc.offer_count, 0) as offers_count
+                            FROM stores s
+                            LEFT JOIN (
+                                SELECT store_id, COUNT(*) as offer_count
+                                FROM offers
+                                WHERE status = 'active'
+                                GROUP BY store_id
+                            ) oc ON s.store_id = oc.store_id
+                            WHERE (s.status = 'active' OR s.status = 'approved')
+                        """
+                        if city:
+                            cursor.execute(base_query + " AND s.city = %s", (city,))
+                        else:
+                            cursor.execute(base_query)
+                        columns = [desc[0] for desc in cursor.description]
+                        raw_stores = [dict(zip(columns, row)) for row in cursor.fetchall()]
+                return raw_stores
+
+            raw_stores = await async_db.run(_load_stores)
 
             # Convert stores with photo URLs (parallel loading)
             async def load_store_with_photo(s: Any) -> dict:
@@ -571,11 +602,11 @@ def build_offer_store_handlers(bot: Any, db: Any):
             stores = await asyncio.gather(*[load_store_with_photo(s) for s in raw_stores])
 
             logger.info(f"API /stores: returning {len(stores)} stores")
-            return add_cors_headers(web.json_response(stores))
+            return add_cors_headers(json_response(stores))
 
         except Exception as e:
             logger.error(f"API stores error: {e}")
-            return add_cors_headers(web.json_response({"error": str(e)}, status=500))
+            return add_cors_headers(json_response({"error": str(e)}, status=500))
 
     async def api_store_detail(request: web.Request) -> web.Response:
         """GET /api/v1/stores/{store_id} - Store details."""
@@ -583,17 +614,17 @@ def build_offer_store_handlers(bot: Any, db: Any):
         try:
             store_id = int(store_id_raw)
         except (TypeError, ValueError):
-            return add_cors_headers(web.json_response({"error": "Invalid store_id"}, status=400))
+            return add_cors_headers(json_response({"error": "Invalid store_id"}, status=400))
 
         try:
-            store = db.get_store(store_id) if hasattr(db, "get_store") else None
+            store = await async_db.get_store(store_id) if hasattr(db, "get_store") else None
             if not store:
-                return add_cors_headers(web.json_response({"error": "Store not found"}, status=404))
+                return add_cors_headers(json_response({"error": "Store not found"}, status=404))
 
             offers_count = int(get_offer_value(store, "offers_count", 0) or 0)
             if offers_count == 0 and hasattr(db, "get_store_offers"):
                 try:
-                    offers_count = len(db.get_store_offers(store_id) or [])
+                    offers_count = len(await async_db.get_store_offers(store_id) or [])
                 except Exception:
                     offers_count = 0
 
@@ -602,7 +633,7 @@ def build_offer_store_handlers(bot: Any, db: Any):
             )
             if rating == 0.0 and hasattr(db, "get_store_average_rating"):
                 try:
-                    rating = float(db.get_store_average_rating(store_id) or 0)
+                    rating = float(await async_db.get_store_average_rating(store_id) or 0)
                 except Exception:
                     rating = 0.0
 
@@ -619,10 +650,10 @@ def build_offer_store_handlers(bot: Any, db: Any):
             if district is not None:
                 store_dict["district"] = district
 
-            return add_cors_headers(web.json_response(store_dict))
+            return add_cors_headers(json_response(store_dict))
 
         except Exception as e:
             logger.error(f"API store detail error: {e}")
-            return add_cors_headers(web.json_response({"error": str(e)}, status=500))
+            return add_cors_headers(json_response({"error": str(e)}, status=500))
 
     return api_offers, api_offer_detail, api_flash_deals, api_stores, api_store_detail
@@ -9,9 +9,10 @@ from pydantic import ValidationError
 
 from app.api.orders import (
     calculate_delivery as fastapi_calculate_delivery,
-    get_order_qr_code as fastapi_get_order_qr,
+    generate_qr_code,
     get_order_status as fastapi_get_order_status,
     get_order_timeline as fastapi_get_order_timeline,
+    load_order_pickup_code,
 )
 from app.api.webapp.common import (
     CreateOrderRequest,
@@ -27,15 +28,18 @@ from app.api.webapp.common import (
 from app.api.webapp.routes_orders import cancel_order as fastapi_cancel_order
 from app.api.webapp.routes_orders import get_orders as fastapi_get_orders
 from app.core.async_db import AsyncDBProxy
+from app.core.fast_runtime import json_response
 from app.core.idempotency import (
     build_request_hash,
     check_or_reserve_key,
     normalize_idempotency_key,
     store_idempotency_response,
 )
+from app.core.offer_lookup import fetch_offers_by_ids
 from app.core.order_math import (
     calc_items_total,
 )
+from app.core.qr_generator import QR_MEDIA_TYPES, get_qr_image, qr_etag
 from app.core.webhook_api_utils import add_cors_headers
 from app.core.webhook_helpers import _delivery_cash_enabled
 from app.core.sanitize import sanitize_phone
@@ -115,7 +119,7 @@ def _detail_response(detail: Any, status_code: int) -> web.Response:
         payload = {"detail": detail, "error": detail}
     else:
         payload = {"detail": detail, "error": "Validation error"}
-    return add_cors_headers(web.json_response(payload, status=status_code))
+    return add_cors_headers(json_response(payload, status=status_code))
 
 
 def _format_validation_errors(errors: list[dict[str, Any]]) -> list[dict[str, Any]]:
@@ -152,10 +156,11 @@ def _status_for_creation_error(detail: str) -> int:
 def _load_offers_and_store(items: list[Any], db: Any) -> tuple[dict[int, Any], int]:
     if not items:
         raise HTTPException(status_code=400, detail="No items provided")
+    offers = fetch_offers_by_ids(db, [item.offer_id for item in items])
     offers_by_id: dict[int, Any] = {}
     store_ids: set[int] = set()
     for item in items:
-        offer = db.get_offer(item.offer_id) if hasattr(db, "get_offer") else None
+        offer = offers.get(item.offer_id)
         if not offer or not is_offer_active(offer):
             raise HTTPException(status_code=400, detail=f"Offer not found: {item.offer_id}")
         if not is_offer_available_now(offer):
@@ -178,8 +183,7 @@ def _load_offers_and_store(items: list[Any], db: Any) -> tuple[dict[int, Any], i
 
 
 def _validate_min_order(
-    db: Any,
-    store_id: int,
+    store_check: Any,
     items: list[Any],
     offers_by_id: dict[int, Any],
 ) -> None:
@@ -193,7 +197,6 @@ def _validate_min_order(
 
     total_check = calc_items_total(calc_items)
 
-    store_check = db.get_store(store_id) if hasattr(db, "get_store") else None
     if not store_check:
         return
     min_order = normalize_price(get_val(store_check, "min_order_amount", 0))
@@ -204,8 +207,7 @@ def _validate_min_order(
         )
 
 
-def _validate_store_open_for_order(db: Any, store_id: int) -> None:
-    store_check = db.get_store(store_id) if hasattr(db, "get_store") else None
+def _validate_store_open_for_order(store_check: Any) -> None:
     if not store_check:
         return
     if not is_store_open_now(store_check):
@@ -286,21 +288,24 @@ def build_order_handlers(
                     "order_type": "delivery" if is_delivery else "pickup",
                 }
                 idem_hash = build_request_hash(idem_payload)
-                idem_result = check_or_reserve_key(db, idempotency_key, user_id, idem_hash)
+                idem_result = await async_db.run(
+                    check_or_reserve_key, db, idempotency_key, user_id, idem_hash
+                )
                 if idem_result.get("status") in ("cached", "conflict", "in_progress"):
                     payload = idem_result.get("payload", {}) or {}
                     if isinstance(payload, dict) and "error" in payload and "detail" not in payload:
                         payload = {**payload, "detail": payload.get("error")}
                     return add_cors_headers(
-                        web.json_response(
+                        json_response(
                             payload,
                             status=int(idem_result.get("status_code", 409)),
                         )
                     )
 
-            def _store_idempotency(payload: dict[str, Any], status_code: int) -> None:
+            async def _store_idempotency(payload: dict[str, Any], status_code: int) -> None:
                 if idempotency_key and idem_hash:
-                    store_idempotency_response(
+                    await async_db.run(
+                        store_idempotency_response,
                         db,
                         idempotency_key,
                         user_id,
@@ -309,10 +314,15 @@ def build_order_handlers(
                         status_code,
                     )
 
-            try:
+            def _load_order_context() -> tuple[dict[int, Any], Any]:
                 _resolve_required_phone(db, user_id, order.phone)
                 offers_by_id, store_id = _load_offers_and_store(order.items, db)
-                _validate_store_open_for_order(db, store_id)
+                store = db.get_store(store_id) if hasattr(db, "get_store") else None
+                _validate_store_open_for_order(store)
+                return offers_by_id, store
+
+            try:
+                offers_by_id, store = await async_db.run(_load_order_context)
 
                 if payment_method not in ("cash", "click"):
                     raise HTTPException(status_code=400, detail="Unsupported payment method")
@@ -324,17 +334,17 @@ def build_order_handlers(
                     )
 
                 if is_delivery:
-                    _validate_min_order(db, store_id, order.items, offers_by_id)
+                    _validate_min_order(store, order.items, offers_by_id)
 
             except HTTPException as exc:
-                _store_idempotency({"detail": exc.detail}, exc.status_code)
+                await _store_idempotency({"detail": exc.detail}, exc.status_code)
                 return _detail_response(exc.detail, exc.status_code)
 
             order_service = get_unified_order_service()
             if not order_service:
                 order_service = _ensure_unified_service(db, bot)
             if not order_service:
-                _store_idempotency({"detail": "Order service unavailable"}, 503)
+                await _store_idempotency({"detail": "Order service unavailable"}, 503)
                 return _detail_response("Order service unavailable", 503)
 
             order_items: list[OrderItem] = []
@@ -349,7 +359,6 @@ def build_order_handlers(
                 )
                 offer_store_id = int(get_val(offer, "store_id"))
                 offer_title = get_val(offer, "title", "Tovar")
-                store = db.get_store(offer_store_id) if hasattr(db, "get_store") else None
                 store_name = get_val(store, "name", "") if store else ""
                 store_address = get_val(store, "address", "") if store else ""
                 delivery_price = 0
@@ -371,7 +380,7 @@ def build_order_handlers(
                 )
 
             if not order_items:
-                _store_idempotency({"detail": "No valid items provided"}, 400)
+                await _store_idempotency({"detail": "No valid items provided"}, 400)
                 return _detail_response("No valid items provided", 400)
 
             try:
@@ -395,7 +404,7 @@ def build_order_handlers(
             if not result or not result.success:
                 detail = result.error_message if result else "Failed to create order"
                 status_code = _status_for_creation_error(detail) if result else 500
-                _store_idempotency({"detail": detail}, status_code)
+                await _store_idempotency({"detail": detail}, status_code)
                 return _detail_response(detail, status_code)
 
             created_items: list[dict[str, Any]] = []
@@ -447,8 +456,8 @@ def build_order_handlers(
                 items_count=total_items,
             ).model_dump()
 
-            _store_idempotency(response_payload, 201)
-            return add_cors_headers(web.json_response(response_payload, status=201))
+            await _store_idempotency(response_payload, 201)
+            return add_cors_headers(json_response(response_payload, status=201))
 
         except Exception as e:
             logger.error(f"API create order error: {e}", exc_info=True)
@@ -465,7 +474,7 @@ def build_order_handlers(
         except HTTPException as exc:
             return _detail_response(exc.detail, exc.status_code)
         payload = _model_to_payload(payload)
-        return add_cors_headers(web.json_response(payload))
+        return add_cors_headers(json_response(payload))
 
 
     async def api_user_orders_history(request: web.Request) -> web.Response:
@@ -497,102 +506,106 @@ def build_order_handlers(
             effective_user_id = requested_id
 
         try:
-            if status and hasattr(db, "get_user_bookings_by_status"):
-                bookings = db.get_user_bookings_by_status(effective_user_id, status)
-            else:
-                bookings = db.get_user_bookings(effective_user_id) if hasattr(db, "get_user_bookings") else []
-
-            bookings = bookings or []
-            if not bookings:
-                payload = {
-                    "orders": [],
-                    "total_count": 0,
-                    "active_count": 0,
-                    "completed_count": 0,
-                }
-                return add_cors_headers(web.json_response(payload))
-
-            orders_list = []
-            active_count = 0
-            completed_count = 0
-
-            for booking in bookings[:limit]:
-                if isinstance(booking, dict):
-                    booking_id = booking.get("booking_id")
-                    offer_id = booking.get("offer_id")
-                    quantity = float(booking.get("quantity", 1) or 1)
-                    total_price = booking.get("total_price", 0)
-                    booking_status = booking.get("status", "pending")
-                    booking_code = booking.get("booking_code")
-                    created_at = booking.get("created_at")
+            def _build_history_payload() -> dict[str, Any]:
+                if status and hasattr(db, "get_user_bookings_by_status"):
+                    bookings = db.get_user_bookings_by_status(effective_user_id, status)
                 else:
-                    booking_id = booking[0]
-                    offer_id = booking[2]
-                    booking_status = booking[3]
-                    quantity = float(booking[4]) if len(booking) > 4 and booking[4] is not None else 1.0
-                    total_price = booking[5]
-                    booking_code = booking[6] if len(booking) > 6 else None
-                    created_at = booking[7] if len(booking) > 7 else None
-
-                if not offer_id:
-                    continue
+                    bookings = db.get_user_bookings(effective_user_id) if hasattr(db, "get_user_bookings") else []
+
+                bookings = bookings or []
+                if not bookings:
+                    payload = {
+                        "orders": [],
+                        "total_count": 0,
+                        "active_count": 0,
+                        "completed_count": 0,
+                    }
+                    return payload
+
+                orders_list = []
+                active_count = 0
+                completed_count = 0
+
+                for booking in bookings[:limit]:
+                    if isinstance(booking, dict):
+                        booking_id = booking.get("booking_id")
+                        offer_id = booking.get("offer_id")
+                        quantity = float(booking.get("quantity", 1) or 1)
+                        total_price = booking.get("total_price", 0)
+                        booking_status = booking.get("status", "pending")
+                        booking_code = booking.get("booking_code")
+                        created_at = booking.get("created_at")
+                    else:
+                        booking_id = booking[0]
+                        offer_id = booking[2]
+                        booking_status = booking[3]
+                        quantity = float(booking[4]) if len(booking) > 4 and booking[4] is not None else 1.0
+                        total_price = booking[5]
+                        booking_code = booking[6] if len(booking) > 6 else None
+                        created_at = booking[7] if len(booking) > 7 else None
+
+                    if not offer_id:
+                        continue
+
+                    offer = db.get_offer(offer_id) if hasattr(db, "get_offer") else None
+                    if not offer:
+                        continue
+
+                    if isinstance(offer, dict):
+                        offer_title = offer.get("title", "Товар")
+                        offer_photo = offer.get("photo")
+                        store_id = offer.get("store_id")
+                    else:
+                        offer_title = offer[1] if len(offer) > 1 else "Товар"
+                        offer_photo = offer[7] if len(offer) > 7 else None
+                        store_id = offer[10] if len(offer) > 10 else None
+
+                    store = db.get_store(store_id) if store_id and hasattr(db, "get_store") else None
+                    if store:
+                        if isinstance(store, dict):
+                            store_name = store.get("name", "Магазин")
+                            store_address = store.get("address")
+                        else:
+                            store_name = store[1] if len(store) > 1 else "Магазин"
+                            store_address = store[2] if len(store) > 2 else None
+                    else:
+                        store_name = "Магазин"
+                        store_address = None
 
-                offer = db.get_offer(offer_id) if hasattr(db, "get_offer") else None
-                if not offer:
-                    continue
+                    if booking_status in ("pending", "confirmed"):
+                        active_count += 1
+                    elif booking_status == "completed":
+                        completed_count += 1
 
-                if isinstance(offer, dict):
-                    offer_title = offer.get("title", "Товар")
-                    offer_photo = offer.get("photo")
-                    store_id = offer.get("store_id")
-                else:
-                    offer_title = offer[1] if len(offer) > 1 else "Товар"
-                    offer_photo = offer[7] if len(offer) > 7 else None
-                    store_id = offer[10] if len(offer) > 10 else None
-
-                store = db.get_store(store_id) if store_id and hasattr(db, "get_store") else None
-                if store:
-                    if isinstance(store, dict):
-                        store_name = store.get("name", "Магазин")
-                        store_address = store.get("address")
-                    else:
-                        store_name = store[1] if len(store) > 1 else "Магазин"
-                        store_address = store[2] if len(store) > 2 else None
-                else:
-                    store_name = "Магазин"
-                    store_address = None
-
-                if booking_status in ("pending", "confirmed"):
-                    active_count += 1
-                elif booking_status == "completed":
-                    completed_count += 1
-
-                created_at_str = str(created_at) if created_at else None
-
-                orders_list.append(
-                    {
-                        "booking_id": booking_id,
-                        "offer_id": offer_id,
-                        "offer_title": offer_title,
-                        "offer_photo": offer_photo,
-                        "quantity": quantity,
-                        "total_price": int(total_price),
-                        "status": booking_status,
-                        "store_name": store_name,
-                        "store_address": store_address,
-                        "booking_code": booking_code,
-                        "created_at": created_at_str,
-                        "pickup_time": None,
-                    }
-                )
+                    created_at_str = str(created_at) if created_at else None
+
+                    orders_list.append(
+                        {
+                            "booking_id": booking_id,
+                            "offer_id": offer_id,
+                            "offer_title": offer_title,
+                            "offer_photo": offer_photo,
+                            "quantity": quantity,
+                            "total_price": int(total_price),
+                            "status": booking_status,
+                            "store_name": store_name,
+                            "store_address": store_address,
+                            "booking_code": booking_code,
+                            "created_at": created_at_str,
+                            "pickup_time": None,
+                        }
+                    )
+
+                payload = {
+                    "orders": orders_list,
+                    "total_count": len(bookings),
+                    "active_count": active_count,
+                    "completed_count": completed_count,
+                }
+                return payload
 
-            payload = {
-                "orders": orders_list,
-                "total_count": len(bookings),
-                "active_count": active_count,
-                "completed_count": completed_count,
-            }
-            return add_cors_headers(web.json_response(payload))
+            payload = await async_db.run(_build_history_payload)
+            return add_cors_headers(json_response(payload))
         except Exception as e:
             logger.error(f"Error getting user orders: {e}")
             return _detail_response(f"Failed to get orders: {str(e)}", 500)
@@ -624,7 +637,7 @@ def build_order_handlers(
             return _detail_response(exc.detail, exc.status_code)
 
         payload = _model_to_payload(result)
-        return add_cors_headers(web.json_response(payload))
+        return add_cors_headers(json_response(payload))
 
 
     async def api_order_timeline(request: web.Request) -> web.Response:
@@ -648,7 +661,7 @@ def build_order_handlers(
             return _detail_response(exc.detail, exc.status_code)
 
         payload = _model_to_payload(result)
-        return add_cors_headers(web.json_response(payload))
+        return add_cors_headers(json_response(payload))
 
 
     async def api_order_qr(request: web.Request) -> web.Response:
@@ -667,12 +680,47 @@ def build_order_handlers(
             return _detail_response("order_id required", 400)
 
         try:
-            result = await fastapi_get_order_qr(order_id, db=async_db, user={"id": authenticated_user_id})
+            pickup_code = await load_order_pickup_code(async_db, order_id, authenticated_user_id)
         except HTTPException as exc:
             return _detail_response(exc.detail, exc.status_code)
 
-        payload = _model_to_payload(result)
-        return add_cors_headers(web.json_response(payload))
+        payload = {
+            "booking_id": order_id,
+            "booking_code": pickup_code,
+            "qr_code": await generate_qr_code(pickup_code),
+            "qr_url": f"/api/v1/orders/{order_id}/qr.png",
+            "message": "Покажите этот QR код в магазине",
+        }
+        return add_cors_headers(json_response(payload))
+
+
+    async def api_order_qr_image(request: web.Request) -> web.Response:
+        """GET /api/v1/orders/{order_id}/qr.{fmt} - QR image (png/svg) with ETag."""
+        authenticated_user_id = _get_authenticated_user_id(request)
+        if not authenticated_user_id:
+            return _detail_response("Authentication required", 401)
+
+        fmt = request.match_info.get("fmt", "")
+        if fmt not in QR_MEDIA_TYPES:
+            return _detail_response("Unsupported QR format", 404)
+        try:
+            order_id = int(request.match_info.get("order_id", ""))
+        except (TypeError, ValueError):
+            return _detail_response("order_id required", 400)
+
+        try:
+            pickup_code = await load_order_pickup_code(async_db, order_id, authenticated_user_id)
+        except HTTPException as exc:
+            return _detail_response(exc.detail, exc.status_code)
+
+        etag = qr_etag(pickup_code, fmt=fmt)
+        headers = {"ETag": etag, "Cache-Control": "private, max-age=86400"}
+        if request.headers.get("If-None-Match") == etag:
+            return add_cors_headers(web.Response(status=304, headers=headers))
+        body = await get_qr_image(pickup_code, fmt=fmt)
+        return add_cors_headers(
+            web.Response(body=body, content_type=QR_MEDIA_TYPES[fmt], headers=headers)
+        )
 
 
     async def api_upload_payment_proof(request: web.Request) -> web.Response:
@@ -704,7 +752,7 @@ def build_order_handlers(
             return _detail_response(exc.detail, exc.status_code)
 
         payload = _model_to_payload(result)
-        return add_cors_headers(web.json_response(payload))
+        return add_cors_headers(json_response(payload))
 
 
     async def api_calculate_delivery(request: web.Request) -> web.Response:
@@ -735,7 +783,7 @@ def build_order_handlers(
             return _detail_response(exc.detail, exc.status_code)
 
         payload = _model_to_payload(result)
-        return add_cors_headers(web.json_response(payload))
+        return add_cors_headers(json_response(payload))
 
 
     return (
@@ -746,6 +794,7 @@ def build_order_handlers(
         api_order_status,
         api_order_timeline,
         api_order_qr,
+        api_order_qr_image,
         api_upload_payment_proof,
         api_cancel_order,
         api_calculate_delivery,
@@ -5,6 +5,7 @@ from typing import Any
 
 from aiohttp import web
 
+from app.core.fast_runtime import json_response
 from app.integrations.payment_service import get_payment_service
 from logging_config import logger
 
@@ -85,10 +86,10 @@ def build_click_callback(db: Any):
                     service_id=service_id,
                 )
 
-            return web.json_response(result)
+            return json_response(result)
         except Exception as e:
             logger.error(f"Click callback error: {e}")
-            return web.json_response({"error": -1, "error_note": str(e)})
+            return json_response({"error": -1, "error_note": str(e)})
 
     return api_click_callback
 
@@ -102,7 +103,7 @@ def build_payme_callback():
             auth_header = request.headers.get("Authorization", "")
 
             if not payment_service.verify_payme_signature(auth_header):
-                return web.json_response(
+                return json_response(
                     {"error": {"code": -32504, "message": "Unauthorized"}, "id": None}, status=401
                 )
 
@@ -112,9 +113,9 @@ def build_payme_callback():
             request_id = data.get("id")
 
             result = await payment_service.process_payme_request(method, params, request_id)
-            return web.json_response(result)
+            return json_response(result)
         except Exception as e:
             logger.error(f"Payme callback error: {e}")
-            return web.json_response({"error": {"code": -32400, "message": str(e)}, "id": None})
+            return json_response({"error": {"code": -32400, "message": str(e)}, "id": None})
 
     return api_payme_callback
@@ -6,6 +6,8 @@ from typing import Any, Callable
 
 from aiohttp import web
 
+from app.core.async_db import AsyncDBProxy
+from app.core.fast_runtime import json_response
 from app.core.webhook_api_utils import add_cors_headers
 from app.core.units import calc_total_price
 from app.integrations.payment_service import get_payment_service
@@ -18,6 +20,8 @@ def build_payment_handlers(
     get_cached_payment_link: Callable[[int, str], str | None],
     set_cached_payment_link: Callable[[int, str, str], None],
 ):
+    async_db = AsyncDBProxy(db)
+
     async def api_get_payment_providers(request: web.Request) -> web.Response:
         """GET /api/v1/payment/providers - Get available payment providers."""
         try:
@@ -34,10 +38,10 @@ def build_payment_handlers(
                         {"id": "click", "name": "Click", "icon": "\U0001F4B3", "enabled": True}
                     )
 
-            return add_cors_headers(web.json_response({"providers": result}))
+            return add_cors_headers(json_response({"providers": result}))
         except Exception as e:
             logger.error(f"API get payment providers error: {e}")
-            return add_cors_headers(web.json_response({"error": str(e)}, status=500))
+            return add_cors_headers(json_response({"error": str(e)}, status=500))
 
     async def api_create_payment(request: web.Request) -> web.Response:
         """POST /api/v1/payment/create - Create payment URL for order."""
@@ -46,7 +50,7 @@ def build_payment_handlers(
             authenticated_user_id = get_authenticated_user_id(request)
             if not authenticated_user_id:
                 return add_cors_headers(
-                    web.json_response({"error": "Authentication required"}, status=401)
+                    json_response({"error": "Authentication required"}, status=401)
                 )
             payload_user_id = data.get("user_id")
             if payload_user_id is not None:
@@ -55,7 +59,7 @@ def build_payment_handlers(
                 except Exception:
                     payload_user_id_int = None
                 if payload_user_id_int is None or payload_user_id_int != authenticated_user_id:
-                    return add_cors_headers(web.json_response({"error": "Access denied"}, status=403))
+                    return add_cors_headers(json_response({"error": "Access denied"}, status=403))
             order_id = data.get("order_id")
             amount = data.get("amount")
             provider = str(data.get("provider", "click")).lower()
@@ -64,7 +68,7 @@ def build_payment_handlers(
             store_id = data.get("store_id")  # For per-store credentials
 
             if not order_id:
-                return add_cors_headers(web.json_response({"error": "order_id required"}, status=400))
+                return add_cors_headers(json_response({"error": "order_id required"}, status=400))
 
             payment_service = get_payment_service()
             if hasattr(payment_service, "set_database"):
@@ -72,9 +76,9 @@ def build_payment_handlers(
 
             order = None
             if hasattr(db, "get_order"):
-                order = db.get_order(int(order_id))
+                order = await async_db.get_order(int(order_id))
             if not order:
-                return add_cors_headers(web.json_response({"error": "Order not found"}, status=404))
+                return add_cors_headers(json_response({"error": "Order not found"}, status=404))
 
             order_user_id = (
                 order.get("user_id") if isinstance(order, dict) else getattr(order, "user_id", None)
@@ -84,9 +88,9 @@ def build_payment_handlers(
             except Exception:
                 order_user_id_int = None
             if order_user_id_int is None:
-                return add_cors_headers(web.json_response({"error": "Access denied"}, status=403))
+                return add_cors_headers(json_response({"error": "Access denied"}, status=403))
             if order_user_id_int != authenticated_user_id:
-                return add_cors_headers(web.json_response({"error": "Access denied"}, status=403))
+                return add_cors_headers(json_response({"error": "Access denied"}, status=403))
 
             order_store_id = order.get("store_id")
             if store_id:
@@ -98,7 +102,7 @@ def build_payment_handlers(
                     order_store_id is not None and store_id_int != int(order_store_id)
                 ):
                     return add_cors_headers(
-                        web.json_response({"error": "Invalid store_id for order"}, status=400)
+                        json_response({"error": "Invalid store_id for order"}, status=400)
                     )
             store_id = order_store_id
 
@@ -151,30 +155,30 @@ def build_payment_handlers(
 
             if order_status in ("completed", "cancelled", "rejected"):
                 return add_cors_headers(
-                    web.json_response({"error": "Order already finalized"}, status=400)
+                    json_response({"error": "Order already finalized"}, status=400)
                 )
 
             if provider != "click":
                 return add_cors_headers(
-                    web.json_response({"error": "Payment provider not supported"}, status=400)
+                    json_response({"error": "Payment provider not supported"}, status=400)
                 )
             if payment_method and payment_method != "click":
-                return add_cors_headers(web.json_response({"error": "Payment method mismatch"}, status=400))
+                return add_cors_headers(json_response({"error": "Payment method mismatch"}, status=400))
             if payment_status not in ("awaiting_payment", ""):
                 return add_cors_headers(
-                    web.json_response({"error": "Payment not awaiting online payment"}, status=400)
+                    json_response({"error": "Payment not awaiting online payment"}, status=400)
                 )
 
             available = payment_service.get_available_providers(int(store_id) if store_id else None)
             if provider not in available:
                 return add_cors_headers(
-                    web.json_response({"error": "Payment provider not available"}, status=400)
+                    json_response({"error": "Payment provider not available"}, status=400)
                 )
 
             cached_url = get_cached_payment_link(int(order_id), provider)
             if cached_url:
                 return add_cors_headers(
-                    web.json_response({"payment_url": cached_url, "provider": provider})
+                    json_response({"payment_url": cached_url, "provider": provider})
                 )
 
             # Check for store-specific or platform-wide Click credentials
@@ -187,7 +191,7 @@ def build_payment_handlers(
             )
             if not credentials and not payment_service.click_enabled:
                 return add_cors_headers(
-                    web.json_response({"error": "Click not configured for this store"}, status=400)
+                    json_response({"error": "Click not configured for this store"}, status=400)
                 )
             payment_url = payment_service.generate_click_url(
                 order_id=int(order_id),
@@ -197,10 +201,10 @@ def build_payment_handlers(
                 store_id=int(store_id) if store_id else 0,
             )
             set_cached_payment_link(int(order_id), "click", payment_url)
-            return add_cors_headers(web.json_response({"payment_url": payment_url, "provider": "click"}))
+            return add_cors_headers(json_response({"payment_url": payment_url, "provider": "click"}))
 
         except Exception as e:
             logger.error(f"API create payment error: {e}")
-            return add_cors_headers(web.json_response({"error": str(e)}, status=500))
+            return add_cors_headers(json_response({"error": str(e)}, status=500))
 
     return api_get_payment_providers, api_create_payment
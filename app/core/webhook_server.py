@@ -1,6 +1,8 @@
 """Webhook server for production deployment."""
 from __future__ import annotations
 
+import asyncio
+import importlib
 import os
 import time
 from typing import Any
@@ -8,8 +10,14 @@ from typing import Any
 from aiogram import Bot, Dispatcher, types
 import aiohttp
 from aiohttp import web
+from pydantic import ValidationError
 
+from app.core.async_db import AsyncDBProxy
+from app.core.fast_runtime import json_response
+from app.core.loop_monitor import setup_loop_monitor
 from app.core.notifications import get_notification_service
+from app.core.rate_limiter import AsyncRateLimiter, RateLimitRule, get_rate_limit_redis_url
+from app.core.startup_timing import mark_startup
 from app.core.webhook_api_utils import add_cors_headers, build_authenticated_user_id, cors_preflight
 from app.core.webhook_meta import (
     build_docs_handler,
@@ -38,6 +46,10 @@ from logging_config import logger
 # Cache for reverse geocoding results (lat,lng -> payload)
 _reverse_geocode_cache: dict[str, tuple[float, dict[str, Any]]] = {}
 _REVERSE_GEOCODE_TTL = 3600
+# The FastAPI app (partner panel, merchant and webapp routers) only serves /api
+# traffic; by default it is imported and built on the first such request rather
+# than before the webhook is registered.
+LAZY_API_APP = os.getenv("LAZY_API_APP", "1").strip().lower() in {"1", "true", "yes", "on"}
 
 
 async def create_webhook_app(
@@ -52,6 +64,7 @@ async def create_webhook_app(
 ) -> web.Application:
     """Create aiohttp web application with webhook handlers."""
     app = web.Application()
+    async_db = AsyncDBProxy(db)
     environment = os.getenv("ENVIRONMENT", "production").lower()
     is_dev = environment in ("development", "dev", "local", "test")
     partner_panel_enabled = os.getenv("PARTNER_PANEL_ENABLED", "0").strip().lower() in {
@@ -61,23 +74,16 @@ async def create_webhook_app(
         "on",
     }
 
-    rate_limit_rules: dict[tuple[str, str], dict[str, int | str]] = {
-        ("POST", "/api/v1/orders"): {"limit": 10, "window": 60, "name": "create_order"},
-        ("GET", "/api/v1/location/reverse"): {"limit": 30, "window": 60, "name": "geo_reverse"},
-        ("GET", "/api/v1/location/search"): {"limit": 30, "window": 60, "name": "geo_search"},
-        ("POST", "/api/v1/payment/click/callback"): {
-            "limit": 120,
-            "window": 60,
-            "name": "click_callback",
-        },
-        ("POST", "/api/v1/payment/payme/callback"): {
-            "limit": 120,
-            "window": 60,
-            "name": "payme_callback",
-        },
+    rate_limit_rules: dict[tuple[str, str], RateLimitRule] = {
+        ("POST", "/api/v1/orders"): RateLimitRule("create_order", 10, 60),
+        ("GET", "/api/v1/location/reverse"): RateLimitRule("geo_reverse", 30, 60),
+        ("GET", "/api/v1/location/search"): RateLimitRule("geo_search", 30, 60),
+        ("POST", "/api/v1/payment/click/callback"): RateLimitRule("click_callback", 120, 60),
+        ("POST", "/api/v1/payment/payme/callback"): RateLimitRule("payme_callback", 120, 60),
     }
-    _rate_limit_state: dict[str, dict[str, float | int]] = {}
-    _rate_limit_cleanup_ts = 0.0
+    rate_limiter = AsyncRateLimiter(
+        redis_url=get_rate_limit_redis_url(), key_prefix="ratelimit:webapp"
+    )
 
     def _get_client_ip(request: web.Request) -> str:
         xff = request.headers.get("X-Forwarded-For")
@@ -90,32 +96,6 @@ async def create_webhook_app(
             return x_real_ip.strip()
         return request.remote or "unknown"
 
-    def _check_rate_limit(rule: dict[str, int | str], request: web.Request) -> tuple[bool, int]:
-        nonlocal _rate_limit_cleanup_ts
-        now = time.monotonic()
-        if now - _rate_limit_cleanup_ts > 120:
-            _rate_limit_cleanup_ts = now
-            expired_keys = [
-                key for key, value in _rate_limit_state.items() if now > float(value["reset"])
-            ]
-            for key in expired_keys:
-                _rate_limit_state.pop(key, None)
-
-        limit = int(rule["limit"])
-        window = int(rule["window"])
-        ip = _get_client_ip(request)
-        key = f"{rule['name']}:{ip}"
-        entry = _rate_limit_state.get(key)
-        if entry and now < float(entry["reset"]):
-            if int(entry["count"]) >= limit:
-                retry_after = max(1, int(float(entry["reset"]) - now))
-                return False, retry_after
-            entry["count"] = int(entry["count"]) + 1
-            return True, 0
-
-        _rate_limit_state[key] = {"reset": now + window, "count": 1}
-        return True, 0
-
     @web.middleware
     async def rate_limit_middleware(request: web.Request, handler):
         if request.method == "OPTIONS":
@@ -125,9 +105,9 @@ async def create_webhook_app(
         if not rule:
             return await handler(request)
 
-        allowed, retry_after = _check_rate_limit(rule, request)
+        allowed, _, retry_after = await rate_limiter.hit(_get_client_ip(request), (rule,))
         if not allowed:
-            response = web.json_response(
+            response = json_response(
                 {"detail": "Too Many Requests"},
                 status=429,
                 headers={"Retry-After": str(retry_after)},
@@ -137,6 +117,7 @@ async def create_webhook_app(
         return await handler(request)
 
     app.middlewares.append(rate_limit_middleware)
+    setup_loop_monitor(app)
     payment_link_cache: dict[tuple[int, str], dict[str, Any]] = {}
     payment_link_ttl = 90.0
 
@@ -179,22 +160,19 @@ async def create_webhook_app(
                     metrics["updates_errors"] += 1
                     return web.Response(status=403, text="Forbidden")
 
-            # Parse JSON
-            try:
-                update_data = await request.json()
-            except Exception as json_e:
-                logger.error(f"Webhook JSON parse error: {repr(json_e)}")
-                metrics["webhook_json_errors"] += 1
-                return web.Response(status=200, text="OK")
-
-            logger.debug(f"Raw update: {update_data}")
+            body = await request.read()
+            logger.debug("Raw update: %s", body)
 
-            # Validate Update structure
+            # Parse and validate in one pass (pydantic-core reads the JSON bytes directly)
             try:
-                telegram_update = types.Update.model_validate(update_data)
-            except Exception as validate_e:
-                logger.error(f"Webhook validation error: {repr(validate_e)}")
-                metrics["webhook_validation_errors"] += 1
+                telegram_update = types.Update.model_validate_json(body)
+            except ValidationError as validate_e:
+                if any(error["type"] == "json_invalid" for error in validate_e.errors()):
+                    logger.error(f"Webhook JSON parse error: {repr(validate_e)}")
+                    metrics["webhook_json_errors"] += 1
+                else:
+                    logger.error(f"Webhook validation error: {repr(validate_e)}")
+                    metrics["webhook_validation_errors"] += 1
                 return web.Response(status=200, text="OK")
 
             # Process update
@@ -247,7 +225,7 @@ async def create_webhook_app(
 
         if lat is None or lon is None:
             return add_cors_headers(
-                web.json_response({"detail": "Latitude and longitude are required"}, status=400)
+                json_response({"detail": "Latitude and longitude are required"}, status=400)
             )
 
         cache_key = f"{round(lat, 5)}:{round(lon, 5)}:{str(lang).strip().lower()}"
@@ -256,7 +234,7 @@ async def create_webhook_app(
             if cached:
                 cached_at, payload = cached
                 if time.time() - cached_at < _REVERSE_GEOCODE_TTL:
-                    return add_cors_headers(web.json_response(payload))
+                    return add_cors_headers(json_response(payload))
                 _reverse_geocode_cache.pop(cache_key, None)
 
         url = "https://nominatim.openstreetmap.org/reverse"
@@ -276,17 +254,17 @@ async def create_webhook_app(
                 async with session.get(url, params=params, headers=headers) as response:
                     if response.status != 200:
                         return add_cors_headers(
-                            web.json_response({"detail": "Geo lookup failed"}, status=502)
+                            json_response({"detail": "Geo lookup failed"}, status=502)
                         )
                     payload = await response.json()
         except Exception as exc:
             logger.error("API reverse geocode error: %s", exc)
             return add_cors_headers(
-                web.json_response({"detail": "Geo lookup failed"}, status=502)
+                json_response({"detail": "Geo lookup failed"}, status=502)
             )
 
         _reverse_geocode_cache[cache_key] = (time.time(), payload)
-        return add_cors_headers(web.json_response(payload))
+        return add_cors_headers(json_response(payload))
 
     api_offers, api_offer_detail, api_flash_deals, api_stores, api_store_detail = (
         build_offer_store_handlers(bot, db)
@@ -304,6 +282,7 @@ async def create_webhook_app(
         api_order_status,
         api_order_timeline,
         api_order_qr,
+        api_order_qr_image,
         api_upload_payment_proof,
         api_cancel_order,
         api_calculate_delivery,
@@ -324,7 +303,7 @@ async def create_webhook_app(
         try:
             if not store_id:
                 return add_cors_headers(
-                    web.json_response({"error": "store_id required"}, status=400)
+                    json_response({"error": "store_id required"}, status=400)
                 )
 
             reviews = []
@@ -332,7 +311,7 @@ async def create_webhook_app(
             total_reviews = 0
 
             if hasattr(db, "get_store_ratings"):
-                raw_reviews = db.get_store_ratings(int(store_id))
+                raw_reviews = await async_db.get_store_ratings(int(store_id))
                 for r in raw_reviews:
                     reviews.append(
                         {
@@ -345,10 +324,12 @@ async def create_webhook_app(
                     )
 
             if hasattr(db, "get_store_rating_summary"):
-                avg_rating, total_reviews = db.get_store_rating_summary(int(store_id))
+                avg_rating, total_reviews = await async_db.get_store_rating_summary(
+                    int(store_id)
+                )
 
             return add_cors_headers(
-                web.json_response(
+                json_response(
                     {
                         "reviews": reviews,
                         "average_rating": avg_rating,
@@ -358,7 +339,7 @@ async def create_webhook_app(
             )
         except Exception as e:
             logger.error(f"API get store reviews error: {e}")
-            return add_cors_headers(web.json_response({"error": str(e)}, status=500))
+            return add_cors_headers(json_response({"error": str(e)}, status=500))
 
     api_get_payment_providers, api_create_payment = build_payment_handlers(
         db, _get_authenticated_user_id, get_cached_payment_link, set_cached_payment_link
@@ -372,7 +353,7 @@ async def create_webhook_app(
         init_data = request.headers.get("X-Telegram-Init-Data")
         if not init_data:
             return add_cors_headers(
-                web.json_response({"detail": "Authentication required"}, status=401)
+                json_response({"detail": "Authentication required"}, status=401)
             )
         try:
             from app.api.webapp.common import validate_init_data
@@ -385,11 +366,11 @@ async def create_webhook_app(
         user = validated.get("user") if isinstance(validated, dict) else None
         if not isinstance(user, dict) or not user.get("id"):
             return add_cors_headers(
-                web.json_response({"detail": "Invalid Telegram initData"}, status=401)
+                json_response({"detail": "Invalid Telegram initData"}, status=401)
             )
 
         token, ttl = await issue_ws_token(int(user.get("id")))
-        return add_cors_headers(web.json_response({"token": token, "expires_in": ttl}))
+        return add_cors_headers(json_response({"token": token, "expires_in": ttl}))
 
     # Register routes
     path_main = webhook_path if webhook_path.startswith("/") else f"/{webhook_path}"
@@ -441,15 +422,34 @@ async def create_webhook_app(
 
         # Partner Panel API - FastAPI integration via direct ASGI
         if offer_service and bot_token:
-            try:
-                from app.api.api_server import create_api_app
+            fastapi_app = None
+            fastapi_app_lock = asyncio.Lock()
+
+            async def get_fastapi_app():
+                """Build the FastAPI app once; imports run off the event loop."""
+                nonlocal fastapi_app
+                async with fastapi_app_lock:
+                    if fastapi_app is None:
+                        api_server = await asyncio.to_thread(
+                            importlib.import_module, "app.api.api_server"
+                        )
+                        fastapi_app = api_server.create_api_app(db, offer_service, bot_token)
+                        mark_startup("api_app_built")
+                return fastapi_app
 
-                # Create FastAPI app with real Partner Panel endpoints
-                fastapi_app = create_api_app(db, offer_service, bot_token)
+            try:
+                if not LAZY_API_APP:
+                    await get_fastapi_app()
 
                 # Create ASGI handler that calls FastAPI directly
                 async def fastapi_handler(request: web.Request) -> web.Response:
                     """Forward requests to FastAPI ASGI app"""
+                    try:
+                        asgi_app = fastapi_app or await get_fastapi_app()
+                    except Exception as e:
+                        logger.error(f"❌ Failed to build FastAPI app: {e}", exc_info=True)
+                        return json_response({"error": "API unavailable"}, status=503)
+
                     # Read body
                     body = await request.read()
 
@@ -490,7 +490,7 @@ async def create_webhook_app(
                             body_parts.append(message.get("body", b""))
 
                     # Call FastAPI
-                    await fastapi_app(scope, receive, send)
+                    await asgi_app(scope, receive, send)
 
                     # Build response
                     response_body = b"".join(body_parts)
@@ -503,7 +503,8 @@ async def create_webhook_app(
                 else:
                     logger.info("ℹ️ Partner Panel API routes disabled (PARTNER_PANEL_ENABLED=0)")
 
-                logger.info("✅ Partner Panel API endpoints registered (FastAPI direct ASGI)")
+                mode = "built on first request" if LAZY_API_APP else "built at startup"
+                logger.info(f"✅ Partner Panel API endpoints registered (FastAPI direct ASGI, {mode})")
             except Exception as e:
                 logger.error(f"❌ Failed to mount FastAPI app: {e}", exc_info=True)
                 logger.warning("⚠️ Partner Panel API will not be available")
@@ -571,6 +572,8 @@ async def create_webhook_app(
             app.router.add_get("/api/v1/orders/{order_id}/timeline", api_order_timeline)
             app.router.add_options("/api/v1/orders/{order_id}/qr", cors_preflight)
             app.router.add_get("/api/v1/orders/{order_id}/qr", api_order_qr)
+            app.router.add_options("/api/v1/orders/{order_id}/qr.{fmt}", cors_preflight)
+            app.router.add_get("/api/v1/orders/{order_id}/qr.{fmt}", api_order_qr_image)
             app.router.add_options("/api/v1/orders/{order_id}/cancel", cors_preflight)
             app.router.add_post("/api/v1/orders/{order_id}/cancel", api_cancel_order)
             app.router.add_options("/api/v1/orders/{order_id}/payment-proof", cors_preflight)
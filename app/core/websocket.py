@@ -3,78 +3,165 @@ WebSocket handler for real-time notifications.
 
 Provides WebSocket endpoint for web clients to receive
 real-time updates about bookings, offers, etc.
+
+``WebSocketManager`` is the single connection hub of the process: the aiohttp
+``/ws`` endpoint and the FastAPI partner endpoint
+(``app.api.websocket_manager``) both register their sockets here. Clients
+are indexed by user, store and city, so routing a message is a dict lookup.
+Dead peers are detected by ping/pong heartbeats and removed when their
+handler exits, so there is no periodic scan over all connections.
 """
 import asyncio
 import inspect
 import json
 import logging
 import os
-from dataclasses import dataclass
+import time
+from collections import deque
+from collections.abc import Hashable
+from functools import partial
+from dataclasses import dataclass, field
 from datetime import datetime
 from typing import Any, Optional
-from weakref import WeakSet
 
-from aiohttp import WSMsgType, web
+from aiohttp import WSCloseCode, WSMsgType, web
 from aiohttp.client_exceptions import ClientConnectionResetError
 
+from app.core.metrics import metrics
 from app.core.notifications import (
     Notification,
     NotificationService,
 )
+from app.core.utils import normalize_city
 from app.core.ws_tokens import consume_ws_token
 
 logger = logging.getLogger(__name__)
 
+# Outbound frames buffered per connection before the slow-consumer policy applies
+WS_SEND_QUEUE_SIZE = int(os.getenv("WS_SEND_QUEUE_SIZE", "256"))
+# close: disconnect the client (it reconnects and resyncs); drop: discard the oldest frame
+WS_SLOW_CONSUMER_POLICY = os.getenv("WS_SLOW_CONSUMER_POLICY", "close").strip().lower()
+# Ping interval; a peer that misses the pong (half the interval) is disconnected
+WS_HEARTBEAT_SECONDS = float(os.getenv("WS_HEARTBEAT_SECONDS", "30"))
+# Partner sockets without protocol pings must send something (e.g. "ping") this often
+WS_IDLE_TIMEOUT_SECONDS = float(os.getenv("WS_IDLE_TIMEOUT_SECONDS", "90"))
+
+ws_connections = metrics.gauge(
+    "fudly_websocket_connections", "Open WebSocket connections", ["kind"]
+)
+ws_frames_dropped = metrics.counter(
+    "fudly_websocket_frames_dropped_total", "Frames dropped for slow WebSocket clients", ["kind"]
+)
+
 
-@dataclass
+@dataclass(slots=True, eq=False)
 class WebSocketClient:
-    """Represents a connected WebSocket client."""
+    """Represents a connected WebSocket client.
+
+    ``ws`` is anything with ``send_str``, ``close(code=...)`` and ``closed``
+    (an aiohttp ``WebSocketResponse`` or the FastAPI adapter). Frames go
+    through a bounded buffer drained by a writer task that only exists
+    while frames are pending, so an idle connection holds no queue and no
+    task. When the buffer is full ``WS_SLOW_CONSUMER_POLICY`` decides
+    whether the client is closed or its oldest frame is dropped.
+    """
 
-    ws: web.WebSocketResponse
+    ws: Any
     user_id: int | None = None
     store_id: int | None = None
+    city: str | None = None
+    kind: str = "app"  # app: /ws notifications; partner: FastAPI partner panel events
     connected_at: datetime = None
+    last_seen: float = 0.0
+    sent: int = 0
+    dropped: int = 0
+    _pending: deque | None = field(default=None, repr=False)
+    _writer: asyncio.Task | None = field(default=None, repr=False)
+    _closing: asyncio.Task | None = field(default=None, repr=False)
 
     def __post_init__(self):
         if self.connected_at is None:
             self.connected_at = datetime.utcnow()
+        self.last_seen = time.monotonic()
 
-    __hash__ = object.__hash__
+    def touch(self) -> None:
+        """Record activity from the peer."""
+        self.last_seen = time.monotonic()
 
-    async def send(self, data: dict) -> bool:
-        """Send data to client."""
+    async def _drain(self) -> None:
+        pending = self._pending
         try:
-            if not self.ws.closed:
-                await self.ws.send_json(data)
-                return True
+            while pending:
+                await self.ws.send_str(pending.popleft())
+                self.sent += 1
         except Exception as e:
-            logger.error(f"Failed to send to WebSocket: {e}")
-        return False
+            logger.debug(f"WebSocket writer stopped: {e}")
+            pending.clear()
+        finally:
+            self._writer = None
+
+    def send_text(self, text: str) -> bool:
+        """Queue a serialized frame without waiting for the socket."""
+        if self.ws.closed or self._closing is not None:
+            return False
+        if self._pending is None:
+            self._pending = deque()
+        if len(self._pending) >= max(1, WS_SEND_QUEUE_SIZE):
+            self.dropped += 1
+            ws_frames_dropped.inc(kind=self.kind)
+            if WS_SLOW_CONSUMER_POLICY != "drop":
+                logger.warning(f"Closing slow WebSocket consumer: user_id={self.user_id}")
+                self._closing = asyncio.create_task(self.close(WSCloseCode.TRY_AGAIN_LATER))
+                return False
+            self._pending.popleft()
+        self._pending.append(text)
+        if self._writer is None:
+            self._writer = asyncio.create_task(self._drain())
+        return True
+
+    async def send(self, data: dict) -> bool:
+        """Send data to client."""
+        return self.send_text(json.dumps(data))
 
     async def send_notification(self, notification: Notification) -> bool:
         """Send notification to client."""
-        return await self.send({"type": "notification", "payload": notification.to_dict()})
+        return self.send_text(notification.to_ws_text())
+
+    def discard_pending(self) -> None:
+        """Drop queued frames and stop the writer."""
+        if self._pending:
+            self._pending.clear()
+        if self._writer is not None and self._writer is not asyncio.current_task():
+            self._writer.cancel()
+
+    async def close(self, code: int = WSCloseCode.OK) -> None:
+        """Stop the writer and close the socket."""
+        self.discard_pending()
+        if not self.ws.closed:
+            await self.ws.close(code=code)
 
 
 class WebSocketManager:
     """
-    Manages WebSocket connections and message routing.
+    Connection hub for every WebSocket of the process.
 
     Features:
-    - Connection tracking by user_id
-    - Automatic cleanup of disconnected clients
+    - Indexes by user, store and city (O(1) routing, O(1) disconnect)
+    - Messages serialized once per send, however many clients receive them
     - Integration with NotificationService pub/sub
-    - Heartbeat/ping-pong support
+    - Heartbeat-driven cleanup (no periodic scans)
     """
 
     _instance: Optional["WebSocketManager"] = None
 
     def __init__(self):
-        self._clients: dict[int, set[WebSocketClient]] = {}  # user_id -> clients
-        self._all_clients: WeakSet[WebSocketClient] = WeakSet()
+        self._clients: set[WebSocketClient] = set()
+        self._by_user: dict[int, set[WebSocketClient]] = {}
+        self._by_store: dict[int, set[WebSocketClient]] = {}
+        self._by_city: dict[str, set[WebSocketClient]] = {}
+        # One city-channel subscription per connected city, fanned out by send_to_city
+        self._city_handlers: dict[str, Any] = {}
         self._notification_service: NotificationService | None = None
-        self._heartbeat_interval = 30  # seconds
-        self._cleanup_task: asyncio.Task | None = None
 
     @classmethod
     def get_instance(cls) -> "WebSocketManager":
@@ -88,67 +175,76 @@ class WebSocketManager:
         self._notification_service = service
 
     async def start(self) -> None:
-        """Start background tasks."""
-        self._cleanup_task = asyncio.create_task(self._cleanup_loop())
+        """Kept for API compatibility; dead peers are found by heartbeats."""
         logger.info("WebSocketManager started")
 
     async def stop(self) -> None:
-        """Stop background tasks and close all connections."""
-        if self._cleanup_task:
-            self._cleanup_task.cancel()
-            try:
-                await self._cleanup_task
-            except asyncio.CancelledError:
-                pass
-
-        # Close all connections
-        for client in list(self._all_clients):
+        """Close all connections."""
+        for client in list(self._clients):
             await self._disconnect(client)
 
         logger.info("WebSocketManager stopped")
 
-    async def _cleanup_loop(self) -> None:
-        """Periodically cleanup disconnected clients."""
-        while True:
-            try:
-                await asyncio.sleep(60)  # Check every minute
-                await self._cleanup_stale_connections()
-            except asyncio.CancelledError:
-                break
-            except Exception as e:
-                logger.error(f"Cleanup loop error: {e}")
-
-    async def _cleanup_stale_connections(self) -> None:
-        """Remove disconnected clients."""
-        for user_id, clients in list(self._clients.items()):
-            for client in list(clients):
-                if client.ws.closed:
-                    clients.discard(client)
+    @staticmethod
+    def _index_add(index: dict, key: Hashable, client: WebSocketClient) -> None:
+        if key is not None:
+            index.setdefault(key, set()).add(client)
+
+    @staticmethod
+    def _index_remove(index: dict, key: Hashable, client: WebSocketClient) -> None:
+        clients = index.get(key)
+        if clients is not None:
+            clients.discard(client)
             if not clients:
-                del self._clients[user_id]
+                del index[key]
+
+    def register(self, client: WebSocketClient) -> WebSocketClient:
+        """Index a client without pub/sub subscriptions or a welcome frame."""
+        self._clients.add(client)
+        self._index_add(self._by_user, client.user_id, client)
+        self._index_add(self._by_store, client.store_id, client)
+        self._index_add(self._by_city, client.city, client)
+        ws_connections.inc(kind=client.kind)
+        return client
+
+    def unregister(self, client: WebSocketClient) -> None:
+        """Remove a client from every index."""
+        if client not in self._clients:
+            return
+        self._clients.discard(client)
+        self._index_remove(self._by_user, client.user_id, client)
+        self._index_remove(self._by_store, client.store_id, client)
+        self._index_remove(self._by_city, client.city, client)
+        ws_connections.dec(kind=client.kind)
 
     async def connect(
-        self, ws: web.WebSocketResponse, user_id: int | None = None, store_id: int | None = None
+        self,
+        ws: web.WebSocketResponse,
+        user_id: int | None = None,
+        store_id: int | None = None,
+        city: str | None = None,
     ) -> WebSocketClient:
         """Register a new WebSocket connection."""
-        client = WebSocketClient(ws=ws, user_id=user_id, store_id=store_id)
-        self._all_clients.add(client)
-
-        if user_id:
-            if user_id not in self._clients:
-                self._clients[user_id] = set()
-            self._clients[user_id].add(client)
+        city = normalize_city(city) if city else None
+        client = self.register(
+            WebSocketClient(ws=ws, user_id=user_id, store_id=store_id, city=city)
+        )
 
+        if user_id and self._notification_service:
             # Subscribe to user's notifications
-            if self._notification_service:
-                await self._notification_service.subscribe_user(user_id, client.send_notification)
+            await self._notification_service.subscribe_user(user_id, client.send_notification)
 
-        if store_id:
+        if store_id and self._notification_service:
             # Subscribe to store notifications (partner panel)
-            if self._notification_service:
-                await self._notification_service.subscribe_store(
-                    int(store_id), client.send_notification
-                )
+            await self._notification_service.subscribe_store(
+                int(store_id), client.send_notification
+            )
+
+        if city and self._notification_service and city not in self._city_handlers:
+            # City-wide notifications, serialized once for every client of the city
+            handler = partial(self.send_to_city, city)
+            self._city_handlers[city] = handler
+            await self._notification_service.subscribe_city(city, handler)
 
         logger.info(f"WebSocket connected: user_id={user_id}, store_id={store_id}")
 
@@ -168,17 +264,13 @@ class WebSocketManager:
 
     async def _disconnect(self, client: WebSocketClient) -> None:
         """Handle client disconnection."""
-        if client.user_id:
-            if client.user_id in self._clients:
-                self._clients[client.user_id].discard(client)
-                if not self._clients[client.user_id]:
-                    del self._clients[client.user_id]
+        self.unregister(client)
 
+        if client.user_id and self._notification_service:
             # Unsubscribe from notifications
-            if self._notification_service:
-                await self._notification_service.unsubscribe_user(
-                    client.user_id, client.send_notification
-                )
+            await self._notification_service.unsubscribe_user(
+                client.user_id, client.send_notification
+            )
 
         if client.store_id and self._notification_service:
             try:
@@ -188,46 +280,62 @@ class WebSocketManager:
             except Exception:
                 pass
 
-        if not client.ws.closed:
-            await client.ws.close()
+        if client.city and client.city not in self._by_city:
+            handler = self._city_handlers.pop(client.city, None)
+            if handler and self._notification_service:
+                await self._notification_service.unsubscribe_city(client.city, handler)
+
+        await client.close()
 
         logger.info(f"WebSocket disconnected: user_id={client.user_id}")
 
-    async def send_to_user(self, user_id: int, data: dict) -> int:
-        """Send data to all connections of a user."""
+    @staticmethod
+    def _send_all(clients, data: dict | str, kind: str | None = None) -> int:
+        if not clients:
+            return 0
+        text = data if isinstance(data, str) else json.dumps(data)
         sent = 0
-        clients = self._clients.get(user_id, set())
-
         for client in list(clients):
-            if await client.send(data):
+            if (kind is None or client.kind == kind) and client.send_text(text):
                 sent += 1
-            elif client.ws.closed:
-                clients.discard(client)
-
         return sent
 
+    async def send_to_user(self, user_id: int, data: dict) -> int:
+        """Send data to all connections of a user."""
+        return self._send_all(self._by_user.get(user_id), data)
+
+    async def send_to_store(self, store_id: int, data: dict, kind: str | None = None) -> int:
+        """Send data to all connections of a store (optionally one client kind)."""
+        return self._send_all(self._by_store.get(store_id), data, kind)
+
+    async def send_to_city(self, city: str, data: dict | Notification) -> int:
+        """Send data or a notification to all connections that registered a city."""
+        if isinstance(data, Notification):
+            data = data.to_ws_text()
+        return self._send_all(self._by_city.get(normalize_city(city)), data)
+
     async def broadcast(self, data: dict) -> int:
         """Broadcast data to all connected clients."""
-        sent = 0
-        for client in list(self._all_clients):
-            if await client.send(data):
-                sent += 1
-        return sent
+        return self._send_all(self._clients, data)
 
     def get_connected_users(self) -> set[int]:
         """Get set of connected user IDs."""
-        return set(self._clients.keys())
+        return set(self._by_user.keys())
 
     def get_connection_count(self) -> int:
         """Get total number of connections."""
-        return sum(len(clients) for clients in self._clients.values())
+        return len(self._clients)
 
     def get_stats(self) -> dict:
         """Get WebSocket statistics."""
         return {
             "total_connections": self.get_connection_count(),
-            "unique_users": len(self._clients),
-            "users": list(self._clients.keys()),
+            "unique_users": len(self._by_user),
+            "users": list(self._by_user.keys()),
+            "stores": len(self._by_store),
+            "cities": len(self._by_city),
+            "frames_sent": sum(client.sent for client in self._clients),
+            "frames_dropped": sum(client.dropped for client in self._clients),
         }
 
 
@@ -238,13 +346,14 @@ async def websocket_handler(request: web.Request) -> web.WebSocketResponse:
     Query params:
     - user_id: User's Telegram ID
     - store_id: Store ID (for store owners)
+    - city: City for city-wide updates (optional)
     - token: Authentication token (optional)
 
     Messages:
     - Client can send: ping, subscribe, unsubscribe
     - Server sends: notification, pong, connected, error
     """
-    ws = web.WebSocketResponse(heartbeat=30)
+    ws = web.WebSocketResponse(heartbeat=WS_HEARTBEAT_SECONDS or None)
     try:
         await ws.prepare(request)
     except ClientConnectionResetError:
@@ -255,6 +364,7 @@ async def websocket_handler(request: web.Request) -> web.WebSocketResponse:
     # Get user info from query params
     user_id = request.query.get("user_id")
     store_id = request.query.get("store_id")
+    city = normalize_city((request.query.get("city") or "").strip()[:64]) or None
     ws_token = request.query.get("ws_token") or request.query.get("token")
 
     authenticated_user_id = None
@@ -330,11 +440,16 @@ async def websocket_handler(request: web.Request) -> web.WebSocketResponse:
             return ws
 
     # Register connection
-    client = await manager.connect(ws, user_id, store_id)
+    client = await manager.connect(ws, user_id, store_id, city)
 
     try:
         async for msg in ws:
+            client.touch()
             if msg.type == WSMsgType.TEXT:
+                if msg.data == "ping":
+                    # Partner panel keepalive sends a bare "ping"
+                    client.send_text('{"type": "pong"}')
+                    continue
                 try:
                     data = json.loads(msg.data)
                     await _handle_client_message(client, data)
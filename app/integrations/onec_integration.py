@@ -15,11 +15,14 @@
 from __future__ import annotations
 
 import asyncio
+import time
 from dataclasses import dataclass, field
 from datetime import datetime, timedelta
 from typing import Any
 from urllib.parse import urljoin
 
+from app.core.async_db import run_sync_db
+from app.domain.offer_rules import validate_offer_prices
 from logging_config import logger
 
 # Optional dependencies
@@ -53,6 +56,9 @@ class OneCConfig:
     # Фильтр по складам/магазинам (опционально)
     warehouse_filter: list[str] = field(default_factory=list)
 
+    # Размер страницы OData ($top/$skip)
+    page_size: int = 1000
+
     # Интервал синхронизации (минуты)
     sync_interval_minutes: int = 60
 
@@ -83,6 +89,10 @@ class OneCProduct:
         return (self.expiry_date.date() - datetime.now().date()).days
 
 
+# Значение offers.external_source для товаров из 1С
+ONEC_SOURCE = "1c"
+
+
 class OneCIntegration:
     """
     Интеграция с 1С через OData API.
@@ -188,7 +198,7 @@ class OneCIntegration:
             "$filter": odata_filter,
             "$format": "json",
             "$select": "Код,Наименование,Цена,Количество,СрокГодности,Категория,Штрихкод",
-            "$top": 100,  # Лимит
+            "$orderby": "Код",
         }
 
         try:
@@ -207,12 +217,9 @@ class OneCIntegration:
                 url = urljoin(self.config.base_url, endpoint)
 
                 try:
-                    async with session.get(url, params=params) as response:
-                        if response.status == 200:
-                            data = await response.json()
-                            products = self._parse_odata_response(data)
-                            if products:
-                                break
+                    products = await self._fetch_all_pages(session, url, params)
+                    if products:
+                        break
                 except Exception as e:
                     logger.debug(f"1C endpoint {endpoint} failed: {e}")
                     continue
@@ -224,15 +231,47 @@ class OneCIntegration:
             logger.error(f"1C fetch_expiring_products error: {e}")
             return []
 
-    def _parse_odata_response(self, data: dict) -> list[OneCProduct]:
-        """Парсинг ответа OData."""
-        products = []
+    async def _fetch_all_pages(
+        self, session: aiohttp.ClientSession, url: str, params: dict[str, Any]
+    ) -> list[OneCProduct]:
+        """
+        Постранично выгрузить endpoint через $top/$skip.
 
+        Ошибка на любой странице прерывает выгрузку целиком: неполный
+        каталог нельзя использовать для деактивации пропавших товаров.
+        """
+        page_size = max(1, self.config.page_size)
+        products: list[OneCProduct] = []
+        skip = 0
+
+        while True:
+            page_params = {**params, "$top": page_size, "$skip": skip}
+            async with session.get(url, params=page_params) as response:
+                if response.status != 200:
+                    if skip == 0:
+                        return []
+                    raise RuntimeError(f"HTTP {response.status} at $skip={skip}")
+                data = await response.json()
+
+            items = self._odata_items(data)
+            products.extend(self._parse_odata_response(data))
+            if len(items) < page_size:
+                return products
+            skip += page_size
+
+    @staticmethod
+    def _odata_items(data: dict) -> list[dict]:
+        """Строки ответа OData (v4 "value" или v2 "d.results")."""
         items = data.get("value", [])
         if not items:
             items = data.get("d", {}).get("results", [])
+        return items
 
-        for item in items:
+    def _parse_odata_response(self, data: dict) -> list[OneCProduct]:
+        """Парсинг ответа OData."""
+        products = []
+
+        for item in self._odata_items(data):
             try:
                 # Маппинг полей (может отличаться в разных конфигурациях 1С)
                 code = item.get("Код") or item.get("Code") or item.get("Ref_Key", "")
@@ -315,64 +354,67 @@ class OneCIntegration:
         """
         Синхронизировать товары из 1С в магазин.
 
+        Текущие предложения магазина загружаются одним запросом в индекс
+        по коду 1С, разница с выгрузкой считается в памяти и применяется
+        одной транзакцией (COPY + upsert + деактивация пропавших товаров).
+
         Args:
             store_id: ID магазина в боте
             db: Database instance
             auto_discount_service: AutoDiscountService для расчёта скидок
 
         Returns:
-            Статистика: {"imported": N, "updated": N, "skipped": N}
+            Статистика: количество imported/updated/unchanged/deactivated/
+            skipped/errors и время этапов fetch_ms/diff_ms/apply_ms
         """
-        stats = {"imported": 0, "updated": 0, "skipped": 0, "errors": 0}
+        stats = {
+            "fetched": 0,
+            "imported": 0,
+            "updated": 0,
+            "unchanged": 0,
+            "deactivated": 0,
+            "skipped": 0,
+            "errors": 0,
+            "fetch_ms": 0,
+            "diff_ms": 0,
+            "apply_ms": 0,
+        }
 
         try:
+            started = time.perf_counter()
             products = await self.fetch_expiring_products()
-
-            for product in products:
-                try:
-                    # Рассчитываем скидку
-                    discount = auto_discount_service.calculate_discount(
-                        product.expiry_date, product.price
-                    )
-
-                    # Пропускаем товары без скидки
-                    if discount.discount_percent == 0:
-                        stats["skipped"] += 1
-                        continue
-
-                    # Проверяем, есть ли уже такой товар (по коду 1С)
-                    existing = self._find_existing_offer(db, store_id, product.code)
-
-                    if existing:
-                        # Обновляем существующий
-                        offer_id = existing.get("offer_id") or existing[0]
-                        db.update_offer(
-                            offer_id,
-                            quantity=product.quantity,
-                            discount_price=discount.discount_price,
-                            description=discount.urgency_message,
-                        )
-                        stats["updated"] += 1
-                    else:
-                        # Создаём новый
-                        db.create_offer(
-                            store_id=store_id,
-                            title=product.name,
-                            description=discount.urgency_message,
-                            original_price=product.price,
-                            discount_price=discount.discount_price,
-                            quantity=product.quantity,
-                            category=product.category,
-                            expiry_date=product.expiry_date.strftime("%Y-%m-%d"),
-                        )
-                        stats["imported"] += 1
-
-                except Exception as e:
-                    logger.error(f"1C sync error for product {product.code}: {e}")
-                    stats["errors"] += 1
+            stats["fetched"] = len(products)
+            stats["fetch_ms"] = int((time.perf_counter() - started) * 1000)
+
+            # Пустая выгрузка чаще означает сбой 1С, чем пустой склад:
+            # ничего не деактивируем.
+            if not products:
+                logger.warning(f"1C sync for store {store_id}: no products fetched")
+                return stats
+
+            started = time.perf_counter()
+            existing = await run_sync_db(db.get_external_offer_index, store_id, ONEC_SOURCE)
+            upserts, deactivate_codes = self._build_sync_diff(
+                products, existing, auto_discount_service, stats
+            )
+            stats["diff_ms"] = int((time.perf_counter() - started) * 1000)
+
+            started = time.perf_counter()
+            if upserts or deactivate_codes:
+                applied = await run_sync_db(
+                    db.apply_external_offer_sync,
+                    store_id,
+                    ONEC_SOURCE,
+                    upserts,
+                    deactivate_codes,
+                )
+                stats["imported"] = applied["inserted"]
+                stats["updated"] = applied["updated"]
+                stats["deactivated"] = applied["deactivated"]
+            stats["apply_ms"] = int((time.perf_counter() - started) * 1000)
 
             self._last_sync = datetime.now()
-            logger.info(f"1C sync complete: {stats}")
+            logger.info(f"1C sync complete for store {store_id}: {stats}")
 
         except Exception as e:
             logger.error(f"1C sync_to_store error: {e}")
@@ -380,17 +422,85 @@ class OneCIntegration:
 
         return stats
 
-    def _find_existing_offer(self, db: Any, store_id: int, code_1c: str) -> Any:
-        """Найти существующее предложение по коду 1С."""
-        # Ищем в описании или создаём отдельное поле
-        # Пока простой поиск по названию (можно улучшить)
-        offers = db.get_store_offers(store_id, status="active")
-        for offer in offers:
-            # Проверяем есть ли код в описании
-            desc = offer.get("description", "") if isinstance(offer, dict) else ""
-            if f"[1C:{code_1c}]" in desc:
-                return offer
-        return None
+    def _build_sync_diff(
+        self,
+        products: list[OneCProduct],
+        existing: dict[str, dict],
+        auto_discount_service: Any,
+        stats: dict[str, int],
+    ) -> tuple[list[dict[str, Any]], list[str]]:
+        """
+        Сравнить выгрузку 1С с индексом предложений магазина.
+
+        Returns:
+            (строки для upsert, коды 1С для деактивации)
+        """
+        upserts: list[dict[str, Any]] = []
+        seen: set[str] = set()
+
+        for product in products:
+            if not product.code or product.code in seen:
+                stats["skipped"] += 1
+                continue
+            seen.add(product.code)
+
+            try:
+                discount = auto_discount_service.calculate_discount(
+                    product.expiry_date, product.price
+                )
+            except Exception as e:
+                logger.error(f"1C sync error for product {product.code}: {e}")
+                stats["errors"] += 1
+                continue
+
+            # Товар без допустимой скидки не выставляем (и снимаем, если был выставлен)
+            try:
+                if discount.discount_percent == 0:
+                    raise ValueError("no discount")
+                validate_offer_prices(product.price, discount.discount_price)
+            except ValueError:
+                seen.discard(product.code)
+                stats["skipped"] += 1
+                continue
+
+            row = {
+                "external_code": product.code,
+                "title": product.name,
+                "description": discount.urgency_message,
+                "original_price": product.price,
+                "discount_price": discount.discount_price,
+                "quantity": product.quantity,
+                "expiry_date": product.expiry_date.date(),
+                "category": product.category,
+            }
+
+            current = existing.get(product.code)
+            if current and current.get("status") == "active" and self._same_offer(current, row):
+                stats["unchanged"] += 1
+                continue
+            upserts.append(row)
+
+        deactivate_codes = [
+            code
+            for code, offer in existing.items()
+            if code not in seen and offer.get("status") == "active"
+        ]
+        return upserts, deactivate_codes
+
+    @staticmethod
+    def _same_offer(current: dict[str, Any], row: dict[str, Any]) -> bool:
+        """Совпадает ли предложение в БД со строкой выгрузки."""
+        quantity = current.get("quantity")
+        return (
+            current.get("title") == row["title"]
+            and current.get("description") == row["description"]
+            and current.get("original_price") == row["original_price"]
+            and current.get("discount_price") == row["discount_price"]
+            and quantity is not None
+            and float(quantity) == float(row["quantity"])
+            and current.get("expiry_date") == row["expiry_date"]
+            and current.get("category") == row["category"]
+        )
 
     async def start_auto_sync(
         self,
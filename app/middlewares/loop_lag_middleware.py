@@ -0,0 +1,58 @@
+"""Middleware that labels Telegram updates for the event loop lag monitor.
+
+Registered as an outer update middleware so the label also covers the other
+middlewares (user cache, rate limit, FSM storage) that run before handlers.
+"""
+from __future__ import annotations
+
+import re
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+from aiogram import BaseMiddleware
+from aiogram.types import TelegramObject, Update
+
+from app.core.loop_monitor import EventLoopLagMonitor, get_loop_monitor
+
+# Commands with a handler (Command(...) filters); anything else a user types
+# after "/" is labelled command:other to keep the metric labels bounded
+KNOWN_COMMANDS = frozenset(
+    {"start", "help", "code", "admin", "stats", "setadmin", "refunds", "load_test_data"}
+)
+
+# Callback data carries ids as underscore-separated numbers
+# (order_confirm_123, store_page_5_40); drop them so labels stay bounded
+_CALLBACK_ID_SEGMENT = re.compile(r"_-?\d+(?=_|$)")
+
+
+class LoopLagMiddleware(BaseMiddleware):
+    """Track in-flight updates so loop stalls can be attributed to them."""
+
+    def __init__(self, monitor: EventLoopLagMonitor | None = None) -> None:
+        self.monitor = monitor or get_loop_monitor()
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: dict[str, Any],
+    ) -> Any:
+        with self.monitor.track(self._label(event)):
+            return await handler(event, data)
+
+    @staticmethod
+    def _label(event: TelegramObject) -> str:
+        if not isinstance(event, Update):
+            return f"update:{type(event).__name__}"
+        if event.callback_query is not None:
+            payload = (event.callback_query.data or "").split(":", 1)[0]
+            return f"callback:{_CALLBACK_ID_SEGMENT.sub('', payload)[:32]}"
+        if event.message is not None:
+            text = event.message.text or ""
+            if text.startswith("/"):
+                parts = text[1:].split(maxsplit=1)
+                command = parts[0].split("@", 1)[0].lower() if parts else ""
+                return f"command:{command if command in KNOWN_COMMANDS else 'other'}"
+            content_type = event.message.content_type
+            return f"message:{getattr(content_type, 'value', content_type)}"
+        return f"update:{event.event_type}"
@@ -7,14 +7,17 @@ Automatically tracks:
 - Error rates
 - Active users
 """
+import asyncio
+import os
 import time
+from collections import defaultdict
 from collections.abc import Awaitable, Callable
 from typing import Any
 
 from aiogram import BaseMiddleware
 from aiogram.types import CallbackQuery, Message, TelegramObject
 
-from app.core.constants import SECONDS_PER_HOUR
+from app.core.constants import SECONDS_PER_HOUR, SECONDS_PER_MINUTE
 from app.core.metrics import metrics
 
 try:
@@ -25,12 +28,120 @@ except ImportError:
     logger = logging.getLogger(__name__)
 
 
+class ActiveUserTracker:
+    """Count distinct active users per city over a sliding window.
+
+    Users are recorded into per-minute buckets (a ring of ``window`` minutes),
+    so recording is an O(1) set insert. Distinct counts are only computed when
+    the gauge is refreshed on a timer.
+
+    With a Redis URL, each refresh also flushes the users seen since the last
+    flush into per-minute HyperLogLog keys and reads the merged count, giving
+    a cross-replica figure at ~12KB per key regardless of user count.
+    """
+
+    KEY_PREFIX = "fudly:active_users"
+
+    def __init__(
+        self,
+        window_seconds: int = SECONDS_PER_HOUR,
+        bucket_seconds: int = SECONDS_PER_MINUTE,
+        redis_url: str | None = None,
+    ):
+        self.bucket_seconds = bucket_seconds
+        self.num_buckets = max(1, window_seconds // bucket_seconds)
+        # ring slot -> (bucket id, city -> user ids)
+        self._ring: list[tuple[int, dict[str, set[int]]]] = [
+            (-1, defaultdict(set)) for _ in range(self.num_buckets)
+        ]
+        self._pending: dict[tuple[int, str], set[int]] = defaultdict(set)
+        self._redis_url = redis_url
+        self._redis: Any = None
+
+    def _bucket_id(self, now: float | None = None) -> int:
+        return int((now if now is not None else time.time()) // self.bucket_seconds)
+
+    def record(self, user_id: int, city: str = "unknown", now: float | None = None) -> None:
+        """Mark a user as active (O(1))."""
+        bucket = self._bucket_id(now)
+        slot = bucket % self.num_buckets
+        slot_bucket, cities = self._ring[slot]
+        if slot_bucket != bucket:
+            cities = defaultdict(set)
+            self._ring[slot] = (bucket, cities)
+        cities[city].add(user_id)
+        if self._redis_url:
+            self._pending[(bucket, city)].add(user_id)
+
+    def local_counts(self, now: float | None = None) -> dict[str, int]:
+        """Distinct active users per city (plus ``all``) seen by this process."""
+        oldest = self._bucket_id(now) - self.num_buckets + 1
+        by_city: dict[str, set[int]] = defaultdict(set)
+        for bucket, cities in self._ring:
+            if bucket < oldest:
+                continue
+            for city, users in cities.items():
+                by_city[city].update(users)
+        counts = {city: len(users) for city, users in by_city.items()}
+        counts["all"] = len(set().union(*by_city.values())) if by_city else 0
+        return counts
+
+    async def _get_redis(self) -> Any:
+        if self._redis is None:
+            import redis.asyncio as aioredis
+
+            self._redis = aioredis.from_url(self._redis_url, decode_responses=True)
+        return self._redis
+
+    def _key(self, city: str, bucket: int) -> str:
+        return f"{self.KEY_PREFIX}:{city}:{bucket}"
+
+    async def shared_counts(self, now: float | None = None) -> dict[str, int] | None:
+        """Flush pending users to Redis HLLs and return cross-replica counts."""
+        if not self._redis_url:
+            return None
+        pending, self._pending = self._pending, defaultdict(set)
+        current = self._bucket_id(now)
+        ttl = (self.num_buckets + 1) * self.bucket_seconds
+        try:
+            client = await self._get_redis()
+            pipe = client.pipeline(transaction=False)
+            for (bucket, city), users in pending.items():
+                for key in (self._key(city, bucket), self._key("all", bucket)):
+                    pipe.pfadd(key, *users)
+                    pipe.expire(key, ttl)
+            cities = {city for cities in (c for _, c in self._ring) for city in cities}
+            cities.add("all")
+            window = range(current - self.num_buckets + 1, current + 1)
+            ordered = sorted(cities)
+            for city in ordered:
+                pipe.pfcount(*[self._key(city, bucket) for bucket in window])
+            results = await pipe.execute()
+        except Exception as e:
+            logger.warning(f"Active users Redis flush failed: {e}")
+            return None
+        return dict(zip(ordered, (int(v or 0) for v in results[-len(ordered):])))
+
+    async def refresh_gauge(self) -> dict[str, int]:
+        """Recompute counts and publish them to ``fudly_active_users``."""
+        counts = await self.shared_counts() or self.local_counts()
+        for city, count in counts.items():
+            metrics.active_users.set(count, city=city)
+        return counts
+
+
 class MetricsMiddleware(BaseMiddleware):
     """Middleware to collect metrics for all handlers."""
 
-    def __init__(self):
-        self._active_users: dict[int, float] = {}  # user_id -> last_seen timestamp
-        self._active_users_window = SECONDS_PER_HOUR  # 1 hour window for "active" users
+    def __init__(self, gauge_interval: float = 30.0, redis_url: str | None = None):
+        if redis_url is None and os.getenv("ACTIVE_USERS_REDIS", "0").lower() in ("1", "true"):
+            redis_url = os.getenv("REDIS_URL") or None
+        self.active_users = ActiveUserTracker(
+            window_seconds=SECONDS_PER_HOUR,  # 1 hour window for "active" users
+            redis_url=redis_url,
+        )
+        self._gauge_interval = gauge_interval
+        self._gauge_task: asyncio.Task | None = None
 
     async def __call__(
         self,
@@ -41,13 +152,11 @@ class MetricsMiddleware(BaseMiddleware):
         # Extract handler name
         handler_name = self._get_handler_name(handler, data)
 
-        # Extract user info
+        # Track active user (city comes from UserCacheMiddleware, no DB hit)
         user_id = self._get_user_id(event)
-        city = self._get_user_city(event, data)
-
-        # Track active user
         if user_id:
-            self._track_active_user(user_id, city)
+            self.active_users.record(user_id, self._get_user_city(data))
+            self._ensure_gauge_task()
 
         # Track request timing
         start_time = time.time()
@@ -74,8 +183,29 @@ class MetricsMiddleware(BaseMiddleware):
                     f"duration={duration:.2f}s, user_id={user_id}"
                 )
 
+    def _ensure_gauge_task(self) -> None:
+        if self._gauge_task is None or self._gauge_task.done():
+            self._gauge_task = asyncio.create_task(self._gauge_loop())
+
+    async def _gauge_loop(self) -> None:
+        """Refresh the active users gauge periodically instead of per event."""
+        while True:
+            try:
+                await self.active_users.refresh_gauge()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Active users gauge refresh failed: {e}")
+            await asyncio.sleep(self._gauge_interval)
+
     def _get_handler_name(self, handler: Callable, data: dict[str, Any]) -> str:
         """Extract handler name from function or data."""
+        # aiogram passes the matched HandlerObject to inner middlewares
+        handler_obj = data.get("handler")
+        callback = getattr(handler_obj, "callback", None)
+        if callback is not None and hasattr(callback, "__name__"):
+            return callback.__name__
+
         # Try to get from handler function
         if hasattr(handler, "__name__"):
             return handler.__name__
@@ -95,45 +225,13 @@ class MetricsMiddleware(BaseMiddleware):
             return event.from_user.id if event.from_user else None
         return None
 
-    def _get_user_city(self, event: TelegramObject, data: dict[str, Any]) -> str:
-        """Try to get user's city from context."""
-        # Try to get from data (if middleware chain has db data)
-        db = data.get("db")
-        user_id = self._get_user_id(event)
-
-        if db and user_id:
-            try:
-                user = db.get_user_model(user_id)
-                if user and user.city:
-                    return user.city
-            except Exception:
-                pass
-
-        return "unknown"
-
-    def _track_active_user(self, user_id: int, city: str = "unknown"):
-        """Track user as active."""
-        current_time = time.time()
-        self._active_users[user_id] = current_time
-
-        # Clean up old entries and update gauge
-        self._cleanup_inactive_users()
-
-        # Update active users gauge by city
-        city_counts: dict[str, int] = {}
-        for uid, last_seen in self._active_users.items():
-            # We don't have city per user here, so just count total
-            city_counts["all"] = city_counts.get("all", 0) + 1
-
-        for c, count in city_counts.items():
-            metrics.active_users.set(count, city=c)
-
-    def _cleanup_inactive_users(self):
-        """Remove users who haven't been active in the window."""
-        current_time = time.time()
-        cutoff = current_time - self._active_users_window
-
-        self._active_users = {uid: ts for uid, ts in self._active_users.items() if ts > cutoff}
+    def _get_user_city(self, data: dict[str, Any]) -> str:
+        """Get user's city from data already loaded by UserCacheMiddleware."""
+        user_data = data.get("user_data")
+        city = data.get("user_city")
+        if not city and isinstance(user_data, dict):
+            city = user_data.get("city")
+        return str(city) if city else "unknown"
 
 
 class BusinessMetricsMiddleware(BaseMiddleware):
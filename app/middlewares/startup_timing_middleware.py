@@ -0,0 +1,31 @@
+"""Middleware that reports time-to-first-update after a (re)start."""
+from __future__ import annotations
+
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+from aiogram import BaseMiddleware
+from aiogram.types import TelegramObject
+
+from app.core.startup_timing import mark_startup
+
+
+class FirstUpdateMiddleware(BaseMiddleware):
+    """Mark the ``first_update`` startup stage once the first update is handled."""
+
+    def __init__(self) -> None:
+        self._seen = False
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: dict[str, Any],
+    ) -> Any:
+        if self._seen:
+            return await handler(event, data)
+        self._seen = True
+        try:
+            return await handler(event, data)
+        finally:
+            mark_startup("first_update")
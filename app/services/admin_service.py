@@ -75,7 +75,24 @@ class AdminService:
         value = row[0]
         return int(value) if value is not None else 0
 
+    def _snapshot(self) -> dict[str, Any] | None:
+        """Cached platform statistics snapshot, when the backend provides one."""
+        if not self._use_postgres:
+            return None
+        getter = getattr(self._db, "get_platform_stats_snapshot", None)
+        return getter() if callable(getter) else None
+
     def get_user_stats(self) -> UserStats:
+        snapshot = self._snapshot()
+        if snapshot is not None:
+            return UserStats(
+                total=snapshot["users_total"],
+                sellers=snapshot["users_sellers"],
+                customers=snapshot["users_customers"],
+                week_users=snapshot["users_week"],
+                today_users=snapshot["users_today"],
+            )
+
         from datetime import datetime
 
         today = datetime.now().strftime("%Y-%m-%d")
@@ -117,6 +134,14 @@ class AdminService:
         )
 
     def get_store_stats(self) -> StoreStats:
+        snapshot = self._snapshot()
+        if snapshot is not None:
+            return StoreStats(
+                active=snapshot["stores_active"],
+                pending=snapshot["stores_pending"],
+                rejected=snapshot["stores_rejected"],
+            )
+
         query = f"SELECT COUNT(*) FROM stores WHERE status = {self.placeholder}"
         with self._db.get_connection() as conn:
             cursor = conn.cursor()
@@ -129,6 +154,18 @@ class AdminService:
         return StoreStats(active=active, pending=pending, rejected=rejected)
 
     def get_offer_stats(self) -> OfferStats:
+        snapshot = self._snapshot()
+        if snapshot is not None:
+            return OfferStats(
+                active=snapshot["offers_active"],
+                inactive=snapshot["offers_inactive"],
+                deleted=snapshot["offers_deleted"],
+                top_categories=[
+                    (str(category), int(count))
+                    for category, count in snapshot["offers_top_categories"]
+                ],
+            )
+
         query = f"SELECT COUNT(*) FROM offers WHERE status = {self.placeholder}"
         with self._db.get_connection() as conn:
             cursor = conn.cursor()
@@ -159,6 +196,17 @@ class AdminService:
         )
 
     def get_booking_stats(self) -> BookingStats:
+        snapshot = self._snapshot()
+        if snapshot is not None:
+            return BookingStats(
+                total=snapshot["bookings_total"],
+                pending=snapshot["bookings_pending"],
+                completed=snapshot["bookings_completed"],
+                cancelled=snapshot["bookings_cancelled"],
+                today_bookings=snapshot["bookings_today"],
+                today_revenue=float(snapshot["revenue_today"]),
+            )
+
         from datetime import datetime
 
         today = datetime.now().strftime("%Y-%m-%d")
@@ -9,22 +9,31 @@ Auto Discount Service - автоматическое управление ски
 
 from __future__ import annotations
 
-import csv
-import io
+import html
 import json
 from dataclasses import dataclass
 from datetime import datetime, timedelta
 from enum import Enum
-from typing import Any, Protocol
-
+from typing import IO, Any, Protocol
+
+from app.core.async_db import AsyncDBProxy, run_sync_db
+from app.domain.offer_rules import MIN_OFFER_DISCOUNT_PERCENT
+from app.services.offer_import import (
+    ProgressCallback,
+    RowSkipped,
+    import_offers_csv,
+)
 from logging_config import logger
 
+# Сколько товаров перечислять в срочном уведомлении владельцу
+URGENT_NOTIFY_MAX_ITEMS = 10
+
 
 class DiscountTier(Enum):
     """Уровни скидок в зависимости от срока годности."""
 
     FRESH = 0  # > 7 дней - без скидки
-    WEEK = 15  # 4-7 дней - 15%
+    WEEK = 20  # 4-7 дней - 20% (минимальная скидка)
     SOON = 30  # 2-3 дня - 30%
     URGENT = 50  # 1 день - 50%
     LAST_DAY = 70  # Сегодня истекает - 70%
@@ -72,7 +81,7 @@ class AutoDiscountService:
 
     # Настройки скидок по умолчанию (дни до истечения -> процент скидки)
     DEFAULT_DISCOUNT_RULES: dict[int, int] = {
-        7: 15,  # 7 дней - 15%
+        7: 20,  # 7 дней - 20% (не ниже MIN_OFFER_DISCOUNT_PERCENT)
         5: 20,  # 5 дней - 20%
         3: 30,  # 3 дня - 30%
         2: 40,  # 2 дня - 40%
@@ -102,28 +111,17 @@ class AutoDiscountService:
         # Определяем процент скидки
         discount_percent = 0
         tier = DiscountTier.FRESH
+        urgency = f"✅ Свежий товар ({days_left} дней)"
 
-        if days_left <= 0:
-            discount_percent = self.discount_rules.get(0, 70)
-            tier = DiscountTier.LAST_DAY
-            urgency = "🔴 Последний день!"
-        elif days_left == 1:
-            discount_percent = self.discount_rules.get(1, 50)
-            tier = DiscountTier.URGENT
-            urgency = "🟠 Истекает завтра!"
-        elif days_left <= 3:
-            discount_percent = self.discount_rules.get(3, 30)
-            tier = DiscountTier.SOON
-            urgency = f"🟡 Осталось {days_left} дня"
-        elif days_left <= 7:
-            discount_percent = self.discount_rules.get(7, 15)
-            tier = DiscountTier.WEEK
-            urgency = f"🟢 Осталось {days_left} дней"
-        else:
-            urgency = f"✅ Свежий товар ({days_left} дней)"
+        for max_days, percent, message, step_tier in self._discount_steps():
+            if days_left <= max_days:
+                discount_percent = percent
+                tier = step_tier
+                urgency = message.format(days=days_left)
+                break
 
-        # Рассчитываем цену со скидкой
-        discount_price = int(original_price * (100 - discount_percent) / 100)
+        # Рассчитываем цену со скидкой (целочисленно, как и в SQL-пересчёте)
+        discount_price = int(original_price) * (100 - discount_percent) // 100
 
         return DiscountResult(
             discount_percent=discount_percent,
@@ -133,6 +131,26 @@ class AutoDiscountService:
             urgency_message=urgency,
         )
 
+    def _discount_steps(self) -> list[tuple[int, int, str, DiscountTier]]:
+        """
+        Ступени скидок: (максимум дней до истечения, процент, сообщение, уровень).
+
+        Общий источник правил для calculate_discount и для пакетного
+        пересчёта в БД (update_existing_offers_discounts). Процент ступени
+        не бывает ниже MIN_OFFER_DISCOUNT_PERCENT, иначе такие цены не
+        проходят проверку минимальной скидки.
+        """
+        steps = [
+            (0, self.discount_rules.get(0, 70), "🔴 Последний день!", DiscountTier.LAST_DAY),
+            (1, self.discount_rules.get(1, 50), "🟠 Истекает завтра!", DiscountTier.URGENT),
+            (3, self.discount_rules.get(3, 30), "🟡 Осталось {days} дня", DiscountTier.SOON),
+            (7, self.discount_rules.get(7, 20), "🟢 Осталось {days} дней", DiscountTier.WEEK),
+        ]
+        return [
+            (max_days, max(percent, MIN_OFFER_DISCOUNT_PERCENT), message, tier)
+            for max_days, percent, message, tier in steps
+        ]
+
     def set_custom_rules(self, rules: dict[int, int]) -> None:
         """
         Установить кастомные правила скидок.
@@ -144,11 +162,18 @@ class AutoDiscountService:
         logger.info(f"Custom discount rules set: {rules}")
 
     async def import_from_csv(
-        self, store_id: int, csv_content: str | bytes, owner_id: int
+        self,
+        store_id: int,
+        csv_content: str | bytes | IO[bytes],
+        owner_id: int,
+        on_progress: ProgressCallback | None = None,
     ) -> dict[str, Any]:
         """
         Импортировать товары из CSV файла.
 
+        Файл читается потоково и записывается пачками через общий
+        движок импорта (app.services.offer_import).
+
         Ожидаемые колонки:
         - name: Название товара
         - price: Цена
@@ -156,88 +181,61 @@ class AutoDiscountService:
         - expiry_date: Дата истечения (YYYY-MM-DD или DD.MM.YYYY)
         - category: Категория (опционально)
         - barcode: Штрихкод (опционально)
+        - sku: Код товара (опционально, повторный импорт обновляет товар)
 
         Returns:
             Статистика импорта
         """
-        if isinstance(csv_content, bytes):
-            csv_content = csv_content.decode("utf-8-sig")
 
-        reader = csv.DictReader(io.StringIO(csv_content), delimiter=";")
+        def map_row(row: dict[str, str]) -> dict[str, Any]:
+            name = (row.get("name") or "").strip()
+            price_str = (row.get("price") or "0").replace(" ", "").replace(",", "")
+            quantity_str = (row.get("quantity") or "1").replace(" ", "")
+            expiry_str = (row.get("expiry_date") or "").strip()
+            category = (row.get("category") or "other").strip().lower()
 
-        imported = 0
-        skipped = 0
-        errors: list[str] = []
+            if not name or not expiry_str:
+                raise RowSkipped
 
-        for row_num, row in enumerate(reader, start=2):
             try:
-                # Парсим данные
-                name = row.get("name", "").strip()
-                price_str = row.get("price", "0").replace(" ", "").replace(",", "")
-                quantity_str = row.get("quantity", "1").replace(" ", "")
-                expiry_str = row.get("expiry_date", "").strip()
-                category = row.get("category", "other").strip().lower()
-
-                if not name or not expiry_str:
-                    skipped += 1
-                    continue
-
-                # Парсим цену
-                try:
-                    original_price = int(float(price_str))
-                except ValueError:
-                    errors.append(f"Строка {row_num}: неверная цена '{price_str}'")
-                    continue
-
-                # Парсим количество
-                try:
-                    quantity = int(float(quantity_str))
-                except ValueError:
-                    quantity = 1
-
-                # Парсим дату
-                expiry_date = self._parse_date(expiry_str)
-                if not expiry_date:
-                    errors.append(f"Строка {row_num}: неверная дата '{expiry_str}'")
-                    continue
-
-                # Рассчитываем скидку
-                discount = self.calculate_discount(expiry_date, original_price)
-
-                # Пропускаем товары без скидки (слишком свежие)
-                if discount.discount_percent == 0:
-                    skipped += 1
-                    continue
-
-                # Создаём предложение
-                offer_id = self.db.create_offer(
-                    store_id=store_id,
-                    title=name,
-                    description=discount.urgency_message,
-                    original_price=original_price,
-                    discount_price=discount.discount_price,
-                    quantity=quantity,
-                    category=category,
-                    expiry_date=expiry_date.strftime("%Y-%m-%d"),
-                )
-
-                if offer_id:
-                    imported += 1
-                    logger.info(
-                        f"Imported: {name}, price: {original_price} -> {discount.discount_price} "
-                        f"(-{discount.discount_percent}%), expires: {expiry_date.date()}"
-                    )
-                else:
-                    errors.append(f"Строка {row_num}: не удалось создать предложение")
+                original_price = int(float(price_str))
+            except ValueError:
+                raise ValueError(f"неверная цена '{price_str}'") from None
 
-            except Exception as e:
-                errors.append(f"Строка {row_num}: {str(e)}")
+            try:
+                quantity = int(float(quantity_str))
+            except ValueError:
+                quantity = 1
+
+            expiry_date = self._parse_date(expiry_str)
+            if not expiry_date:
+                raise ValueError(f"неверная дата '{expiry_str}'")
+
+            discount = self.calculate_discount(expiry_date, original_price)
+
+            # Пропускаем товары без скидки (слишком свежие)
+            if discount.discount_percent == 0:
+                raise RowSkipped
+
+            return {
+                "title": name,
+                "description": discount.urgency_message,
+                "original_price": original_price,
+                "discount_price": discount.discount_price,
+                "quantity": quantity,
+                "category": category,
+                "expiry_date": expiry_date.date(),
+            }
+
+        imported = await import_offers_csv(
+            self.db, store_id, csv_content, map_row, delimiter=";", on_progress=on_progress
+        )
 
         result = {
-            "imported": imported,
-            "skipped": skipped,
-            "errors": errors[:10],  # Ограничиваем количество ошибок
-            "total_errors": len(errors),
+            "imported": imported.imported,
+            "skipped": imported.skipped,
+            "errors": imported.error_lines("Строка {row}: {message}", limit=10),
+            "total_errors": imported.failed,
         }
 
         logger.info(f"CSV import complete: {result}")
@@ -325,89 +323,51 @@ class AutoDiscountService:
         Обновить скидки для существующих предложений на основе срока годности.
 
         Запускается по расписанию (например, каждый день в 6:00).
+        Пересчёт выполняется в БД двумя UPDATE на все предложения сразу;
+        владельцы получают одно уведомление на магазин.
         """
-        updated = 0
-        deactivated = 0
-        notified_owners: set[int] = set()
-
-        # Получаем все активные предложения
-        if store_id:
-            offers = self.db.get_store_offers(store_id, status="active")
-        else:
-            offers = self.db.get_all_active_offers()
-
-        for offer in offers:
-            try:
-                offer_id = offer.get("offer_id") if isinstance(offer, dict) else offer[0]
-                expiry_str = offer.get("expiry_date") if isinstance(offer, dict) else offer[7]
-                original_price = (
-                    offer.get("original_price") if isinstance(offer, dict) else offer[4]
-                )
-                current_discount = (
-                    offer.get("discount_price") if isinstance(offer, dict) else offer[5]
-                )
-                store_id_offer = offer.get("store_id") if isinstance(offer, dict) else offer[1]
-
-                if not expiry_str:
-                    continue
-
-                expiry_date = self._parse_date(str(expiry_str))
-                if not expiry_date:
-                    continue
-
-                discount = self.calculate_discount(expiry_date, original_price)
-
-                # Если товар просрочен - деактивируем
-                if discount.days_until_expiry < 0:
-                    self.db.update_offer_status(offer_id, "expired")
-                    deactivated += 1
-                    continue
+        tiers = [
+            (max_days, percent, message)
+            for max_days, percent, message, _ in self._discount_steps()
+        ]
+        sync_db = self.db.sync if isinstance(self.db, AsyncDBProxy) else self.db
+        applied = await run_sync_db(
+            sync_db.apply_expiry_discounts, tiers, store_id, MIN_OFFER_DISCOUNT_PERCENT
+        )
 
-                # Если скидка изменилась - обновляем
-                if discount.discount_price != current_discount:
-                    self.db.update_offer(
-                        offer_id,
-                        discount_price=discount.discount_price,
-                        description=discount.urgency_message,
-                    )
-                    updated += 1
-
-                    # Уведомляем владельца о критичных изменениях
-                    if discount.tier in [DiscountTier.URGENT, DiscountTier.LAST_DAY]:
-                        if self.bot and store_id_offer not in notified_owners:
-                            await self._notify_owner_urgent(store_id_offer, offer, discount)
-                            notified_owners.add(store_id_offer)
+        # Уведомляем владельцев о критичных изменениях (истекает сегодня/завтра)
+        if self.bot:
+            urgent_by_store: dict[int, list[dict[str, Any]]] = {}
+            for offer in applied["updated"]:
+                if offer["days_left"] <= 1 and offer.get("owner_id"):
+                    urgent_by_store.setdefault(offer["store_id"], []).append(offer)
+            for offers in urgent_by_store.values():
+                await self._notify_owner_urgent(offers[0]["owner_id"], offers)
 
-            except Exception as e:
-                logger.error(f"Error updating offer discount: {e}")
-
-        result = {"updated": updated, "deactivated": deactivated}
+        result = {"updated": len(applied["updated"]), "deactivated": applied["expired"]}
         logger.info(f"Auto-discount update complete: {result}")
         return result
 
-    async def _notify_owner_urgent(
-        self, store_id: int, offer: Any, discount: DiscountResult
-    ) -> None:
-        """Уведомить владельца о срочных товарах."""
+    async def _notify_owner_urgent(self, owner_id: int, offers: list[dict[str, Any]]) -> None:
+        """Уведомить владельца о срочных товарах (одно сообщение на магазин)."""
         if not self.bot:
             return
 
-        store = self.db.get_store(store_id)
-        if not store:
-            return
-
-        owner_id = store.get("owner_id") if isinstance(store, dict) else store[1]
-        offer_title = offer.get("title") if isinstance(offer, dict) else offer[2]
+        store_name = html.escape(str(offers[0].get("store_name") or ""))
+        lines = [
+            f"📦 {html.escape(str(offer['title']))}: <b>{offer['discount_price']:,} сум</b> "
+            f"(-{offer['percent']}%) — {offer['description']}"
+            for offer in offers[:URGENT_NOTIFY_MAX_ITEMS]
+        ]
+        if len(offers) > URGENT_NOTIFY_MAX_ITEMS:
+            lines.append(f"…и ещё {len(offers) - URGENT_NOTIFY_MAX_ITEMS}")
 
         try:
             await self.bot.send_message(
                 owner_id,
-                f"⚠️ <b>Срочное уведомление!</b>\n\n"
-                f"📦 Товар: {offer_title}\n"
-                f"{discount.urgency_message}\n"
-                f"💰 Новая цена: <b>{discount.discount_price:,} сум</b> "
-                f"(-{discount.discount_percent}%)\n\n"
-                f"💡 Рекомендуем продвинуть этот товар или увеличить скидку!",
+                f"⚠️ <b>Срочное уведомление!</b>\n🏪 {store_name}\n\n"
+                + "\n".join(lines)
+                + "\n\n💡 Рекомендуем продвинуть эти товары или увеличить скидку!",
                 parse_mode="HTML",
             )
         except Exception as e:
@@ -2,12 +2,16 @@
 Notification Builder - unified order cards for customer/seller updates.
 
 Provides a single interface for pickup and delivery orders with
-consistent structure and optional detail blocks.
+consistent structure and optional detail blocks. Static labels and the
+card head of each (order_type, lang, status, role) are compiled once and
+cached; only the per-order fields are formatted for every card.
 """
 from __future__ import annotations
 
 import html
 import os
+from dataclasses import dataclass
+from functools import lru_cache
 from typing import Literal
 
 from app.domain.order import PaymentStatus
@@ -15,6 +19,57 @@ from app.domain.order_labels import normalize_order_status, status_label
 from localization import get_text
 
 
+@lru_cache(maxsize=2048)
+def cached_text(lang: str, key: str) -> str:
+    """get_text() for a static label (localized texts do not change at runtime)."""
+    return get_text(lang, key)
+
+
+@dataclass(frozen=True, slots=True)
+class _CardHead:
+    """Compiled top of a card: header, banner and status line."""
+
+    lead: str  # before the order id
+    tail: str  # after the order id
+    ready_notice: str | None
+
+
+@lru_cache(maxsize=1024)
+def _card_head(
+    order_type: str,
+    lang: str,
+    status: str,
+    role: str,
+    is_group: bool,
+    ready_hours: str,
+) -> _CardHead:
+    type_label = NotificationBuilder(order_type)._type_label(lang)
+    status_text = status_label(status, lang, order_type)
+    normalized_status = normalize_order_status(status)
+    if order_type == "pickup" and normalized_status == "preparing":
+        normalized_status = "ready"
+
+    title_label = cached_text(lang, "label_cart" if is_group else "label_order")
+    tail = f" — {type_label}"
+    if normalized_status in ("cancelled", "rejected"):
+        banner_key = (
+            "order_cancelled_bold" if normalized_status == "cancelled" else "order_rejected_bold"
+        )
+        banner = cached_text(lang, banner_key)
+        if banner:
+            tail += f"\n{banner}"
+    tail += f"\n{cached_text(lang, 'label_status')}: {status_text}"
+
+    ready_notice = None
+    if role == "customer" and order_type == "pickup" and normalized_status == "ready":
+        ready_notice = get_text(lang, "pickup_ready_notice", hours=ready_hours)
+    return _CardHead(
+        lead=f"🧾 {title_label}",
+        tail=tail,
+        ready_notice=ready_notice,
+    )
+
+
 class NotificationBuilder:
     """Unified notification builder for order cards."""
 
@@ -72,17 +127,17 @@ class NotificationBuilder:
         if normalized is None:
             normalized = PaymentStatus.initial_for_method(payment_method)
         if normalized == PaymentStatus.CONFIRMED:
-            return get_text(lang, "payment_status_confirmed")
+            return cached_text(lang, "payment_status_confirmed")
         if normalized == PaymentStatus.NOT_REQUIRED:
-            return get_text(lang, "payment_status_not_required")
+            return cached_text(lang, "payment_status_not_required")
         if normalized == PaymentStatus.AWAITING_PAYMENT:
-            return get_text(lang, "payment_status_awaiting_payment")
+            return cached_text(lang, "payment_status_awaiting_payment")
         if normalized == PaymentStatus.AWAITING_PROOF:
-            return get_text(lang, "payment_status_awaiting_proof")
+            return cached_text(lang, "payment_status_awaiting_proof")
         if normalized == PaymentStatus.PROOF_SUBMITTED:
-            return get_text(lang, "payment_status_proof_submitted")
+            return cached_text(lang, "payment_status_proof_submitted")
         if normalized == PaymentStatus.REJECTED:
-            return get_text(lang, "payment_status_rejected")
+            return cached_text(lang, "payment_status_rejected")
         return None
 
     def _status_label(self, status: str, lang: str) -> str:
@@ -117,29 +172,18 @@ class NotificationBuilder:
         map_url: str | None = None,
         max_items: int = 3,
     ) -> str:
-        type_label = self._type_label(lang)
-        status_text = self._status_label(status, lang)
-        normalized_status = normalize_order_status(status)
-        if self.order_type == "pickup" and normalized_status == "preparing":
-            normalized_status = "ready"
-
         group_ids = sorted({int(x) for x in (order_ids or []) if x})
         is_group = bool(is_cart or (len(group_ids) > 1))
-
-        title_label = get_text(lang, "label_cart") if is_group else get_text(lang, "label_order")
-        header = (
-            f"🧾 {title_label} — {type_label}"
-            if is_group
-            else f"🧾 {title_label} #{order_id} — {type_label}"
+        head = _card_head(
+            self.order_type,
+            lang,
+            status,
+            role,
+            is_group,
+            str(int(os.getenv("PICKUP_READY_EXPIRY_HOURS", "2"))),
         )
 
-        lines: list[str] = [header]
-        if normalized_status in ("cancelled", "rejected"):
-            banner_key = "order_cancelled_bold" if normalized_status == "cancelled" else "order_rejected_bold"
-            banner = get_text(lang, banner_key)
-            if banner:
-                lines.append(banner)
-        lines.append(f"{get_text(lang, 'label_status')}: {status_text}")
+        lines: list[str] = [head.lead + ("" if is_group else f" #{order_id}") + head.tail]
 
         payment_text = self._payment_label(lang, payment_method)
         payment_status_text = self._payment_status_label(
@@ -154,50 +198,49 @@ class NotificationBuilder:
             else:
                 lines.append(payment_text)
 
-        if role == "customer" and self.order_type == "pickup" and normalized_status == "ready":
-            ready_hours = int(os.getenv("PICKUP_READY_EXPIRY_HOURS", "2"))
-            lines.append(
-                get_text(lang, "pickup_ready_notice", hours=str(ready_hours))
-            )
+        if head.ready_notice:
+            lines.append(head.ready_notice)
 
         if is_group and group_ids:
             max_show = 5
             shown = group_ids[:max_show]
             suffix = f" +{len(group_ids) - max_show}" if len(group_ids) > max_show else ""
             ids_text = ", ".join([f"#{oid}" for oid in shown]) + suffix
-            lines.append(f"{get_text(lang, 'label_orders')}: {ids_text}")
+            lines.append(f"{cached_text(lang, 'label_orders')}: {ids_text}")
 
         if store_name:
-            lines.append(f"{get_text(lang, 'label_store')}: {self._esc(store_name)}")
+            lines.append(f"{cached_text(lang, 'label_store')}: {self._esc(store_name)}")
         if role == "customer" and store_phone:
             lines.append(
-                f"{get_text(lang, 'label_store_phone')}: <code>{self._esc(store_phone)}</code>"
+                f"{cached_text(lang, 'label_store_phone')}: <code>{self._esc(store_phone)}</code>"
             )
 
         if self.order_type == "delivery":
             if delivery_address:
-                lines.append(f"{get_text(lang, 'address')}: {self._esc(delivery_address)}")
+                lines.append(f"{cached_text(lang, 'address')}: {self._esc(delivery_address)}")
             if courier_phone:
                 lines.append(
-                    f"{get_text(lang, 'label_courier')}: <code>{self._esc(courier_phone)}</code>"
+                    f"{cached_text(lang, 'label_courier')}: <code>{self._esc(courier_phone)}</code>"
                 )
         else:
             if store_address:
-                lines.append(f"{get_text(lang, 'address')}: {self._esc(store_address)}")
+                lines.append(f"{cached_text(lang, 'address')}: {self._esc(store_address)}")
             if pickup_code:
-                lines.append(f"{get_text(lang, 'label_code')}: <b>{self._esc(pickup_code)}</b>")
+                lines.append(f"{cached_text(lang, 'label_code')}: <b>{self._esc(pickup_code)}</b>")
 
         if role == "seller":
             if customer_name:
-                lines.append(f"{get_text(lang, 'label_customer')}: {self._esc(customer_name)}")
+                lines.append(f"{cached_text(lang, 'label_customer')}: {self._esc(customer_name)}")
             if customer_phone:
-                lines.append(f"{get_text(lang, 'phone')}: <code>{self._esc(customer_phone)}</code>")
+                lines.append(
+                    f"{cached_text(lang, 'phone')}: <code>{self._esc(customer_phone)}</code>"
+                )
             if comment:
-                lines.append(f"{get_text(lang, 'label_comment')}: {self._esc(comment)}")
+                lines.append(f"{cached_text(lang, 'label_comment')}: {self._esc(comment)}")
             if map_url:
-                open_label = get_text(lang, "label_open")
+                open_label = cached_text(lang, "label_open")
                 lines.append(
-                    f"{get_text(lang, 'label_map')}: <a href=\"{html.escape(map_url)}\">{open_label}</a>"
+                    f"{cached_text(lang, 'label_map')}: <a href=\"{html.escape(map_url)}\">{open_label}</a>"
                 )
 
         items_total = 0
@@ -213,7 +256,7 @@ class NotificationBuilder:
             if len(items) > max_items:
                 extra = len(items) - max_items
                 items_parts.append(get_text(lang, "label_items_more", count=str(extra)))
-            lines.append(f"{get_text(lang, 'label_items')}: " + "; ".join(items_parts))
+            lines.append(f"{cached_text(lang, 'label_items')}: " + "; ".join(items_parts))
 
         total_value = int(total or 0)
         if total_value == 0 and items_total:
@@ -223,21 +266,21 @@ class NotificationBuilder:
         delivery_note = None
         if self.order_type == "delivery" and delivery_price:
             if role == "seller":
-                delivery_note = get_text(lang, "delivery_fee_paid_to_courier")
+                delivery_note = cached_text(lang, "delivery_fee_paid_to_courier")
                 if delivery_note == "delivery_fee_paid_to_courier":
                     delivery_note = None
             else:
-                delivery_note = get_text(lang, "delivery_fee_paid_to_courier")
+                delivery_note = cached_text(lang, "delivery_fee_paid_to_courier")
                 if delivery_note == "delivery_fee_paid_to_courier":
                     delivery_note = None
 
         if total_value:
-            lines.append(f"{get_text(lang, 'label_total')}: <b>{total_value:,} {currency}</b>")
+            lines.append(f"{cached_text(lang, 'label_total')}: <b>{total_value:,} {currency}</b>")
         if delivery_note:
             lines.append(f"<i>{delivery_note}</i>")
 
         if reject_reason and status in ("rejected", "cancelled"):
-            lines.append(f"{get_text(lang, 'label_reason')}: {self._esc(reject_reason)}")
+            lines.append(f"{cached_text(lang, 'label_reason')}: {self._esc(reject_reason)}")
 
         return "\n".join(lines)
 
@@ -0,0 +1,203 @@
+"""Streaming CSV import of offers shared by the bot and the partner panel.
+
+Rows are read lazily from the uploaded file, mapped and validated in chunks
+and every chunk is written with one COPY + INSERT
+(``OfferMixin.bulk_import_offers``), so memory use depends on the chunk size
+rather than the file size. Each caller supplies a ``map_row`` function for
+its own CSV layout; the engine adds price validation, per-row error
+reporting and progress callbacks.
+
+An optional ``sku`` column makes re-imports idempotent: rows with a code
+update the offer imported earlier with the same code instead of adding a
+duplicate.
+"""
+from __future__ import annotations
+
+import csv
+import inspect
+import io
+import os
+from collections.abc import Awaitable, Callable, Iterable, Iterator
+from dataclasses import dataclass, field
+from typing import IO, Any
+
+from app.core.async_db import AsyncDBProxy, run_sync_db
+from app.domain.offer_rules import validate_offer_prices
+
+try:
+    from logging_config import logger
+except ImportError:  # pragma: no cover
+    import logging
+
+    logger = logging.getLogger(__name__)
+
+IMPORT_CHUNK_SIZE = int(os.getenv("OFFER_IMPORT_CHUNK_SIZE", "500"))
+# Errors beyond this are counted but not kept, so a broken file cannot
+# blow up memory or the response size.
+MAX_REPORTED_ERRORS = 200
+CSV_IMPORT_SOURCE = "csv"
+
+RowMapper = Callable[[dict[str, str]], dict[str, Any]]
+ProgressCallback = Callable[["ImportResult"], Awaitable[None] | None]
+
+
+class RowSkipped(Exception):
+    """Raised by a row mapper for rows that are deliberately not imported."""
+
+
+class ImportFormatError(ValueError):
+    """The file as a whole cannot be imported (e.g. required columns missing)."""
+
+
+@dataclass
+class ImportRowError:
+    row: int
+    message: str
+
+
+@dataclass
+class ImportResult:
+    total_rows: int = 0
+    imported: int = 0
+    skipped: int = 0
+    failed: int = 0
+    # Rows merged into another row of their chunk with the same SKU; also
+    # counted in ``skipped``
+    duplicates: int = 0
+    errors: list[ImportRowError] = field(default_factory=list)
+
+    def add_error(self, row: int, message: str) -> None:
+        self.failed += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append(ImportRowError(row, message))
+
+    def error_lines(
+        self, template: str = "Row {row}: {message}", limit: int | None = None
+    ) -> list[str]:
+        errors = self.errors if limit is None else self.errors[:limit]
+        return [template.format(row=error.row, message=error.message) for error in errors]
+
+
+def open_csv_text(source: bytes | str | IO[bytes] | IO[str]) -> IO[str]:
+    """Wrap raw upload content as a text stream without copying binary files."""
+    if isinstance(source, bytes):
+        source = io.BytesIO(source)
+    elif isinstance(source, str):
+        return io.StringIO(source.removeprefix("\ufeff"), newline="")
+    if isinstance(source, io.TextIOBase):
+        return source
+    return io.TextIOWrapper(source, encoding="utf-8-sig", newline="")
+
+
+def parse_offer_rows(
+    lines: Iterable[str],
+    map_row: RowMapper,
+    result: ImportResult,
+    *,
+    delimiter: str = ",",
+    chunk_size: int = IMPORT_CHUNK_SIZE,
+    required_columns: Iterable[str] = (),
+) -> Iterator[list[tuple[int, dict[str, Any]]]]:
+    """Yield chunks of ``(row_number, offer)`` for rows that passed validation.
+
+    Skipped and invalid rows are recorded in ``result``. Row numbers are
+    1-based file lines, the header being line 1.
+    """
+    reader = csv.DictReader(lines, delimiter=delimiter)
+    fieldnames = [name.strip() for name in reader.fieldnames or []]
+    missing = [name for name in required_columns if name not in fieldnames]
+    if missing:
+        raise ImportFormatError(f"Missing columns: {', '.join(missing)}")
+    reader.fieldnames = fieldnames
+
+    chunk: list[tuple[int, dict[str, Any]]] = []
+    for row_number, row in enumerate(reader, start=2):
+        result.total_rows += 1
+        try:
+            offer = map_row(row)
+            validate_offer_prices(offer.get("original_price"), offer.get("discount_price"))
+        except RowSkipped:
+            result.skipped += 1
+            continue
+        except KeyError as e:
+            result.add_error(row_number, f"missing value {e}")
+            continue
+        except (ValueError, TypeError) as e:
+            result.add_error(row_number, str(e))
+            continue
+
+        if not offer.get("external_code"):
+            offer["external_code"] = (row.get("sku") or "").strip() or None
+        chunk.append((row_number, offer))
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+async def write_offer_rows(
+    db: Any,
+    store_id: int,
+    chunk: list[tuple[int, dict[str, Any]]],
+    result: ImportResult,
+    *,
+    source: str = CSV_IMPORT_SOURCE,
+) -> None:
+    """Write one validated chunk; a failed chunk marks all its rows as failed."""
+    sync_db = db.sync if isinstance(db, AsyncDBProxy) else db
+    try:
+        written = await run_sync_db(
+            sync_db.bulk_import_offers, store_id, [offer for _, offer in chunk], source
+        )
+    except Exception as e:
+        logger.error(f"Offer import chunk failed for store {store_id}: {e}")
+        for row_number, _ in chunk:
+            result.add_error(row_number, "database error")
+        return
+    result.imported += written
+    if written < len(chunk):
+        # Rows repeating a SKU within the chunk collapse into one offer
+        duplicates = len(chunk) - written
+        result.duplicates += duplicates
+        result.skipped += duplicates
+        logger.debug(f"Offer import wrote {written} of {len(chunk)} rows (repeated SKUs)")
+
+
+async def import_offers_csv(
+    db: Any,
+    store_id: int,
+    source: bytes | str | IO[bytes] | IO[str],
+    map_row: RowMapper,
+    *,
+    delimiter: str = ",",
+    chunk_size: int = IMPORT_CHUNK_SIZE,
+    required_columns: Iterable[str] = (),
+    on_progress: ProgressCallback | None = None,
+) -> ImportResult:
+    """Stream a CSV file into the store's offers.
+
+    Raises:
+        ImportFormatError: if the header lacks ``required_columns``
+    """
+    result = ImportResult()
+    chunks = parse_offer_rows(
+        open_csv_text(source),
+        map_row,
+        result,
+        delimiter=delimiter,
+        chunk_size=chunk_size,
+        required_columns=required_columns,
+    )
+    for chunk in chunks:
+        await write_offer_rows(db, store_id, chunk, result)
+        if on_progress is not None:
+            maybe_awaitable = on_progress(result)
+            if inspect.isawaitable(maybe_awaitable):
+                await maybe_awaitable
+
+    logger.info(
+        f"CSV import for store {store_id}: {result.imported} imported, "
+        f"{result.skipped} skipped, {result.failed} failed of {result.total_rows}"
+    )
+    return result
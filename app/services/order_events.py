@@ -0,0 +1,217 @@
+"""Relay of the order_events outbox to the notification consumers.
+
+``UnifiedOrderService.create_order`` and ``update_status`` write an
+``order_created``/``status_changed`` event in the same transaction as the
+order change (see ``OrderEventMixin.add_order_event``) and return; the
+relay claims committed events in batches (SKIP LOCKED, one in-flight event
+per order) and fans each out to its consumers:
+
+- ``websocket``: customer/partner WebSocket and store notifications of a
+  status change (for new orders they go out with the Telegram cards)
+- ``telegram``: customer and seller Telegram messages
+- ``analytics``: the ``fudly_order_events_total`` counter
+
+Delivery is at-least-once. A consumer that fails leaves the event for a
+retry with backoff; the consumers that already handled it are recorded in
+``delivered_to`` and skipped on the retry. A relay that dies mid-way lets
+the lease expire and the event is handled again. Status messages are
+edited in place (customer_message_id/seller_message_id), so a repeat mostly
+re-renders the same card instead of sending a second one.
+
+Every bot instance may run a relay. Throughput and lag are exported as
+``fudly_order_events_relayed_total`` and ``fudly_order_events_lag_seconds``.
+"""
+from __future__ import annotations
+
+import asyncio
+import os
+import time
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+from app.core.async_db import run_sync_db
+from app.core.metrics import metrics
+
+try:
+    from logging_config import logger
+except ImportError:
+    import logging
+
+    logger = logging.getLogger(__name__)
+
+ORDER_EVENTS_ENABLED = os.getenv("ORDER_EVENTS_ENABLED", "1").strip().lower() in {
+    "1",
+    "true",
+    "yes",
+}
+ORDER_EVENTS_POLL_SECONDS = float(os.getenv("ORDER_EVENTS_POLL_SECONDS", "2") or 2)
+ORDER_EVENTS_BATCH = int(os.getenv("ORDER_EVENTS_BATCH", "20") or 20)
+ORDER_EVENTS_LEASE_SECONDS = int(os.getenv("ORDER_EVENTS_LEASE_SECONDS", "120") or 120)
+ORDER_EVENTS_MAX_ATTEMPTS = int(os.getenv("ORDER_EVENTS_MAX_ATTEMPTS", "5") or 5)
+ORDER_EVENTS_RETENTION_DAYS = int(os.getenv("ORDER_EVENTS_RETENTION_DAYS", "7") or 7)
+_PURGE_INTERVAL_SECONDS = 3600
+
+ORDER_CREATED = "order_created"
+STATUS_CHANGED = "status_changed"
+
+Consumer = Callable[[dict[str, Any]], Awaitable[None]]
+
+_wakeup: asyncio.Event | None = None
+
+
+def wake_order_event_relay() -> None:
+    """Let the relay of this process pick up a new event without waiting for the poll."""
+    if _wakeup is not None:
+        _wakeup.set()
+
+
+def retry_delay(attempts: int) -> float:
+    """Backoff before the next delivery attempt (2s, 4s, 8s ... up to 5 minutes)."""
+    return float(min(300, 2 ** max(1, attempts)))
+
+
+def _order_service():
+    from app.services.unified_order_service import get_unified_order_service
+
+    service = get_unified_order_service()
+    if service is None:
+        raise RuntimeError("UnifiedOrderService is not initialized")
+    return service
+
+
+async def _websocket_consumer(event: dict[str, Any]) -> None:
+    if event.get("event_type") == STATUS_CHANGED:
+        await _order_service().push_status_realtime(
+            entity_type=event["entity_type"],
+            entity_id=int(event["entity_id"]),
+            payload=event.get("payload") or {},
+        )
+
+
+async def _telegram_consumer(event: dict[str, Any]) -> None:
+    event_type = event.get("event_type")
+    payload = event.get("payload") or {}
+    if event_type == STATUS_CHANGED:
+        await _order_service().deliver_status_event(
+            entity_type=event["entity_type"],
+            entity_id=int(event["entity_id"]),
+            payload=payload,
+        )
+    elif event_type == ORDER_CREATED:
+        await _order_service().deliver_created_event(int(event["entity_id"]), payload)
+    else:
+        logger.warning(f"Skipping unknown order event type: {event_type}")
+
+
+async def _analytics_consumer(event: dict[str, Any]) -> None:
+    payload = event.get("payload") or {}
+    metrics.order_events_total.inc(
+        event_type=event.get("event_type") or "",
+        status=payload.get("target_status") or "created",
+    )
+
+
+DEFAULT_CONSUMERS: dict[str, Consumer] = {
+    "websocket": _websocket_consumer,
+    "telegram": _telegram_consumer,
+    "analytics": _analytics_consumer,
+}
+
+
+class OrderEventRelay:
+    """Claims committed outbox events and fans them out to the consumers."""
+
+    def __init__(
+        self,
+        db: Any,
+        consumers: dict[str, Consumer] | None = None,
+        *,
+        batch_size: int = ORDER_EVENTS_BATCH,
+        poll_seconds: float = ORDER_EVENTS_POLL_SECONDS,
+        lease_seconds: int = ORDER_EVENTS_LEASE_SECONDS,
+        max_attempts: int = ORDER_EVENTS_MAX_ATTEMPTS,
+    ):
+        self.db = db
+        self.consumers = DEFAULT_CONSUMERS if consumers is None else consumers
+        self.batch_size = max(1, batch_size)
+        self.poll_seconds = poll_seconds
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max(1, max_attempts)
+
+    async def run_once(self) -> int:
+        """Relay one batch of due events. Returns the number claimed."""
+        events = await run_sync_db(self.db.claim_order_events, self.batch_size, self.lease_seconds)
+        # One event per order in a batch, so they can go out concurrently
+        await asyncio.gather(*(self._process(event) for event in events))
+        return len(events)
+
+    async def run(self) -> None:
+        """Poll the outbox until cancelled; woken early by wake_order_event_relay()."""
+        global _wakeup
+        _wakeup = asyncio.Event()
+        last_purge = time.monotonic()
+        while True:
+            try:
+                claimed = await self.run_once()
+                if time.monotonic() - last_purge > _PURGE_INTERVAL_SECONDS:
+                    last_purge = time.monotonic()
+                    await run_sync_db(self.db.purge_order_events, ORDER_EVENTS_RETENTION_DAYS)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Order event relay error: {e}")
+                claimed = 0
+            if claimed >= self.batch_size:
+                continue
+            try:
+                await asyncio.wait_for(_wakeup.wait(), timeout=self.poll_seconds)
+            except asyncio.TimeoutError:
+                pass
+            _wakeup.clear()
+
+    async def _process(self, event: dict[str, Any]) -> None:
+        event_id = event["event_id"]
+        event_type = event.get("event_type") or ""
+        delivered = list(event.get("delivered_to") or [])
+        errors: list[str] = []
+        for name, consumer in self.consumers.items():
+            if name in delivered:
+                continue
+            try:
+                await consumer(event)
+            except Exception as e:
+                metrics.order_event_consumer_errors.inc(consumer=name)
+                errors.append(f"{name}: {e}")
+                continue
+            delivered.append(name)
+
+        if not errors:
+            await run_sync_db(self.db.complete_order_event, event_id)
+            metrics.order_events_relayed.inc(event_type=event_type, result="delivered")
+            metrics.order_events_lag.observe(
+                float(event.get("age_seconds") or 0), event_type=event_type
+            )
+            return
+
+        attempts = int(event.get("attempts") or 1)
+        give_up = attempts >= self.max_attempts
+        error = "; ".join(errors)
+        logger.warning(
+            "Order event %s (%s #%s) failed, attempt %s%s: %s",
+            event_id,
+            event.get("entity_type"),
+            event.get("entity_id"),
+            attempts,
+            " - giving up" if give_up else "",
+            error,
+        )
+        await run_sync_db(
+            self.db.fail_order_event,
+            event_id,
+            error,
+            None if give_up else retry_delay(attempts),
+            delivered,
+        )
+        metrics.order_events_relayed.inc(
+            event_type=event_type, result="dropped" if give_up else "retried"
+        )
@@ -0,0 +1,76 @@
+"""ZIP photo archives for the bot's CSV + ZIP bulk import.
+
+The archive stays on disk (the caller spools the download to a temp file)
+and is indexed once by normalized file name. Members are read one at a time
+when their product is processed and recompressed to a bounded JPEG; the
+recompression is CPU-bound and meant to run in a worker thread.
+"""
+from __future__ import annotations
+
+import io
+import os
+import zipfile
+from pathlib import PurePosixPath
+
+from PIL import Image, ImageOps
+
+PHOTO_EXTENSIONS = (".jpg", ".jpeg", ".png", ".webp")
+# Larger members are rejected before decompression (zip bombs, raw scans)
+MAX_PHOTO_MEMBER_BYTES = 20 * 1024 * 1024
+PHOTO_MAX_SIDE = int(os.getenv("IMPORT_PHOTO_MAX_SIDE", "1280"))
+PHOTO_JPEG_QUALITY = 85
+
+
+def normalize_photo_name(name: str) -> str:
+    """Case-insensitive base name, ignoring folders inside the archive."""
+    return PurePosixPath(name.replace("\\", "/")).name.strip().lower()
+
+
+class PhotoArchive:
+    """Read-only index of the photos in a ZIP file on disk."""
+
+    def __init__(self, path: str):
+        self._zip = zipfile.ZipFile(path)
+        self._by_name: dict[str, zipfile.ZipInfo] = {}
+        self._by_stem: dict[str, zipfile.ZipInfo] = {}
+        for info in self._zip.infolist():
+            name = normalize_photo_name(info.filename)
+            # Skip folders and macOS resource forks (__MACOSX/._photo.jpg)
+            if info.is_dir() or name.startswith("._") or not name.endswith(PHOTO_EXTENSIONS):
+                continue
+            self._by_name.setdefault(name, info)
+            self._by_stem.setdefault(PurePosixPath(name).stem, info)
+
+    def __len__(self) -> int:
+        return len(self._by_name)
+
+    def __enter__(self) -> PhotoArchive:
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._zip.close()
+
+    def find(self, photo_name: str) -> zipfile.ZipInfo | None:
+        """Member for a CSV ``photo_file`` value; the extension may differ."""
+        name = normalize_photo_name(photo_name)
+        if not name:
+            return None
+        return self._by_name.get(name) or self._by_stem.get(PurePosixPath(name).stem)
+
+    def read_jpeg(self, info: zipfile.ZipInfo) -> bytes:
+        """Decompress one member and recompress it as a bounded JPEG (blocking)."""
+        if info.file_size > MAX_PHOTO_MEMBER_BYTES:
+            raise ValueError(f"file is too large ({info.file_size // 1024} KB)")
+        with self._zip.open(info) as member:
+            raw = member.read(MAX_PHOTO_MEMBER_BYTES + 1)
+        with Image.open(io.BytesIO(raw)) as image:
+            image = ImageOps.exif_transpose(image)
+            if image.mode != "RGB":
+                image = image.convert("RGB")
+            image.thumbnail((PHOTO_MAX_SIDE, PHOTO_MAX_SIDE))
+            out = io.BytesIO()
+            image.save(out, format="JPEG", quality=PHOTO_JPEG_QUALITY, optimize=True)
+        return out.getvalue()
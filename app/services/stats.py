@@ -1,8 +1,9 @@
 from __future__ import annotations
 from dataclasses import dataclass
-from datetime import datetime
+from datetime import date, datetime, time, timedelta
 from decimal import Decimal
 from typing import Optional, List, Dict, Any
+from zoneinfo import ZoneInfo
 
 
 @dataclass
@@ -87,10 +88,24 @@ class AdminStatsFilters:
     seller_id: Optional[int] = None
 
 
+def period_days(period: Period) -> tuple[date, date]:
+    """Inclusive business-day range covered by a period (in the period's TZ)."""
+    tz = ZoneInfo(period.tz)
+    start = period.start.astimezone(tz) if period.start.tzinfo else period.start
+    end = period.end.astimezone(tz) if period.end.tzinfo else period.end
+    end_day = end.date()
+    # An exclusive midnight end does not include that day
+    if end.time() == time.min and end_day > start.date():
+        end_day -= timedelta(days=1)
+    return start.date(), end_day
+
+
 def get_partner_stats(db, partner_id: int, period: Period, tz: str, store_id: Optional[int] = None) -> PartnerStats:
     """
     Aggregate partner statistics for the given period.
 
+    Reads the ``store_daily_stats`` rollup, so any range costs one query.
+
     Args:
         db: Database instance.
         partner_id: Current partner ID.
@@ -101,76 +116,40 @@ def get_partner_stats(db, partner_id: int, period: Period, tz: str, store_id: Op
     Returns:
         PartnerStats dataclass with totals.
     """
-    # Query bookings + orders for revenue, orders, items_sold
+    start_day, end_day = period_days(period)
+    # One query: rollup totals for the period + active products
     with db.get_connection() as conn:
         cursor = conn.cursor()
         if store_id is not None:
-            booking_store_filter = "o.store_id = %s"
-            order_store_filter = "ord.store_id = %s"
-            offer_store_filter = "o.store_id = %s"
+            store_filter = "store_id = %s"
             store_param = store_id
         else:
-            booking_store_filter = "o.store_id IN (SELECT store_id FROM stores WHERE owner_id = %s)"
-            order_store_filter = "ord.store_id IN (SELECT store_id FROM stores WHERE owner_id = %s)"
-            offer_store_filter = "o.store_id IN (SELECT store_id FROM stores WHERE owner_id = %s)"
+            store_filter = "store_id IN (SELECT store_id FROM stores WHERE owner_id = %s)"
             store_param = partner_id
 
-        # Revenue and orders: sum of completed bookings (status='completed' or 'confirmed')
-        # Items sold: sum(quantity) from bookings
-        # Price is from offers.discount_price
-        cursor.execute(
-            f"""
-            SELECT
-                COALESCE(SUM(o.discount_price * b.quantity), 0) AS revenue,
-                COUNT(DISTINCT b.booking_id) AS orders,
-                COALESCE(SUM(b.quantity), 0) AS items_sold
-            FROM bookings b
-            JOIN offers o ON b.offer_id = o.offer_id
-            WHERE {booking_store_filter}
-            AND b.status IN ('completed', 'confirmed')
-            AND b.created_at >= %s AND b.created_at < %s
-            """,
-            (store_param, period.start, period.end),
-        )
-        row = cursor.fetchone() or (0, 0, 0)
-        bookings_revenue = Decimal(row[0] or 0)
-        bookings_orders = int(row[1] or 0)
-        bookings_items_sold = int(row[2] or 0)
-
-        # Revenue and orders from delivery/pickup orders table (completed only)
         cursor.execute(
             f"""
             SELECT
-                COALESCE(SUM(ord.total_price), 0) AS revenue,
-                COUNT(DISTINCT ord.order_id) AS orders,
-                COALESCE(SUM(ord.quantity), 0) AS items_sold
-            FROM orders ord
-            WHERE {order_store_filter}
-            AND ord.order_status = 'completed'
-            AND ord.created_at >= %s AND ord.created_at < %s
+                COALESCE(SUM(s.revenue), 0) AS revenue,
+                COALESCE(SUM(s.orders), 0) AS orders,
+                COALESCE(SUM(s.items_sold), 0) AS items_sold,
+                (
+                    SELECT COUNT(*) FROM offers o
+                    WHERE o.{store_filter}
+                    AND o.status = 'active'
+                    AND (COALESCE(o.stock_quantity, o.quantity) IS NULL OR COALESCE(o.stock_quantity, o.quantity) > 0)
+                ) AS active_products
+            FROM store_daily_stats s
+            WHERE s.{store_filter}
+            AND s.day BETWEEN %s AND %s
             """,
-            (store_param, period.start, period.end),
+            (store_param, store_param, start_day, end_day),
         )
-        row = cursor.fetchone() or (0, 0, 0)
-        orders_revenue = Decimal(row[0] or 0)
-        orders_orders = int(row[1] or 0)
-        orders_items_sold = int(row[2] or 0)
-
-        revenue = bookings_revenue + orders_revenue
-        orders = bookings_orders + orders_orders
-        items_sold = bookings_items_sold + orders_items_sold
-
-        # Active products: count active offers from partner's stores
-        cursor.execute(
-            f"""
-            SELECT COUNT(*) FROM offers o
-            WHERE {offer_store_filter}
-            AND o.status = 'active'
-            AND (COALESCE(o.stock_quantity, o.quantity) IS NULL OR COALESCE(o.stock_quantity, o.quantity) > 0)
-            """,
-            (store_param,),
-        )
-        active_products = cursor.fetchone()[0] or 0
+        row = cursor.fetchone() or (0, 0, 0, 0)
+        revenue = Decimal(row[0] or 0)
+        orders = int(row[1] or 0)
+        items_sold = int(row[2] or 0)
+        active_products = int(row[3] or 0)
 
     avg_ticket = (revenue / orders) if orders > 0 else None
     totals = PartnerTotals(
@@ -220,16 +199,9 @@ def get_admin_stats(db, filters: AdminStatsFilters) -> AdminStats:
         buyers = int(row[2]) if row else 0
         items_sold = int(row[3]) if row else 0
 
-        # Active sellers: count stores with active offers
-        cursor.execute(
-            """
-            SELECT COUNT(DISTINCT s.owner_id)
-            FROM stores s
-            JOIN offers o ON s.store_id = o.store_id
-            WHERE o.status = 'active' AND s.status = 'approved'
-            """
-        )
-        active_sellers = cursor.fetchone()[0] or 0
+    # Active sellers (owners of approved stores with active offers) is not
+    # period-dependent, so it comes from the shared platform stats snapshot
+    active_sellers = int(db.get_platform_stats_snapshot()["active_sellers"] or 0)
 
     avg_ticket = (revenue / orders) if orders > 0 else None
     totals = AdminTotals(
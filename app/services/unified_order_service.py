@@ -30,14 +30,14 @@ import io
 import math
 import os
 import re
-from dataclasses import dataclass
+from dataclasses import asdict, dataclass
 from datetime import datetime, time as dt_time, timedelta
+from functools import lru_cache
 from typing import Any, Literal
 
 from aiogram import Bot
 from aiogram.types import BufferedInputFile, WebAppInfo
 from aiogram.utils.keyboard import InlineKeyboardBuilder
-from PIL import Image
 
 from app.core.geocoding import geocode_store_address
 from app.core.constants import DEFAULT_DELIVERY_RADIUS_KM, MAX_DELIVERY_RADIUS_KM
@@ -50,8 +50,14 @@ from app.integrations.payment_service import get_payment_service
 from app.domain.order import OrderStatus, PaymentStatus
 from app.domain.order_fsm import TERMINAL_STATUSES, validate_order_transition
 from app.domain.order_labels import status_label
-from app.services.notification_builder import NotificationBuilder
+from app.services.notification_builder import NotificationBuilder, cached_text
 from app.services.notification_unified import build_unified_order_payload
+from app.services.order_events import (
+    ORDER_CREATED,
+    ORDER_EVENTS_ENABLED,
+    STATUS_CHANGED,
+    wake_order_event_relay,
+)
 from localization import get_text
 
 try:
@@ -262,6 +268,126 @@ class StatusUpdateContext:
 # NOTIFICATION TEMPLATES
 # =============================================================================
 
+# An order card is rendered again on every status change. Everything that only
+# depends on (lang, status, order_type) is compiled once into the fragments
+# below; rendering a card joins them with the per-order fields.
+
+
+@dataclass(frozen=True, slots=True)
+class _SellerCardTemplate:
+    head: str  # up to the order id
+    status_line: str  # after the order id: type label and status
+    created_prefix: str
+    customer_prefix: str
+    phone_prefix: str
+    items_header: str
+    amount_prefix: str
+    delivery_note: str  # empty when there is none for this order type
+    total_prefix: str
+    hint: str
+
+
+@dataclass(frozen=True, slots=True)
+class _CustomerCardTemplate:
+    head: str
+    status_prefix: str  # status line up to the optional reject reason
+    shows_reason: bool
+    amount_prefix: str
+    delivery_note: str
+    type_line: str
+    ready_prefix: str
+    is_pickup: bool
+    store_prefix: str
+    address_prefix: str
+    pickup_code_prefix: str
+
+
+def _fmt_money(value: int) -> str:
+    return f"{int(value):,}".replace(",", " ")
+
+
+def _card_items_total(total: int | None, items: list[dict] | None) -> int:
+    """Card amount: ``total``, or the sum of the items when it is missing."""
+    items_total = int(total or 0)
+    if items_total <= 0 and items:
+        try:
+            items_total = sum(
+                calc_total_price(int(item.get("price") or 0), float(item.get("quantity") or 1))
+                for item in items
+            )
+        except Exception:
+            items_total = int(total or 0)
+    return items_total
+
+
+def _delivery_fee_note(lang: str) -> str:
+    note = cached_text(lang, "delivery_fee_paid_to_courier")
+    if not note or note == "delivery_fee_paid_to_courier":
+        return ""
+    return f"\n<i>{note}</i>"
+
+
+@lru_cache(maxsize=512)
+def _seller_card_template(lang: str, status: str, order_type: str | None) -> _SellerCardTemplate:
+    normalized_type = "delivery" if order_type == "taxi" else (order_type or "delivery")
+    display_type = "pickup" if normalized_type == "pickup" else "delivery"
+
+    type_label = cached_text(
+        lang, "order_type_pickup" if display_type == "pickup" else "order_type_delivery"
+    )
+    status_text = NotificationTemplates._seller_status_label(status, lang, display_type)
+    status_emoji = NotificationTemplates._status_emoji(status)
+    hint = NotificationTemplates._seller_status_hint(status, lang, display_type)
+    return _SellerCardTemplate(
+        head=f"📦 {cached_text(lang, 'label_order')} #",
+        status_line=(
+            f" — {type_label}\n"
+            f"{cached_text(lang, 'label_status')}: {status_emoji} <b>{status_text}</b>"
+        ),
+        created_prefix=f"\n⏱ {cached_text(lang, 'label_created')}: ",
+        customer_prefix=f"\n\n👤 {cached_text(lang, 'label_customer')}: ",
+        phone_prefix=f"\n📞 {cached_text(lang, 'phone')}: ",
+        items_header=f"\n\n🛒 {cached_text(lang, 'label_items')}:",
+        amount_prefix=(
+            f"\n\n💰 {cached_text(lang, 'label_amount')}:\n"
+            f"{cached_text(lang, 'label_items_cost')}: "
+        ),
+        delivery_note=_delivery_fee_note(lang) if display_type == "delivery" else "",
+        total_prefix=f"\n{cached_text(lang, 'label_total')}: ",
+        hint=f"\n\n{hint}" if hint else "",
+    )
+
+
+@lru_cache(maxsize=512)
+def _customer_card_template(
+    lang: str, status: str, order_type: str | None
+) -> _CustomerCardTemplate:
+    normalized_type = "delivery" if order_type == "taxi" else (order_type or "delivery")
+    display_type = "pickup" if normalized_type == "pickup" else "delivery"
+
+    status_text = status_label(status, lang, display_type)
+    normalized_status = OrderStatus.normalize(str(status).strip().lower())
+    type_value = cached_text(
+        lang, "order_type_pickup" if display_type == "pickup" else "order_type_delivery"
+    )
+    is_delivery = normalized_type in ("delivery", "taxi")
+    return _CustomerCardTemplate(
+        head=f"📄 {cached_text(lang, 'label_order')} #",
+        status_prefix=(
+            f"\n\n{cached_text(lang, 'label_status')}: "
+            f"{NotificationTemplates._status_emoji(status)} <b>{status_text}"
+        ),
+        shows_reason=normalized_status in (OrderStatus.CANCELLED, OrderStatus.REJECTED),
+        amount_prefix=f"\n{cached_text(lang, 'label_amount')}: <b>",
+        delivery_note=_delivery_fee_note(lang) if is_delivery else "",
+        type_line=f"\n{cached_text(lang, 'label_order_type')}: {type_value}" if type_value else "",
+        ready_prefix=f"\n{cached_text(lang, 'label_pickup_until')}: <b>",
+        is_pickup=display_type == "pickup",
+        store_prefix=f"\n📍 {cached_text(lang, 'label_store')}: ",
+        address_prefix=f"\n{cached_text(lang, 'address')}: ",
+        pickup_code_prefix=f"\n🔐 {cached_text(lang, 'label_pickup_code')}\n<code>",
+    )
+
 
 class NotificationTemplates:
     """Unified notification templates for RU and UZ languages."""
@@ -369,91 +495,32 @@ class NotificationTemplates:
         currency: str,
         created_at: Any | None = None,
     ) -> str:
-        normalized_type = "delivery" if order_type == "taxi" else (order_type or "delivery")
-        display_type = "pickup" if normalized_type == "pickup" else "delivery"
-
-        type_label = (
-            get_text(lang, "order_type_pickup")
-            if display_type == "pickup"
-            else get_text(lang, "order_type_delivery")
-        )
-        status_text = NotificationTemplates._seller_status_label(status, lang, display_type)
-        status_emoji = NotificationTemplates._status_emoji(status)
+        template = _seller_card_template(lang, status, order_type)
         created_time = NotificationTemplates._format_created_time(created_at)
+        items_total = _card_items_total(total, items)
 
-        safe_name = html.escape(str(customer_name)) if customer_name else "—"
-        safe_phone = html.escape(str(customer_phone)) if customer_phone else "—"
-
-        items_total = int(total or 0)
-        if items_total <= 0 and items:
-            try:
-                items_total = sum(
-                    calc_total_price(int(item.get("price") or 0), float(item.get("quantity") or 1))
-                    for item in items
-                )
-            except Exception:
-                items_total = int(total or 0)
-
-        delivery_fee = int(delivery_price or 0) if display_type == "delivery" else 0
-        grand_total = items_total
-
-        label_order = get_text(lang, "label_order")
-        label_status = get_text(lang, "label_status")
-        label_created = get_text(lang, "label_created")
-        label_customer = get_text(lang, "label_customer")
-        label_phone = get_text(lang, "phone")
-        label_items = get_text(lang, "label_items")
-        label_amount = get_text(lang, "label_amount")
-        label_items_cost = get_text(lang, "label_items_cost")
-        label_total = get_text(lang, "label_total")
-
-        def _fmt_money(value: int) -> str:
-            return f"{int(value):,}".replace(",", " ")
-
-        lines: list[str] = [
-            f"📦 {label_order} #{order_id} — {type_label}",
-            f"{label_status}: {status_emoji} <b>{status_text}</b>",
-        ]
+        parts = [template.head, str(order_id), template.status_line]
         if created_time:
-            lines.append(f"⏱ {label_created}: {created_time}")
-
-        lines.extend(
-            [
-                "",
-                f"👤 {label_customer}: {safe_name}",
-                f"📞 {label_phone}: {safe_phone}",
-                "",
-                f"🛒 {label_items}:",
-            ]
-        )
-
+            parts += [template.created_prefix, created_time]
+        parts += [
+            template.customer_prefix,
+            html.escape(str(customer_name)) if customer_name else "—",
+            template.phone_prefix,
+            html.escape(str(customer_phone)) if customer_phone else "—",
+            template.items_header,
+        ]
         if items:
             for item in items:
                 title = html.escape(str(item.get("title") or ""))
-                qty = float(item.get("quantity") or 1)
-                lines.append(f"• {title} ×{qty}")
+                parts.append(f"\n• {title} ×{float(item.get('quantity') or 1)}")
         else:
-            lines.append("• —")
-
-        lines.extend(
-            [
-                "",
-                f"💰 {label_amount}:",
-                f"{label_items_cost}: {_fmt_money(items_total)} {currency}",
-            ]
-        )
-        if display_type == "delivery" and delivery_fee:
-            delivery_note = get_text(lang, "delivery_fee_paid_to_courier")
-            if delivery_note and delivery_note != "delivery_fee_paid_to_courier":
-                lines.append(f"<i>{delivery_note}</i>")
-        lines.append(f"{label_total}: {_fmt_money(grand_total)} {currency}")
-
-        hint = NotificationTemplates._seller_status_hint(status, lang, display_type)
-        if hint:
-            lines.append("")
-            lines.append(hint)
-
-        return "\n".join(lines)
+            parts.append("\n• —")
+        money = f"{_fmt_money(items_total)} {currency}"
+        parts += [template.amount_prefix, money]
+        if delivery_price:
+            parts.append(template.delivery_note)
+        parts += [template.total_prefix, money, template.hint]
+        return "".join(parts)
 
     @staticmethod
     def _build_customer_card(
@@ -473,74 +540,33 @@ class NotificationTemplates:
         ready_until: str | None = None,
         items: list[dict] | None = None,
     ) -> str:
-        normalized_type = "delivery" if order_type == "taxi" else (order_type or "delivery")
-        display_type = "pickup" if normalized_type == "pickup" else "delivery"
-
-        status_text = status_label(status, lang, display_type)
-        normalized_status = OrderStatus.normalize(str(status).strip().lower())
-        if reject_reason and normalized_status in (OrderStatus.CANCELLED, OrderStatus.REJECTED):
-            status_text = f"{status_text} — {reject_reason}"
-
-        total_value = int(total or 0)
-        if total_value <= 0 and items:
-            try:
-                total_value = sum(
-                    calc_total_price(int(item.get("price") or 0), float(item.get("quantity") or 1))
-                    for item in items
-                )
-            except Exception:
-                total_value = int(total or 0)
-
-        is_delivery = normalized_type in ("delivery", "taxi")
-        delivery_note = None
-        if is_delivery and delivery_price:
-            delivery_note = get_text(lang, "delivery_fee_paid_to_courier")
-            if delivery_note == "delivery_fee_paid_to_courier":
-                delivery_note = None
-
-        order_label = get_text(lang, "label_order")
-        status_label_text = get_text(lang, "label_status")
-        amount_label = get_text(lang, "label_amount")
-        type_label = get_text(lang, "label_order_type")
-        pickup_type = get_text(lang, "order_type_pickup")
-        delivery_type = get_text(lang, "order_type_delivery")
-        store_label = get_text(lang, "label_store")
-        address_label = get_text(lang, "address")
-        pickup_code_label = get_text(lang, "label_pickup_code")
-        pickup_until_label = get_text(lang, "label_pickup_until")
-
-        type_value = pickup_type if display_type == "pickup" else delivery_type
-        address_value = (
-            delivery_address if display_type == "delivery" else store_address
-        )
-
-        lines = [
-            f"📄 {order_label} #{order_id}",
-            "",
-            f"{status_label_text}: {NotificationTemplates._status_emoji(status)} <b>{status_text}</b>",
-        ]
+        template = _customer_card_template(lang, status, order_type)
+        total_value = _card_items_total(total, items)
 
+        parts = [template.head, str(order_id), template.status_prefix]
+        if reject_reason and template.shows_reason:
+            parts.append(f" — {reject_reason}")
+        parts.append("</b>")
         if total_value > 0:
-            lines.append(f"{amount_label}: <b>{total_value:,} {currency}</b>")
-        if delivery_note:
-            lines.append(f"<i>{delivery_note}</i>")
-        if type_value:
-            lines.append(f"{type_label}: {type_value}")
+            parts += [template.amount_prefix, f"{total_value:,} {currency}</b>"]
+        if delivery_price:
+            parts.append(template.delivery_note)
+        parts.append(template.type_line)
         if ready_until:
-            lines.append(f"{pickup_until_label}: <b>{ready_until}</b>")
+            parts += [template.ready_prefix, f"{ready_until}</b>"]
 
+        address_value = store_address if template.is_pickup else delivery_address
         if store_name or address_value:
-            lines.append("")
+            parts.append("\n")
             if store_name:
-                lines.append(f"📍 {store_label}: {html.escape(str(store_name))}")
+                parts += [template.store_prefix, html.escape(str(store_name))]
             if address_value:
-                lines.append(f"{address_label}: {html.escape(str(address_value))}")
+                parts += [template.address_prefix, html.escape(str(address_value))]
 
-        if pickup_code and display_type == "pickup":
-            lines.append(f"🔐 {pickup_code_label}")
-            lines.append(f"<code>{html.escape(str(pickup_code))}</code>")
+        if pickup_code and template.is_pickup:
+            parts += [template.pickup_code_prefix, html.escape(str(pickup_code)), "</code>"]
 
-        return "\n".join(lines)
+        return "".join(parts)
 
 
     @staticmethod
@@ -795,6 +821,16 @@ class UnifiedOrderService:
             "yes",
             "y",
         }
+        # Order notifications go through the order_events outbox when the DB supports it
+        self.use_order_events = ORDER_EVENTS_ENABLED and hasattr(db, "add_order_event")
+
+    def _outbox_event(
+        self, event_type: str, payload: dict[str, Any]
+    ) -> tuple[str, dict[str, Any]] | None:
+        """Outbox event to write with the DB change, or None to notify inline."""
+        if not self.use_order_events:
+            return None
+        return event_type, payload
 
     def get_last_status_error(self) -> str | None:
         """Return reason from the last rejected status transition."""
@@ -1168,6 +1204,9 @@ class UnifiedOrderService:
         if len(photo_ids) < 2 or tile_size <= 0:
             return None
 
+        # Pillow is only needed for multi-item orders; keep it off the import path
+        from PIL import Image
+
         selected = [pid for pid in photo_ids if pid][:4]
         images: list[Image.Image] = []
 
@@ -1561,7 +1600,6 @@ class UnifiedOrderService:
             return self._error_result("Invalid item quantity")
 
         is_delivery = order_type in ("delivery", "taxi")
-        normalized_order_type = "delivery" if order_type == "taxi" else order_type
         if is_delivery and not delivery_address:
             return self._error_result("Delivery address required")
 
@@ -1694,10 +1732,31 @@ class UnifiedOrderService:
         # Prepare items for database
         db_items = self._build_db_items(items, is_delivery)
 
+        # Notifications are written to the outbox with the orders and sent by
+        # the order event relay (inline when the outbox is off)
+        outbox_event = self._outbox_event(
+            ORDER_CREATED,
+            {
+                "user_id": user_id,
+                "order_type": order_type,
+                "delivery_address": delivery_address,
+                "delivery_lat": delivery_lat,
+                "delivery_lon": delivery_lon,
+                "comment": comment,
+                "payment_method": payment_method,
+                "items": [asdict(item) for item in items],
+                "notify_customer": notify_customer,
+                "notify_sellers": notify_sellers,
+                "telegram_notify": telegram_notify,
+            },
+        )
+
         # Create orders using appropriate method based on type
         if order_type == "pickup":
             # Use booking system for pickup
-            result = await self._create_pickup_orders(user_id, db_items, payment_method)
+            result = await self._create_pickup_orders(
+                user_id, db_items, payment_method, outbox_event=outbox_event
+            )
         else:
             # Use order system for delivery
             result = await self._create_delivery_orders(
@@ -1709,6 +1768,7 @@ class UnifiedOrderService:
                 delivery_lat=delivery_lat,
                 delivery_lon=delivery_lon,
                 comment=comment,
+                outbox_event=outbox_event,
             )
 
         if not result.get("success"):
@@ -1743,6 +1803,69 @@ class UnifiedOrderService:
                 except Exception as proof_err:
                     logger.warning(f"Failed to save payment proof for order {oid}: {proof_err}")
 
+        if outbox_event:
+            wake_order_event_relay()
+        else:
+            await self._notify_order_created(
+                user_id=user_id,
+                items=items,
+                order_type=order_type,
+                delivery_address=delivery_address,
+                delivery_lat=delivery_lat,
+                delivery_lon=delivery_lon,
+                comment=comment,
+                payment_method=payment_method,
+                order_ids=order_ids,
+                booking_ids=booking_ids,
+                pickup_codes=pickup_codes,
+                stores_orders=stores_orders,
+                notify_customer=notify_customer,
+                notify_sellers=notify_sellers,
+                telegram_notify=telegram_notify,
+            )
+
+        # Log order creation
+        logger.info(
+            f"ORDER_CREATED: ids={','.join(map(str, order_ids + booking_ids))}, "
+            f"user={user_id}, type={order_type}, total={int(grand_total)}, "
+            f"items={total_items}, source=unified_order_service"
+        )
+
+        return OrderResult(
+            success=True,
+            order_ids=order_ids,
+            booking_ids=booking_ids,
+            pickup_codes=pickup_codes,
+            total_items=total_items,
+            total_price=int(total_price),
+            delivery_price=int(delivery_price),
+            grand_total=int(grand_total),
+        )
+
+    async def _notify_order_created(
+        self,
+        *,
+        user_id: int,
+        items: list[OrderItem],
+        order_type: str,
+        delivery_address: str | None,
+        delivery_lat: float | None,
+        delivery_lon: float | None,
+        comment: str | None,
+        payment_method: str,
+        order_ids: list[int],
+        booking_ids: list[int],
+        pickup_codes: list[str],
+        stores_orders: dict[int, list[dict]],
+        notify_customer: bool,
+        notify_sellers: bool,
+        telegram_notify: bool | None,
+    ) -> None:
+        """Send the seller and customer notifications of newly created orders."""
+        is_delivery = order_type in ("delivery", "taxi")
+        total_price = sum(item.price * item.quantity for item in items)
+        delivery_price = items[0].delivery_price if is_delivery and items else 0
+
         # Get customer info
         customer = (
             self.db.get_user_model(user_id)
@@ -1769,7 +1892,7 @@ class UnifiedOrderService:
         if notify_sellers and stores_orders:
             await self._notify_sellers_new_order(
                 stores_orders=stores_orders,
-                order_type=normalized_order_type,
+                order_type="delivery" if order_type == "taxi" else order_type,
                 delivery_address=delivery_address,
                 delivery_lat=delivery_lat,
                 delivery_lon=delivery_lon,
@@ -1800,31 +1923,18 @@ class UnifiedOrderService:
             notifications_enabled=notifications_enabled,
         )
 
-        # Log order creation
-        logger.info(
-            f"ORDER_CREATED: ids={','.join(map(str, order_ids + booking_ids))}, "
-            f"user={user_id}, type={order_type}, total={int(grand_total)}, "
-            f"items={total_items}, source=unified_order_service"
-        )
-
-        return OrderResult(
-            success=True,
-            order_ids=order_ids,
-            booking_ids=booking_ids,
-            pickup_codes=pickup_codes,
-            total_items=total_items,
-            total_price=int(total_price),
-            delivery_price=int(delivery_price),
-            grand_total=int(grand_total),
-        )
-
     async def _create_pickup_orders(
-        self, user_id: int, items: list[dict], payment_method: str
+        self,
+        user_id: int,
+        items: list[dict],
+        payment_method: str,
+        outbox_event: tuple[str, dict[str, Any]] | None = None,
     ) -> dict:
         """Create pickup orders.
 
         Target model (v24+): pickup orders live in the unified `orders` table.
         """
+        outbox_kwargs = {"outbox_event": outbox_event} if outbox_event else {}
         try:
             # Cart pickup must be a SINGLE order row (per store) to keep status/payment/proof consistent.
             if (
@@ -1853,6 +1963,7 @@ class UnifiedOrderService:
                     delivery_address=None,
                     delivery_price=0,
                     payment_method=payment_method,
+                    **outbox_kwargs,
                 )
 
                 if not ok or not order_id:
@@ -1896,6 +2007,7 @@ class UnifiedOrderService:
                 order_type="pickup",
                 delivery_address=None,
                 payment_method=payment_method,
+                **outbox_kwargs,
             )
 
             created_orders = result.get("created_orders", [])
@@ -1984,8 +2096,10 @@ class UnifiedOrderService:
         delivery_lat: float | None = None,
         delivery_lon: float | None = None,
         comment: str | None = None,
+        outbox_event: tuple[str, dict[str, Any]] | None = None,
     ) -> dict:
         """Create delivery orders."""
+        outbox_kwargs = {"outbox_event": outbox_event} if outbox_event else {}
         try:
             normalized_order_type = "delivery" if order_type == "taxi" else order_type
             # Cart delivery must be a SINGLE order row (per store) to keep payment/proof/admin flow consistent.
@@ -2011,6 +2125,7 @@ class UnifiedOrderService:
                     delivery_price=delivery_price,
                     payment_method=payment_method,
                     order_type=normalized_order_type,
+                    **outbox_kwargs,
                 )
 
                 if not ok or not order_id:
@@ -2043,6 +2158,7 @@ class UnifiedOrderService:
                 delivery_lon=delivery_lon,
                 comment=comment,
                 payment_method=payment_method,
+                **outbox_kwargs,
             )
 
             created_orders = result.get("created_orders", [])
@@ -2747,8 +2863,9 @@ class UnifiedOrderService:
         target_status: str,
         current_status_raw: str | None,
         terminal_statuses: set[str],
+        outbox_event: tuple[str, dict[str, Any]] | None = None,
     ) -> tuple[bool, bool]:
-        """Persist status change. Returns (update_ok, short_circuit)."""
+        """Persist status change (with its outbox event). Returns (update_ok, short_circuit)."""
         update_ok = True
         if target_status in [OrderStatus.REJECTED, OrderStatus.CANCELLED]:
             try:
@@ -2777,6 +2894,18 @@ class UnifiedOrderService:
                                 (target_status, ctx.entity_id),
                             )
                     update_ok = cursor.rowcount > 0
+                    if update_ok and hasattr(self.db, "apply_store_daily_stats_delta"):
+                        self.db.apply_store_daily_stats_delta(
+                            cursor,
+                            ctx.entity_type,
+                            ctx.entity_id,
+                            current_status_raw,
+                            target_status,
+                        )
+                    if update_ok and outbox_event:
+                        self.db.add_order_event(
+                            cursor, ctx.entity_type, ctx.entity_id, *outbox_event
+                        )
             except Exception as e:
                 logger.error(f"Failed to update status atomically: {e}")
                 return False, False
@@ -2813,16 +2942,17 @@ class UnifiedOrderService:
                     return False, True
                 return False, False
         else:
+            outbox_kwargs = {"outbox_event": outbox_event} if outbox_event else {}
             if ctx.entity_type == "booking":
                 if not hasattr(self.db, "update_booking_status"):
                     logger.warning("DB layer does not support update_booking_status")
                     return False, False
-                self.db.update_booking_status(ctx.entity_id, target_status)
+                self.db.update_booking_status(ctx.entity_id, target_status, **outbox_kwargs)
             else:
                 if not hasattr(self.db, "update_order_status"):
                     logger.warning("DB layer does not support update_order_status")
                     return False, False
-                self.db.update_order_status(ctx.entity_id, target_status)
+                self.db.update_order_status(ctx.entity_id, target_status, **outbox_kwargs)
 
         return True, False
 
@@ -3608,76 +3738,27 @@ class UnifiedOrderService:
                 f"Failed to send seller message for order#{entity_id}: {send_error}"
             )
 
-    async def _notify_status_change(
+    async def _push_status_realtime(
         self,
         ctx: StatusUpdateContext,
         target_status: str,
-        normalized_payment_status: str,
-        notify_customer: bool,
-        reject_reason: str | None,
+        normalized_payment_status: str | None,
         courier_phone: str | None,
-        new_status: str,
     ) -> None:
-        entity = ctx.entity
+        """Push a status change to the customer/partner WebSockets and store notifications."""
         entity_type = ctx.entity_type
         entity_id = ctx.entity_id
         user_id = ctx.user_id
         store_id = ctx.store_id
         pickup_code = ctx.pickup_code
-        order_type = ctx.order_type
         delivery_address = ctx.delivery_address
         delivery_price = ctx.delivery_price
         is_cart = ctx.is_cart
-        cart_items_json = ctx.cart_items_json
-        offer_id = ctx.offer_id
-        quantity = ctx.quantity
-        total_price = ctx.total_price
 
-        normalized_order_type = order_type or ("delivery" if delivery_address else "pickup")
+        normalized_order_type = ctx.order_type or ("delivery" if delivery_address else "pickup")
         if normalized_order_type == "taxi":
             normalized_order_type = "delivery"
 
-        notifications_enabled = self._notifications_enabled(user_id)
-        existing_message_id = self._get_existing_message_id(entity)
-        should_edit = bool(existing_message_id) and bool(user_id)
-        should_send_card = (
-            bool(user_id)
-            and not existing_message_id
-            and (self.force_telegram_sync or self.telegram_order_notifications)
-        )
-        should_send_notification = bool(user_id) and bool(notify_customer) and notifications_enabled
-
-        ready_until = None
-        if normalized_order_type == "pickup" and target_status == OrderStatus.READY:
-            ready_until = self._format_pickup_ready_until(get_uzb_time())
-
-        customer_lang = self.db.get_user_language(user_id) if user_id else "ru"
-        critical_text = (
-            self._build_customer_notification(
-                lang=customer_lang,
-                order_id=entity_id,
-                order_type=normalized_order_type,
-                status=target_status,
-                reject_reason=reject_reason,
-                courier_phone=courier_phone,
-            )
-            if should_send_notification
-            else None
-        )
-
-        logger.info(
-            "Notification check for #%s: status=%s, order_type=%s, notify_customer=%s, "
-            "user_id=%s, edit_card=%s, send_card=%s, critical=%s",
-            entity_id,
-            target_status,
-            normalized_order_type,
-            notify_customer,
-            user_id,
-            should_edit,
-            should_send_card,
-            bool(critical_text),
-        )
-
         if user_id:
             try:
                 from app.core.websocket import get_websocket_manager
@@ -3768,6 +3849,82 @@ class UnifiedOrderService:
             except Exception as notify_error:
                 logger.warning(f"Store status notification failed: {notify_error}")
 
+    async def _notify_status_change(
+        self,
+        ctx: StatusUpdateContext,
+        target_status: str,
+        normalized_payment_status: str,
+        notify_customer: bool,
+        reject_reason: str | None,
+        courier_phone: str | None,
+        new_status: str,
+        realtime: bool = True,
+    ) -> None:
+        entity = ctx.entity
+        entity_type = ctx.entity_type
+        entity_id = ctx.entity_id
+        user_id = ctx.user_id
+        store_id = ctx.store_id
+        pickup_code = ctx.pickup_code
+        order_type = ctx.order_type
+        delivery_address = ctx.delivery_address
+        delivery_price = ctx.delivery_price
+        is_cart = ctx.is_cart
+        cart_items_json = ctx.cart_items_json
+        offer_id = ctx.offer_id
+        quantity = ctx.quantity
+        total_price = ctx.total_price
+
+        normalized_order_type = order_type or ("delivery" if delivery_address else "pickup")
+        if normalized_order_type == "taxi":
+            normalized_order_type = "delivery"
+
+        notifications_enabled = self._notifications_enabled(user_id)
+        existing_message_id = self._get_existing_message_id(entity)
+        should_edit = bool(existing_message_id) and bool(user_id)
+        should_send_card = (
+            bool(user_id)
+            and not existing_message_id
+            and (self.force_telegram_sync or self.telegram_order_notifications)
+        )
+        should_send_notification = bool(user_id) and bool(notify_customer) and notifications_enabled
+
+        ready_until = None
+        if normalized_order_type == "pickup" and target_status == OrderStatus.READY:
+            ready_until = self._format_pickup_ready_until(get_uzb_time())
+
+        customer_lang = self.db.get_user_language(user_id) if user_id else "ru"
+        critical_text = (
+            self._build_customer_notification(
+                lang=customer_lang,
+                order_id=entity_id,
+                order_type=normalized_order_type,
+                status=target_status,
+                reject_reason=reject_reason,
+                courier_phone=courier_phone,
+            )
+            if should_send_notification
+            else None
+        )
+
+        logger.info(
+            "Notification check for #%s: status=%s, order_type=%s, notify_customer=%s, "
+            "user_id=%s, edit_card=%s, send_card=%s, critical=%s",
+            entity_id,
+            target_status,
+            normalized_order_type,
+            notify_customer,
+            user_id,
+            should_edit,
+            should_send_card,
+            bool(critical_text),
+        )
+
+        if realtime:
+            await self._push_status_realtime(
+                ctx, target_status, normalized_payment_status, courier_phone
+            )
+
         if critical_text and user_id:
             try:
                 await self.bot.send_message(int(user_id), critical_text)
@@ -4199,11 +4356,25 @@ class UnifiedOrderService:
                 )
                 return False
 
+            # Notifications are written to the outbox with the status change and
+            # sent by the order event relay (inline when the outbox is off)
+            outbox_event = self._outbox_event(
+                STATUS_CHANGED,
+                {
+                    "target_status": target_status,
+                    "payment_status": normalized_payment_status,
+                    "notify_customer": notify_customer,
+                    "reject_reason": reject_reason,
+                    "courier_phone": courier_phone,
+                    "new_status": str(new_status),
+                },
+            )
             update_ok, short_circuit = self._apply_status_update(
                 ctx=ctx,
                 target_status=target_status,
                 current_status_raw=ctx.current_status_raw,
                 terminal_statuses=terminal_statuses,
+                outbox_event=outbox_event,
             )
             if short_circuit:
                 return True
@@ -4228,15 +4399,18 @@ class UnifiedOrderService:
                         reject_reason=reject_reason,
                     )
 
-            await self._notify_status_change(
-                ctx=ctx,
-                target_status=target_status,
-                normalized_payment_status=normalized_payment_status,
-                notify_customer=notify_customer,
-                reject_reason=reject_reason,
-                courier_phone=courier_phone,
-                new_status=new_status,
-            )
+            if outbox_event:
+                wake_order_event_relay()
+            else:
+                await self._notify_status_change(
+                    ctx=ctx,
+                    target_status=target_status,
+                    normalized_payment_status=normalized_payment_status,
+                    notify_customer=notify_customer,
+                    reject_reason=reject_reason,
+                    courier_phone=courier_phone,
+                    new_status=new_status,
+                )
 
             logger.info(f"STATUS_UPDATE: #{entity_id} -> {target_status}")
             return True
@@ -4246,6 +4420,107 @@ class UnifiedOrderService:
             logger.error(f"Failed to update status: {e}")
             return False
 
+    async def deliver_status_event(
+        self,
+        entity_type: Literal["order", "booking"],
+        entity_id: int,
+        payload: dict[str, Any],
+    ) -> None:
+        """Send the Telegram messages of a status_changed outbox event.
+
+        The entity is reloaded, so the latest customer/seller message ids are
+        edited even if an earlier event of the same order sent new messages.
+        """
+        ctx = self._get_status_update_context(entity_id=entity_id, entity_type=entity_type)
+        if not ctx:
+            logger.warning(f"Status event for missing {entity_type} #{entity_id} skipped")
+            return
+        target_status = str(payload.get("target_status") or "")
+        await self._notify_status_change(
+            ctx=ctx,
+            target_status=target_status,
+            normalized_payment_status=payload.get("payment_status"),
+            notify_customer=bool(payload.get("notify_customer", True)),
+            reject_reason=payload.get("reject_reason"),
+            courier_phone=payload.get("courier_phone"),
+            new_status=payload.get("new_status") or target_status,
+            realtime=False,
+        )
+
+    async def push_status_realtime(
+        self,
+        entity_type: Literal["order", "booking"],
+        entity_id: int,
+        payload: dict[str, Any],
+    ) -> None:
+        """Send the WebSocket/store updates of a status_changed outbox event."""
+        ctx = self._get_status_update_context(entity_id=entity_id, entity_type=entity_type)
+        if not ctx:
+            return
+        await self._push_status_realtime(
+            ctx,
+            str(payload.get("target_status") or ""),
+            payload.get("payment_status"),
+            payload.get("courier_phone"),
+        )
+
+    async def deliver_created_event(self, entity_id: int, payload: dict[str, Any]) -> None:
+        """Send the seller/customer notifications of an order_created outbox event.
+
+        ``payload`` holds the create_order arguments plus the ``orders`` lines
+        (order_id, offer_id, pickup_code) written by the DB layer.
+        """
+        items = [OrderItem(**item) for item in payload.get("items") or []]
+        lines = {int(line["offer_id"]): line for line in payload.get("orders") or []}
+        order_ids: list[int] = []
+        pickup_codes: list[str] = []
+        stores_orders: dict[int, list[dict]] = {}
+        for item in items:
+            line = lines.get(int(item.offer_id))
+            if not line:
+                continue  # item failed, no order was created for it
+            order_id = int(line["order_id"])
+            pickup_code = line.get("pickup_code")
+            if order_id not in order_ids:
+                order_ids.append(order_id)
+            if pickup_code and pickup_code not in pickup_codes:
+                pickup_codes.append(pickup_code)
+            stores_orders.setdefault(int(item.store_id), []).append(
+                {
+                    "order_id": order_id,
+                    "offer_id": int(item.offer_id),
+                    "store_id": int(item.store_id),
+                    "quantity": item.quantity,
+                    "price": item.price,
+                    "total": item.price * item.quantity,
+                    "pickup_code": pickup_code,
+                    "title": item.title,
+                    "store_name": item.store_name,
+                    "store_address": item.store_address,
+                    "delivery_price": item.delivery_price,
+                }
+            )
+        if not order_ids:
+            logger.warning(f"Order created event for #{entity_id} has no orders, skipped")
+            return
+        await self._notify_order_created(
+            user_id=int(payload["user_id"]),
+            items=items,
+            order_type=str(payload.get("order_type") or "pickup"),
+            delivery_address=payload.get("delivery_address"),
+            delivery_lat=payload.get("delivery_lat"),
+            delivery_lon=payload.get("delivery_lon"),
+            comment=payload.get("comment"),
+            payment_method=str(payload.get("payment_method") or "cash"),
+            order_ids=order_ids,
+            booking_ids=[],
+            pickup_codes=pickup_codes,
+            stores_orders=stores_orders,
+            notify_customer=bool(payload.get("notify_customer", True)),
+            notify_sellers=bool(payload.get("notify_sellers", True)),
+            telegram_notify=payload.get("telegram_notify"),
+        )
+
     async def _restore_quantities(self, entity: Any, entity_type: str) -> None:
         """Restore offer quantities when order is cancelled/rejected."""
         import json
@@ -24,11 +24,13 @@ from aiogram.fsm.context import FSMContext
 from app.core.bootstrap import build_application
 from app.core.config import load_settings
 from app.core.constants import SECONDS_PER_HOUR
+from app.core.fast_runtime import install_event_loop, runtime_summary
 from app.core.security import (
     PRODUCTION_FEATURES,
     logger,
     start_background_tasks,
 )
+from app.core.startup_timing import mark_startup
 from database_protocol import DatabaseProtocol
 from localization import get_text
 
@@ -72,12 +74,21 @@ else:
 ENABLE_RATING_REMINDERS: bool = (
     os.getenv("ENABLE_RATING_REMINDERS", "0").strip().lower() in {"1", "true", "yes"}
 )
+# store_daily_stats reconciliation (0 disables); rebuilds the last 2 days
+STORE_STATS_RECONCILE_SECONDS: int = int(os.getenv("STORE_STATS_RECONCILE_SECONDS", "3600") or 0)
+# Admin platform statistics snapshot refresh (0 disables; screens refresh on demand)
+PLATFORM_STATS_REFRESH_SECONDS: int = int(os.getenv("PLATFORM_STATS_REFRESH_SECONDS", "60") or 0)
+# Purge expired Postgres idempotency keys (0 disables; Redis keys expire on their own)
+IDEMPOTENCY_GC_SECONDS: int = int(os.getenv("IDEMPOTENCY_GC_SECONDS", "3600") or 0)
+# Move old finished orders/bookings to the archive tables (0 disables)
+HISTORY_ARCHIVE_SECONDS: int = int(os.getenv("HISTORY_ARCHIVE_SECONDS", "21600") or 0)
 
 # =============================================================================
 # APPLICATION BOOTSTRAP
 # =============================================================================
 
 bot, dp, db, cache = build_application(settings)
+mark_startup("application_built")
 
 # =============================================================================
 # SERVICES
@@ -95,9 +106,7 @@ unified_order_service = init_unified_order_service(db, bot)
 # API SERVER (Mini App)
 # =============================================================================
 
-from app.api.api_server import run_api_server
-
-# API server configuration
+# API server configuration (FastAPI itself is imported only when it is started)
 API_PORT = int(os.getenv("API_PORT", "8000"))
 ENABLE_API = os.getenv("ENABLE_API", "1").strip().lower() in {"1", "true", "yes"}
 
@@ -587,9 +596,16 @@ def _register_handlers() -> None:
 def _register_middlewares() -> None:
     """Register middlewares in correct order."""
     from app.middlewares.db_middleware import DbSessionMiddleware
+    from app.middlewares.loop_lag_middleware import LoopLagMiddleware
     from app.middlewares.rate_limit import RateLimitMiddleware
+    from app.middlewares.startup_timing_middleware import FirstUpdateMiddleware
     from app.middlewares.user_cache_middleware import UserCacheMiddleware
 
+    # 0. Time-to-first-update after a (re)start, then event loop lag attribution
+    dp.update.outer_middleware(FirstUpdateMiddleware())
+    if os.getenv("LOOP_LAG_MONITOR", "1").strip().lower() in {"1", "true", "yes", "on"}:
+        dp.update.outer_middleware(LoopLagMiddleware())
+
     # 1. Database session middleware
     dp.update.middleware(DbSessionMiddleware(db))
 
@@ -641,6 +657,74 @@ async def cleanup_expired_fsm_states() -> None:
             logger.error(f"Error cleaning expired FSM states: {e}")
 
 
+async def reconcile_store_stats() -> None:
+    """Background task to repair drift in the store_daily_stats rollup."""
+    from app.core.async_db import run_sync_db
+
+    while True:
+        try:
+            await asyncio.sleep(STORE_STATS_RECONCILE_SECONDS)
+            if hasattr(db, "reconcile_store_daily_stats"):
+                rows = await run_sync_db(db.reconcile_store_daily_stats, days=2)
+                logger.info(f"📊 Reconciled store daily stats ({rows} rows)")
+        except asyncio.CancelledError:
+            break
+        except Exception as e:
+            logger.error(f"Error reconciling store daily stats: {e}")
+
+
+async def refresh_platform_stats() -> None:
+    """Background task to keep the admin statistics snapshot and gauges warm."""
+    from app.core.async_db import run_sync_db
+    from app.core.metrics import update_business_metrics
+
+    while True:
+        try:
+            if hasattr(db, "refresh_platform_stats_snapshot"):
+                await run_sync_db(db.refresh_platform_stats_snapshot)
+                await update_business_metrics(db)
+            await asyncio.sleep(PLATFORM_STATS_REFRESH_SECONDS)
+        except asyncio.CancelledError:
+            break
+        except Exception as e:
+            logger.error(f"Error refreshing platform stats: {e}")
+            await asyncio.sleep(PLATFORM_STATS_REFRESH_SECONDS)
+
+
+async def cleanup_expired_idempotency_keys() -> None:
+    """Background task to purge expired order idempotency keys in batches."""
+    from app.core.async_db import run_sync_db
+    from app.core.idempotency import purge_expired_idempotency_keys
+
+    while True:
+        try:
+            await asyncio.sleep(IDEMPOTENCY_GC_SECONDS)
+            deleted = await run_sync_db(purge_expired_idempotency_keys, db)
+            if deleted > 0:
+                logger.info(f"🧹 Purged {deleted} expired idempotency keys")
+        except asyncio.CancelledError:
+            break
+        except Exception as e:
+            logger.error(f"Error purging idempotency keys: {e}")
+
+
+async def archive_order_history() -> None:
+    """Background task moving old terminal orders/bookings to the archive."""
+    from app.core.async_db import run_sync_db
+
+    while True:
+        try:
+            await asyncio.sleep(HISTORY_ARCHIVE_SECONDS)
+            if hasattr(db, "archive_history"):
+                moved = await run_sync_db(db.archive_history)
+                if any(moved.values()):
+                    logger.info(f"🗄 Archived order history: {moved}")
+        except asyncio.CancelledError:
+            break
+        except Exception as e:
+            logger.error(f"Error archiving order history: {e}")
+
+
 async def start_booking_worker() -> asyncio.Task | None:
     """Start the booking expiry worker if available."""
     if not ENABLE_INTERNAL_BOOKING_WORKER:
@@ -673,6 +757,18 @@ async def start_rating_reminder_worker_task() -> asyncio.Task | None:
         return None
 
 
+async def start_order_event_relay_task() -> asyncio.Task | None:
+    """Start the relay sending order notifications from the order_events outbox."""
+    from app.services.order_events import ORDER_EVENTS_ENABLED, OrderEventRelay
+
+    if not ORDER_EVENTS_ENABLED or not hasattr(db, "claim_order_events"):
+        logger.info("Order event relay disabled (order notifications are sent inline)")
+        return None
+    task = asyncio.create_task(OrderEventRelay(db).run())
+    logger.info("✅ Order event relay started")
+    return task
+
+
 # =============================================================================
 # LIFECYCLE HOOKS
 # =============================================================================
@@ -778,16 +874,40 @@ async def main() -> None:
         logger.info(f"🌐 API Server: Enabled on port {API_PORT}")
     logger.info("=" * 50)
 
+    # Event loop lag sampler / blocking-call detector
+    from app.core.loop_monitor import start_loop_diagnostics
+
+    start_loop_diagnostics()
+
     # Start background tasks
     cleanup_task = asyncio.create_task(cleanup_expired_offers())
     fsm_cleanup_task = asyncio.create_task(cleanup_expired_fsm_states())
+    stats_task = (
+        asyncio.create_task(reconcile_store_stats()) if STORE_STATS_RECONCILE_SECONDS > 0 else None
+    )
+    platform_stats_task = (
+        asyncio.create_task(refresh_platform_stats())
+        if PLATFORM_STATS_REFRESH_SECONDS > 0
+        else None
+    )
+    idempotency_task = (
+        asyncio.create_task(cleanup_expired_idempotency_keys())
+        if IDEMPOTENCY_GC_SECONDS > 0
+        else None
+    )
+    archive_task = (
+        asyncio.create_task(archive_order_history()) if HISTORY_ARCHIVE_SECONDS > 0 else None
+    )
     booking_task = await start_booking_worker()
     rating_task = await start_rating_reminder_worker_task()
+    order_event_task = await start_order_event_relay_task()
 
     # API server is now integrated into webhook server
     api_task = None
     # Standalone API server only for polling mode
     if ENABLE_API and not USE_WEBHOOK:
+        from app.api.api_server import run_api_server
+
         logger.info("🚀 Starting Mini App API server (polling mode)...")
         api_task = asyncio.create_task(
             run_api_server(
@@ -822,16 +942,27 @@ async def main() -> None:
 
         # Now register webhook with Telegram (can fail without breaking health checks)
         await on_startup()
+        mark_startup("webhook_ready")
 
         try:
             await shutdown_event.wait()
         finally:
             cleanup_task.cancel()
             fsm_cleanup_task.cancel()
+            if stats_task:
+                stats_task.cancel()
+            if platform_stats_task:
+                platform_stats_task.cancel()
+            if idempotency_task:
+                idempotency_task.cancel()
+            if archive_task:
+                archive_task.cancel()
             if booking_task:
                 booking_task.cancel()
             if rating_task:
                 rating_task.cancel()
+            if order_event_task:
+                order_event_task.cancel()
             if api_task:
                 api_task.cancel()
             await runner.cleanup()
@@ -839,6 +970,7 @@ async def main() -> None:
     else:
         # Polling mode (local development)
         await on_startup()
+        mark_startup("polling_ready")
 
         polling_task = asyncio.create_task(
             dp.start_polling(
@@ -866,10 +998,20 @@ async def main() -> None:
         finally:
             cleanup_task.cancel()
             fsm_cleanup_task.cancel()
+            if stats_task:
+                stats_task.cancel()
+            if platform_stats_task:
+                platform_stats_task.cancel()
+            if idempotency_task:
+                idempotency_task.cancel()
+            if archive_task:
+                archive_task.cancel()
             if booking_task:
                 booking_task.cancel()
             if rating_task:
                 rating_task.cancel()
+            if order_event_task:
+                order_event_task.cancel()
             try:
                 await cleanup_task
             except asyncio.CancelledError:
@@ -938,7 +1080,9 @@ if __name__ == "__main__":
     signal.signal(signal.SIGINT, signal_handler)
     signal.signal(signal.SIGTERM, signal_handler)
 
-    # Run the bot
+    # Run the bot (uvloop when installed, see FAST_RUNTIME)
+    install_event_loop()
+    logger.info(f"⚡ Runtime: {runtime_summary()}")
     try:
         asyncio.run(main())
     except KeyboardInterrupt:
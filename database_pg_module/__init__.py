@@ -22,6 +22,8 @@ The Database class combines functionality through mixins:
 - StatsMixin: Platform statistics
 - PaymentMixin: Payment settings
 - NotificationMixin: User notifications
+- ArchiveMixin: Hot/cold order and booking history
+- OrderEventMixin: Durable per-order event queue
 """
 from __future__ import annotations
 
@@ -5,11 +5,13 @@ from __future__ import annotations
 
 from .core import DatabaseCore
 from .mixins import (
+    ArchiveMixin,
     BookingMixin,
     FavoritesMixin,
     LocationReferenceMixin,
     NotificationMixin,
     OfferMixin,
+    OrderEventMixin,
     OrderMixin,
     PaymentMixin,
     RatingMixin,
@@ -43,6 +45,8 @@ class Database(
     StatsMixin,
     PaymentMixin,
     NotificationMixin,
+    ArchiveMixin,
+    OrderEventMixin,
 ):
     """
     PostgreSQL Database for Fudly Bot.
@@ -59,6 +63,8 @@ class Database(
     - StatsMixin: Platform statistics
     - PaymentMixin: Payment settings
     - NotificationMixin: User notifications
+    - ArchiveMixin: Hot/cold order and booking history
+    - OrderEventMixin: Durable per-order event queue
     """
 
     def __init__(self, database_url=None):
@@ -73,7 +79,11 @@ class Database(
             logger.info("Database initialization skipped (SKIP_DB_INIT=1).")
             return
         if run_db_migrations:
-            self.init_db()
+            # Runs the DDL only when the recorded schema version differs
+            force = os.getenv("DB_SCHEMA_FORCE_INIT", "0").strip().lower() in {"1", "true", "yes"}
+            self.ensure_schema(force=force)
             logger.info("Database initialized with all mixins.")
         else:
+            # Resolve search/location capabilities up front in one catalog query
+            self.get_schema_state()
             logger.info("Database initialization skipped (set RUN_DB_MIGRATIONS=1 to enable).")
@@ -1,11 +1,13 @@
 """Database mixins for modular database operations."""
 from __future__ import annotations
 
+from .archive import ArchiveMixin
 from .bookings import BookingMixin
 from .favorites import FavoritesMixin
 from .locations import LocationReferenceMixin
 from .notifications import NotificationMixin
 from .offers import OfferMixin
+from .order_events import OrderEventMixin
 from .orders import OrderMixin
 from .payments import PaymentMixin
 from .ratings import RatingMixin
@@ -15,11 +17,13 @@ from .stores import StoreMixin
 from .users import UserMixin
 
 __all__ = [
+    "ArchiveMixin",
     "BookingMixin",
     "FavoritesMixin",
     "LocationReferenceMixin",
     "NotificationMixin",
     "OfferMixin",
+    "OrderEventMixin",
     "OrderMixin",
     "PaymentMixin",
     "RatingMixin",
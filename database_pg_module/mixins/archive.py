@@ -0,0 +1,190 @@
+"""
+Hot/cold split of order and booking history.
+
+Terminal orders and bookings older than HISTORY_RETENTION_DAYS are moved in
+batches from ``orders``/``bookings`` into ``orders_archive``/``bookings_archive``
+(same columns plus ``archived_at``), so the hot tables and their indexes only
+hold recent and in-flight rows. The ``order_items`` lines of a moved order go
+to ``order_items_archive`` in the same statement. Readers stay on the hot tables unless they
+ask for history through ``history_source(..., include_archive=True)``.
+"""
+from __future__ import annotations
+
+import os
+from collections.abc import Sequence
+from typing import Any
+
+from psycopg.rows import dict_row
+
+try:
+    from logging_config import logger
+except ImportError:
+    import logging
+
+    logger = logging.getLogger(__name__)
+
+HISTORY_RETENTION_DAYS = int(os.getenv("HISTORY_RETENTION_DAYS", "180"))
+HISTORY_ARCHIVE_BATCH = int(os.getenv("HISTORY_ARCHIVE_BATCH", "1000"))
+
+ARCHIVE_TABLES = {
+    "orders": "orders_archive",
+    "bookings": "bookings_archive",
+    "order_items": "order_items_archive",
+}
+_ID_COLUMNS = {"orders": "order_id", "bookings": "booking_id"}
+# ON DELETE CASCADE children moved together with their parent row
+_CHILD_TABLES = {"orders": ("order_items",)}
+_STATUS_COLUMNS = {"orders": "order_status", "bookings": "status"}
+# Only rows that can no longer change are moved out
+ARCHIVABLE_STATUSES = {
+    "orders": ("completed", "cancelled", "rejected"),
+    "bookings": ("completed", "cancelled", "rejected", "expired"),
+}
+
+# Columns the history readers select through history_source()
+ORDER_HISTORY_COLUMNS = (
+    "order_id", "user_id", "store_id", "offer_id", "order_status", "order_type",
+    "pickup_code", "delivery_address", "delivery_price", "total_price", "item_title",
+    "item_price", "item_original_price", "quantity", "payment_method", "payment_status",
+    "payment_proof_photo_id", "is_cart_order", "cart_items", "created_at", "updated_at",
+)
+BOOKING_HISTORY_COLUMNS = (
+    "booking_id", "user_id", "offer_id", "status", "booking_code", "pickup_time",
+    "quantity", "unit_price", "created_at",
+)
+ORDER_ITEM_HISTORY_COLUMNS = (
+    "order_id", "position", "offer_id", "title", "quantity", "price", "original_price",
+)
+
+_COLUMNS_SQL = """
+    SELECT attname FROM pg_attribute
+    WHERE attrelid = %s::regclass AND attnum > 0 AND NOT attisdropped
+    ORDER BY attnum
+"""
+
+# Single-column foreign keys that would block deleting the hot row
+# (ON DELETE CASCADE children are moved with it, see _CHILD_TABLES)
+_REFERENCES_SQL = """
+    SELECT c.conrelid::regclass::text, a.attname
+    FROM pg_constraint c
+    JOIN pg_attribute a ON a.attrelid = c.conrelid AND a.attnum = c.conkey[1]
+    WHERE c.contype = 'f'
+      AND c.confrelid = %s::regclass
+      AND c.confdeltype <> 'c'
+      AND array_length(c.conkey, 1) = 1
+"""
+
+
+def history_source(table: str, columns: Sequence[str], include_archive: bool = False) -> str:
+    """FROM source for ``orders``/``bookings``/``order_items`` history.
+
+    The hot table itself, or with ``include_archive`` a UNION ALL of the hot
+    and archive rows limited to ``columns``; callers alias it, e.g.
+    ``f"FROM {history_source('orders', cols, True)} o"``.
+    """
+    archive = ARCHIVE_TABLES[table]
+    if not include_archive:
+        return table
+    cols = ", ".join(columns)
+    return f"(SELECT {cols} FROM {table} UNION ALL SELECT {cols} FROM {archive})"
+
+
+class ArchiveMixin:
+    """Mixin moving old order/booking history to the archive tables."""
+
+    @staticmethod
+    def _column_list(cursor, table: str) -> str:
+        cursor.execute(_COLUMNS_SQL, (table,))
+        return ", ".join(f'"{row[0]}"' for row in cursor.fetchall())
+
+    def _archive_move_sql(self, cursor, table: str) -> str:
+        """DELETE ... RETURNING feeding the archive INSERT for one batch.
+
+        Child rows are deleted and archived by CTEs of the same statement, so
+        the cascade of the parent DELETE finds nothing left to drop.
+        """
+        id_column = _ID_COLUMNS[table]
+        columns = self._column_list(cursor, table)
+        cursor.execute(_REFERENCES_SQL, (table,))
+        referenced = "".join(
+            f' AND NOT EXISTS (SELECT 1 FROM {ref_table} r WHERE r."{ref_column}" = h.{id_column})'
+            for ref_table, ref_column in cursor.fetchall()
+        )
+        children = ""
+        for child in _CHILD_TABLES.get(table, ()):
+            child_columns = self._column_list(cursor, child)
+            children += f""",
+            moved_{child} AS (
+                DELETE FROM {child} c USING moved m
+                WHERE c.{id_column} = m.{id_column}
+                RETURNING c.*
+            ),
+            archived_{child} AS (
+                INSERT INTO {ARCHIVE_TABLES[child]} ({child_columns})
+                SELECT {child_columns} FROM moved_{child}
+            )"""
+        return f"""
+            WITH moved AS (
+                DELETE FROM {table} t
+                WHERE t.ctid = ANY(ARRAY(
+                    SELECT h.ctid FROM {table} h
+                    WHERE h.{_STATUS_COLUMNS[table]} = ANY(%s)
+                      AND COALESCE(h.updated_at, h.created_at)
+                          < LOCALTIMESTAMP - make_interval(days => %s)
+                      {referenced}
+                    LIMIT %s
+                    FOR UPDATE SKIP LOCKED
+                ))
+                RETURNING t.*
+            ){children}
+            INSERT INTO {ARCHIVE_TABLES[table]} ({columns})
+            SELECT {columns} FROM moved
+        """
+
+    def archive_history(
+        self, retention_days: int | None = None, batch_size: int | None = None
+    ) -> dict[str, int]:
+        """Move terminal orders/bookings older than the retention to the archive.
+
+        One transaction per batch, with SKIP LOCKED so replicas can run it at
+        the same time. Rows still referenced by a foreign key (ratings,
+        payment transactions, promo usage) stay in the hot table; order lines
+        move with their order.
+
+        Returns the number of rows moved per hot table.
+        """
+        retention = HISTORY_RETENTION_DAYS if retention_days is None else retention_days
+        batch = max(1, batch_size or HISTORY_ARCHIVE_BATCH)
+        moved: dict[str, int] = {}
+        for table in _ID_COLUMNS:
+            with self.get_connection() as conn:
+                query = self._archive_move_sql(conn.cursor(), table)
+            total = 0
+            while True:
+                with self.get_connection() as conn:
+                    cursor = conn.cursor()
+                    cursor.execute(query, (list(ARCHIVABLE_STATUSES[table]), retention, batch))
+                    count = cursor.rowcount or 0
+                total += count
+                if count < batch:
+                    break
+            moved[table] = total
+        return moved
+
+    def _get_archived(self, table: str, entity_id: int) -> dict[str, Any] | None:
+        with self.get_connection() as conn:
+            cursor = conn.cursor(row_factory=dict_row)
+            cursor.execute(
+                f"SELECT * FROM {ARCHIVE_TABLES[table]} WHERE {_ID_COLUMNS[table]} = %s",
+                (entity_id,),
+            )
+            row = cursor.fetchone()
+            return dict(row) if row else None
+
+    def get_archived_order(self, order_id: int) -> dict[str, Any] | None:
+        """Get an order moved to orders_archive."""
+        return self._get_archived("orders", order_id)
+
+    def get_archived_booking(self, booking_id: int) -> dict[str, Any] | None:
+        """Get a booking moved to bookings_archive."""
+        return self._get_archived("bookings", booking_id)
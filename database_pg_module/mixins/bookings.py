@@ -13,6 +13,8 @@ from app.domain.order_fsm import validate_order_transition
 
 from psycopg.rows import dict_row
 
+from .archive import BOOKING_HISTORY_COLUMNS, history_source
+
 try:
     from logging_config import logger
 except ImportError:
@@ -115,7 +117,7 @@ class BookingMixin:
             # Check and reserve product atomically
             cursor.execute(
                 """
-                SELECT quantity, stock_quantity, status, store_id
+                SELECT quantity, stock_quantity, status, store_id, discount_price
                 FROM offers
                 WHERE offer_id = %s AND status = 'active'
                 FOR UPDATE
@@ -183,8 +185,8 @@ class BookingMixin:
             # Create booking with expiry
             cursor.execute(
                 """
-                INSERT INTO bookings (offer_id, user_id, store_id, booking_code, status, quantity, pickup_time, pickup_address, expiry_time)
-                VALUES (%s, %s, %s, %s, 'pending', %s, %s, %s, now() + (%s * INTERVAL '1 hour'))
+                INSERT INTO bookings (offer_id, user_id, store_id, booking_code, status, quantity, unit_price, pickup_time, pickup_address, expiry_time)
+                VALUES (%s, %s, %s, %s, 'pending', %s, %s, %s, %s, now() + (%s * INTERVAL '1 hour'))
                 RETURNING booking_id
             """,
                 (
@@ -193,6 +195,7 @@ class BookingMixin:
                     store_id,
                     booking_code,
                     quantity,
+                    offer[4],
                     pickup_time,
                     pickup_address,
                     BOOKING_DURATION_HOURS,
@@ -200,6 +203,8 @@ class BookingMixin:
             )
             booking_id = cursor.fetchone()[0]
             self._snapshot_store_phone(cursor, booking_id, store_id)
+            if hasattr(self, "count_store_booking_created"):
+                self.count_store_booking_created(cursor, booking_id)
 
             conn.commit()
             logger.info(
@@ -376,21 +381,25 @@ class BookingMixin:
             )
             return [dict(row) for row in cursor.fetchall()]
 
-    def get_user_bookings(self, user_id: int):
-        """Get all user bookings (not just active)."""
+    def get_user_bookings(self, user_id: int, include_archive: bool = False):
+        """Get all user bookings (not just active).
+
+        ``include_archive`` adds bookings moved to the history archive.
+        """
+        source = history_source("bookings", BOOKING_HISTORY_COLUMNS, include_archive)
         with self.get_connection() as conn:
             cursor = conn.cursor(row_factory=dict_row)
             cursor.execute(
-                """
+                f"""
                 SELECT b.booking_id, b.offer_id, b.user_id, b.status, b.booking_code,
                        b.pickup_time, COALESCE(b.quantity, 1) as quantity, b.created_at,
                        COALESCE(o.title, 'Удалённый товар') as title,
-                       COALESCE(o.discount_price, 0) as discount_price,
+                       COALESCE(b.unit_price, o.discount_price, 0) as discount_price,
                        o.available_until,
                        COALESCE(s.name, 'Магазин') as name,
                        COALESCE(s.address, '') as address,
                        s.city
-                FROM bookings b
+                FROM {source} b
                 LEFT JOIN offers o ON b.offer_id = o.offer_id
                 LEFT JOIN stores s ON o.store_id = s.store_id
                 WHERE b.user_id = %s
@@ -445,8 +454,13 @@ class BookingMixin:
             )
             return [dict(row) for row in cursor.fetchall()]
 
-    def update_booking_status(self, booking_id: int, status: str):
-        """Update booking status."""
+    def update_booking_status(
+        self,
+        booking_id: int,
+        status: str,
+        outbox_event: tuple[str, dict[str, Any]] | None = None,
+    ):
+        """Update booking status (and write ``outbox_event`` to order_events with it)."""
         with self.get_connection() as conn:
             cursor = conn.cursor(row_factory=dict_row)
             cursor.execute(
@@ -472,6 +486,12 @@ class BookingMixin:
                 "UPDATE bookings SET status = %s, updated_at = CURRENT_TIMESTAMP WHERE booking_id = %s",
                 (status, booking_id),
             )
+            if hasattr(self, "apply_store_daily_stats_delta"):
+                self.apply_store_daily_stats_delta(
+                    cursor, "booking", booking_id, row.get("status"), status
+                )
+            if outbox_event:
+                self.add_order_event(cursor, "booking", booking_id, *outbox_event)
 
     def set_booking_customer_message_id(self, booking_id: int, message_id: int) -> bool:
         """Save customer notification message_id for live updates."""
@@ -590,6 +610,10 @@ class BookingMixin:
                 "UPDATE bookings SET status = %s, updated_at = CURRENT_TIMESTAMP WHERE booking_id = %s",
                 ("cancelled", booking_id),
             )
+            if hasattr(self, "apply_store_daily_stats_delta"):
+                self.apply_store_daily_stats_delta(
+                    cursor, "booking", booking_id, status, "cancelled"
+                )
 
             # Release pickup slot capacity if applicable (best-effort)
             if pickup_time and store_id:
@@ -645,14 +669,20 @@ class BookingMixin:
             cursor = conn.cursor()
             cursor.execute(
                 """
-                INSERT INTO bookings (user_id, offer_id, store_id, quantity, expiry_time)
-                VALUES (%s, %s, %s, %s, now() + (%s * INTERVAL '1 hour'))
+                INSERT INTO bookings (user_id, offer_id, store_id, quantity, unit_price, expiry_time)
+                VALUES (
+                    %s, %s, %s, %s,
+                    (SELECT discount_price FROM offers WHERE offer_id = %s),
+                    now() + (%s * INTERVAL '1 hour')
+                )
                 RETURNING booking_id
             """,
-                (user_id, offer_id, store_id, quantity, BOOKING_DURATION_HOURS),
+                (user_id, offer_id, store_id, quantity, offer_id, BOOKING_DURATION_HOURS),
             )
             booking_id = cursor.fetchone()[0]
             self._snapshot_store_phone(cursor, booking_id, store_id)
+            if hasattr(self, "count_store_booking_created"):
+                self.count_store_booking_created(cursor, booking_id)
             return booking_id
 
     def create_cart_booking_atomic(
@@ -126,6 +126,22 @@ def _build_geo_slug_map() -> dict[str, str]:
 
 _GEO_SLUG_MAP = _build_geo_slug_map()
 
+# Column order of the offer_stage temp table used by bulk writes
+_OFFER_STAGE_COLUMNS = (
+    "external_code",
+    "title",
+    "description",
+    "original_price",
+    "discount_price",
+    "quantity",
+    "available_from",
+    "available_until",
+    "expiry_date",
+    "photo_id",
+    "unit",
+    "category",
+)
+
 
 def canonicalize_geo_slug(value: str | None) -> str | None:
     base = _normalize_geo_slug(value)
@@ -170,29 +186,7 @@ class OfferMixin:
         return list(variants)
 
     def _get_store_slug_columns(self) -> set[str]:
-        cache = getattr(self, "_store_slug_columns_cache", None)
-        if cache is not None:
-            return cache
-
-        columns: set[str] = set()
-        try:
-            with self.get_connection() as conn:
-                cursor = conn.cursor()
-                cursor.execute(
-                    """
-                    SELECT column_name
-                    FROM information_schema.columns
-                    WHERE table_name = 'stores'
-                      AND column_name IN ('city_slug', 'region_slug', 'district_slug')
-                    """
-                )
-                columns = {row[0] for row in cursor.fetchall()}
-        except Exception as exc:
-            logger.warning("Location slug column check failed: %s", exc)
-            columns = set()
-
-        self._store_slug_columns_cache = columns
-        return columns
+        return set(self.get_schema_state().store_slug_columns)
 
     def _build_location_filter(
         self,
@@ -466,6 +460,34 @@ class OfferMixin:
             result = cursor.fetchone()
             return dict(result) if result else None
 
+    def get_offers_by_ids(self, offer_ids: list[int]) -> dict[int, dict]:
+        """Get several offers with their store fields in one query.
+
+        Store columns are prefixed (``store_name``, ``store_address``, ...) so
+        no offer column is shadowed; the delivery settings keep the names the
+        cart code already reads. Unknown IDs are absent from the result.
+        """
+        ids = sorted({int(offer_id) for offer_id in offer_ids})
+        if not ids:
+            return {}
+        with self.get_connection() as conn:
+            cursor = conn.cursor(row_factory=dict_row)
+            cursor.execute(
+                """
+                SELECT o.*,
+                       s.name AS store_name, s.address AS store_address,
+                       s.city AS store_city, s.phone AS store_phone,
+                       s.owner_id AS store_owner_id, s.status AS store_status,
+                       s.working_hours AS store_working_hours,
+                       s.delivery_enabled, s.delivery_price, s.min_order_amount
+                FROM offers o
+                LEFT JOIN stores s ON s.store_id = o.store_id
+                WHERE o.offer_id = ANY(%s)
+                """,
+                (ids,),
+            )
+            return {int(row["offer_id"]): dict(row) for row in cursor.fetchall()}
+
     def get_offer_model(self, offer_id: int) -> Any | None:
         """Get offer as Pydantic model."""
         try:
@@ -1491,3 +1513,259 @@ class OfferMixin:
                 logger.info(f"Marked {len(expired)} offers as expired")
             return len(expired)
 
+    def apply_expiry_discounts(
+        self,
+        tiers: list[tuple[int, int, str]],
+        store_id: int | None = None,
+        min_discount_percent: int = 0,
+    ) -> dict[str, Any]:
+        """Expire and reprice active offers by days left until expiry, set-based.
+
+        ``tiers`` are ``(max_days_left, discount_percent, description)``
+        sorted by ``max_days_left``; ``{days}`` in a description is replaced
+        with the number of days left. Offers past expiry are marked expired,
+        the rest get ``original_price`` minus the tier percent (integer
+        arithmetic) when that differs from their current price and still
+        honours ``min_discount_percent``. Both statements run in one
+        transaction.
+
+        Returns:
+            {"expired": count, "updated": [repriced offers with owner_id, store_name]}
+        """
+        store_filter = "AND o.store_id = %s" if store_id is not None else ""
+        store_params: tuple[Any, ...] = (store_id,) if store_id is not None else ()
+
+        percent_case = " ".join("WHEN days_left <= %s THEN %s" for _ in tiers)
+        percent_params = [value for max_days, percent, _ in tiers for value in (max_days, percent)]
+        message_case = " ".join(
+            "WHEN p.days_left <= %s THEN replace(%s, '{days}', p.days_left::text)" for _ in tiers
+        )
+        message_params = [value for max_days, _, text in tiers for value in (max_days, text)]
+
+        with self.get_connection() as conn:
+            cursor = conn.cursor(row_factory=dict_row)
+            cursor.execute(
+                f"""
+                UPDATE offers o
+                SET status = 'expired'
+                WHERE o.status = 'active'
+                  AND o.expiry_date < CURRENT_DATE
+                  {store_filter}
+                """,
+                store_params,
+            )
+            expired = cursor.rowcount
+
+            cursor.execute(
+                f"""
+                WITH calc AS (
+                    SELECT offer_id, original_price, days_left,
+                           CASE {percent_case} ELSE 0 END AS percent
+                    FROM (
+                        SELECT o.offer_id, o.original_price,
+                               (o.expiry_date - CURRENT_DATE) AS days_left
+                        FROM offers o
+                        WHERE o.status = 'active'
+                          AND o.expiry_date >= CURRENT_DATE
+                          AND o.original_price > 0
+                          {store_filter}
+                    ) src
+                ), priced AS (
+                    SELECT offer_id, original_price, days_left, percent,
+                           ((original_price::bigint * (100 - percent)) / 100)::int AS new_price
+                    FROM calc
+                    WHERE percent > 0
+                )
+                UPDATE offers o
+                SET discount_price = p.new_price,
+                    description = CASE {message_case} ELSE o.description END
+                FROM priced p, stores s
+                WHERE o.offer_id = p.offer_id
+                  AND s.store_id = o.store_id
+                  AND o.discount_price IS DISTINCT FROM p.new_price
+                  AND p.new_price > 0
+                  AND p.new_price::bigint * 100 <= p.original_price::bigint * (100 - %s)
+                RETURNING o.offer_id, o.store_id, s.owner_id, s.name AS store_name, o.title,
+                          o.discount_price, o.description, p.percent, p.days_left
+                """,
+                (
+                    *percent_params,
+                    *store_params,
+                    *message_params,
+                    min_discount_percent,
+                ),
+            )
+            updated = [dict(row) for row in cursor.fetchall()]
+
+        logger.info(f"Expiry discounts: {expired} expired, {len(updated)} repriced")
+        return {"expired": expired, "updated": updated}
+
+    def get_external_offer_index(self, store_id: int, source: str) -> dict[str, dict]:
+        """Offers of a store synced from an external catalog, keyed by product code."""
+        with self.get_connection() as conn:
+            cursor = conn.cursor(row_factory=dict_row)
+            cursor.execute(
+                """
+                SELECT offer_id, external_code, title, description, original_price,
+                       discount_price, quantity, expiry_date, category, unit, status
+                FROM offers
+                WHERE store_id = %s AND external_source = %s AND external_code IS NOT NULL
+                """,
+                (store_id, source),
+            )
+            return {row["external_code"]: dict(row) for row in cursor.fetchall()}
+
+    def _stage_offer_rows(self, cursor: Any, rows: list[dict[str, Any]]) -> None:
+        """COPY offer rows into a transaction-scoped ``offer_stage`` temp table."""
+        cursor.execute(
+            """
+            CREATE TEMP TABLE offer_stage (
+                external_code TEXT,
+                title TEXT,
+                description TEXT,
+                original_price INTEGER,
+                discount_price INTEGER,
+                quantity REAL,
+                available_from TIME,
+                available_until TIME,
+                expiry_date DATE,
+                photo_id TEXT,
+                unit TEXT,
+                category TEXT
+            ) ON COMMIT DROP
+            """
+        )
+        with cursor.copy(
+            f"COPY offer_stage ({', '.join(_OFFER_STAGE_COLUMNS)}) FROM STDIN"
+        ) as copy:
+            for row in rows:
+                copy.write_row(
+                    (
+                        row.get("external_code"),
+                        row["title"],
+                        row.get("description"),
+                        row["original_price"],
+                        row["discount_price"],
+                        row.get("quantity", 1),
+                        row.get("available_from"),
+                        row.get("available_until"),
+                        row.get("expiry_date"),
+                        row.get("photo_id"),
+                        row.get("unit") or "piece",
+                        row.get("category") or "other",
+                    )
+                )
+
+    def bulk_import_offers(
+        self, store_id: int, rows: list[dict[str, Any]], source: str | None = None
+    ) -> int:
+        """Insert a batch of validated offers with one COPY and one INSERT.
+
+        Rows carrying an ``external_code`` are merged on the
+        (store_id, external_source, external_code) index, so re-importing
+        the same file updates those offers instead of duplicating them.
+        Returns the number of offers inserted or updated.
+        """
+        if not rows:
+            return 0
+        # ON CONFLICT cannot touch one offer twice per statement: last row wins
+        last_by_code = {row["external_code"]: row for row in rows if row.get("external_code")}
+        rows = [
+            row
+            for row in rows
+            if not row.get("external_code") or last_by_code[row["external_code"]] is row
+        ]
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            self._stage_offer_rows(cursor, rows)
+            cursor.execute(
+                """
+                INSERT INTO offers (store_id, external_source, external_code, title,
+                                    description, original_price, discount_price, quantity,
+                                    stock_quantity, available_from, available_until,
+                                    expiry_date, photo_id, unit, category, status)
+                SELECT %s, CASE WHEN external_code IS NULL THEN NULL ELSE %s END,
+                       external_code, title, description, original_price, discount_price,
+                       quantity, quantity, available_from, available_until, expiry_date,
+                       photo_id, unit, category, 'active'
+                FROM offer_stage
+                ON CONFLICT (store_id, external_source, external_code)
+                    WHERE external_code IS NOT NULL
+                DO UPDATE SET title = EXCLUDED.title,
+                              description = EXCLUDED.description,
+                              original_price = EXCLUDED.original_price,
+                              discount_price = EXCLUDED.discount_price,
+                              quantity = EXCLUDED.quantity,
+                              stock_quantity = EXCLUDED.stock_quantity,
+                              available_from = EXCLUDED.available_from,
+                              available_until = EXCLUDED.available_until,
+                              expiry_date = EXCLUDED.expiry_date,
+                              photo_id = COALESCE(EXCLUDED.photo_id, offers.photo_id),
+                              unit = EXCLUDED.unit,
+                              category = EXCLUDED.category,
+                              status = 'active'
+                """,
+                (store_id, source),
+            )
+            written = cursor.rowcount
+        logger.info(f"Bulk imported {written} offers into store {store_id}")
+        return written
+
+    def apply_external_offer_sync(
+        self,
+        store_id: int,
+        source: str,
+        upserts: list[dict[str, Any]],
+        deactivate_codes: list[str],
+    ) -> dict[str, int]:
+        """Apply an external catalog diff in a single transaction.
+
+        ``upserts`` rows are streamed into a temp table with COPY and merged
+        into offers with one INSERT ... ON CONFLICT on the
+        (store_id, external_source, external_code) index. Offers whose codes
+        are in ``deactivate_codes`` are marked inactive with one UPDATE.
+        """
+        result = {"inserted": 0, "updated": 0, "deactivated": 0}
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            if upserts:
+                self._stage_offer_rows(cursor, upserts)
+                cursor.execute(
+                    """
+                    INSERT INTO offers (store_id, external_source, external_code, title,
+                                        description, original_price, discount_price, quantity,
+                                        stock_quantity, expiry_date, category, unit, status)
+                    SELECT %s, %s, external_code, title, description, original_price,
+                           discount_price, quantity, quantity, expiry_date, category, unit,
+                           'active'
+                    FROM offer_stage
+                    ON CONFLICT (store_id, external_source, external_code)
+                        WHERE external_code IS NOT NULL
+                    DO UPDATE SET title = EXCLUDED.title,
+                                  description = EXCLUDED.description,
+                                  original_price = EXCLUDED.original_price,
+                                  discount_price = EXCLUDED.discount_price,
+                                  quantity = EXCLUDED.quantity,
+                                  stock_quantity = EXCLUDED.stock_quantity,
+                                  expiry_date = EXCLUDED.expiry_date,
+                                  category = EXCLUDED.category,
+                                  status = 'active'
+                    RETURNING (xmax = 0) AS inserted
+                    """,
+                    (store_id, source),
+                )
+                for (inserted,) in cursor.fetchall():
+                    result["inserted" if inserted else "updated"] += 1
+            if deactivate_codes:
+                cursor.execute(
+                    """
+                    UPDATE offers
+                    SET status = 'inactive'
+                    WHERE store_id = %s AND external_source = %s
+                      AND external_code = ANY(%s) AND status = 'active'
+                    """,
+                    (store_id, source, list(deactivate_codes)),
+                )
+                result["deactivated"] = cursor.rowcount
+        logger.info(f"External sync ({source}) applied to store {store_id}: {result}")
+        return result
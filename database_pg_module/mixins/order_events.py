@@ -0,0 +1,168 @@
+"""
+Transactional outbox of order events (``order_events``).
+
+Order creation and status changes write their event with the same cursor
+(``add_order_event``), so an event exists exactly when its change was
+committed. The relay (see ``app.services.order_events``) claims events
+with SKIP LOCKED, at most one in-flight event per order, so the events of
+one order are handled in the order they were written. A claim is a lease:
+an event that is not marked done before the lease ends (relay crashed or
+a consumer failed) becomes claimable again; ``delivered_to`` lists the
+consumers that already handled it, so a retry only re-runs the rest.
+"""
+from __future__ import annotations
+
+import json
+from typing import Any
+
+from psycopg.rows import dict_row
+
+try:
+    from logging_config import logger
+except ImportError:
+    import logging
+
+    logger = logging.getLogger(__name__)
+
+# Head events only: the oldest pending event of each entity, once due
+_CLAIM_SQL = """
+    UPDATE order_events e
+    SET attempts = e.attempts + 1,
+        available_at = LOCALTIMESTAMP + make_interval(secs => %s)
+    WHERE e.event_id IN (
+        SELECT p.event_id FROM order_events p
+        WHERE p.processed_at IS NULL
+          AND p.available_at <= LOCALTIMESTAMP
+          AND NOT EXISTS (
+              SELECT 1 FROM order_events older
+              WHERE older.entity_type = p.entity_type
+                AND older.entity_id = p.entity_id
+                AND older.processed_at IS NULL
+                AND older.event_id < p.event_id
+          )
+        ORDER BY p.event_id
+        LIMIT %s
+        FOR UPDATE SKIP LOCKED
+    )
+    RETURNING e.event_id, e.entity_type, e.entity_id, e.event_type, e.payload, e.attempts,
+              e.delivered_to,
+              EXTRACT(EPOCH FROM (LOCALTIMESTAMP - e.created_at))::float AS age_seconds
+"""
+
+
+class OrderEventMixin:
+    """Mixin for the order_events outbox."""
+
+    def add_order_event(
+        self,
+        cursor,
+        entity_type: str,
+        entity_id: int,
+        event_type: str,
+        payload: dict[str, Any] | None = None,
+    ) -> int | None:
+        """Write an event with the caller's cursor (committed with its transaction)."""
+        cursor.execute(
+            """
+            INSERT INTO order_events (entity_type, entity_id, event_type, payload)
+            VALUES (%s, %s, %s, %s)
+            RETURNING event_id
+            """,
+            (
+                entity_type,
+                int(entity_id),
+                event_type,
+                json.dumps(payload or {}, ensure_ascii=False, default=str),
+            ),
+        )
+        row = cursor.fetchone()
+        if not row:
+            return None
+        return int(row["event_id"] if isinstance(row, dict) else row[0])
+
+    def enqueue_order_event(
+        self,
+        entity_type: str,
+        entity_id: int,
+        event_type: str,
+        payload: dict[str, Any] | None = None,
+    ) -> int | None:
+        """Append an event for an order/booking in its own transaction. Returns event_id."""
+        with self.get_connection() as conn:
+            return self.add_order_event(conn.cursor(), entity_type, entity_id, event_type, payload)
+
+    def claim_order_events(self, limit: int = 20, lease_seconds: int = 120) -> list[dict]:
+        """Lease up to ``limit`` due events, one per entity, oldest first."""
+        with self.get_connection() as conn:
+            cursor = conn.cursor(row_factory=dict_row)
+            cursor.execute(_CLAIM_SQL, (lease_seconds, max(1, limit)))
+            rows = [dict(row) for row in cursor.fetchall()]
+        return sorted(rows, key=lambda row: row["event_id"])
+
+    def complete_order_event(self, event_id: int) -> None:
+        """Mark a delivered event as processed."""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                "UPDATE order_events SET processed_at = LOCALTIMESTAMP WHERE event_id = %s",
+                (event_id,),
+            )
+
+    def fail_order_event(
+        self,
+        event_id: int,
+        error: str,
+        retry_in: float | None = None,
+        delivered_to: list[str] | None = None,
+    ) -> None:
+        """Record a failed delivery.
+
+        The event is retried after ``retry_in`` seconds, skipping the
+        consumers in ``delivered_to``; with ``None`` it is given up (marked
+        processed with the error) so it stops blocking the later events of
+        its order.
+        """
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            if retry_in is None:
+                cursor.execute(
+                    """
+                    UPDATE order_events
+                    SET last_error = %s, delivered_to = COALESCE(%s, delivered_to),
+                        processed_at = LOCALTIMESTAMP
+                    WHERE event_id = %s
+                    """,
+                    (error[:1000], delivered_to, event_id),
+                )
+            else:
+                cursor.execute(
+                    """
+                    UPDATE order_events
+                    SET last_error = %s, delivered_to = COALESCE(%s, delivered_to),
+                        available_at = LOCALTIMESTAMP + make_interval(secs => %s)
+                    WHERE event_id = %s
+                    """,
+                    (error[:1000], delivered_to, retry_in, event_id),
+                )
+
+    def purge_order_events(self, older_than_days: int = 7, batch_size: int = 5000) -> int:
+        """Delete processed events older than ``older_than_days`` in batches."""
+        deleted = 0
+        while True:
+            with self.get_connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute(
+                    """
+                    DELETE FROM order_events
+                    WHERE event_id IN (
+                        SELECT event_id FROM order_events
+                        WHERE processed_at < LOCALTIMESTAMP - make_interval(days => %s)
+                        LIMIT %s
+                    )
+                    """,
+                    (older_than_days, batch_size),
+                )
+                count = cursor.rowcount or 0
+            deleted += count
+            if count < batch_size:
+                return deleted
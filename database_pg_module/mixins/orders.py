@@ -13,6 +13,8 @@ from app.domain.order_fsm import validate_order_transition
 
 from psycopg.rows import dict_row
 
+from .archive import ORDER_ITEM_HISTORY_COLUMNS, history_source
+
 try:
     from logging_config import logger
 except ImportError:
@@ -70,6 +72,99 @@ class OrderMixin:
         except Exception as e:
             logger.debug(f"Store phone snapshot skipped for order {order_id}: {e}")
 
+    @staticmethod
+    def _order_item_columns(cart_items: list[dict[str, Any]]) -> tuple[list, ...]:
+        """Cart items as column arrays for a single unnest() insert."""
+        offer_ids, titles, quantities, prices, original_prices = [], [], [], [], []
+        for item in cart_items:
+            item = item or {}
+            try:
+                price = int(float(item.get("price") or 0))
+            except (TypeError, ValueError):
+                price = 0
+            try:
+                original_price = int(float(item["original_price"]))
+            except (KeyError, TypeError, ValueError):
+                original_price = None
+            try:
+                quantity = float(item.get("quantity", 1) or 0)
+            except (TypeError, ValueError):
+                quantity = 1.0
+            offer_id = item.get("offer_id")
+            offer_ids.append(int(offer_id) if offer_id is not None else None)
+            titles.append(item.get("title"))
+            quantities.append(quantity)
+            prices.append(price)
+            original_prices.append(original_price)
+        return offer_ids, titles, quantities, prices, original_prices
+
+    def _insert_order_items(
+        self, cursor, order_id: int, cart_items: list[dict[str, Any]]
+    ) -> None:
+        """Write the order lines once, in the order's transaction (best-effort).
+
+        orders.cart_items keeps the same data, so a database without the
+        order_items table still creates orders.
+        """
+        if not order_id or not cart_items:
+            return
+        cursor.execute("SAVEPOINT sp_order_items")
+        try:
+            cursor.execute(
+                """
+                INSERT INTO order_items (
+                    order_id, position, offer_id, title, quantity, price, original_price
+                )
+                SELECT %s, (t.ord - 1)::smallint, t.offer_id, t.title, t.quantity,
+                       t.price, t.original_price
+                FROM unnest(%s::int[], %s::text[], %s::real[], %s::int[], %s::int[])
+                     WITH ORDINALITY AS t(offer_id, title, quantity, price, original_price, ord)
+                """,
+                (order_id, *self._order_item_columns(cart_items)),
+            )
+            cursor.execute("RELEASE SAVEPOINT sp_order_items")
+        except Exception as e:
+            cursor.execute("ROLLBACK TO SAVEPOINT sp_order_items")
+            logger.warning(f"order_items insert skipped for order {order_id}: {e}")
+
+    def get_order_items(
+        self, order_ids: list[int], include_archive: bool = False
+    ) -> dict[int, list[dict]]:
+        """Lines of many cart orders in one query, keyed by order_id.
+
+        Orders without rows in order_items (single-offer orders) are absent
+        from the result. ``include_archive`` also reads the lines of orders
+        moved to the history archive.
+        """
+        if not order_ids:
+            return {}
+        with self.get_connection() as conn:
+            return self._fetch_order_items(
+                conn.cursor(row_factory=dict_row), order_ids, include_archive
+            )
+
+    @staticmethod
+    def _fetch_order_items(
+        cur, order_ids: list[int], include_archive: bool = False
+    ) -> dict[int, list[dict]]:
+        source = history_source("order_items", ORDER_ITEM_HISTORY_COLUMNS, include_archive)
+        cur.execute(
+            f"""
+            SELECT oi.order_id, oi.offer_id, oi.title, oi.quantity, oi.price,
+                   oi.original_price, off.photo_id
+            FROM {source} oi
+            LEFT JOIN offers off ON off.offer_id = oi.offer_id
+            WHERE oi.order_id = ANY(%s)
+            ORDER BY oi.order_id, oi.position
+            """,
+            (list(order_ids),),
+        )
+        items: dict[int, list[dict]] = {}
+        for row in cur.fetchall():
+            row = dict(row)
+            items.setdefault(row.pop("order_id"), []).append(row)
+        return items
+
     def create_order(
         self,
         user_id: int,
@@ -162,6 +257,7 @@ class OrderMixin:
         comment: str | None = None,
         payment_method: str = "cash",
         notify_customer: bool = True,
+        outbox_event: tuple[str, dict[str, Any]] | None = None,
     ) -> dict[str, Any]:
         """Create orders for multiple cart items, grouped by store.
 
@@ -172,6 +268,8 @@ class OrderMixin:
             delivery_address: Delivery address (for delivery orders)
             payment_method: 'cash' or 'card'
             notify_customer: Whether to send notification (deprecated, handled by UnifiedOrderService)
+            outbox_event: (event_type, payload) written to order_events with the
+                orders, keyed by the first order; the payload gets ``orders`` added
 
         Returns:
             Dictionary with created_orders list and total info
@@ -406,6 +504,24 @@ class OrderMixin:
                     logger.error(f"Failed to create cart order for offer {offer_id}: {e}")
                     failed_items.append(item)
 
+            if outbox_event and created_orders:
+                event_type, payload = outbox_event
+                orders = [
+                    {
+                        "order_id": o["order_id"],
+                        "offer_id": o["offer_id"],
+                        "pickup_code": o["pickup_code"],
+                    }
+                    for o in created_orders
+                ]
+                self.add_order_event(
+                    cursor,
+                    "order",
+                    created_orders[0]["order_id"],
+                    event_type,
+                    {**payload, "orders": orders},
+                )
+
         return {
             "created_orders": created_orders,
             "failed_items": failed_items,
@@ -439,7 +555,8 @@ class OrderMixin:
             cursor = conn.cursor()
             cursor.execute(
                 """
-                UPDATE orders SET payment_proof_photo_id = %s, payment_status = %s
+                UPDATE orders SET payment_proof_photo_id = %s, payment_status = %s,
+                    updated_at = CURRENT_TIMESTAMP
                 WHERE order_id = %s
             """,
                 (photo_id, "proof_submitted", order_id),
@@ -452,7 +569,8 @@ class OrderMixin:
             if photo_id:
                 cursor.execute(
                     """
-                    UPDATE orders SET payment_status = %s, payment_proof_photo_id = %s
+                    UPDATE orders SET payment_status = %s, payment_proof_photo_id = %s,
+                        updated_at = CURRENT_TIMESTAMP
                     WHERE order_id = %s
                 """,
                     (status, photo_id, order_id),
@@ -460,7 +578,7 @@ class OrderMixin:
             else:
                 cursor.execute(
                     """
-                    UPDATE orders SET payment_status = %s
+                    UPDATE orders SET payment_status = %s, updated_at = CURRENT_TIMESTAMP
                     WHERE order_id = %s
                 """,
                     (status, order_id),
@@ -514,12 +632,20 @@ class OrderMixin:
             row = cursor.fetchone()
             return dict(row) if row else None
 
-    def update_order_status(self, order_id: int, order_status: str) -> bool:
+    def update_order_status(
+        self,
+        order_id: int,
+        order_status: str,
+        outbox_event: tuple[str, dict[str, Any]] | None = None,
+    ) -> bool:
         """Update order status.
 
         NOTE: This method only updates order_status field.
         Use update_payment_status() to update payment_status separately.
 
+        ``outbox_event`` (event_type, payload) is written to order_events
+        in the same transaction.
+
         Returns:
             True if update was successful
         """
@@ -557,6 +683,12 @@ class OrderMixin:
                 "UPDATE orders SET order_status = %s, updated_at = CURRENT_TIMESTAMP WHERE order_id = %s",
                 (order_status, order_id),
             )
+            if hasattr(self, "apply_store_daily_stats_delta"):
+                self.apply_store_daily_stats_delta(
+                    cursor, "order", order_id, current_status, order_status
+                )
+            if outbox_event:
+                self.add_order_event(cursor, "order", order_id, *outbox_event)
             return True
 
     def set_order_customer_message_id(self, order_id: int, message_id: int) -> bool:
@@ -650,6 +782,70 @@ class OrderMixin:
                 )
             return [dict(row) for row in cursor.fetchall()]
 
+    def get_store_orders_page(
+        self,
+        store_id: int,
+        statuses: list[str] | None = None,
+        limit: int = 50,
+        cursor: tuple[Any, int] | None = None,
+        updated_since: Any = None,
+    ) -> tuple[list[dict], Any]:
+        """Get one page of store orders, newest first, or changes since a time.
+
+        Page mode orders by (created_at, order_id) DESC and ``cursor`` is the
+        last (created_at, order_id) seen. With ``updated_since`` the rows
+        changed at or after that time are returned oldest change first and
+        ``cursor`` is the last (updated_at, order_id) seen.
+
+        Returns (rows, server_now); server_now is the sync point for the next
+        delta request.
+        """
+        params: list[Any] = [store_id]
+        where = ["o.store_id = %s"]
+        if statuses:
+            where.append("o.order_status = ANY(%s)")
+            params.append(list(statuses))
+        if updated_since is not None:
+            if cursor is not None:
+                where.append("(o.updated_at, o.order_id) > (%s, %s)")
+                params.extend(cursor)
+            else:
+                where.append("o.updated_at >= %s")
+                params.append(updated_since)
+            order_by = "o.updated_at ASC, o.order_id ASC"
+        else:
+            if cursor is not None:
+                where.append("(o.created_at, o.order_id) < (%s, %s)")
+                params.extend(cursor)
+            order_by = "o.created_at DESC, o.order_id DESC"
+        params.append(limit)
+
+        with self.get_connection() as conn:
+            cur = conn.cursor(row_factory=dict_row)
+            cur.execute("SELECT LOCALTIMESTAMP AS now")
+            server_now = cur.fetchone()["now"]
+            cur.execute(
+                f"""
+                SELECT o.*,
+                       u.first_name, u.phone, u.username,
+                       off.title as offer_title, off.discount_price, off.photo_id as offer_photo_id
+                FROM orders o
+                LEFT JOIN users u ON o.user_id = u.user_id
+                LEFT JOIN offers off ON o.offer_id = off.offer_id
+                WHERE {" AND ".join(where)}
+                ORDER BY {order_by}
+                LIMIT %s
+                """,
+                params,
+            )
+            rows = [dict(row) for row in cur.fetchall()]
+            cart_ids = [row["order_id"] for row in rows if row.get("is_cart_order")]
+            items = self._fetch_order_items(cur, cart_ids) if cart_ids else {}
+            for row in rows:
+                if row["order_id"] in items:
+                    row["items"] = items[row["order_id"]]
+            return rows, server_now
+
     def get_total_orders(self) -> int:
         """Get total orders count."""
         with self.get_connection() as conn:
@@ -669,11 +865,15 @@ class OrderMixin:
         delivery_price: int = 0,
         payment_method: str = "cash",
         order_type: str | None = None,
+        outbox_event: tuple[str, dict[str, Any]] | None = None,
     ):
         """Create one order for multiple cart items atomically.
 
         cart_items format: [{"offer_id": 1, "quantity": 2, "price": 100, "title": "Item"}, ...]
 
+        ``outbox_event`` (event_type, payload) is written to order_events with
+        the order; the payload gets the created ``orders`` lines added.
+
         Returns: Tuple[bool, Optional[int], Optional[str], Optional[str]]
             - ok: True if order created successfully
             - order_id: ID of created order or None on error
@@ -895,6 +1095,20 @@ class OrderMixin:
                     raise RuntimeError("order_insert_failed")
 
                 self._snapshot_store_phone(cursor, order_id, store_id)
+                self._insert_order_items(cursor, order_id, cart_items)
+                if outbox_event:
+                    event_type, payload = outbox_event
+                    orders = [
+                        {
+                            "order_id": order_id,
+                            "offer_id": item.get("offer_id"),
+                            "pickup_code": pickup_code,
+                        }
+                        for item in cart_items
+                    ]
+                    self.add_order_event(
+                        cursor, "order", order_id, event_type, {**payload, "orders": orders}
+                    )
 
                 logger.info(
                     f"🛒✅ Cart order created: id={order_id}, code={pickup_code}, items={len(cart_items)}, total={total_price}"
@@ -29,48 +29,10 @@ class SearchMixin:
     """Mixin for search-related database operations."""
 
     def _is_fts_available(self, table_name: str) -> bool:
-        cache = getattr(self, "_fts_available_cache", {})
-        if table_name in cache:
-            return cache[table_name]
-
-        available = False
-        try:
-            with self.get_connection() as conn:
-                cursor = conn.cursor()
-                cursor.execute(
-                    """
-                    SELECT 1
-                    FROM information_schema.columns
-                    WHERE table_name = %s AND column_name = 'search_vector'
-                """,
-                    (table_name,),
-                )
-                available = cursor.fetchone() is not None
-        except Exception as e:
-            logger.warning(f"FTS availability check failed for {table_name}: {e}")
-            available = False
-
-        cache[table_name] = available
-        self._fts_available_cache = cache
-        return available
+        return table_name in self.get_schema_state().fts_tables
 
     def _is_trgm_available(self) -> bool:
-        cache = getattr(self, "_trgm_available_cache", None)
-        if cache is not None:
-            return cache
-
-        available = False
-        try:
-            with self.get_connection() as conn:
-                cursor = conn.cursor()
-                cursor.execute("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")
-                available = cursor.fetchone() is not None
-        except Exception as e:
-            logger.warning(f"pg_trgm availability check failed: {e}")
-            available = False
-
-        self._trgm_available_cache = available
-        return available
+        return self.get_schema_state().trgm
 
     def _trgm_threshold(self, query: str) -> float:
         length = len(query or "")
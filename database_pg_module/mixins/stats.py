@@ -3,6 +3,18 @@ Statistics and admin-related database operations.
 """
 from __future__ import annotations
 
+import json
+import os
+import threading
+import time
+from datetime import date, datetime, timedelta
+from typing import Any
+from zoneinfo import ZoneInfo
+
+from psycopg.rows import dict_row
+
+from .archive import BOOKING_HISTORY_COLUMNS, history_source
+
 try:
     from logging_config import logger
 except ImportError:
@@ -10,48 +22,403 @@ except ImportError:
 
     logger = logging.getLogger(__name__)
 
+# Business days for store stats are counted in this timezone.
+STATS_TZ = "Asia/Tashkent"
+
+# Statuses that count towards revenue/orders (same rules as the raw aggregates).
+# Bookings are priced at their unit_price, the offer price when they were made;
+# rows from before that column fall back to the offer's current price.
+BOOKING_REVENUE_STATUSES = ("completed", "confirmed")
+ORDER_REVENUE_STATUSES = ("completed",)
+
+_UPSERT_DAILY_STATS = """
+    ON CONFLICT (store_id, day) DO UPDATE SET
+        revenue = store_daily_stats.revenue + EXCLUDED.revenue,
+        orders = store_daily_stats.orders + EXCLUDED.orders,
+        items_sold = store_daily_stats.items_sold + EXCLUDED.items_sold,
+        bookings_completed = store_daily_stats.bookings_completed + EXCLUDED.bookings_completed,
+        bookings_cancelled = store_daily_stats.bookings_cancelled + EXCLUDED.bookings_cancelled,
+        bookings_total = store_daily_stats.bookings_total + EXCLUDED.bookings_total,
+        updated_at = CURRENT_TIMESTAMP
+"""
+
+
+# Platform-wide admin statistics snapshot (shared through platform_settings)
+PLATFORM_STATS_KEY = "platform_stats_snapshot"
+PLATFORM_STATS_MAX_AGE_SECONDS = int(os.getenv("PLATFORM_STATS_MAX_AGE_SECONDS", "120"))
+_platform_stats_lock = threading.Lock()
+
+
+def _status_delta(old_status: str | None, new_status: str | None, statuses) -> int:
+    return int(new_status in statuses) - int(old_status in statuses)
+
 
 class StatsMixin:
     """Mixin for statistics and admin operations."""
 
-    def get_statistics(self):
-        """Get platform statistics."""
+    def count_store_booking_created(self, cursor, booking_id: int) -> None:
+        """Add a new booking to store_daily_stats.bookings_total.
+
+        Same transaction and savepoint rules as apply_store_daily_stats_delta().
+        """
+        try:
+            with cursor.connection.transaction():
+                cursor.execute(
+                    """
+                    INSERT INTO store_daily_stats (store_id, day, bookings_total)
+                    SELECT o.store_id, (b.created_at::timestamptz AT TIME ZONE %s)::date, 1
+                    FROM bookings b
+                    JOIN offers o ON b.offer_id = o.offer_id
+                    WHERE b.booking_id = %s AND o.store_id IS NOT NULL
+                      AND b.created_at IS NOT NULL
+                    """
+                    + _UPSERT_DAILY_STATS,
+                    (STATS_TZ, booking_id),
+                )
+        except Exception as e:
+            logger.warning(f"store_daily_stats update skipped for new booking #{booking_id}: {e}")
+
+    def apply_store_daily_stats_delta(
+        self,
+        cursor,
+        entity_type: str,
+        entity_id: int,
+        old_status: str | None,
+        new_status: str | None,
+    ) -> None:
+        """Update store_daily_stats for one status transition.
+
+        Runs on the caller's cursor (same transaction as the status update),
+        inside a savepoint so a rollup failure never blocks the status change;
+        reconcile_store_daily_stats() repairs any drift.
+        """
+        if old_status == new_status:
+            return
+        if entity_type == "booking":
+            sign = _status_delta(old_status, new_status, BOOKING_REVENUE_STATUSES)
+            completed = _status_delta(old_status, new_status, ("completed",))
+            cancelled = _status_delta(old_status, new_status, ("cancelled",))
+            if not (sign or completed or cancelled):
+                return
+            query = (
+                """
+                INSERT INTO store_daily_stats
+                    (store_id, day, revenue, orders, items_sold,
+                     bookings_completed, bookings_cancelled)
+                SELECT o.store_id, (b.created_at::timestamptz AT TIME ZONE %s)::date,
+                       %s * COALESCE(b.unit_price, o.discount_price, 0) * COALESCE(b.quantity, 0),
+                       %s, %s * COALESCE(b.quantity, 0), %s, %s
+                FROM bookings b
+                JOIN offers o ON b.offer_id = o.offer_id
+                WHERE b.booking_id = %s AND o.store_id IS NOT NULL AND b.created_at IS NOT NULL
+                """
+                + _UPSERT_DAILY_STATS
+            )
+            params = (STATS_TZ, sign, sign, sign, completed, cancelled, entity_id)
+        else:
+            sign = _status_delta(old_status, new_status, ORDER_REVENUE_STATUSES)
+            if not sign:
+                return
+            query = (
+                """
+                INSERT INTO store_daily_stats
+                    (store_id, day, revenue, orders, items_sold,
+                     bookings_completed, bookings_cancelled)
+                SELECT ord.store_id, (ord.created_at::timestamptz AT TIME ZONE %s)::date,
+                       %s * COALESCE(ord.total_price, 0), %s,
+                       %s * COALESCE(ord.quantity, 0), 0, 0
+                FROM orders ord
+                WHERE ord.order_id = %s AND ord.store_id IS NOT NULL
+                  AND ord.created_at IS NOT NULL
+                """
+                + _UPSERT_DAILY_STATS
+            )
+            params = (STATS_TZ, sign, sign, sign, entity_id)
+        try:
+            with cursor.connection.transaction():
+                cursor.execute(query, params)
+        except Exception as e:
+            logger.warning(f"store_daily_stats update skipped for {entity_type} #{entity_id}: {e}")
+
+    def get_store_daily_stats(
+        self, store_ids: list[int], start_day: date, end_day: date
+    ) -> list[dict[str, Any]]:
+        """Return per-day rollup rows for the stores, inclusive of both days."""
+        if not store_ids:
+            return []
         with self.get_connection() as conn:
-            cursor = conn.cursor()
+            cursor = conn.cursor(row_factory=dict_row)
+            cursor.execute(
+                """
+                SELECT day,
+                       SUM(revenue) AS revenue,
+                       SUM(orders) AS orders,
+                       SUM(items_sold) AS items_sold,
+                       SUM(bookings_completed) AS bookings_completed,
+                       SUM(bookings_cancelled) AS bookings_cancelled
+                FROM store_daily_stats
+                WHERE store_id = ANY(%s) AND day BETWEEN %s AND %s
+                GROUP BY day
+                ORDER BY day
+                """,
+                (list(store_ids), start_day, end_day),
+            )
+            return [dict(row) for row in cursor.fetchall()]
 
-            stats = {}
+    def reconcile_store_daily_stats(self, days: int = 2) -> int:
+        """Rebuild the rollup for the last ``days`` days from bookings/orders.
 
-            cursor.execute("SELECT COUNT(*) FROM users")
-            stats["users"] = cursor.fetchone()[0]
+        Returns the number of (store, day) rows written.
+        """
+        today = datetime.now(ZoneInfo(STATS_TZ)).date()
+        since_day = today - timedelta(days=max(days, 1) - 1)
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("DELETE FROM store_daily_stats WHERE day >= %s", (since_day,))
+            cursor.execute(
+                """
+                INSERT INTO store_daily_stats
+                    (store_id, day, revenue, orders, items_sold,
+                     bookings_completed, bookings_cancelled, bookings_total)
+                SELECT store_id, day, SUM(revenue), SUM(orders), SUM(items_sold),
+                       SUM(bookings_completed), SUM(bookings_cancelled), SUM(bookings_total)
+                FROM (
+                    SELECT o.store_id,
+                           (b.created_at::timestamptz AT TIME ZONE %(tz)s)::date AS day,
+                           CASE WHEN b.status = ANY(%(booking_statuses)s)
+                                THEN COALESCE(b.unit_price, o.discount_price, 0)
+                                     * COALESCE(b.quantity, 0)
+                                ELSE 0 END AS revenue,
+                           CASE WHEN b.status = ANY(%(booking_statuses)s) THEN 1 ELSE 0 END
+                               AS orders,
+                           CASE WHEN b.status = ANY(%(booking_statuses)s)
+                                THEN COALESCE(b.quantity, 0) ELSE 0 END AS items_sold,
+                           CASE WHEN b.status = 'completed' THEN 1 ELSE 0 END
+                               AS bookings_completed,
+                           CASE WHEN b.status = 'cancelled' THEN 1 ELSE 0 END
+                               AS bookings_cancelled,
+                           1 AS bookings_total
+                    FROM bookings b
+                    JOIN offers o ON b.offer_id = o.offer_id
+                    WHERE b.created_at::timestamptz
+                          >= (%(since)s::date::timestamp AT TIME ZONE %(tz)s)
+                    UNION ALL
+                    SELECT ord.store_id,
+                           (ord.created_at::timestamptz AT TIME ZONE %(tz)s)::date,
+                           COALESCE(ord.total_price, 0), 1, COALESCE(ord.quantity, 0), 0, 0, 0
+                    FROM orders ord
+                    WHERE ord.order_status = ANY(%(order_statuses)s)
+                      AND ord.created_at::timestamptz
+                          >= (%(since)s::date::timestamp AT TIME ZONE %(tz)s)
+                ) src
+                WHERE store_id IS NOT NULL AND day IS NOT NULL AND day >= %(since)s
+                GROUP BY store_id, day
+                """,
+                {
+                    "tz": STATS_TZ,
+                    "since": since_day,
+                    "booking_statuses": list(BOOKING_REVENUE_STATUSES),
+                    "order_statuses": list(ORDER_REVENUE_STATUSES),
+                },
+            )
+            return cursor.rowcount or 0
 
-            cursor.execute("SELECT COUNT(*) FROM users WHERE role = 'customer'")
-            stats["customers"] = cursor.fetchone()[0]
+    def compute_platform_stats(self) -> dict[str, Any]:
+        """Aggregate platform statistics with one FILTER query per table."""
+        today = datetime.now(ZoneInfo(STATS_TZ)).date()
+        params = {"tz": STATS_TZ, "today": today, "week_start": today - timedelta(days=6)}
+        since_today = "::timestamptz >= (%(today)s::date::timestamp AT TIME ZONE %(tz)s)"
+        since_week = "::timestamptz >= (%(week_start)s::date::timestamp AT TIME ZONE %(tz)s)"
+        with self.get_connection() as conn:
+            cursor = conn.cursor(row_factory=dict_row)
+            cursor.execute(
+                f"""
+                SELECT
+                    COUNT(*) AS users_total,
+                    COUNT(*) FILTER (WHERE role = 'seller') AS users_sellers,
+                    COUNT(*) FILTER (WHERE role = 'customer') AS users_customers,
+                    COUNT(*) FILTER (WHERE created_at{since_today}) AS users_today,
+                    COUNT(*) FILTER (WHERE created_at{since_week}) AS users_week
+                FROM users
+                """,
+                params,
+            )
+            stats = dict(cursor.fetchone() or {})
 
-            cursor.execute("SELECT COUNT(*) FROM users WHERE role = 'seller'")
-            stats["sellers"] = cursor.fetchone()[0]
+            cursor.execute(
+                """
+                SELECT
+                    COUNT(*) AS stores_total,
+                    COUNT(*) FILTER (WHERE status = 'active') AS stores_active,
+                    COUNT(*) FILTER (WHERE status = 'pending') AS stores_pending,
+                    COUNT(*) FILTER (WHERE status = 'rejected') AS stores_rejected,
+                    (
+                        SELECT COUNT(DISTINCT s.owner_id)
+                        FROM stores s
+                        WHERE (s.status = 'approved' OR s.status = 'active')
+                          AND EXISTS (
+                              SELECT 1 FROM offers o
+                              WHERE o.store_id = s.store_id AND o.status = 'active'
+                          )
+                    ) AS active_sellers,
+                    (
+                        SELECT COALESCE(json_agg(json_build_array(t.city, t.cnt)), '[]'::json)
+                        FROM (
+                            SELECT city, COUNT(*) AS cnt FROM stores
+                            GROUP BY city ORDER BY cnt DESC LIMIT 5
+                        ) t
+                    ) AS stores_top_cities,
+                    (
+                        SELECT COALESCE(json_agg(json_build_array(t.category, t.cnt)), '[]'::json)
+                        FROM (
+                            SELECT category, COUNT(*) AS cnt FROM stores
+                            GROUP BY category ORDER BY cnt DESC LIMIT 5
+                        ) t
+                    ) AS stores_top_categories
+                FROM stores
+                """
+            )
+            stats.update(cursor.fetchone() or {})
 
-            cursor.execute("SELECT COUNT(*) FROM stores")
-            stats["stores"] = cursor.fetchone()[0]
+            cursor.execute(
+                """
+                SELECT
+                    COUNT(*) AS offers_total,
+                    COUNT(*) FILTER (WHERE status = 'active') AS offers_active,
+                    COUNT(*) FILTER (WHERE status = 'inactive') AS offers_inactive,
+                    COUNT(*) FILTER (WHERE status = 'deleted') AS offers_deleted,
+                    COALESCE(SUM(original_price) FILTER (WHERE status = 'active'), 0)
+                        AS offers_active_original_sum,
+                    COALESCE(SUM(discount_price) FILTER (WHERE status = 'active'), 0)
+                        AS offers_active_discount_sum,
+                    (
+                        SELECT COALESCE(json_agg(json_build_array(t.category, t.cnt)), '[]'::json)
+                        FROM (
+                            SELECT category, COUNT(*) AS cnt FROM offers
+                            WHERE status = 'active' AND category IS NOT NULL
+                            GROUP BY category ORDER BY cnt DESC LIMIT 5
+                        ) t
+                    ) AS offers_top_categories
+                FROM offers
+                """
+            )
+            stats.update(cursor.fetchone() or {})
 
-            cursor.execute("SELECT COUNT(*) FROM stores WHERE status = 'active'")
-            stats["approved_stores"] = cursor.fetchone()[0]
+            # All-time totals include bookings moved to the history archive
+            bookings = history_source("bookings", BOOKING_HISTORY_COLUMNS, include_archive=True)
+            cursor.execute(
+                f"""
+                SELECT
+                    COUNT(*) AS bookings_total,
+                    COUNT(*) FILTER (WHERE b.status = 'pending') AS bookings_pending,
+                    COUNT(*) FILTER (WHERE b.status = 'active') AS bookings_active,
+                    COUNT(*) FILTER (WHERE b.status = 'confirmed') AS bookings_confirmed,
+                    COUNT(*) FILTER (WHERE b.status = 'completed') AS bookings_completed,
+                    COUNT(*) FILTER (WHERE b.status = 'cancelled') AS bookings_cancelled,
+                    COUNT(*) FILTER (WHERE b.created_at{since_today}) AS bookings_today,
+                    COALESCE(SUM(COALESCE(b.unit_price, o.discount_price) * b.quantity) FILTER (
+                        WHERE b.created_at{since_today} AND b.status != 'cancelled'
+                    ), 0) AS revenue_today,
+                    COALESCE(SUM(b.quantity) FILTER (
+                        WHERE b.status IN ('active', 'completed')
+                    ), 0) AS bookings_quantity,
+                    COALESCE(SUM((o.original_price - o.discount_price) * b.quantity) FILTER (
+                        WHERE b.status IN ('active', 'completed')
+                    ), 0) AS customer_savings,
+                    (
+                        SELECT COALESCE(json_agg(json_build_array(t.name, t.cnt)), '[]'::json)
+                        FROM (
+                            SELECT s.name, COUNT(bk.booking_id) AS cnt
+                            FROM {bookings} bk
+                            JOIN offers ofr ON ofr.offer_id = bk.offer_id
+                            JOIN stores s ON s.store_id = ofr.store_id
+                            WHERE bk.status IN ('active', 'completed')
+                            GROUP BY s.store_id, s.name
+                            ORDER BY cnt DESC
+                            LIMIT 5
+                        ) t
+                    ) AS top_stores
+                FROM {bookings} b
+                LEFT JOIN offers o ON b.offer_id = o.offer_id
+                """,
+                params,
+            )
+            stats.update(cursor.fetchone() or {})
 
-            cursor.execute("SELECT COUNT(*) FROM stores WHERE status = 'pending'")
-            stats["pending_stores"] = cursor.fetchone()[0]
+        for key, value in stats.items():
+            if not isinstance(value, (int, list)):
+                stats[key] = float(value or 0)
+        stats["computed_at"] = time.time()
+        return stats
 
-            cursor.execute("SELECT COUNT(*) FROM offers")
-            stats["offers"] = cursor.fetchone()[0]
+    def refresh_platform_stats_snapshot(self) -> dict[str, Any]:
+        """Recompute the platform statistics snapshot and publish it."""
+        stats = self.compute_platform_stats()
+        try:
+            with self.get_connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute(
+                    """
+                    INSERT INTO platform_settings (key, value, updated_at)
+                    VALUES (%s, %s, CURRENT_TIMESTAMP)
+                    ON CONFLICT (key) DO UPDATE
+                    SET value = EXCLUDED.value, updated_at = EXCLUDED.updated_at
+                    """,
+                    (PLATFORM_STATS_KEY, json.dumps(stats)),
+                )
+        except Exception as e:
+            logger.warning(f"Failed to store platform stats snapshot: {e}")
+        self._platform_stats_snapshot = stats
+        return dict(stats)
 
-            cursor.execute("SELECT COUNT(*) FROM offers WHERE status = 'active'")
-            stats["active_offers"] = cursor.fetchone()[0]
+    def get_platform_stats_snapshot(self, max_age: float | None = None) -> dict[str, Any]:
+        """Platform statistics, at most ``max_age`` seconds old.
 
-            cursor.execute("SELECT COUNT(*) FROM bookings")
-            stats["bookings"] = cursor.fetchone()[0]
+        Served from memory, then from the snapshot another process stored in
+        platform_settings; recomputed only when both are stale.
+        """
+        if max_age is None:
+            max_age = PLATFORM_STATS_MAX_AGE_SECONDS
+        snapshot = getattr(self, "_platform_stats_snapshot", None)
+        if snapshot and time.time() - snapshot["computed_at"] <= max_age:
+            return dict(snapshot)
 
-            cursor.execute("SELECT COUNT(*) FROM bookings WHERE status = 'completed'")
-            stats["completed_bookings"] = cursor.fetchone()[0]
+        with _platform_stats_lock:
+            snapshot = getattr(self, "_platform_stats_snapshot", None)
+            if snapshot and time.time() - snapshot["computed_at"] <= max_age:
+                return dict(snapshot)
+            try:
+                with self.get_connection() as conn:
+                    cursor = conn.cursor()
+                    cursor.execute(
+                        "SELECT value FROM platform_settings WHERE key = %s",
+                        (PLATFORM_STATS_KEY,),
+                    )
+                    row = cursor.fetchone()
+                stored = json.loads(row[0]) if row and row[0] else None
+            except Exception as e:
+                logger.warning(f"Failed to read platform stats snapshot: {e}")
+                stored = None
+            if stored and time.time() - float(stored.get("computed_at", 0)) <= max_age:
+                self._platform_stats_snapshot = stored
+                return dict(stored)
+            return self.refresh_platform_stats_snapshot()
 
-            return stats
+    def get_statistics(self):
+        """Get platform statistics."""
+        snapshot = self.get_platform_stats_snapshot()
+        return {
+            "users": snapshot["users_total"],
+            "customers": snapshot["users_customers"],
+            "sellers": snapshot["users_sellers"],
+            "stores": snapshot["stores_total"],
+            "approved_stores": snapshot["stores_active"],
+            "pending_stores": snapshot["stores_pending"],
+            "offers": snapshot["offers_total"],
+            "active_offers": snapshot["offers_active"],
+            "bookings": snapshot["bookings_total"],
+            "completed_bookings": snapshot["bookings_completed"],
+        }
 
     def get_total_users(self) -> int:
         """Get total users count."""
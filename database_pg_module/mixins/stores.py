@@ -946,39 +946,43 @@ class StoreMixin:
             return True
 
     def get_store_analytics(self, store_id: int) -> dict:
-        """Get store analytics."""
+        """Get store analytics.
+
+        Total/completed/cancelled counts and the weekday split come from the
+        ``store_daily_stats`` rollup, so archived bookings count too.
+        """
         with self.get_connection() as conn:
             cursor = conn.cursor()
 
-            # Total stats
+            # Bookings by day of week (rollup)
             cursor.execute(
                 """
                 SELECT
-                    COUNT(*) as total_bookings,
-                    SUM(CASE WHEN status = 'completed' THEN 1 ELSE 0 END) as completed,
-                    SUM(CASE WHEN status = 'cancelled' THEN 1 ELSE 0 END) as cancelled
-                FROM bookings b
-                JOIN offers o ON b.offer_id = o.offer_id
-                WHERE o.store_id = %s
+                    EXTRACT(DOW FROM day)::INTEGER as day_of_week,
+                    COALESCE(SUM(bookings_total), 0) as total,
+                    COALESCE(SUM(bookings_completed), 0) as completed,
+                    COALESCE(SUM(bookings_cancelled), 0) as cancelled
+                FROM store_daily_stats
+                WHERE store_id = %s
+                GROUP BY day_of_week
             """,
                 (store_id,),
             )
-            stats = cursor.fetchone()
+            days = cursor.fetchall()
+            total_bookings = sum(int(row[1] or 0) for row in days)
+            completed = sum(int(row[2] or 0) for row in days)
+            cancelled = sum(int(row[3] or 0) for row in days)
 
-            # Sales by day of week
+            # Average rating
             cursor.execute(
                 """
-                SELECT
-                    EXTRACT(DOW FROM b.created_at)::INTEGER as day_of_week,
-                    COUNT(*) as count
-                FROM bookings b
-                JOIN offers o ON b.offer_id = o.offer_id
-                WHERE o.store_id = %s AND b.status = 'completed'
-                GROUP BY day_of_week
+                SELECT AVG(rating) as avg_rating, COUNT(*) as rating_count
+                FROM ratings
+                WHERE store_id = %s
             """,
                 (store_id,),
             )
-            days = cursor.fetchall()
+            totals = cursor.fetchone()
 
             # Popular categories
             cursor.execute(
@@ -997,26 +1001,15 @@ class StoreMixin:
             )
             categories = cursor.fetchall()
 
-            # Average rating
-            cursor.execute(
-                """
-                SELECT AVG(rating) as avg_rating, COUNT(*) as rating_count
-                FROM ratings
-                WHERE store_id = %s
-            """,
-                (store_id,),
-            )
-            rating = cursor.fetchone()
-
             return {
-                "total_bookings": stats[0] or 0,
-                "completed": stats[1] or 0,
-                "cancelled": stats[2] or 0,
-                "conversion_rate": (stats[1] / stats[0] * 100) if stats[0] > 0 else 0,
-                "days_of_week": dict(days) if days else {},
+                "total_bookings": total_bookings,
+                "completed": completed,
+                "cancelled": cancelled,
+                "conversion_rate": (completed / total_bookings * 100) if total_bookings > 0 else 0,
+                "days_of_week": {int(row[0]): int(row[2]) for row in days if row[2]},
                 "popular_categories": categories or [],
-                "avg_rating": rating[0] or 0,
-                "rating_count": rating[1] or 0,
+                "avg_rating": totals[0] or 0,
+                "rating_count": totals[1] or 0,
             }
 
     # Payment integration methods
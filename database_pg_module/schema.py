@@ -4,6 +4,8 @@ Database schema initialization.
 from __future__ import annotations
 
 import os
+import time
+from dataclasses import dataclass
 
 try:
     from logging_config import logger
@@ -12,14 +14,219 @@ except ImportError:
 
     logger = logging.getLogger(__name__)
 
+# Version of the runtime DDL below (init_db, _create_indexes, _run_migrations).
+# Kept equal to the Alembic head revision: bump it together with every new
+# migration so that RUN_DB_MIGRATIONS=1 deployments re-apply the DDL once.
+SCHEMA_VERSION = "029_store_daily_bookings_total"
+SCHEMA_COMPONENT = "runtime"
+# pg_advisory_xact_lock key: replicas booting together apply the DDL one at a time
+SCHEMA_LOCK_KEY = 4_610_038
+FTS_TABLES = ("offers", "stores")
+STORE_SLUG_COLUMNS = ("city_slug", "region_slug", "district_slug")
+
+# One catalog round trip for everything the query builders probe for.
+# to_regclass() keeps it valid on an empty database.
+_SCHEMA_PROBE_SQL = """
+    SELECT
+        to_regclass('schema_version') IS NOT NULL,
+        EXISTS (SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'),
+        ARRAY(
+            SELECT c.relname || '.' || a.attname
+            FROM pg_attribute a
+            JOIN pg_class c ON c.oid = a.attrelid
+            WHERE c.oid IN (to_regclass('offers'), to_regclass('stores'))
+              AND a.attnum > 0
+              AND NOT a.attisdropped
+              AND a.attname IN ('search_vector', 'city_slug', 'region_slug', 'district_slug')
+        )
+"""
+
+# Copies cart orders created before order_items existed; idempotent per order.
+ORDER_ITEMS_BACKFILL_SQL = """
+    INSERT INTO order_items (
+        order_id, position, offer_id, title, quantity, price, original_price
+    )
+    SELECT o.order_id,
+           (e.ordinality - 1)::smallint,
+           NULLIF(e.item->>'offer_id', '')::numeric::integer,
+           e.item->>'title',
+           COALESCE(NULLIF(e.item->>'quantity', '')::real, 1),
+           COALESCE(NULLIF(e.item->>'price', '')::numeric, 0)::integer,
+           NULLIF(e.item->>'original_price', '')::numeric::integer
+    FROM orders o
+    CROSS JOIN LATERAL jsonb_array_elements(o.cart_items) WITH ORDINALITY AS e(item, ordinality)
+    WHERE jsonb_typeof(o.cart_items) = 'array'
+      AND NOT EXISTS (SELECT 1 FROM order_items oi WHERE oi.order_id = o.order_id)
+    ON CONFLICT (order_id, position) DO NOTHING
+"""
+
+# Lines of orders archived before order_items_archive existed (the cascade
+# dropped them); rebuilt from the cart_items copy kept in orders_archive.
+ORDER_ITEMS_ARCHIVE_BACKFILL_SQL = """
+    INSERT INTO order_items_archive (
+        order_id, position, offer_id, title, quantity, price, original_price
+    )
+    SELECT o.order_id,
+           (e.ordinality - 1)::smallint,
+           NULLIF(e.item->>'offer_id', '')::numeric::integer,
+           e.item->>'title',
+           COALESCE(NULLIF(e.item->>'quantity', '')::real, 1),
+           COALESCE(NULLIF(e.item->>'price', '')::numeric, 0)::integer,
+           NULLIF(e.item->>'original_price', '')::numeric::integer
+    FROM orders_archive o
+    CROSS JOIN LATERAL jsonb_array_elements(o.cart_items) WITH ORDINALITY AS e(item, ordinality)
+    WHERE jsonb_typeof(o.cart_items) = 'array'
+    ON CONFLICT (order_id, position) DO NOTHING
+"""
+
+# Bookings created per store and business day, live and archived.
+STORE_BOOKINGS_TOTAL_BACKFILL_SQL = """
+    INSERT INTO store_daily_stats (store_id, day, bookings_total)
+    SELECT o.store_id, (b.created_at::timestamptz AT TIME ZONE 'Asia/Tashkent')::date, COUNT(*)
+    FROM (
+        SELECT offer_id, created_at FROM bookings
+        UNION ALL
+        SELECT offer_id, created_at FROM bookings_archive
+    ) b
+    JOIN offers o ON b.offer_id = o.offer_id
+    WHERE o.store_id IS NOT NULL AND b.created_at IS NOT NULL
+    GROUP BY 1, 2
+    ON CONFLICT (store_id, day) DO UPDATE SET bookings_total = EXCLUDED.bookings_total
+"""
+
+# Cold copies of orders/bookings and the order lines (see
+# database_pg_module.mixins.archive). Creates the archive tables and aligns
+# their columns with the hot tables, including a bookings_archive left behind
+# by the v24 migration script. The third element is the archive's unique key.
+HISTORY_ARCHIVE_SQL = """
+DO $$
+DECLARE
+    pair text[];
+    col record;
+BEGIN
+    FOREACH pair SLICE 1 IN ARRAY ARRAY[
+        ['orders', 'orders_archive', 'order_id'],
+        ['bookings', 'bookings_archive', 'booking_id'],
+        ['order_items', 'order_items_archive', 'order_id, position']
+    ] LOOP
+        EXECUTE format('CREATE TABLE IF NOT EXISTS %I (LIKE %I)', pair[2], pair[1]);
+        FOR col IN
+            SELECT a.attname,
+                   format_type(a.atttypid, a.atttypmod) AS hot_type,
+                   format_type(ar.atttypid, ar.atttypmod) AS archive_type
+            FROM pg_attribute a
+            LEFT JOIN pg_attribute ar
+              ON ar.attrelid = pair[2]::regclass
+             AND ar.attname = a.attname
+             AND ar.attnum > 0
+             AND NOT ar.attisdropped
+            WHERE a.attrelid = pair[1]::regclass AND a.attnum > 0 AND NOT a.attisdropped
+        LOOP
+            IF col.archive_type IS NULL THEN
+                EXECUTE format('ALTER TABLE %I ADD COLUMN %I %s',
+                               pair[2], col.attname, col.hot_type);
+            ELSIF col.archive_type <> col.hot_type THEN
+                EXECUTE format('ALTER TABLE %I ALTER COLUMN %I TYPE %s USING %I::text::%s',
+                               pair[2], col.attname, col.hot_type, col.attname, col.hot_type);
+            END IF;
+        END LOOP;
+        EXECUTE format('ALTER TABLE %I ADD COLUMN IF NOT EXISTS archived_at TIMESTAMP '
+                       'DEFAULT CURRENT_TIMESTAMP', pair[2]);
+        EXECUTE format('CREATE UNIQUE INDEX IF NOT EXISTS %I ON %I (%s)',
+                       'idx_' || pair[2] || '_id', pair[2], pair[3]);
+        IF pair[1] <> 'order_items' THEN
+            EXECUTE format('CREATE INDEX IF NOT EXISTS %I ON %I (user_id, created_at DESC)',
+                           'idx_' || pair[2] || '_user_created', pair[2]);
+        END IF;
+    END LOOP;
+END $$;
+"""
+
+
+@dataclass(frozen=True)
+class SchemaState:
+    """Recorded runtime schema version and optional features of the database."""
+
+    version: str | None = None
+    trgm: bool = False
+    fts_tables: frozenset[str] = frozenset()
+    store_slug_columns: frozenset[str] = frozenset()
+
 
 class SchemaMixin:
     """Mixin for database schema initialization."""
 
-    def init_db(self):
-        """Initialize PostgreSQL database schema."""
+    def get_schema_state(self, refresh: bool = False) -> SchemaState:
+        """Schema version and capabilities, probed once per process."""
+        state = getattr(self, "_schema_state", None)
+        if state is None or refresh:
+            try:
+                with self.get_connection() as conn:
+                    state = self._read_schema_state(conn.cursor())
+            except Exception as e:
+                logger.warning(f"Schema capability probe failed: {e}")
+                state = SchemaState()
+            self._schema_state = state
+        return state
+
+    @staticmethod
+    def _read_schema_state(cursor) -> SchemaState:
+        cursor.execute(_SCHEMA_PROBE_SQL)
+        has_version_table, trgm, columns = cursor.fetchone()
+        version = None
+        if has_version_table:
+            cursor.execute(
+                "SELECT version FROM schema_version WHERE component = %s", (SCHEMA_COMPONENT,)
+            )
+            row = cursor.fetchone()
+            version = row[0] if row else None
+        columns = set(columns or ())
+        return SchemaState(
+            version=version,
+            trgm=bool(trgm),
+            fts_tables=frozenset(t for t in FTS_TABLES if f"{t}.search_vector" in columns),
+            store_slug_columns=frozenset(
+                c for c in STORE_SLUG_COLUMNS if f"stores.{c}" in columns
+            ),
+        )
+
+    def ensure_schema(self, force: bool = False) -> bool:
+        """Apply the runtime DDL only when the recorded version differs.
+
+        The boot path on an up-to-date database is a single catalog query.
+        Returns True when the DDL was applied by this process.
+        """
+        started = time.perf_counter()
+        state = self.get_schema_state()
+        if state.version == SCHEMA_VERSION and not force:
+            logger.info(
+                f"Schema {SCHEMA_VERSION} is current, runtime DDL skipped "
+                f"({(time.perf_counter() - started) * 1000:.0f} ms)"
+            )
+            return False
+
+        applied = self.init_db(skip_if_current=not force)
+        self.get_schema_state(refresh=True)
+        if applied:
+            logger.info(
+                f"Schema upgraded {state.version or 'none'} -> {SCHEMA_VERSION} "
+                f"in {(time.perf_counter() - started) * 1000:.0f} ms"
+            )
+        return applied
+
+    def init_db(self, skip_if_current: bool = False) -> bool:
+        """Initialize PostgreSQL database schema.
+
+        Returns False if ``skip_if_current`` is set and another process
+        already recorded the current version while this one waited for the lock.
+        """
         with self.get_connection() as conn:
             cursor = conn.cursor()
+            cursor.execute("SELECT pg_advisory_xact_lock(%s)", (SCHEMA_LOCK_KEY,))
+            if skip_if_current and self._read_schema_state(cursor).version == SCHEMA_VERSION:
+                logger.info(f"Schema {SCHEMA_VERSION} was applied by another instance")
+                return False
+
             run_runtime_migrations = (
                 os.getenv("RUN_DB_MIGRATIONS", "0").strip().lower() in {"1", "true", "yes"}
             )
@@ -139,6 +346,8 @@ class SchemaMixin:
                     category TEXT DEFAULT 'other',
                     package_value REAL,
                     package_unit TEXT,
+                    external_source TEXT,
+                    external_code TEXT,
                     FOREIGN KEY (store_id) REFERENCES stores(store_id)
                 )
             """
@@ -164,6 +373,8 @@ class SchemaMixin:
                     )
                     cursor.execute("ALTER TABLE offers ADD COLUMN IF NOT EXISTS package_value REAL")
                     cursor.execute("ALTER TABLE offers ADD COLUMN IF NOT EXISTS package_unit TEXT")
+                    cursor.execute("ALTER TABLE offers ADD COLUMN IF NOT EXISTS external_source TEXT")
+                    cursor.execute("ALTER TABLE offers ADD COLUMN IF NOT EXISTS external_code TEXT")
                 except Exception as e:
                     logger.warning(f"Migration for offers table: {e}")
                     conn.rollback()
@@ -433,6 +644,7 @@ class SchemaMixin:
                     item_original_price INTEGER,
                     pickup_code TEXT,
                     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                     FOREIGN KEY (user_id) REFERENCES users(user_id),
                     FOREIGN KEY (offer_id) REFERENCES offers(offer_id),
                     FOREIGN KEY (store_id) REFERENCES stores(store_id)
@@ -483,6 +695,28 @@ class SchemaMixin:
                 except Exception as e:
                     logger.warning(f"Migration for orders cart columns: {e}")
 
+            # Normalized cart order lines, written with the order
+            # (orders.cart_items keeps the same data for single-order readers)
+            cursor.execute(
+                """
+                CREATE TABLE IF NOT EXISTS order_items (
+                    order_id INTEGER NOT NULL REFERENCES orders(order_id) ON DELETE CASCADE,
+                    position SMALLINT NOT NULL,
+                    offer_id INTEGER,
+                    title TEXT,
+                    quantity REAL NOT NULL DEFAULT 1,
+                    price INTEGER NOT NULL DEFAULT 0,
+                    original_price INTEGER,
+                    PRIMARY KEY (order_id, position)
+                )
+                """
+            )
+            if run_runtime_migrations:
+                try:
+                    cursor.execute(ORDER_ITEMS_BACKFILL_SQL)
+                except Exception as e:
+                    logger.warning(f"Migration for order_items backfill: {e}")
+
             # Migration: Add customer_message_id for editable status notifications
             if run_runtime_migrations:
                 try:
@@ -613,6 +847,13 @@ class SchemaMixin:
                 except Exception as e:
                     logger.warning(f"Migration for bookings rating_reminder: {e}")
 
+            # Migration: Offer price at booking time, so revenue does not follow price changes
+            if run_runtime_migrations:
+                try:
+                    cursor.execute("ALTER TABLE bookings ADD COLUMN IF NOT EXISTS unit_price INTEGER")
+                except Exception as e:
+                    logger.warning(f"Migration for bookings unit_price: {e}")
+
             # Payment settings table
             cursor.execute(
                 """
@@ -931,14 +1172,96 @@ class SchemaMixin:
             """
             )
 
+            # Per-store daily stats rollup (maintained on booking creation and status changes)
+            cursor.execute(
+                """
+                CREATE TABLE IF NOT EXISTS store_daily_stats (
+                    store_id INTEGER NOT NULL,
+                    day DATE NOT NULL,
+                    revenue NUMERIC(14, 2) NOT NULL DEFAULT 0,
+                    orders INTEGER NOT NULL DEFAULT 0,
+                    items_sold REAL NOT NULL DEFAULT 0,
+                    bookings_completed INTEGER NOT NULL DEFAULT 0,
+                    bookings_cancelled INTEGER NOT NULL DEFAULT 0,
+                    bookings_total INTEGER NOT NULL DEFAULT 0,
+                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    PRIMARY KEY (store_id, day)
+                )
+            """
+            )
+
+            # Idempotency keys for order creation (see app.core.idempotency)
+            cursor.execute(
+                """
+                CREATE TABLE IF NOT EXISTS idempotency_keys (
+                    idempotency_key TEXT NOT NULL,
+                    user_id BIGINT NOT NULL,
+                    request_hash TEXT NOT NULL,
+                    response_body TEXT,
+                    status_code INTEGER,
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    PRIMARY KEY (idempotency_key, user_id)
+                )
+            """
+            )
+
+            # Outbox of order events (see OrderEventMixin)
+            cursor.execute(
+                """
+                CREATE TABLE IF NOT EXISTS order_events (
+                    event_id BIGSERIAL PRIMARY KEY,
+                    entity_type TEXT NOT NULL,
+                    entity_id INTEGER NOT NULL,
+                    event_type TEXT NOT NULL,
+                    payload JSONB NOT NULL DEFAULT '{}'::jsonb,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    last_error TEXT,
+                    delivered_to TEXT[] NOT NULL DEFAULT '{}',
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    available_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    processed_at TIMESTAMP
+                )
+            """
+            )
+            if run_runtime_migrations:
+                try:
+                    cursor.execute(
+                        "ALTER TABLE order_events ADD COLUMN IF NOT EXISTS delivered_to TEXT[] "
+                        "NOT NULL DEFAULT '{}'"
+                    )
+                except Exception as e:
+                    logger.warning(f"Migration for order_events delivered_to: {e}")
+
+            # Runtime schema version (see SCHEMA_VERSION)
+            cursor.execute(
+                """
+                CREATE TABLE IF NOT EXISTS schema_version (
+                    component TEXT PRIMARY KEY,
+                    version TEXT NOT NULL,
+                    applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            """
+            )
+
             # Create indexes
             if run_runtime_migrations:
                 self._create_indexes(cursor)
                 # Run migrations
                 self._run_migrations(cursor)
+                # Only a full run (tables, indexes, migrations) counts as current
+                cursor.execute(
+                    """
+                    INSERT INTO schema_version (component, version)
+                    VALUES (%s, %s)
+                    ON CONFLICT (component) DO UPDATE
+                    SET version = EXCLUDED.version, applied_at = CURRENT_TIMESTAMP
+                """,
+                    (SCHEMA_COMPONENT, SCHEMA_VERSION),
+                )
 
             conn.commit()
             logger.info("✅ PostgreSQL database schema initialized successfully")
+        return True
 
     def _create_indexes(self, cursor):
         """Create database indexes."""
@@ -970,12 +1293,27 @@ class SchemaMixin:
         )
         cursor.execute("CREATE INDEX IF NOT EXISTS idx_offers_expiry ON offers(expiry_date)")
         cursor.execute("CREATE INDEX IF NOT EXISTS idx_offers_stock ON offers(stock_quantity)")
+        # External catalog sync (1C): one offer per store/source/product code
+        cursor.execute(
+            "CREATE UNIQUE INDEX IF NOT EXISTS uq_offers_external "
+            "ON offers(store_id, external_source, external_code) "
+            "WHERE external_code IS NOT NULL"
+        )
 
         # Order indexes
         cursor.execute("CREATE INDEX IF NOT EXISTS idx_orders_user ON orders(user_id)")
         cursor.execute("CREATE INDEX IF NOT EXISTS idx_orders_store ON orders(store_id)")
         cursor.execute("CREATE INDEX IF NOT EXISTS idx_orders_status ON orders(order_status)")
         cursor.execute("CREATE INDEX IF NOT EXISTS idx_orders_created ON orders(created_at DESC)")
+        # Partner order feed: keyset pagination and updated_since delta sync
+        cursor.execute(
+            "CREATE INDEX IF NOT EXISTS idx_orders_store_created "
+            "ON orders(store_id, created_at DESC, order_id DESC)"
+        )
+        cursor.execute(
+            "CREATE INDEX IF NOT EXISTS idx_orders_store_updated "
+            "ON orders(store_id, updated_at, order_id)"
+        )
 
         # Booking indexes - critical for daily operations
         cursor.execute("CREATE INDEX IF NOT EXISTS idx_bookings_user ON bookings(user_id)")
@@ -1017,6 +1355,22 @@ class SchemaMixin:
         cursor.execute(
             "CREATE INDEX IF NOT EXISTS idx_search_history_user ON search_history(user_id)"
         )
+        # Item-level analytics (top products) group order lines by offer
+        cursor.execute(
+            "CREATE INDEX IF NOT EXISTS idx_order_items_offer ON order_items(offer_id)"
+        )
+        # Expired idempotency keys are purged in batches by age
+        cursor.execute(
+            "CREATE INDEX IF NOT EXISTS idx_idempotency_keys_created ON idempotency_keys(created_at)"
+        )
+        # Pending order events are claimed per entity in event_id order
+        cursor.execute(
+            """
+            CREATE INDEX IF NOT EXISTS idx_order_events_pending
+            ON order_events(entity_type, entity_id, event_id)
+            WHERE processed_at IS NULL
+            """
+        )
 
     def _run_migrations(self, cursor):
         """Run database migrations."""
@@ -1025,6 +1379,41 @@ class SchemaMixin:
         self._migrate_stores_working_hours(cursor)
         self._migrate_bookings_delivery(cursor)
         self._migrate_user_view_mode(cursor)
+        # Last: the archive copies every hot column added above
+        self._migrate_history_archive(cursor)
+        self._migrate_store_daily_bookings_total(cursor)
+
+    def _migrate_history_archive(self, cursor):
+        """Create orders_archive/bookings_archive/order_items_archive matching the hot tables."""
+        try:
+            with cursor.connection.transaction():
+                cursor.execute("SELECT to_regclass('order_items_archive') IS NULL")
+                items_archive_missing = cursor.fetchone()[0]
+                cursor.execute(HISTORY_ARCHIVE_SQL)
+                if items_archive_missing:
+                    cursor.execute(ORDER_ITEMS_ARCHIVE_BACKFILL_SQL)
+        except Exception as e:
+            logger.warning(f"Could not prepare history archive tables: {e}")
+
+    def _migrate_store_daily_bookings_total(self, cursor):
+        """Add store_daily_stats.bookings_total, filled once from the booking history."""
+        try:
+            with cursor.connection.transaction():
+                cursor.execute(
+                    """
+                    SELECT 1 FROM information_schema.columns
+                    WHERE table_name = 'store_daily_stats' AND column_name = 'bookings_total'
+                    """
+                )
+                if cursor.fetchone() is not None:
+                    return
+                cursor.execute(
+                    "ALTER TABLE store_daily_stats "
+                    "ADD COLUMN bookings_total INTEGER NOT NULL DEFAULT 0"
+                )
+                cursor.execute(STORE_BOOKINGS_TOTAL_BACKFILL_SQL)
+        except Exception as e:
+            logger.warning(f"Could not add store_daily_stats.bookings_total: {e}")
 
     def _migrate_user_view_mode(self, cursor):
         """Add view_mode column to users table if not exists."""
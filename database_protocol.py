@@ -399,6 +399,9 @@ class DatabaseProtocol(Protocol):
     def get_offer(self, offer_id: int) -> tuple[Any, ...] | None:
         ...
 
+    def get_offers_by_ids(self, offer_ids: list[int]) -> dict[int, dict[str, Any]]:
+        ...
+
     def get_store_offers(
         self,
         store_id: int,
@@ -463,6 +466,35 @@ class DatabaseProtocol(Protocol):
         """Delete/mark expired offers and return count of affected rows."""
         ...
 
+    def apply_expiry_discounts(
+        self,
+        tiers: list[tuple[int, int, str]],
+        store_id: int | None = None,
+        min_discount_percent: int = 0,
+    ) -> dict[str, Any]:
+        """Expire and reprice active offers by days to expiry in set-based UPDATEs."""
+        ...
+
+    def get_external_offer_index(self, store_id: int, source: str) -> dict[str, dict]:
+        """Offers synced from an external catalog, keyed by external product code."""
+        ...
+
+    def bulk_import_offers(
+        self, store_id: int, rows: list[dict[str, Any]], source: str | None = None
+    ) -> int:
+        """Insert (or merge by external code) a batch of offers with one COPY."""
+        ...
+
+    def apply_external_offer_sync(
+        self,
+        store_id: int,
+        source: str,
+        upserts: list[dict[str, Any]],
+        deactivate_codes: list[str],
+    ) -> dict[str, int]:
+        """Bulk upsert/deactivate external catalog offers in one transaction."""
+        ...
+
     # ========== BOOKING METHODS ==========
     def create_booking(
         self,
@@ -485,7 +517,9 @@ class DatabaseProtocol(Protocol):
     ) -> tuple[bool, int | None, str | None, str | None]:
         ...
 
-    def get_user_bookings(self, user_id: int) -> list[tuple[Any, ...]]:
+    def get_user_bookings(
+        self, user_id: int, include_archive: bool = False
+    ) -> list[tuple[Any, ...]]:
         ...
 
     def get_booking(self, booking_id: int) -> tuple[Any, ...] | None:
@@ -494,7 +528,12 @@ class DatabaseProtocol(Protocol):
     def get_booking_by_code(self, booking_code: str) -> tuple[Any, ...] | None:
         ...
 
-    def update_booking_status(self, booking_id: int, status: str) -> None:
+    def update_booking_status(
+        self,
+        booking_id: int,
+        status: str,
+        outbox_event: tuple[str, dict[str, Any]] | None = None,
+    ) -> None:
         ...
 
     def complete_booking(self, booking_id: int) -> None:
@@ -522,6 +561,20 @@ class DatabaseProtocol(Protocol):
     def get_statistics(self) -> dict[str, Any]:
         ...
 
+    def get_platform_stats_snapshot(self, max_age: float | None = None) -> dict[str, Any]:
+        ...
+
+    def refresh_platform_stats_snapshot(self) -> dict[str, Any]:
+        ...
+
+    def get_store_daily_stats(
+        self, store_ids: list[int], start_day: Any, end_day: Any
+    ) -> list[dict[str, Any]]:
+        ...
+
+    def reconcile_store_daily_stats(self, days: int = 2) -> int:
+        ...
+
     # ========== FAVORITES METHODS ==========
     def get_favorites(self, user_id: int) -> list[tuple[Any, ...]]:
         ...
@@ -618,8 +671,89 @@ class DatabaseProtocol(Protocol):
         """Get orders sharing the same customer_message_id."""
         ...
 
-    def update_order_status(self, order_id: int, status: str) -> bool:
-        """Update order status."""
+    def get_store_orders_page(
+        self,
+        store_id: int,
+        statuses: list[str] | None = None,
+        limit: int = 50,
+        cursor: tuple[Any, int] | None = None,
+        updated_since: Any = None,
+    ) -> tuple[list[dict], Any]:
+        """Get a page of store orders (or changes since a time) and the DB time."""
+        ...
+
+    def get_order_items(
+        self, order_ids: list[int], include_archive: bool = False
+    ) -> dict[int, list[dict]]:
+        """Get cart order lines for many orders in one query, keyed by order_id."""
+        ...
+
+    def update_order_status(
+        self,
+        order_id: int,
+        status: str,
+        outbox_event: tuple[str, dict[str, Any]] | None = None,
+    ) -> bool:
+        """Update order status (writing ``outbox_event`` in the same transaction)."""
+        ...
+
+    # ======= HISTORY ARCHIVE =======
+    def archive_history(
+        self, retention_days: int | None = None, batch_size: int | None = None
+    ) -> dict[str, int]:
+        """Move old terminal orders/bookings to the archive tables."""
+        ...
+
+    def get_archived_order(self, order_id: int) -> dict[str, Any] | None:
+        """Get an order moved to orders_archive."""
+        ...
+
+    def get_archived_booking(self, booking_id: int) -> dict[str, Any] | None:
+        """Get a booking moved to bookings_archive."""
+        ...
+
+    # ======= ORDER EVENTS =======
+    def add_order_event(
+        self,
+        cursor: Any,
+        entity_type: str,
+        entity_id: int,
+        event_type: str,
+        payload: dict[str, Any] | None = None,
+    ) -> int | None:
+        """Write an outbox event with the caller's cursor."""
+        ...
+
+    def enqueue_order_event(
+        self,
+        entity_type: str,
+        entity_id: int,
+        event_type: str,
+        payload: dict[str, Any] | None = None,
+    ) -> int | None:
+        """Append an outbox event in its own transaction."""
+        ...
+
+    def claim_order_events(self, limit: int = 20, lease_seconds: int = 120) -> list[dict]:
+        """Lease due events, at most one per order."""
+        ...
+
+    def complete_order_event(self, event_id: int) -> None:
+        """Mark a delivered event as processed."""
+        ...
+
+    def fail_order_event(
+        self,
+        event_id: int,
+        error: str,
+        retry_in: float | None = None,
+        delivered_to: list[str] | None = None,
+    ) -> None:
+        """Record a failed delivery (retry later or give up)."""
+        ...
+
+    def purge_order_events(self, older_than_days: int = 7, batch_size: int = 5000) -> int:
+        """Delete old processed events."""
         ...
 
     # ======= SEARCH =======
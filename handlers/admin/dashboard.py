@@ -6,10 +6,14 @@ Handles all admin panel callbacks and statistics
 import asyncio
 import logging
 from datetime import datetime
+from typing import Any
 
 from aiogram import F, Router, types
 from aiogram.utils.keyboard import InlineKeyboardBuilder
 
+from app.core.async_db import run_sync_db
+from handlers.common import UZB_TZ
+
 logger = logging.getLogger(__name__)
 
 # Router for admin dashboard
@@ -26,80 +30,31 @@ def setup(bot_instance, db_instance, get_text_func, moderation_keyboard_func, ge
     get_uzb_time = get_uzb_time_func
 
 
-@router.callback_query(F.data == "admin_refresh_dashboard")
-async def refresh_dashboard(callback: types.CallbackQuery):
-    """Обновить dashboard"""
-    if not db.is_admin(callback.from_user.id):
-        await callback.answer("❌ Доступ запрещён", show_alert=True)
-        return
-
-    # Используем тот же код что и в admin_dashboard
-    with db.get_connection() as conn:
-        cursor = conn.cursor()
-
-        # [Копируем весь код из admin_dashboard для получения статистики]
-        cursor.execute("SELECT COUNT(*) FROM users")
-        total_users = cursor.fetchone()[0]
-
-        cursor.execute('SELECT COUNT(*) FROM users WHERE role = "seller"')
-        sellers = cursor.fetchone()[0]
-
-        cursor.execute('SELECT COUNT(*) FROM users WHERE role = "customer"')
-        customers = cursor.fetchone()[0]
-
-        cursor.execute('SELECT COUNT(*) FROM stores WHERE status = "active"')
-        active_stores = cursor.fetchone()[0]
-
-        cursor.execute('SELECT COUNT(*) FROM stores WHERE status = "pending"')
-        pending_stores = cursor.fetchone()[0]
-
-    cursor.execute('SELECT COUNT(*) FROM offers WHERE status = "active"')
-    active_offers = cursor.fetchone()[0]
-
-    cursor.execute('SELECT COUNT(*) FROM offers WHERE status = "inactive"')
-    inactive_offers = cursor.fetchone()[0]
-
-    cursor.execute("SELECT COUNT(*) FROM bookings")
-    total_bookings = cursor.fetchone()[0]
-
-    cursor.execute('SELECT COUNT(*) FROM bookings WHERE status = "pending"')
-    pending_bookings = cursor.fetchone()[0]
-
-    today = datetime.now().strftime("%Y-%m-%d")
-
-    cursor.execute("SELECT COUNT(*) FROM bookings WHERE DATE(created_at) = ?", (today,))
-    today_bookings = cursor.fetchone()[0]
-
-    cursor.execute(
-        """
-        SELECT SUM(o.discount_price * b.quantity)
-        FROM bookings b
-        JOIN offers o ON b.offer_id = o.offer_id
-        WHERE DATE(b.created_at) = ? AND b.status != 'cancelled'
-    """,
-        (today,),
+def format_dashboard(snapshot: dict[str, Any]) -> tuple[str, Any]:
+    """Build dashboard text and keyboard from a platform stats snapshot."""
+    pending_stores = snapshot["stores_pending"]
+    active_bookings = (
+        snapshot["bookings_pending"] + snapshot["bookings_active"] + snapshot["bookings_confirmed"]
     )
-    today_revenue = cursor.fetchone()[0] or 0
-
-    cursor.execute("SELECT COUNT(*) FROM users WHERE DATE(created_at) = ?", (today,))
-    today_users = cursor.fetchone()[0]
+    updated_at = datetime.fromtimestamp(snapshot["computed_at"], UZB_TZ).strftime("%H:%M:%S")
 
     text = "📊 <b>Dashboard - Общая статистика</b>\n\n"
     text += "👥 <b>Пользователи:</b>\n"
-    text += f"├ Всего: {total_users} (+{today_users} сегодня)\n"
-    text += f"├ 🏪 Партнёры: {sellers}\n"
-    text += f"└ 🛍 Покупатели: {customers}\n\n"
+    text += f"├ Всего: {snapshot['users_total']} (+{snapshot['users_today']} сегодня)\n"
+    text += f"├ 🏪 Партнёры: {snapshot['users_sellers']}\n"
+    text += f"└ 🛍 Покупатели: {snapshot['users_customers']}\n\n"
     text += "🏪 <b>Магазины:</b>\n"
-    text += f"├ ✅ Активные: {active_stores}\n"
+    text += f"├ ✅ Активные: {snapshot['stores_active']}\n"
     text += f"└ ⏳ На модерации: {pending_stores}\n\n"
     text += "📦 <b>Товары:</b>\n"
-    text += f"├ ✅ Активные: {active_offers}\n"
-    text += f"└ ❌ Неактивные: {inactive_offers}\n\n"
+    text += f"├ ✅ Активные: {snapshot['offers_active']}\n"
+    text += f"└ ❌ Неактивные: {snapshot['offers_inactive']}\n\n"
     text += "🎫 <b>Бронирования:</b>\n"
-    text += f"├ Всего: {total_bookings}\n"
-    text += f"├ ⏳ Активные: {pending_bookings}\n"
-    text += f"└ 📅 Сегодня: {today_bookings}\n\n"
-    text += f"💰 <b>Выручка сегодня:</b> {int(today_revenue):,} сум"
+    text += f"├ Всего: {snapshot['bookings_total']}\n"
+    text += f"├ ⏳ Активные: {active_bookings}\n"
+    text += f"└ 📅 Сегодня: {snapshot['bookings_today']}\n\n"
+    text += f"💰 <b>Выручка сегодня:</b> {int(snapshot['revenue_today']):,} сум\n\n"
+    text += f"🕒 <i>Данные на {updated_at}</i>"
 
     kb = InlineKeyboardBuilder()
     if pending_stores > 0:
@@ -107,11 +62,24 @@ async def refresh_dashboard(callback: types.CallbackQuery):
     kb.button(text="📊 Детальная статистика", callback_data="admin_detailed_stats")
     kb.button(text="🔄 Обновить", callback_data="admin_refresh_dashboard")
     kb.adjust(1)
+    return text, kb.as_markup()
+
+
+@router.callback_query(F.data == "admin_refresh_dashboard")
+async def refresh_dashboard(callback: types.CallbackQuery):
+    """Обновить dashboard"""
+    if not db.is_admin(callback.from_user.id):
+        await callback.answer("❌ Доступ запрещён", show_alert=True)
+        return
+
+    # An explicit refresh recomputes instead of serving the cached snapshot
+    snapshot = await run_sync_db(db.refresh_platform_stats_snapshot)
+    text, markup = format_dashboard(snapshot)
 
     try:
-        await callback.message.edit_text(text, parse_mode="HTML", reply_markup=kb.as_markup())
+        await callback.message.edit_text(text, parse_mode="HTML", reply_markup=markup)
     except Exception:
-        await callback.message.answer(text, parse_mode="HTML", reply_markup=kb.as_markup())
+        await callback.message.answer(text, parse_mode="HTML", reply_markup=markup)
 
     await callback.answer("✅ Обновлено")
 
@@ -202,88 +170,27 @@ async def admin_detailed_stats_callback(callback: types.CallbackQuery):
 
     await callback.answer()
 
-    await bot.send_message(callback.message.chat.id, "⏳ Собираю статистику...")
-
-    with db.get_connection() as conn:
-        cursor = conn.cursor()
-
-        # Статистика по пользователям
-        cursor.execute("SELECT COUNT(*) FROM users")
-        total_users = cursor.fetchone()[0]
-        cursor.execute('SELECT COUNT(*) FROM users WHERE role = "seller"')
-        sellers = cursor.fetchone()[0]
-        cursor.execute('SELECT COUNT(*) FROM users WHERE role = "customer"')
-        customers = cursor.fetchone()[0]
-
-        # Статистика по магазинам
-        cursor.execute("SELECT COUNT(*) FROM stores")
-        total_stores = cursor.fetchone()[0]
-        cursor.execute('SELECT COUNT(*) FROM stores WHERE status = "active"')
-        approved_stores = cursor.fetchone()[0]
-        cursor.execute('SELECT COUNT(*) FROM stores WHERE status = "pending"')
-        pending_stores = cursor.fetchone()[0]
-        cursor.execute('SELECT COUNT(*) FROM stores WHERE status = "rejected"')
-        rejected_stores = cursor.fetchone()[0]
-
-        # Статистика по городам
-        cursor.execute(
-            "SELECT city, COUNT(*) FROM stores GROUP BY city ORDER BY COUNT(*) DESC LIMIT 5"
-        )
-        top_cities = cursor.fetchall()
-
-        # Статистика по категориям
-        cursor.execute(
-            "SELECT category, COUNT(*) FROM stores GROUP BY category ORDER BY COUNT(*) DESC LIMIT 5"
-        )
-        top_categories = cursor.fetchall()
-
-        # Статистика по предложениям
-        cursor.execute("SELECT COUNT(*) FROM offers")
-        total_offers = cursor.fetchone()[0]
-        cursor.execute('SELECT COUNT(*) FROM offers WHERE status = "active"')
-        active_offers = cursor.fetchone()[0]
-        cursor.execute('SELECT SUM(original_price) FROM offers WHERE status = "active"')
-        total_original_price = cursor.fetchone()[0] or 0
-        cursor.execute('SELECT SUM(discount_price) FROM offers WHERE status = "active"')
-        total_discounted_price = cursor.fetchone()[0] or 0
-
-        # Статистика по бронированиям
-        cursor.execute("SELECT COUNT(*) FROM bookings")
-        total_bookings = cursor.fetchone()[0]
-        cursor.execute('SELECT COUNT(*) FROM bookings WHERE status = "active"')
-        active_bookings = cursor.fetchone()[0]
-        cursor.execute('SELECT COUNT(*) FROM bookings WHERE status = "completed"')
-        completed_bookings = cursor.fetchone()[0]
-        cursor.execute('SELECT COUNT(*) FROM bookings WHERE status = "cancelled"')
-        cancelled_bookings = cursor.fetchone()[0]
-        cursor.execute('SELECT SUM(quantity) FROM bookings WHERE status IN ("active", "completed")')
-        total_quantity = cursor.fetchone()[0] or 0
-
-        # Доход (экономия покупателей)
-        cursor.execute(
-            """
-            SELECT SUM((o.original_price - o.discount_price) * b.quantity)
-            FROM bookings b
-            JOIN offers o ON b.offer_id = o.offer_id
-            WHERE b.status IN ("active", "completed")
-        """
-        )
-        total_savings = cursor.fetchone()[0] or 0
-
-        # Самые активные магазины
-        cursor.execute(
-            """
-            SELECT s.name, COUNT(b.booking_id) as bookings_count
-            FROM stores s
-            LEFT JOIN offers o ON s.store_id = o.store_id
-            LEFT JOIN bookings b ON o.offer_id = b.offer_id
-            WHERE b.status IN ("active", "completed")
-            GROUP BY s.store_id
-            ORDER BY bookings_count DESC
-            LIMIT 5
-        """
-        )
-        top_stores = cursor.fetchall()
+    snapshot = await run_sync_db(db.get_platform_stats_snapshot)
+    total_users = snapshot["users_total"]
+    sellers = snapshot["users_sellers"]
+    customers = snapshot["users_customers"]
+    total_stores = snapshot["stores_total"]
+    approved_stores = snapshot["stores_active"]
+    pending_stores = snapshot["stores_pending"]
+    rejected_stores = snapshot["stores_rejected"]
+    top_cities = snapshot["stores_top_cities"]
+    top_categories = snapshot["stores_top_categories"]
+    total_offers = snapshot["offers_total"]
+    active_offers = snapshot["offers_active"]
+    total_original_price = snapshot["offers_active_original_sum"]
+    total_discounted_price = snapshot["offers_active_discount_sum"]
+    total_bookings = snapshot["bookings_total"]
+    active_bookings = snapshot["bookings_active"]
+    completed_bookings = snapshot["bookings_completed"]
+    cancelled_bookings = snapshot["bookings_cancelled"]
+    total_quantity = int(snapshot["bookings_quantity"])
+    total_savings = snapshot["customer_savings"]
+    top_stores = snapshot["top_stores"]
 
     # Формируем текст
     text = "📈 <b>ДЕТАЛЬНАЯ АНАЛИТИКА</b>\n\n"
@@ -696,12 +603,10 @@ async def admin_all_offers_callback(callback: types.CallbackQuery):
         )
         offers = cursor.fetchall()
 
-        cursor.execute("SELECT COUNT(*) FROM offers")
-        total = cursor.fetchone()[0]
-        cursor.execute('SELECT COUNT(*) FROM offers WHERE status = "active"')
-        active = cursor.fetchone()[0]
-        cursor.execute('SELECT COUNT(*) FROM offers WHERE status = "deleted"')
-        deleted = cursor.fetchone()[0]
+    snapshot = await run_sync_db(db.get_platform_stats_snapshot)
+    total = snapshot["offers_total"]
+    active = snapshot["offers_active"]
+    deleted = snapshot["offers_deleted"]
 
     text = "📦 <b>Все товары</b>\n\n"
     text += "📊 Статистика:\n"
@@ -875,45 +780,17 @@ async def admin_bookings_stats_callback(callback: types.CallbackQuery):
         return
 
     await callback.answer()
+    snapshot = await run_sync_db(db.get_platform_stats_snapshot)
+    total = snapshot["bookings_total"]
+    active = snapshot["bookings_active"]
+    completed = snapshot["bookings_completed"]
+    cancelled = snapshot["bookings_cancelled"]
+    total_savings = snapshot["customer_savings"]
+    top_stores = snapshot["top_stores"]
+
     with db.get_connection() as conn:
         cursor = conn.cursor()
 
-        # Общая статистика
-        cursor.execute("SELECT COUNT(*) FROM bookings")
-        total = cursor.fetchone()[0]
-        cursor.execute('SELECT COUNT(*) FROM bookings WHERE status = "active"')
-        active = cursor.fetchone()[0]
-        cursor.execute('SELECT COUNT(*) FROM bookings WHERE status = "completed"')
-        completed = cursor.fetchone()[0]
-        cursor.execute('SELECT COUNT(*) FROM bookings WHERE status = "cancelled"')
-        cancelled = cursor.fetchone()[0]
-
-        # Экономия
-        cursor.execute(
-            """
-            SELECT SUM((o.original_price - o.discount_price) * b.quantity)
-            FROM bookings b
-            JOIN offers o ON b.offer_id = o.offer_id
-            WHERE b.status IN ('active', 'completed')
-        """
-        )
-        total_savings = cursor.fetchone()[0] or 0
-
-        # Топ магазинов по бронированиям
-        cursor.execute(
-            """
-            SELECT s.name, COUNT(b.booking_id) as cnt
-            FROM bookings b
-            JOIN offers o ON b.offer_id = o.offer_id
-            JOIN stores s ON o.store_id = s.store_id
-            WHERE b.status IN ('active', 'completed')
-            GROUP BY s.store_id
-            ORDER BY cnt DESC
-            LIMIT 5
-        """
-        )
-        top_stores = cursor.fetchall()
-
         # Топ покупателей
         cursor.execute(
             """
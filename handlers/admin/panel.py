@@ -11,9 +11,10 @@ from aiogram import F, Router, types
 from aiogram.filters import Command
 from aiogram.utils.keyboard import InlineKeyboardBuilder
 
+from app.core.async_db import run_sync_db
 from app.keyboards import admin_menu
 from database_protocol import DatabaseProtocol
-from handlers.common import get_uzb_time
+from handlers.admin.dashboard import format_dashboard
 from localization import get_text
 
 router = Router(name="admin_panel")
@@ -203,101 +204,9 @@ async def admin_dashboard(message: types.Message, db: DatabaseProtocol):
     if not db.is_admin(message.from_user.id):
         return
 
-    with db.get_connection() as conn:
-        cursor = conn.cursor()
-
-        # General statistics
-        cursor.execute("SELECT COUNT(*) FROM users")
-        total_users = cursor.fetchone()[0]
-
-        cursor.execute("SELECT COUNT(*) FROM users WHERE role = 'seller'")
-        sellers = cursor.fetchone()[0]
-
-        cursor.execute("SELECT COUNT(*) FROM users WHERE role = 'customer'")
-        customers = cursor.fetchone()[0]
-
-        # Stores
-        cursor.execute("SELECT COUNT(*) FROM stores WHERE status = 'active'")
-        active_stores = cursor.fetchone()[0]
-
-        cursor.execute("SELECT COUNT(*) FROM stores WHERE status = 'pending'")
-        pending_stores = cursor.fetchone()[0]
-
-        # Offers
-        cursor.execute("SELECT COUNT(*) FROM offers WHERE status = 'active'")
-        active_offers = cursor.fetchone()[0]
-
-        cursor.execute("SELECT COUNT(*) FROM offers WHERE status = 'inactive'")
-        inactive_offers = cursor.fetchone()[0]
-
-        # Bookings
-        cursor.execute("SELECT COUNT(*) FROM bookings")
-        total_bookings = cursor.fetchone()[0]
-
-        cursor.execute("SELECT COUNT(*) FROM bookings WHERE status = 'pending'")
-        pending_bookings = cursor.fetchone()[0]
-
-        # Today's statistics
-        today = get_uzb_time().strftime("%Y-%m-%d")
-
-        cursor.execute("SELECT COUNT(*) FROM bookings WHERE DATE(created_at) = %s", (today,))
-        today_bookings = cursor.fetchone()[0]
-
-        cursor.execute(
-            """
-            SELECT SUM(o.discount_price * b.quantity)
-            FROM bookings b
-            JOIN offers o ON b.offer_id = o.offer_id
-            WHERE DATE(b.created_at) = %s AND b.status != %s
-        """,
-            (today, "cancelled"),
-        )
-        today_revenue = cursor.fetchone()[0] or 0
-
-        # New users today
-        cursor.execute(
-            """
-            SELECT COUNT(*) FROM users
-            WHERE DATE(created_at) = %s
-        """,
-            (today,),
-        )
-        today_users = cursor.fetchone()[0]
-
-    # Format message
-    text = "📊 <b>Dashboard - Общая статистика</b>\n\n"
-
-    text += "👥 <b>Пользователи:</b>\n"
-    text += f"├ Всего: {total_users} (+{today_users} сегодня)\n"
-    text += f"├ 🏪 Партнёры: {sellers}\n"
-    text += f"└ 🛍 Покупатели: {customers}\n\n"
-
-    text += "🏪 <b>Магазины:</b>\n"
-    text += f"├ ✅ Активные: {active_stores}\n"
-    text += f"└ ⏳ На модерации: {pending_stores}\n\n"
-
-    text += "📦 <b>Товары:</b>\n"
-    text += f"├ ✅ Активные: {active_offers}\n"
-    text += f"└ ❌ Неактивные: {inactive_offers}\n\n"
-
-    text += "🎫 <b>Бронирования:</b>\n"
-    text += f"├ Всего: {total_bookings}\n"
-    text += f"├ ⏳ Активные: {pending_bookings}\n"
-    text += f"└ 📅 Сегодня: {today_bookings}\n\n"
-
-    text += f"💰 <b>Выручка сегодня:</b> {int(today_revenue):,} сум"
-
-    # Inline buttons for quick actions
-    kb = InlineKeyboardBuilder()
-
-    if pending_stores > 0:
-        kb.button(text=f"⏳ Модерация ({pending_stores})", callback_data="admin_moderation")
-
-    kb.button(text="📊 Детальная статистика", callback_data="admin_detailed_stats")
-    kb.button(text="🔄 Обновить", callback_data="admin_refresh_dashboard")
-    kb.adjust(1)
-
-    await message.answer(text, parse_mode="HTML", reply_markup=kb.as_markup())
+    snapshot = await run_sync_db(db.get_platform_stats_snapshot)
+    text, markup = format_dashboard(snapshot)
+    await message.answer(text, parse_mode="HTML", reply_markup=markup)
 
 
 @router.message(F.text == "🔙 Выход")
@@ -8,6 +8,7 @@ from __future__ import annotations
 import html
 from typing import Any
 
+from app.core.offer_lookup import fetch_offers_by_ids
 from app.core.units import effective_order_unit
 from app.core.utils import get_offer_field, get_store_field
 from localization import get_text
@@ -52,14 +53,17 @@ def refresh_cart_items(user_id: int, lang: str) -> tuple[list[str], bool]:
     delivery_price = int(get_store_field(store, "delivery_price", 0) or 0)
     delivery_changed = False
 
-    can_refresh_offer = hasattr(db, "get_offer")
+    can_refresh_offer = hasattr(db, "get_offers_by_ids") or hasattr(db, "get_offer")
+    offers = (
+        fetch_offers_by_ids(db, [item.offer_id for item in items]) if can_refresh_offer else {}
+    )
 
     for item in items:
         item_changed = False
         if item.delivery_enabled and not delivery_enabled:
             delivery_changed = True
 
-        offer = db.get_offer(item.offer_id) if can_refresh_offer else None
+        offer = offers.get(int(item.offer_id))
         if not can_refresh_offer:
             resolved_delivery_enabled = bool(delivery_enabled)
             resolved_delivery_price = delivery_price if delivery_enabled else 0
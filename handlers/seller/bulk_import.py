@@ -1,15 +1,28 @@
 """Bulk import of offers via media group (photo albums) and CSV+ZIP."""
-import csv
-import io
+import asyncio
+import os
+import tempfile
+import time
 import zipfile
-from datetime import datetime
+from datetime import datetime, timedelta
 from typing import Any
 
 from aiogram import F, Router, types
+from aiogram.exceptions import TelegramRetryAfter
 from aiogram.fsm.context import FSMContext
 from aiogram.fsm.state import State, StatesGroup
 from aiogram.utils.keyboard import InlineKeyboardBuilder
 
+from app.services.offer_import import (
+    IMPORT_CHUNK_SIZE,
+    ImportFormatError,
+    ImportResult,
+    open_csv_text,
+    parse_offer_rows,
+    write_offer_rows,
+)
+from app.services.photo_archive import PhotoArchive
+
 # Module-level dependencies
 db: Any = None
 bot: Any = None
@@ -44,6 +57,45 @@ def _get_accessible_store(user_id: int) -> Any | None:
     return None
 
 
+# Photos prepared and uploaded at once; Telegram throttles bursts per chat
+PHOTO_UPLOAD_CONCURRENCY = int(os.getenv("IMPORT_PHOTO_CONCURRENCY", "3"))
+# Seconds between progress edits of the status message
+PROGRESS_EDIT_INTERVAL = 3.0
+
+BULK_CSV_REQUIRED_FIELDS = (
+    "photo_file",
+    "title",
+    "original_price",
+    "discount_price",
+    "quantity",
+    "expiry_date",
+)
+
+
+def _map_bulk_row(row: dict[str, str]) -> dict[str, Any]:
+    """Validate one CSV+ZIP row; the result must stay JSON-serializable for FSM state."""
+    title = (row.get("title") or "").strip()
+    photo_file = (row.get("photo_file") or "").strip()
+    if not title:
+        raise ValueError("пустое название")
+    if not photo_file:
+        raise ValueError("не указан photo_file")
+    try:
+        expiry_date = datetime.fromisoformat(row["expiry_date"].strip()).date()
+    except ValueError:
+        raise ValueError(f"неверная дата '{row['expiry_date']}'") from None
+    return {
+        "photo_file": photo_file,
+        "title": title,
+        "description": row.get("description") or "",
+        "original_price": int(float(row["original_price"])),
+        "discount_price": int(float(row["discount_price"])),
+        "quantity": int(float(row["quantity"])),
+        "expiry_date": expiry_date.isoformat(),
+        "unit": row.get("unit") or "шт",
+    }
+
+
 class BulkImport(StatesGroup):
     waiting_photos = State()
     waiting_csv = State()
@@ -552,54 +604,26 @@ async def receive_csv(message: types.Message, state: FSMContext):
         return
 
     try:
-        # Download CSV file
+        # Download CSV file and validate it row by row while streaming
         file = await bot.download(message.document)
-        csv_content = file.read().decode("utf-8-sig")  # Handle BOM
-
-        # Parse CSV
-        csv_reader = csv.DictReader(io.StringIO(csv_content))
-        products = list(csv_reader)
-
-        if not products:
-            await message.answer("CSV файл пустой" if lang == "ru" else "CSV fayl bo'sh")
-            return
-
-        # Validate CSV structure
-        required_fields = [
-            "photo_file",
-            "title",
-            "original_price",
-            "discount_price",
-            "quantity",
-            "expiry_date",
-        ]
-        missing_fields = [f for f in required_fields if f not in products[0]]
-
-        if missing_fields:
-            await message.answer(
-                f"В CSV отсутствуют обязательные поля: {', '.join(missing_fields)}"
-                if lang == "ru"
-                else f"CSV da majburiy maydonlar yo'q: {', '.join(missing_fields)}"
+        csv_check = ImportResult()
+        products = [
+            [row_number, offer]
+            for chunk in parse_offer_rows(
+                open_csv_text(file),
+                _map_bulk_row,
+                csv_check,
+                required_columns=BULK_CSV_REQUIRED_FIELDS,
             )
-            return
-
-        # Save products to state
-        await state.update_data(products=products)
-
+            for row_number, offer in chunk
+        ]
+    except ImportFormatError as e:
         await message.answer(
-            f"CSV загружен: <b>{len(products)} товаров</b>\n\n"
-            f"<b>Теперь отправьте ZIP архив с фотографиями</b>\n"
-            f"Имена файлов должны совпадать с CSV.\n\n"
-            f"Отмена - /cancel"
+            f"В CSV отсутствуют обязательные поля: {e}"
             if lang == "ru"
-            else f"CSV yuklandi: <b>{len(products)} mahsulot</b>\n\n"
-            f"<b>Endi rasmlar bilan ZIP arxivni yuboring</b>\n\n"
-            f"Bekor qilish - /cancel",
-            parse_mode="HTML",
+            else f"CSV da majburiy maydonlar yo'q: {e}"
         )
-
-        await state.set_state(BulkImport.waiting_zip)
-
+        return
     except Exception as e:
         print(f"Error parsing CSV: {e}")
         await message.answer(
@@ -607,6 +631,61 @@ async def receive_csv(message: types.Message, state: FSMContext):
             if lang == "ru"
             else "CSV faylni o'qishda xato. Formatni tekshiring."
         )
+        return
+
+    if not csv_check.total_rows:
+        await message.answer("CSV файл пустой" if lang == "ru" else "CSV fayl bo'sh")
+        return
+
+    # Save validated products to state
+    await state.update_data(
+        products=products,
+        csv_failed=csv_check.failed,
+        csv_errors=csv_check.error_lines("Строка {row}: {message}", limit=10),
+    )
+
+    text = (
+        f"CSV загружен: <b>{len(products)} товаров</b>\n\n"
+        if lang == "ru"
+        else f"CSV yuklandi: <b>{len(products)} mahsulot</b>\n\n"
+    )
+    if csv_check.failed:
+        text += (
+            f"Строк с ошибками: <b>{csv_check.failed}</b>\n"
+            if lang == "ru"
+            else f"Xato qatorlar: <b>{csv_check.failed}</b>\n"
+        )
+        text += "\n".join(csv_check.error_lines("Строка {row}: {message}", limit=5)) + "\n\n"
+    text += (
+        "<b>Теперь отправьте ZIP архив с фотографиями</b>\n"
+        "Имена файлов должны совпадать с CSV.\n\n"
+        "Отмена - /cancel"
+        if lang == "ru"
+        else "<b>Endi rasmlar bilan ZIP arxivni yuboring</b>\n\n"
+        "Bekor qilish - /cancel"
+    )
+    await message.answer(text, parse_mode="HTML")
+
+    await state.set_state(BulkImport.waiting_zip)
+
+
+async def _upload_photo(message: types.Message, photo: bytes, filename: str) -> str:
+    """Upload a photo through the chat to get a reusable file_id."""
+    for _ in range(3):
+        try:
+            photo_msg = await message.answer_photo(
+                types.BufferedInputFile(photo, filename=filename), disable_notification=True
+            )
+            break
+        except TelegramRetryAfter as e:
+            await asyncio.sleep(e.retry_after)
+    else:
+        raise RuntimeError("Telegram rate limit")
+    try:
+        await photo_msg.delete()  # Clean up
+    except Exception:
+        pass
+    return photo_msg.photo[-1].file_id
 
 
 @router.message(BulkImport.waiting_zip, F.document)
@@ -624,6 +703,9 @@ async def receive_zip(message: types.Message, state: FSMContext):
         await message.answer("Отправьте ZIP архив" if lang == "ru" else "ZIP arxiv yuboring")
         return
 
+    # Spool the archive to disk instead of holding it (and every photo) in memory
+    fd, zip_path = tempfile.mkstemp(suffix=".zip")
+    os.close(fd)
     try:
         # Get store
         store = _get_accessible_store(user_id)
@@ -634,27 +716,9 @@ async def receive_zip(message: types.Message, state: FSMContext):
 
         store_id = store.get("store_id") if isinstance(store, dict) else store[0]
 
-        # Download ZIP file
-        file = await bot.download(message.document)
-        zip_content = file.read()
-
-        # Parse ZIP
-        with zipfile.ZipFile(io.BytesIO(zip_content)) as zip_file:
-            photo_files = {
-                name: zip_file.read(name)
-                for name in zip_file.namelist()
-                if name.lower().endswith((".jpg", ".jpeg", ".png"))
-            }
-
-        if not photo_files:
-            await message.answer(
-                "В ZIP архиве нет фотографий" if lang == "ru" else "ZIP arxivda rasmlar yo'q"
-            )
-            return
-
         # Get products from state
-        data = await state.get_data()
-        products = data.get("products", [])
+        data_state = await state.get_data()
+        products = data_state.get("products", [])
 
         if not products:
             await message.answer(
@@ -663,89 +727,30 @@ async def receive_zip(message: types.Message, state: FSMContext):
             await state.set_state(BulkImport.waiting_csv)
             return
 
-        await message.answer(
-            f"<b>Обрабатываю {len(products)} товаров...</b>\n"
-            f"Загрузка фото в Telegram...\n"
-            f"Добавление в базу данных..."
-            if lang == "ru"
-            else f"<b>{len(products)} mahsulot qayta ishlanmoqda...</b>"
-        )
+        await bot.download(message.document, destination=zip_path)
 
-        # Process each product
-        success_count = 0
-        failed_count = 0
-        errors = []
-
-        for idx, product in enumerate(products, 1):
-            try:
-                photo_name = product["photo_file"].strip()
-
-                # Find photo in ZIP (case insensitive)
-                photo_data = None
-                for zip_name, data in photo_files.items():
-                    if (
-                        zip_name.lower().endswith(photo_name.lower())
-                        or photo_name.lower() in zip_name.lower()
-                    ):
-                        photo_data = data
-                        break
-
-                if not photo_data:
-                    errors.append(f"{idx}. {product['title']}: фото {photo_name} не найдено")
-                    failed_count += 1
-                    continue
-
-                # Upload photo to Telegram
-                photo_file = types.BufferedInputFile(photo_data, filename=photo_name)
-                photo_msg = await message.answer_photo(photo_file)
-                photo_file_id = photo_msg.photo[-1].file_id
-                await photo_msg.delete()  # Clean up
-
-                # Parse product data
-                title = product["title"]
-                description = product.get("description", "")
-                original_price = float(product["original_price"])
-                discount_price = float(product["discount_price"])
-                quantity = int(product["quantity"])
-                expiry_date = product["expiry_date"]
-                unit = product.get("unit", "шт")
-
-                # Validate
-                if discount_price >= original_price:
-                    errors.append(f"{idx}. {title}: цена со скидкой >= обычной")
-                    failed_count += 1
-                    continue
-
-                # Add to database
-                from datetime import datetime, timedelta
-
-                now = datetime.now()
-                available_from = now.strftime("%Y-%m-%d %H:%M:%S")
-                available_until = (now + timedelta(days=30)).strftime("%Y-%m-%d %H:%M:%S")
-
-                # Store prices directly as entered
-                original_price_value = int(original_price)
-                discount_price_value = int(discount_price)
-
-                db.add_offer(
-                    store_id=store_id,
-                    title=title,
-                    description=description,
-                    original_price=original_price_value,
-                    discount_price=discount_price_value,
-                    quantity=quantity,
-                    available_from=available_from,
-                    available_until=available_until,
-                    expiry_date=expiry_date,
-                    unit=unit,
-                    photo_id=photo_file_id,
+        with PhotoArchive(zip_path) as archive:
+            if not len(archive):
+                await message.answer(
+                    "В ZIP архиве нет фотографий" if lang == "ru" else "ZIP arxivda rasmlar yo'q"
                 )
+                return
 
-                success_count += 1
+            status_msg = await message.answer(
+                f"<b>Обрабатываю {len(products)} товаров...</b>"
+                if lang == "ru"
+                else f"<b>{len(products)} mahsulot qayta ishlanmoqda...</b>",
+                parse_mode="HTML",
+            )
+            result = await _import_zip_products(
+                message, status_msg, archive, store_id, products, lang
+            )
 
-            except Exception as e:
-                errors.append(f"{idx}. {product.get('title', '-')}: {str(e)}")
-                failed_count += 1
+        success_count = result.imported
+        failed_count = result.failed + data_state.get("csv_failed", 0)
+        errors = data_state.get("csv_errors", []) + result.error_lines(
+            "Строка {row}: {message}"
+        )
 
         # Result
         result_text = (
@@ -765,10 +770,10 @@ async def receive_zip(message: types.Message, state: FSMContext):
             )
             if errors:
                 result_text += "\n<b>Детали:</b>\n" + "\n".join(errors[:10])
-                if len(errors) > 10:
-                    result_text += f"\n\n...\u0438 еще {len(errors)-10} ошибок"
+                if failed_count > 10:
+                    result_text += f"\n\n...\u0438 еще {failed_count - 10} ошибок"
 
-        await message.answer(result_text, parse_mode="HTML")
+        await status_msg.edit_text(result_text, parse_mode="HTML")
         await state.clear()
 
     except zipfile.BadZipFile:
@@ -780,6 +785,64 @@ async def receive_zip(message: types.Message, state: FSMContext):
         await message.answer(
             "Ошибка при обработке архива" if lang == "ru" else "Arxivni qayta ishlashda xato"
         )
+    finally:
+        os.unlink(zip_path)
+
+
+async def _import_zip_products(
+    message: types.Message,
+    status_msg: types.Message,
+    archive: PhotoArchive,
+    store_id: int,
+    products: list,
+    lang: str,
+) -> ImportResult:
+    """Attach archive photos to validated CSV rows and write them in chunks."""
+    result = ImportResult()
+    now = datetime.now()
+    available_from = now.strftime("%Y-%m-%d %H:%M:%S")
+    available_until = (now + timedelta(days=30)).strftime("%Y-%m-%d %H:%M:%S")
+    upload_slots = asyncio.Semaphore(PHOTO_UPLOAD_CONCURRENCY)
+    done = 0
+    last_progress = time.monotonic()
+
+    async def attach_photo(row_number: int, product: dict) -> tuple[int, dict] | None:
+        nonlocal done, last_progress
+        photo_name = product.pop("photo_file")
+        try:
+            member = archive.find(photo_name)
+            if member is None:
+                result.add_error(row_number, f"фото {photo_name} не найдено")
+                return None
+            async with upload_slots:
+                # Decompress + resize in a worker thread, keep the loop free
+                photo = await asyncio.to_thread(archive.read_jpeg, member)
+                product["photo_id"] = await _upload_photo(message, photo, f"{row_number}.jpg")
+        except Exception as e:
+            result.add_error(row_number, f"{product.get('title', '-')}: {e}")
+            return None
+        finally:
+            done += 1
+            if time.monotonic() - last_progress >= PROGRESS_EDIT_INTERVAL:
+                last_progress = time.monotonic()
+                try:
+                    await status_msg.edit_text(
+                        f"Обработано {done} из {len(products)}..."
+                        if lang == "ru"
+                        else f"{len(products)} dan {done} tasi qayta ishlandi..."
+                    )
+                except Exception:
+                    pass
+        product.update(available_from=available_from, available_until=available_until)
+        return row_number, product
+
+    for start in range(0, len(products), IMPORT_CHUNK_SIZE):
+        batch = products[start : start + IMPORT_CHUNK_SIZE]
+        attached = await asyncio.gather(*(attach_photo(row, item) for row, item in batch))
+        chunk = [item for item in attached if item is not None]
+        if chunk:
+            await write_offer_rows(db, store_id, chunk, result)
+    return result
 
 
 @router.message(BulkImport.waiting_photos, F.text == "/cancel")
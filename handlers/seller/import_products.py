@@ -4,6 +4,7 @@ Handlers for product import and auto-discount features.
 
 from __future__ import annotations
 
+import time
 from typing import Any
 
 from aiogram import F, Router, types
@@ -16,6 +17,7 @@ from app.integrations.onec_integration import (
     OneCIntegration,
 )
 from app.services.auto_discount_service import AutoDiscountService
+from app.services.offer_import import ImportResult
 from logging_config import logger
 
 router = Router(name="import")
@@ -33,6 +35,9 @@ db: Any = None
 bot: Any = None
 auto_discount_service: AutoDiscountService | None = None
 
+# Seconds between progress edits of the "processing" message
+IMPORT_PROGRESS_INTERVAL = 3.0
+
 
 def setup_dependencies(database: Any, bot_instance: Any) -> None:
     """Setup module dependencies."""
@@ -188,7 +193,6 @@ async def process_import_file(message: types.Message, state: FSMContext) -> None
     try:
         file = await bot.get_file(message.document.file_id)
         file_content = await bot.download_file(file.file_path)
-        content = file_content.read()
     except Exception as e:
         logger.error(f"Failed to download file: {e}")
         await message.answer("Не удалось загрузить файл")
@@ -197,9 +201,28 @@ async def process_import_file(message: types.Message, state: FSMContext) -> None
     # Show processing message
     processing_msg = await message.answer("Обрабатываю файл...")
 
+    last_progress = time.monotonic()
+
+    async def report_progress(progress: ImportResult) -> None:
+        nonlocal last_progress
+        # Telegram throttles message edits, so report at most every few seconds
+        if time.monotonic() - last_progress < IMPORT_PROGRESS_INTERVAL:
+            return
+        last_progress = time.monotonic()
+        try:
+            await processing_msg.edit_text(
+                f"Обрабатываю файл... {progress.total_rows}"
+                if lang == "ru"
+                else f"Fayl qayta ishlanmoqda... {progress.total_rows}"
+            )
+        except Exception as e:
+            logger.debug(f"Import progress update failed: {e}")
+
     # Import products
     try:
-        result = await auto_discount_service.import_from_csv(store_id, content, user_id)
+        result = await auto_discount_service.import_from_csv(
+            store_id, file_content, user_id, on_progress=report_progress
+        )
     except Exception as e:
         logger.error(f"Import failed: {e}")
         await processing_msg.edit_text(f"Ошибка импорта: {e}")
@@ -629,60 +652,35 @@ async def sync_from_1c(callback: types.CallbackQuery) -> None:
 
     await callback.answer("Синхронизация...")
 
-    # Fetch products from 1C
-    products = await integration.fetch_expiring_products()
+    stats = await integration.sync_to_store(store_id, db, auto_discount_service)
 
-    if not products:
+    if not stats["fetched"]:
         if lang == "uz":
             await callback.message.answer("1C da muddati tugayotgan mahsulotlar topilmadi")
         else:
             await callback.message.answer("В 1С нет товаров с истекающим сроком годности")
         return
 
-    # Import products with auto-discount
-    imported = 0
-    errors = 0
-
-    for product in products:
-        try:
-            # Calculate discount
-            discount = auto_discount_service.calculate_discount(product.expiry_date, product.price)
-
-            # Skip if no discount needed
-            if discount.discount_percent == 0:
-                continue
-
-            # Create offer
-            db.create_offer(
-                store_id=store_id,
-                title=product.name,
-                description=f"[1C:{product.code}] {discount.urgency_message}",
-                original_price=product.price,
-                discount_price=discount.discount_price,
-                quantity=product.quantity,
-                category=product.category,
-                expiry_date=product.expiry_date.strftime("%Y-%m-%d"),
-            )
-            imported += 1
-
-        except Exception as e:
-            logger.error(f"1C import error for {product.code}: {e}")
-            errors += 1
-
     # Result message
     if lang == "uz":
         text = (
             f"<b>1C dan import yakunlandi</b>\n\n"
-            f"Topildi: {len(products)}\n"
-            f"Import qilindi: {imported}\n"
-            f"Xatolar: {errors}"
+            f"Topildi: {stats['fetched']}\n"
+            f"Yangi: {stats['imported']}\n"
+            f"Yangilandi: {stats['updated']}\n"
+            f"O'zgarmagan: {stats['unchanged']}\n"
+            f"O'chirildi: {stats['deactivated']}\n"
+            f"Xatolar: {stats['errors']}"
         )
     else:
         text = (
             f"<b>Импорт из 1С завершён</b>\n\n"
-            f"Найдено: {len(products)}\n"
-            f"Импортировано: {imported}\n"
-            f"Ошибок: {errors}"
+            f"Найдено: {stats['fetched']}\n"
+            f"Новых: {stats['imported']}\n"
+            f"Обновлено: {stats['updated']}\n"
+            f"Без изменений: {stats['unchanged']}\n"
+            f"Снято с продажи: {stats['deactivated']}\n"
+            f"Ошибок: {stats['errors']}"
         )
 
     await callback.message.answer(text, parse_mode="HTML")
@@ -4,6 +4,7 @@ from datetime import datetime, time
 from zoneinfo import ZoneInfo
 from decimal import Decimal
 
+from app.core.async_db import run_sync_db
 from app.services.stats import get_partner_stats, Period
 from localization import get_text
 
@@ -66,6 +67,8 @@ async def partner_stats_today(message: types.Message):
     # Partner ID = user_id; store_id optional
     partner_id = user_id
     store_id = None
-    stats = get_partner_stats(db=db, partner_id=partner_id, period=period, tz=tz, store_id=store_id)
+    stats = await run_sync_db(
+        get_partner_stats, db=db, partner_id=partner_id, period=period, tz=tz, store_id=store_id
+    )
     text = _render_partner_stats_card(stats)
     await message.answer(text)
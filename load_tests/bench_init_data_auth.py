@@ -0,0 +1,97 @@
+"""Microbenchmark for Telegram initData verification (Mini App + partner panel).
+
+Compares the cold path (parse + HMAC on every call, i.e. the behaviour before
+the verification cache) with the cached path for a single initData, which is
+what a Mini App session sends on every request.
+
+Usage (PowerShell):
+  python .\\load_tests\\bench_init_data_auth.py
+
+Optional:
+  $env:BENCH_ITERATIONS = "20000"
+"""
+from __future__ import annotations
+
+import hashlib
+import hmac
+import json
+import os
+import sys
+import time
+import timeit
+from pathlib import Path
+from urllib.parse import urlencode
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+os.environ.setdefault("TELEGRAM_BOT_TOKEN", "123456:bench-token")
+os.environ.setdefault("BOT_TOKEN", os.environ["TELEGRAM_BOT_TOKEN"])
+
+from app.api import partner_panel_simple  # noqa: E402
+from app.api.webapp.common import validate_init_data  # noqa: E402
+from app.core.init_data_cache import init_data_cache  # noqa: E402
+
+ITERATIONS = int(os.getenv("BENCH_ITERATIONS", "20000"))
+BOT_TOKEN = os.environ["TELEGRAM_BOT_TOKEN"]
+
+
+def build_init_data(bot_token: str, user_id: int = 424242) -> str:
+    fields = {
+        "auth_date": str(int(time.time())),
+        "query_id": "AAHdF6IQAAAAAN0XohDhrOrc",
+        "user": json.dumps(
+            {"id": user_id, "first_name": "Bench", "language_code": "ru"},
+            separators=(",", ":"),
+        ),
+    }
+    data_check_string = "\n".join(f"{k}={v}" for k, v in sorted(fields.items()))
+    secret_key = hmac.new(b"WebAppData", bot_token.encode(), hashlib.sha256).digest()
+    fields["hash"] = hmac.new(
+        secret_key, data_check_string.encode(), hashlib.sha256
+    ).hexdigest()
+    return urlencode(fields)
+
+
+def _report(name: str, cold: float, warm: float) -> None:
+    cold_us = cold / ITERATIONS * 1e6
+    warm_us = warm / ITERATIONS * 1e6
+    print(
+        f"{name:<24} uncached {cold_us:7.2f} us/call   cached {warm_us:7.2f} us/call"
+        f"   speedup x{cold_us / warm_us:.1f}"
+    )
+
+
+def main() -> None:
+    init_data = build_init_data(BOT_TOKEN)
+    authorization = f"tma {init_data}"
+
+    def webapp_cold() -> None:
+        init_data_cache.clear()
+        validate_init_data(init_data, BOT_TOKEN)
+
+    def webapp_warm() -> None:
+        validate_init_data(init_data, BOT_TOKEN)
+
+    def partner_cold() -> None:
+        init_data_cache.clear()
+        partner_panel_simple.verify_telegram_webapp(authorization)
+
+    def partner_warm() -> None:
+        partner_panel_simple.verify_telegram_webapp(authorization)
+
+    assert validate_init_data(init_data, BOT_TOKEN)["user"]["id"] == 424242
+    # Cold timings include one clear() per call; it is negligible next to HMAC.
+    _report(
+        "webapp validate_init_data",
+        timeit.timeit(webapp_cold, number=ITERATIONS),
+        timeit.timeit(webapp_warm, number=ITERATIONS),
+    )
+    _report(
+        "partner verify (tma)",
+        timeit.timeit(partner_cold, number=ITERATIONS),
+        timeit.timeit(partner_warm, number=ITERATIONS),
+    )
+
+
+if __name__ == "__main__":
+    main()
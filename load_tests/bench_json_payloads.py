@@ -0,0 +1,95 @@
+"""Microbenchmark for JSON encoding of offer list responses.
+
+Compares, for a page of offers:
+- aiohttp webhook routes: stdlib ``web.json_response`` vs ``fast_runtime.json_response``
+- FastAPI cache hits: re-validating a cached dict list against the response
+  model and serializing it vs sending pre-serialized bytes
+
+Usage (PowerShell):
+  python .\\load_tests\\bench_json_payloads.py
+
+Optional:
+  $env:BENCH_ITERATIONS = "2000"
+  $env:BENCH_PAGE_SIZE = "50"
+"""
+from __future__ import annotations
+
+import os
+import sys
+import timeit
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+os.environ.setdefault("TELEGRAM_BOT_TOKEN", "123456:bench-token")
+
+from aiohttp import web  # noqa: E402
+from pydantic import TypeAdapter  # noqa: E402
+
+from app.api.webapp.common import OfferResponse  # noqa: E402
+from app.core import fast_runtime  # noqa: E402
+from app.core.webhook_helpers import offer_to_dict  # noqa: E402
+
+ITERATIONS = int(os.getenv("BENCH_ITERATIONS", "2000"))
+PAGE_SIZE = int(os.getenv("BENCH_PAGE_SIZE", "50"))
+
+
+def sample_page() -> list[dict]:
+    return [
+        offer_to_dict(
+            {
+                "offer_id": i,
+                "title": f"Молоко 3.2% {i}",
+                "description": "Свежий товар со скидкой до конца дня",
+                "original_price": 15000,
+                "discount_price": 9000,
+                "discount_percent": 40,
+                "quantity": 12,
+                "category": "dairy",
+                "store_id": 7,
+                "store_name": "Korzinka",
+                "address": "Tashkent, Amir Temur 1",
+                "delivery_enabled": True,
+                "delivery_price": 10000,
+                "min_order_amount": 30000,
+                "photo": "AgACAgIAAxkBAAIB" + "x" * 60,
+                "expiry_date": "2026-10-19",
+            }
+        )
+        for i in range(PAGE_SIZE)
+    ]
+
+
+def report(label: str, seconds: float) -> None:
+    print(f"{label:<46} {seconds / ITERATIONS * 1e6:9.1f} us/op")
+
+
+def main() -> None:
+    page = sample_page()
+    adapter = TypeAdapter(list[OfferResponse])
+    cached_dicts = [OfferResponse(**offer).model_dump() for offer in page]
+    cached_bytes = adapter.dump_json(adapter.validate_python(cached_dicts))
+
+    print(f"runtime: {fast_runtime.runtime_summary()}, page={PAGE_SIZE}, n={ITERATIONS}")
+    report(
+        "aiohttp web.json_response (stdlib)",
+        timeit.timeit(lambda: web.json_response(page), number=ITERATIONS),
+    )
+    report(
+        "aiohttp fast_runtime.json_response",
+        timeit.timeit(lambda: fast_runtime.json_response(page), number=ITERATIONS),
+    )
+    report(
+        "Cache hit: validate cached dicts + dump",
+        timeit.timeit(
+            lambda: adapter.dump_json(adapter.validate_python(cached_dicts)), number=ITERATIONS
+        ),
+    )
+    report(
+        "Cache hit: pre-serialized bytes",
+        timeit.timeit(lambda: fast_runtime.raw_json_response(cached_bytes), number=ITERATIONS),
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""Benchmark for building seller/customer order notification cards.
+
+Renders BENCH_CARDS cards (default 10k) the way an order lifecycle does:
+the seller card, the customer card and the NotificationBuilder card for
+each status change of pickup and delivery orders in both languages.
+Reports cards/s with the compiled templates warm, and with the template
+caches cleared before every card (what each card cost before templates
+were compiled once per lang/status/order_type).
+
+Usage (PowerShell):
+  python .\\load_tests\\bench_notification_cards.py
+
+Optional:
+  $env:BENCH_CARDS = "10000"
+"""
+from __future__ import annotations
+
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+os.environ.setdefault("TELEGRAM_BOT_TOKEN", "bench-token")
+
+from app.services import notification_builder, unified_order_service  # noqa: E402
+from app.services.notification_builder import NotificationBuilder  # noqa: E402
+from app.services.unified_order_service import NotificationTemplates  # noqa: E402
+
+CARDS = int(os.getenv("BENCH_CARDS", "10000"))
+LIFECYCLES = {
+    "pickup": ("pending", "preparing", "ready", "completed"),
+    "delivery": ("pending", "preparing", "ready", "delivering", "completed"),
+}
+ITEMS = [
+    {"title": "Non <issiq>", "quantity": 2, "price": 4500},
+    {"title": "Sut 1L", "quantity": 1, "price": 12000},
+    {"title": "Pishloq & co", "quantity": 0.5, "price": 80000},
+]
+CACHES = (
+    notification_builder.cached_text,
+    notification_builder._card_head,
+    unified_order_service._seller_card_template,
+    unified_order_service._customer_card_template,
+)
+
+
+def _card_args() -> list[tuple]:
+    args = []
+    order_id = 100000
+    while len(args) < CARDS:
+        for lang in ("ru", "uz"):
+            for order_type, statuses in LIFECYCLES.items():
+                order_id += 1
+                for status in statuses:
+                    args.append((lang, order_id, status, order_type))
+    return args[:CARDS]
+
+
+def _build(lang: str, order_id: int, status: str, order_type: str) -> int:
+    seller = NotificationTemplates._build_seller_card(
+        lang=lang,
+        order_id=order_id,
+        status=status,
+        order_type=order_type,
+        items=ITEMS,
+        customer_name="Aziz <Karimov>",
+        customer_phone="+998901234567",
+        total=0,
+        delivery_price=15000,
+        currency="so'm",
+        created_at="2026-10-18 12:30:00",
+    )
+    customer = NotificationTemplates._build_customer_card(
+        lang=lang,
+        order_id=order_id,
+        status=status,
+        order_type=order_type,
+        total=None,
+        delivery_price=15000,
+        currency="so'm",
+        store_name="Fresh Bakery",
+        store_address="Amir Temur 1",
+        delivery_address="Chilonzor 9",
+        pickup_code="AB12",
+        items=ITEMS,
+    )
+    builder = NotificationBuilder("pickup" if order_type == "pickup" else "delivery").build(
+        status=status,
+        lang=lang,
+        order_id=order_id,
+        store_name="Fresh Bakery",
+        items=ITEMS,
+        payment_method="click",
+        payment_status="confirmed",
+        role="seller",
+    )
+    return len(seller) + len(customer) + len(builder)
+
+
+def _run(args: list[tuple], cold: bool) -> float:
+    started = time.perf_counter()
+    for card in args:
+        if cold:
+            for cache in CACHES:
+                cache.cache_clear()
+        _build(*card)
+    return time.perf_counter() - started
+
+
+def main() -> None:
+    args = _card_args()
+    _run(args[:100], cold=False)  # imports, first compile
+    cold = _run(args, cold=True)
+    warm = _run(args, cold=False)
+    print(f"cards={CARDS} (x3 renders: seller, customer, builder)")
+    print(f"uncached templates: {CARDS / cold:,.0f} cards/s, {cold / CARDS * 1e6:.1f} us/card")
+    print(f"compiled templates: {CARDS / warm:,.0f} cards/s, {warm / CARDS * 1e6:.1f} us/card")
+    print(f"speedup: {cold / warm:.1f}x")
+    for cache in CACHES:
+        print(f"{cache.__name__}: {cache.cache_info()}")
+
+
+if __name__ == "__main__":
+    main()
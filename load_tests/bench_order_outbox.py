@@ -0,0 +1,108 @@
+"""Benchmark for the order_events outbox relay.
+
+Writes status events for a number of orders into ``order_events`` while
+relays drain it with stub consumers (a short sleep standing in for the
+Telegram call), and reports relay throughput and write->relay lag from
+the ``fudly_order_events_*`` metrics.
+
+WARNING: This writes to the provided database (order ids from
+BENCH_FIRST_ORDER_ID up, which need not exist). Only run against a
+staging/test DB.
+
+Usage (PowerShell):
+  $env:DATABASE_URL = "postgresql://..."
+  python .\\load_tests\\bench_order_outbox.py
+
+Optional:
+  $env:BENCH_ORDERS = "500"
+  $env:BENCH_EVENTS_PER_ORDER = "4"
+  $env:BENCH_RELAYS = "2"
+  $env:BENCH_CONSUMER_MS = "20"
+"""
+from __future__ import annotations
+
+import asyncio
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.core.metrics import metrics  # noqa: E402
+from app.services.order_events import STATUS_CHANGED, OrderEventRelay  # noqa: E402
+from database_pg import Database  # noqa: E402
+
+DB_URL = os.environ.get("DATABASE_URL")
+ORDERS = int(os.getenv("BENCH_ORDERS", "500"))
+EVENTS_PER_ORDER = int(os.getenv("BENCH_EVENTS_PER_ORDER", "4"))
+RELAYS = int(os.getenv("BENCH_RELAYS", "2"))
+CONSUMER_MS = float(os.getenv("BENCH_CONSUMER_MS", "20"))
+FIRST_ORDER_ID = int(os.getenv("BENCH_FIRST_ORDER_ID", "900000000"))
+STATUSES = ("preparing", "ready", "delivering", "completed")
+
+
+async def main() -> None:
+    if not DB_URL:
+        print("ERROR: set DATABASE_URL env var to the target Postgres connection string")
+        sys.exit(1)
+    db = Database(database_url=DB_URL)
+    order_ids = range(FIRST_ORDER_ID, FIRST_ORDER_ID + ORDERS)
+    seen: dict[int, list[str]] = {order_id: [] for order_id in order_ids}
+
+    async def telegram(event: dict) -> None:
+        await asyncio.sleep(CONSUMER_MS / 1000)
+        seen[int(event["entity_id"])].append(event["payload"]["target_status"])
+
+    async def analytics(event: dict) -> None:
+        return None
+
+    consumers = {"telegram": telegram, "analytics": analytics}
+    relays = [OrderEventRelay(db, consumers, poll_seconds=0.05) for _ in range(RELAYS)]
+    tasks = [asyncio.create_task(relay.run()) for relay in relays]
+
+    total = ORDERS * EVENTS_PER_ORDER
+    started = time.perf_counter()
+    for step in range(EVENTS_PER_ORDER):
+        for order_id in order_ids:
+            await asyncio.to_thread(
+                db.enqueue_order_event,
+                "order",
+                order_id,
+                STATUS_CHANGED,
+                {"target_status": STATUSES[step % len(STATUSES)]},
+            )
+    write_seconds = time.perf_counter() - started
+
+    deadline = time.perf_counter() + 300
+    while sum(len(v) for v in seen.values()) < total and time.perf_counter() < deadline:
+        await asyncio.sleep(0.1)
+    drain_seconds = time.perf_counter() - started
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+    relayed = sum(len(v) for v in seen.values())
+    expected = [STATUSES[step % len(STATUSES)] for step in range(EVENTS_PER_ORDER)]
+    out_of_order = sum(1 for statuses in seen.values() if statuses[: len(expected)] != expected)
+    lag = metrics.order_events_lag
+    print(f"orders={ORDERS} events={total} relays={RELAYS} consumer={CONSUMER_MS:.0f}ms")
+    print(f"write: {total / write_seconds:,.0f} events/s")
+    print(f"relay: {relayed / drain_seconds:,.0f} events/s, drained in {drain_seconds:.2f}s")
+    print(f"orders with events out of sequence: {out_of_order}")
+    print(
+        f"relay lag s: avg={lag.get_avg(event_type=STATUS_CHANGED):.2f} "
+        f"p50<={lag.get_percentile(50, event_type=STATUS_CHANGED)} "
+        f"p99<={lag.get_percentile(99, event_type=STATUS_CHANGED)}"
+    )
+
+    with db.get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(
+            "DELETE FROM order_events WHERE entity_type = 'order' AND entity_id BETWEEN %s AND %s",
+            (FIRST_ORDER_ID, FIRST_ORDER_ID + ORDERS),
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,140 @@
+"""Benchmark for notification fan-out to many WebSocket clients.
+
+Connects simulated clients (fake sockets, no network) through
+``WebSocketManager`` to the notification service, reports the memory an
+idle connection costs, publishes notifications to random users and
+reports publish->socket latency. A share of the clients
+is deliberately slow to show that they no longer stall everybody else.
+
+Runs against a local Redis when ``BENCH_BACKEND=redis`` (default when
+REDIS_URL is set), otherwise against the in-memory backend.
+
+Usage (PowerShell):
+  python .\\load_tests\\bench_ws_fanout.py
+
+Optional:
+  $env:REDIS_URL = "redis://localhost:6379/0"
+  $env:BENCH_CLIENTS = "5000"
+  $env:BENCH_MESSAGES = "20000"
+  $env:BENCH_SLOW_PERCENT = "1"
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.core.notifications import (  # noqa: E402
+    InMemoryPubSub,
+    Notification,
+    NotificationService,
+    NotificationType,
+    RedisPubSub,
+)
+from app.core.websocket import WebSocketManager  # noqa: E402
+
+REDIS_URL = os.getenv("REDIS_URL", "")
+BACKEND = os.getenv("BENCH_BACKEND", "redis" if REDIS_URL else "memory")
+CLIENTS = int(os.getenv("BENCH_CLIENTS", "5000"))
+MESSAGES = int(os.getenv("BENCH_MESSAGES", "20000"))
+SLOW_PERCENT = float(os.getenv("BENCH_SLOW_PERCENT", "1"))
+SLOW_DELAY = float(os.getenv("BENCH_SLOW_DELAY", "0.5"))
+
+
+class FakeSocket:
+    def __init__(self, delay: float):
+        self.delay = delay
+        self.closed = False
+        self.received: list[tuple[float, str]] = []
+
+    async def send_str(self, text: str) -> None:
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        self.received.append((time.perf_counter(), text))
+
+    async def send_json(self, data: dict) -> None:
+        await self.send_str(json.dumps(data))
+
+    async def close(self, code: int | None = None) -> None:
+        self.closed = True
+
+
+async def main() -> None:
+    backend = RedisPubSub(REDIS_URL) if BACKEND == "redis" else InMemoryPubSub()
+    service = NotificationService(backend)
+    manager = WebSocketManager()
+    manager.set_notification_service(service)
+
+    slow_every = int(100 / SLOW_PERCENT) if SLOW_PERCENT > 0 else 0
+    sockets = [
+        FakeSocket(SLOW_DELAY if slow_every and user_id % slow_every == 0 else 0.0)
+        for user_id in range(1, CLIENTS + 1)
+    ]
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    for user_id, sock in enumerate(sockets, start=1):
+        await manager.connect(sock, user_id=user_id)
+    await asyncio.sleep(0.5)
+    for sock in sockets:
+        sock.received.clear()  # welcome frames
+    idle_bytes = (tracemalloc.get_traced_memory()[0] - before) / CLIENTS
+    tracemalloc.stop()
+
+    sent_at: dict[int, float] = {}
+    started = time.perf_counter()
+    for seq in range(MESSAGES):
+        user_id = random.randint(1, CLIENTS)
+        sent_at[seq] = time.perf_counter()
+        await service.notify_user(
+            Notification(
+                type=NotificationType.BOOKING_CONFIRMED,
+                recipient_id=user_id,
+                title="Бронирование подтверждено",
+                message="Заберите заказ до 21:00",
+                data={"seq": seq},
+            )
+        )
+    publish_seconds = time.perf_counter() - started
+
+    deadline = time.perf_counter() + 30
+    fast = [s for s in sockets if not s.delay]
+    while time.perf_counter() < deadline:
+        delivered = sum(len(s.received) for s in fast)
+        await asyncio.sleep(0.1)
+        if delivered == sum(len(s.received) for s in fast):
+            break
+    total_seconds = time.perf_counter() - started
+
+    latencies = sorted(
+        (arrived - sent_at[json.loads(text)["payload"]["data"]["seq"]]) * 1000
+        for sock in fast
+        for arrived, text in sock.received
+    )
+    slow_clients = [c for c in manager._clients if c.ws.delay]
+    print(f"backend={BACKEND} clients={CLIENTS} messages={MESSAGES} slow={len(slow_clients)}")
+    print(f"idle connection (hub + subscription, excluding the socket): {idle_bytes:,.0f} bytes")
+    print(f"publish: {MESSAGES / publish_seconds:,.0f} msg/s, drained in {total_seconds:.2f}s")
+    if latencies:
+        p99 = latencies[int(len(latencies) * 0.99) - 1]
+        print(
+            f"fast-client latency ms: p50={statistics.median(latencies):.2f} "
+            f"p99={p99:.2f} max={latencies[-1]:.2f} delivered={len(latencies)}"
+        )
+    print(
+        f"slow clients closed: {sum(c.ws.closed for c in slow_clients)}, "
+        f"frames dropped: {sum(c.dropped for c in manager._clients)}"
+    )
+    await manager.stop()
+    await service.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -185,6 +185,8 @@ async def main():
     print(f"base_url: {BASE_URL}")
     print(f"concurrency: {CONCURRENCY}")
     print(f"duration_s: {duration:.2f}")
+    total_requests = sum(stat.total for stat in stats.values())
+    print(f"throughput_rps: {total_requests / duration if duration else 0.0:.1f}")
 
     for name, stat in stats.items():
         p50 = percentile(stat.latencies, 0.50)
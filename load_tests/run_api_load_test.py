@@ -6,6 +6,10 @@ Usage (PowerShell):
   $env:LOAD_DURATION = "60"
   $env:LOAD_SKIP_REVERSE = "1"
   python .\load_tests\run_api_load_test.py
+
+Compare the default and the fast runtime (uvloop/orjson, when installed)
+by running once with $env:FAST_RUNTIME = "0" and once without it; the
+summary prints the runtime and throughput_rps.
 """
 from __future__ import annotations
 
@@ -21,6 +25,7 @@ sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
 
 from app.api.api_server import create_api_app
 from app.core.database import create_database
+from app.core.fast_runtime import install_event_loop, runtime_summary
 
 
 async def run() -> None:
@@ -45,6 +50,7 @@ async def run() -> None:
 
     from load_tests import load_test_api
 
+    print(f"runtime: {runtime_summary()}")
     try:
         await load_test_api.main()
     finally:
@@ -53,4 +59,5 @@ async def run() -> None:
 
 
 if __name__ == "__main__":
+    install_event_loop()
     asyncio.run(run())
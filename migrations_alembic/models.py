@@ -17,13 +17,17 @@ from sqlalchemy import (
     ForeignKey,
     Index,
     Integer,
+    Numeric,
     PrimaryKeyConstraint,
+    SmallInteger,
     String,
+    Table,
     Text,
     Time,
     UniqueConstraint,
+    text,
 )
-from sqlalchemy.dialects.postgresql import JSONB, TSVECTOR, UUID
+from sqlalchemy.dialects.postgresql import ARRAY, JSONB, TSVECTOR, UUID
 from sqlalchemy.orm import DeclarativeBase, relationship
 
 
@@ -188,6 +192,8 @@ class Offer(Base):
     category = Column(String(50), default="other")
     package_value = Column(Float, nullable=True)
     package_unit = Column(String(20), nullable=True)
+    external_source = Column(String(20), nullable=True)
+    external_code = Column(String(100), nullable=True)
     search_vector = Column(TSVECTOR, nullable=True)
 
     # Relationships
@@ -201,6 +207,14 @@ class Offer(Base):
         Index("ix_offers_store", "store_id"),
         Index("ix_offers_status", "status"),
         Index("ix_offers_category", "category"),
+        Index(
+            "uq_offers_external",
+            "store_id",
+            "external_source",
+            "external_code",
+            unique=True,
+            postgresql_where=text("external_code IS NOT NULL"),
+        ),
     )
 
 
@@ -239,6 +253,8 @@ class Booking(Base):
     delivery_lat = Column(Float, nullable=True)
     delivery_lon = Column(Float, nullable=True)
     delivery_structured = Column(JSONB, nullable=True)
+    # Offer price at booking time (NULL for cart bookings and older rows)
+    unit_price = Column(Integer, nullable=True)
 
     # Relationships
     user = relationship("User", back_populates="bookings")
@@ -301,6 +317,8 @@ class Order(Base):
         Index("ix_orders_user", "user_id"),
         Index("ix_orders_store", "store_id"),
         Index("ix_orders_status", "order_status"),
+        Index("idx_orders_store_created", "store_id", "created_at", "order_id"),
+        Index("idx_orders_store_updated", "store_id", "updated_at", "order_id"),
     )
 
 
@@ -591,3 +609,113 @@ class SearchHistory(Base):
     searched_at = Column(DateTime, default=datetime.utcnow)
 
     __table_args__ = (Index("ix_search_history_user", "user_id"),)
+
+
+class StoreDailyStats(Base):
+    """Per-store daily sales rollup (business day in Asia/Tashkent)."""
+
+    __tablename__ = "store_daily_stats"
+
+    store_id = Column(Integer, primary_key=True)
+    day = Column(Date, primary_key=True)
+    revenue = Column(Numeric(14, 2), nullable=False, default=0)
+    orders = Column(Integer, nullable=False, default=0)
+    items_sold = Column(Float, nullable=False, default=0)
+    bookings_completed = Column(Integer, nullable=False, default=0)
+    bookings_cancelled = Column(Integer, nullable=False, default=0)
+    bookings_total = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, default=datetime.utcnow)
+
+
+class IdempotencyKey(Base):
+    """Reserved order-creation idempotency key and its cached response."""
+
+    __tablename__ = "idempotency_keys"
+
+    idempotency_key = Column(Text, primary_key=True)
+    user_id = Column(BigInteger, primary_key=True)
+    request_hash = Column(Text, nullable=False)
+    response_body = Column(Text)
+    status_code = Column(Integer)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+    __table_args__ = (Index("idx_idempotency_keys_created", "created_at"),)
+
+
+class OrderItem(Base):
+    """Line of a cart order, written once together with the order."""
+
+    __tablename__ = "order_items"
+
+    order_id = Column(
+        Integer, ForeignKey("orders.order_id", ondelete="CASCADE"), primary_key=True
+    )
+    position = Column(SmallInteger, primary_key=True)
+    offer_id = Column(Integer, nullable=True)
+    title = Column(Text, nullable=True)
+    quantity = Column(Float, nullable=False, default=1)
+    price = Column(Integer, nullable=False, default=0)
+    original_price = Column(Integer, nullable=True)
+
+    __table_args__ = (Index("idx_order_items_offer", "offer_id"),)
+
+
+class OrderEvent(Base):
+    """Outbox row for an order/booking change, relayed in order per entity."""
+
+    __tablename__ = "order_events"
+
+    event_id = Column(BigInteger, primary_key=True, autoincrement=True)
+    entity_type = Column(Text, nullable=False)
+    entity_id = Column(Integer, nullable=False)
+    event_type = Column(Text, nullable=False)
+    payload = Column(JSONB, nullable=False, server_default=text("'{}'::jsonb"))
+    attempts = Column(Integer, nullable=False, default=0)
+    last_error = Column(Text)
+    delivered_to = Column(ARRAY(Text), nullable=False, server_default=text("'{}'"))
+    created_at = Column(DateTime, default=datetime.utcnow)
+    available_at = Column(DateTime, default=datetime.utcnow)
+    processed_at = Column(DateTime)
+
+    __table_args__ = (
+        Index(
+            "idx_order_events_pending",
+            "entity_type",
+            "entity_id",
+            "event_id",
+            postgresql_where=text("processed_at IS NULL"),
+        ),
+    )
+
+
+class SchemaVersion(Base):
+    """Runtime schema version recorded by SchemaMixin.init_db."""
+
+    __tablename__ = "schema_version"
+
+    component = Column(Text, primary_key=True)
+    version = Column(Text, nullable=False)
+    applied_at = Column(DateTime, default=datetime.utcnow)
+
+
+def _archive_table(name: str, source: Table, *id_columns: str) -> Table:
+    """Cold copy of a hot history table: same columns, no keys, plus archived_at."""
+    indexes = [Index(f"idx_{name}_id", *id_columns, unique=True)]
+    if "user_id" in source.columns:
+        indexes.append(Index(f"idx_{name}_user_created", "user_id", text("created_at DESC")))
+    return Table(
+        name,
+        Base.metadata,
+        *(Column(c.name, c.type, nullable=c.name not in id_columns) for c in source.columns),
+        Column("archived_at", DateTime, default=datetime.utcnow),
+        *indexes,
+    )
+
+
+# Filled by ArchiveMixin.archive_history with old terminal orders/bookings
+orders_archive = _archive_table("orders_archive", Order.__table__, "order_id")
+bookings_archive = _archive_table("bookings_archive", Booking.__table__, "booking_id")
+# Lines of archived orders, moved in the same statement as the order
+order_items_archive = _archive_table(
+    "order_items_archive", OrderItem.__table__, "order_id", "position"
+)
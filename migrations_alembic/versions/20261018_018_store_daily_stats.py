@@ -0,0 +1,70 @@
+"""store_daily_stats rollup
+
+Revision ID: 018_store_daily_stats
+Revises: 017_offer_package_size
+Create Date: 2026-10-18 00:00:00.000000
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+revision: str = "018_store_daily_stats"
+down_revision: Union[str, None] = "017_offer_package_size"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute(
+        """
+        CREATE TABLE IF NOT EXISTS store_daily_stats (
+            store_id INTEGER NOT NULL,
+            day DATE NOT NULL,
+            revenue NUMERIC(14, 2) NOT NULL DEFAULT 0,
+            orders INTEGER NOT NULL DEFAULT 0,
+            items_sold REAL NOT NULL DEFAULT 0,
+            bookings_completed INTEGER NOT NULL DEFAULT 0,
+            bookings_cancelled INTEGER NOT NULL DEFAULT 0,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (store_id, day)
+        )
+        """
+    )
+    # Backfill full history (business days in Asia/Tashkent).
+    op.execute("DELETE FROM store_daily_stats")
+    op.execute(
+        """
+        INSERT INTO store_daily_stats
+            (store_id, day, revenue, orders, items_sold, bookings_completed, bookings_cancelled)
+        SELECT store_id, day, SUM(revenue), SUM(orders), SUM(items_sold),
+               SUM(bookings_completed), SUM(bookings_cancelled)
+        FROM (
+            SELECT o.store_id,
+                   (b.created_at::timestamptz AT TIME ZONE 'Asia/Tashkent')::date AS day,
+                   CASE WHEN b.status IN ('completed', 'confirmed')
+                        THEN COALESCE(o.discount_price, 0) * COALESCE(b.quantity, 0)
+                        ELSE 0 END AS revenue,
+                   CASE WHEN b.status IN ('completed', 'confirmed') THEN 1 ELSE 0 END AS orders,
+                   CASE WHEN b.status IN ('completed', 'confirmed')
+                        THEN COALESCE(b.quantity, 0) ELSE 0 END AS items_sold,
+                   CASE WHEN b.status = 'completed' THEN 1 ELSE 0 END AS bookings_completed,
+                   CASE WHEN b.status = 'cancelled' THEN 1 ELSE 0 END AS bookings_cancelled
+            FROM bookings b
+            JOIN offers o ON b.offer_id = o.offer_id
+            WHERE b.status IN ('completed', 'confirmed', 'cancelled')
+            UNION ALL
+            SELECT ord.store_id,
+                   (ord.created_at::timestamptz AT TIME ZONE 'Asia/Tashkent')::date,
+                   COALESCE(ord.total_price, 0), 1, COALESCE(ord.quantity, 0), 0, 0
+            FROM orders ord
+            WHERE ord.order_status = 'completed'
+        ) src
+        WHERE store_id IS NOT NULL AND day IS NOT NULL
+        GROUP BY store_id, day
+        """
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP TABLE IF EXISTS store_daily_stats")
@@ -0,0 +1,36 @@
+"""partner order feed indexes
+
+Revision ID: 019_orders_feed_indexes
+Revises: 018_store_daily_stats
+Create Date: 2026-10-18 00:00:00.000000
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+revision: str = "019_orders_feed_indexes"
+down_revision: Union[str, None] = "018_store_daily_stats"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute(
+        "ALTER TABLE orders ADD COLUMN IF NOT EXISTS updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP"
+    )
+    # Delta sync relies on updated_at being set for every row.
+    op.execute("UPDATE orders SET updated_at = created_at WHERE updated_at IS NULL")
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS idx_orders_store_created "
+        "ON orders(store_id, created_at DESC, order_id DESC)"
+    )
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS idx_orders_store_updated "
+        "ON orders(store_id, updated_at, order_id)"
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS idx_orders_store_updated")
+    op.execute("DROP INDEX IF EXISTS idx_orders_store_created")
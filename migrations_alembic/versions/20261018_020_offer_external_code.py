@@ -0,0 +1,52 @@
+"""offer external catalog code
+
+Revision ID: 020_offer_external_code
+Revises: 019_orders_feed_indexes
+Create Date: 2026-10-18 00:00:00.000000
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+revision: str = "020_offer_external_code"
+down_revision: Union[str, None] = "019_orders_feed_indexes"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute("ALTER TABLE offers ADD COLUMN IF NOT EXISTS external_source TEXT")
+    op.execute("ALTER TABLE offers ADD COLUMN IF NOT EXISTS external_code TEXT")
+    # Offers imported from 1C used to carry the product code as a "[1C:code]"
+    # description tag. Keep only the newest offer per store/code so the
+    # unique index below can be built.
+    op.execute(
+        r"""
+        UPDATE offers o
+        SET external_source = '1c', external_code = tagged.code
+        FROM (
+            SELECT DISTINCT ON (store_id, code) offer_id, code
+            FROM (
+                SELECT offer_id, store_id,
+                       substring(description from '\[1C:([^\]]+)\]') AS code
+                FROM offers
+                WHERE description LIKE '%[1C:%'
+            ) src
+            WHERE code IS NOT NULL
+            ORDER BY store_id, code, offer_id DESC
+        ) tagged
+        WHERE o.offer_id = tagged.offer_id AND o.external_code IS NULL
+        """
+    )
+    op.execute(
+        "CREATE UNIQUE INDEX IF NOT EXISTS uq_offers_external "
+        "ON offers(store_id, external_source, external_code) "
+        "WHERE external_code IS NOT NULL"
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS uq_offers_external")
+    op.execute("ALTER TABLE offers DROP COLUMN IF EXISTS external_code")
+    op.execute("ALTER TABLE offers DROP COLUMN IF EXISTS external_source")
@@ -0,0 +1,33 @@
+"""schema_version table for the runtime schema check
+
+Revision ID: 021_schema_version
+Revises: 020_offer_external_code
+Create Date: 2026-10-18 00:00:00.000000
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+revision: str = "021_schema_version"
+down_revision: Union[str, None] = "020_offer_external_code"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # The row itself is written by SchemaMixin.init_db after a full runtime
+    # DDL pass; Alembic-managed deploys keep using alembic_version.
+    op.execute(
+        """
+        CREATE TABLE IF NOT EXISTS schema_version (
+            component TEXT PRIMARY KEY,
+            version TEXT NOT NULL,
+            applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+        """
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP TABLE IF EXISTS schema_version")
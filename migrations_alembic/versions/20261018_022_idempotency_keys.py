@@ -0,0 +1,40 @@
+"""idempotency_keys table with an index for expiry purges
+
+Revision ID: 022_idempotency_keys
+Revises: 021_schema_version
+Create Date: 2026-10-18 00:00:00.000000
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+revision: str = "022_idempotency_keys"
+down_revision: Union[str, None] = "021_schema_version"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # The table used to be created lazily by app.core.idempotency
+    op.execute(
+        """
+        CREATE TABLE IF NOT EXISTS idempotency_keys (
+            idempotency_key TEXT NOT NULL,
+            user_id BIGINT NOT NULL,
+            request_hash TEXT NOT NULL,
+            response_body TEXT,
+            status_code INTEGER,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (idempotency_key, user_id)
+        )
+        """
+    )
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS idx_idempotency_keys_created "
+        "ON idempotency_keys(created_at)"
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS idx_idempotency_keys_created")
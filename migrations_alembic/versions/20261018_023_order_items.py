@@ -0,0 +1,57 @@
+"""order_items table for normalized cart order lines
+
+Revision ID: 023_order_items
+Revises: 022_idempotency_keys
+Create Date: 2026-10-18 00:00:00.000000
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+revision: str = "023_order_items"
+down_revision: Union[str, None] = "022_idempotency_keys"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute(
+        """
+        CREATE TABLE IF NOT EXISTS order_items (
+            order_id INTEGER NOT NULL REFERENCES orders(order_id) ON DELETE CASCADE,
+            position SMALLINT NOT NULL,
+            offer_id INTEGER,
+            title TEXT,
+            quantity REAL NOT NULL DEFAULT 1,
+            price INTEGER NOT NULL DEFAULT 0,
+            original_price INTEGER,
+            PRIMARY KEY (order_id, position)
+        )
+        """
+    )
+    op.execute("CREATE INDEX IF NOT EXISTS idx_order_items_offer ON order_items(offer_id)")
+    # Existing cart orders keep their cart_items JSON; copy the lines over
+    op.execute(
+        """
+        INSERT INTO order_items (
+            order_id, position, offer_id, title, quantity, price, original_price
+        )
+        SELECT o.order_id,
+               (e.ordinality - 1)::smallint,
+               NULLIF(e.item->>'offer_id', '')::numeric::integer,
+               e.item->>'title',
+               COALESCE(NULLIF(e.item->>'quantity', '')::real, 1),
+               COALESCE(NULLIF(e.item->>'price', '')::numeric, 0)::integer,
+               NULLIF(e.item->>'original_price', '')::numeric::integer
+        FROM orders o
+        CROSS JOIN LATERAL jsonb_array_elements(o.cart_items)
+            WITH ORDINALITY AS e(item, ordinality)
+        WHERE jsonb_typeof(o.cart_items) = 'array'
+        ON CONFLICT (order_id, position) DO NOTHING
+        """
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP TABLE IF EXISTS order_items")
@@ -0,0 +1,67 @@
+"""orders_archive/bookings_archive tables for the hot/cold history split
+
+Revision ID: 024_history_archive
+Revises: 023_order_items
+Create Date: 2026-10-18 00:00:00.000000
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+revision: str = "024_history_archive"
+down_revision: Union[str, None] = "023_order_items"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Archive tables copy the hot columns; a bookings_archive created by the
+    # old create_bookings_archive.py script gets the missing columns added
+    op.execute(
+        """
+        DO $$
+        DECLARE
+            pair text[];
+            col record;
+        BEGIN
+            FOREACH pair SLICE 1 IN ARRAY ARRAY[
+                ['orders', 'orders_archive', 'order_id'],
+                ['bookings', 'bookings_archive', 'booking_id']
+            ] LOOP
+                EXECUTE format('CREATE TABLE IF NOT EXISTS %I (LIKE %I)', pair[2], pair[1]);
+                FOR col IN
+                    SELECT a.attname,
+                           format_type(a.atttypid, a.atttypmod) AS hot_type,
+                           format_type(ar.atttypid, ar.atttypmod) AS archive_type
+                    FROM pg_attribute a
+                    LEFT JOIN pg_attribute ar
+                      ON ar.attrelid = pair[2]::regclass
+                     AND ar.attname = a.attname
+                     AND ar.attnum > 0
+                     AND NOT ar.attisdropped
+                    WHERE a.attrelid = pair[1]::regclass AND a.attnum > 0 AND NOT a.attisdropped
+                LOOP
+                    IF col.archive_type IS NULL THEN
+                        EXECUTE format('ALTER TABLE %I ADD COLUMN %I %s',
+                                       pair[2], col.attname, col.hot_type);
+                    ELSIF col.archive_type <> col.hot_type THEN
+                        EXECUTE format('ALTER TABLE %I ALTER COLUMN %I TYPE %s USING %I::text::%s',
+                                       pair[2], col.attname, col.hot_type, col.attname, col.hot_type);
+                    END IF;
+                END LOOP;
+                EXECUTE format('ALTER TABLE %I ADD COLUMN IF NOT EXISTS archived_at TIMESTAMP '
+                               'DEFAULT CURRENT_TIMESTAMP', pair[2]);
+                EXECUTE format('CREATE UNIQUE INDEX IF NOT EXISTS %I ON %I (%I)',
+                               'idx_' || pair[2] || '_id', pair[2], pair[3]);
+                EXECUTE format('CREATE INDEX IF NOT EXISTS %I ON %I (user_id, created_at DESC)',
+                               'idx_' || pair[2] || '_user_created', pair[2]);
+            END LOOP;
+        END $$;
+        """
+    )
+
+
+def downgrade() -> None:
+    # Archived rows are not moved back: the tables are kept
+    pass
@@ -0,0 +1,26 @@
+"""order_events.delivered_to for per-consumer relay progress
+
+Revision ID: 026_order_events_outbox
+Revises: 025_order_events
+Create Date: 2026-10-18 00:00:00.000000
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+revision: str = "026_order_events_outbox"
+down_revision: Union[str, None] = "025_order_events"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute(
+        "ALTER TABLE order_events ADD COLUMN IF NOT EXISTS delivered_to TEXT[] "
+        "NOT NULL DEFAULT '{}'"
+    )
+
+
+def downgrade() -> None:
+    op.execute("ALTER TABLE order_events DROP COLUMN IF EXISTS delivered_to")
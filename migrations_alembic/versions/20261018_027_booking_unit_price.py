@@ -0,0 +1,26 @@
+"""bookings.unit_price: offer price at booking time
+
+Revision ID: 027_booking_unit_price
+Revises: 026_order_events_outbox
+Create Date: 2026-10-18 00:00:00.000000
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+revision: str = "027_booking_unit_price"
+down_revision: Union[str, None] = "026_order_events_outbox"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Older rows keep NULL and are priced from the offer, as before
+    op.execute("ALTER TABLE bookings ADD COLUMN IF NOT EXISTS unit_price INTEGER")
+    op.execute("ALTER TABLE bookings_archive ADD COLUMN IF NOT EXISTS unit_price INTEGER")
+
+
+def downgrade() -> None:
+    op.execute("ALTER TABLE bookings_archive DROP COLUMN IF EXISTS unit_price")
+    op.execute("ALTER TABLE bookings DROP COLUMN IF EXISTS unit_price")
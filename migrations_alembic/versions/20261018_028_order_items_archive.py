@@ -0,0 +1,55 @@
+"""order_items_archive for the lines of archived orders
+
+Revision ID: 028_order_items_archive
+Revises: 027_booking_unit_price
+Create Date: 2026-10-18 00:00:00.000000
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+revision: str = "028_order_items_archive"
+down_revision: Union[str, None] = "027_booking_unit_price"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Same columns as order_items without the foreign key: the order itself
+    # moves to orders_archive in the same statement
+    op.execute("CREATE TABLE IF NOT EXISTS order_items_archive (LIKE order_items)")
+    op.execute(
+        "ALTER TABLE order_items_archive ADD COLUMN IF NOT EXISTS archived_at TIMESTAMP "
+        "DEFAULT CURRENT_TIMESTAMP"
+    )
+    op.execute(
+        "CREATE UNIQUE INDEX IF NOT EXISTS idx_order_items_archive_id "
+        "ON order_items_archive (order_id, position)"
+    )
+    # Orders archived earlier lost their lines to the cascade; rebuild them
+    # from the cart_items copy kept in orders_archive
+    op.execute(
+        """
+        INSERT INTO order_items_archive (
+            order_id, position, offer_id, title, quantity, price, original_price
+        )
+        SELECT o.order_id,
+               (e.ordinality - 1)::smallint,
+               NULLIF(e.item->>'offer_id', '')::numeric::integer,
+               e.item->>'title',
+               COALESCE(NULLIF(e.item->>'quantity', '')::real, 1),
+               COALESCE(NULLIF(e.item->>'price', '')::numeric, 0)::integer,
+               NULLIF(e.item->>'original_price', '')::numeric::integer
+        FROM orders_archive o
+        CROSS JOIN LATERAL jsonb_array_elements(o.cart_items)
+            WITH ORDINALITY AS e(item, ordinality)
+        WHERE jsonb_typeof(o.cart_items) = 'array'
+        ON CONFLICT (order_id, position) DO NOTHING
+        """
+    )
+
+
+def downgrade() -> None:
+    # Archived lines are not moved back: the table is kept
+    pass
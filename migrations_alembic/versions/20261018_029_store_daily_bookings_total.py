@@ -0,0 +1,42 @@
+"""store_daily_stats.bookings_total: bookings created per store and day
+
+Revision ID: 029_store_daily_bookings_total
+Revises: 028_order_items_archive
+Create Date: 2026-10-18 00:00:00.000000
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+revision: str = "029_store_daily_bookings_total"
+down_revision: Union[str, None] = "028_order_items_archive"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute(
+        "ALTER TABLE store_daily_stats ADD COLUMN IF NOT EXISTS bookings_total INTEGER "
+        "NOT NULL DEFAULT 0"
+    )
+    # Backfill from live and archived bookings (business days in Asia/Tashkent)
+    op.execute(
+        """
+        INSERT INTO store_daily_stats (store_id, day, bookings_total)
+        SELECT o.store_id, (b.created_at::timestamptz AT TIME ZONE 'Asia/Tashkent')::date, COUNT(*)
+        FROM (
+            SELECT offer_id, created_at FROM bookings
+            UNION ALL
+            SELECT offer_id, created_at FROM bookings_archive
+        ) b
+        JOIN offers o ON b.offer_id = o.offer_id
+        WHERE o.store_id IS NOT NULL AND b.created_at IS NOT NULL
+        GROUP BY 1, 2
+        ON CONFLICT (store_id, day) DO UPDATE SET bookings_total = EXCLUDED.bookings_total
+        """
+    )
+
+
+def downgrade() -> None:
+    op.execute("ALTER TABLE store_daily_stats DROP COLUMN IF EXISTS bookings_total")
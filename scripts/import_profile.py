@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""Import-time profile of the bot, API and worker entry points.
+
+Runs ``python -X importtime`` in a fresh interpreter for the modules an
+entry point loads before it can serve the first request and prints the
+slowest modules, the slowest first-party modules and the per-package totals.
+Nothing connects to the database or Telegram: only imports are executed.
+
+Usage:
+  python scripts/import_profile.py            # bot (webhook/polling process)
+  python scripts/import_profile.py api worker
+  python scripts/import_profile.py bot --top 40
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import subprocess
+import sys
+from collections import defaultdict
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+FIRST_PARTY = ("app", "handlers", "database_pg_module", "localization", "logging_config")
+
+# Code run in the child interpreter for each entry point (Procfile: web/api/worker)
+ENTRY_POINTS = {
+    "bot": (
+        "import importlib, pkgutil, handlers\n"
+        "import app.core.bootstrap, app.core.webhook_server, app.keyboards\n"
+        "for m in pkgutil.walk_packages(handlers.__path__, 'handlers.'):\n"
+        "    importlib.import_module(m.name)\n"
+    ),
+    "api": "import app.api.api_server\n",
+    "worker": "import app.worker.arq_worker\n",
+}
+
+
+def profile(entry_point: str) -> list[tuple[str, int, int, int]]:
+    """Return ``(module, self_us, cumulative_us, depth)`` in import order."""
+    env = dict(os.environ)
+    env.setdefault("TELEGRAM_BOT_TOKEN", "import-profile")
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", ENTRY_POINTS[entry_point]],
+        cwd=PROJECT_ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    if proc.returncode != 0:
+        raise SystemExit(f"{entry_point}: import failed\n{proc.stderr[-2000:]}")
+
+    rows = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:") :].split("|")
+        depth = (len(name) - len(name.lstrip())) // 2
+        rows.append((name.strip(), int(self_us), int(cumulative_us), depth))
+    return rows
+
+
+def report(entry_point: str, top: int) -> None:
+    rows = profile(entry_point)
+    total_ms = sum(cumulative for _, _, cumulative, depth in rows if depth == 0) / 1000
+    print(f"\n=== {entry_point}: {len(rows)} modules, {total_ms:.0f} ms ===")
+
+    print("\nSlowest modules (self time):")
+    for name, self_us, _, _ in sorted(rows, key=lambda r: r[1], reverse=True)[:top]:
+        print(f"  {self_us / 1000:8.1f} ms  {name}")
+
+    print("\nSlowest first-party modules (cumulative, includes what they pull in):")
+    own = [r for r in rows if r[0].split(".")[0] in FIRST_PARTY]
+    for name, _, cumulative_us, _ in sorted(own, key=lambda r: r[2], reverse=True)[:top]:
+        print(f"  {cumulative_us / 1000:8.1f} ms  {name}")
+
+    packages: dict[str, int] = defaultdict(int)
+    for name, self_us, _, _ in rows:
+        packages[name.split(".")[0]] += self_us
+    print("\nPackages (self time):")
+    for package, self_us in sorted(packages.items(), key=lambda p: p[1], reverse=True)[:top]:
+        print(f"  {self_us / 1000:8.1f} ms  {package}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("entry_points", nargs="*", metavar="{bot,api,worker}")
+    parser.add_argument("--top", type=int, default=20)
+    args = parser.parse_args()
+    unknown = set(args.entry_points) - set(ENTRY_POINTS)
+    if unknown:
+        parser.error(f"unknown entry point(s): {', '.join(sorted(unknown))}")
+    for entry_point in args.entry_points or ["bot"]:
+        report(entry_point, args.top)
+
+
+if __name__ == "__main__":
+    main()
@@ -68,6 +68,22 @@ def db(postgres_db: Database) -> Database:
     return postgres_db
 
 
+@pytest.fixture()
+def seller_store(db: Database) -> tuple[int, int]:
+    """Seller with one Tashkent store for DB tests; returns ``(seller_id, store_id)``."""
+    seller_id = 300001
+    db.add_user(user_id=seller_id, username="test_seller")
+    store_id = db.add_store(
+        owner_id=seller_id,
+        name="Test Store",
+        city="Tashkent",
+        category="Bakery",
+        address="Test street 1",
+        phone="+998901234567",
+    )
+    return seller_id, store_id
+
+
 @pytest.fixture(scope="session", autouse=True)
 def _test_env_vars() -> None:
     """Provide minimal env vars required for imports in tests."""
@@ -0,0 +1,131 @@
+"""Tests for set-based auto-discount recalculation."""
+from __future__ import annotations
+
+from datetime import date, datetime, timedelta
+
+from app.domain.offer_rules import MIN_OFFER_DISCOUNT_PERCENT
+from app.services.auto_discount_service import AutoDiscountService, DiscountTier
+
+
+def test_calculate_discount_follows_tier_table():
+    service = AutoDiscountService(db=None)
+    now = datetime.now()
+
+    today = service.calculate_discount(now, 10001)
+    assert (today.discount_percent, today.discount_price, today.tier) == (
+        70,
+        3000,
+        DiscountTier.LAST_DAY,
+    )
+    soon = service.calculate_discount(now + timedelta(days=2), 10000)
+    assert soon.urgency_message == "🟡 Осталось 2 дня"
+    assert service.calculate_discount(now + timedelta(days=10), 10000).discount_percent == 0
+
+    service.set_custom_rules({0: 80, 1: 60, 3: 40, 7: 25})
+    assert service.calculate_discount(now + timedelta(days=5), 10000).discount_price == 7500
+
+
+def test_week_tier_is_raised_to_the_minimum_discount():
+    service = AutoDiscountService(db=None)
+    now = datetime.now()
+
+    week = service.calculate_discount(now + timedelta(days=5), 10000)
+    assert (week.discount_percent, week.discount_price, week.tier) == (
+        MIN_OFFER_DISCOUNT_PERCENT,
+        8000,
+        DiscountTier.WEEK,
+    )
+
+    service.set_custom_rules({0: 70, 1: 50, 3: 30, 7: 15})
+    assert service.calculate_discount(now + timedelta(days=5), 10000).discount_percent == 20
+    assert min(percent for _, percent, _, _ in service._discount_steps()) == 20
+
+
+class FakeRecalcDb:
+    def __init__(self, updated):
+        self.updated = updated
+        self.calls = []
+
+    def apply_expiry_discounts(self, tiers, store_id=None, min_discount_percent=0):
+        self.calls.append((tiers, store_id, min_discount_percent))
+        return {"expired": 2, "updated": self.updated}
+
+
+class FakeBot:
+    def __init__(self):
+        self.sent = []
+
+    async def send_message(self, chat_id, text, **kwargs):
+        self.sent.append((chat_id, text))
+
+
+def _row(offer_id, owner_id, days_left, store_id=None):
+    store_id = store_id or owner_id
+    return {
+        "offer_id": offer_id,
+        "store_id": store_id,
+        "owner_id": owner_id,
+        "store_name": f"Store <{store_id}>",
+        "title": f"Offer {offer_id} & co",
+        "discount_price": 3000,
+        "description": "🔴 Последний день!",
+        "percent": 70,
+        "days_left": days_left,
+    }
+
+
+async def test_recalculation_is_one_db_call_with_grouped_notifications():
+    db = FakeRecalcDb(
+        [
+            _row(1, 100, 0),
+            _row(2, 100, 1),
+            _row(5, 100, 0, store_id=101),
+            _row(3, 200, 0),
+            _row(4, 300, 3),
+        ]
+    )
+    bot = FakeBot()
+
+    result = await AutoDiscountService(db, bot).update_existing_offers_discounts(store_id=5)
+
+    assert result == {"updated": 5, "deactivated": 2}
+    tiers, store_id, min_percent = db.calls[0]
+    assert [max_days for max_days, _, _ in tiers] == [0, 1, 3, 7]
+    assert (store_id, min_percent) == (5, MIN_OFFER_DISCOUNT_PERCENT)
+    # One message per store, only for offers expiring today/tomorrow
+    assert sorted(chat_id for chat_id, _ in bot.sent) == [100, 100, 200]
+    store_text, other_store_text = (text for chat_id, text in bot.sent if chat_id == 100)
+    assert "Store &lt;100&gt;" in store_text and "Store &lt;101&gt;" in other_store_text
+    assert "Offer 1 &amp; co" in store_text and "Offer 2 &amp; co" in store_text
+    assert "Offer 5" in other_store_text and "Offer 5" not in store_text
+
+
+def test_apply_expiry_discounts_against_database(db, seller_store):
+    _, store_id = seller_store
+    today = date.today()
+    offers = {}
+    for name, days in (("today", 0), ("tomorrow", 1), ("week", 5), ("fresh", 10), ("gone", -1)):
+        offers[name] = db.add_offer(
+            store_id=store_id,
+            title=name,
+            original_price=10000,
+            discount_price=9000,
+            quantity=1,
+            expiry_date=(today + timedelta(days=days)).isoformat(),
+        )
+    tiers = [
+        (max_days, percent, message)
+        for max_days, percent, message, _ in AutoDiscountService(db)._discount_steps()
+    ]
+
+    result = db.apply_expiry_discounts(tiers, store_id, MIN_OFFER_DISCOUNT_PERCENT)
+
+    assert result["expired"] == 1
+    assert {row["title"] for row in result["updated"]} == {"today", "tomorrow", "week"}
+    assert db.get_offer(offers["today"])["discount_price"] == 3000
+    assert db.get_offer(offers["tomorrow"])["description"] == "🟠 Истекает завтра!"
+    assert db.get_offer(offers["week"])["discount_price"] == 8000
+    assert db.get_offer(offers["fresh"])["discount_price"] == 9000
+    assert db.get_offer(offers["gone"])["status"] == "expired"
+    again = db.apply_expiry_discounts(tiers, store_id, MIN_OFFER_DISCOUNT_PERCENT)
+    assert again == {"expired": 0, "updated": []}
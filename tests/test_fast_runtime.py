@@ -0,0 +1,84 @@
+"""Tests for the fast JSON runtime and pre-serialized cache payloads."""
+from __future__ import annotations
+
+import json
+import os
+from datetime import datetime
+from decimal import Decimal
+
+import pytest
+
+os.environ.setdefault("TELEGRAM_BOT_TOKEN", "test-token")
+
+from app.api.webapp import routes_offers
+from app.api.webapp.common import CategoryResponse
+from app.core import fast_runtime
+from app.core.caching import CacheService, MemoryCacheBackend
+
+
+@pytest.mark.parametrize("use_orjson", [True, False])
+def test_dumps_handles_db_values(monkeypatch, use_orjson):
+    if use_orjson and fast_runtime.orjson is None:
+        pytest.skip("orjson is not installed")
+    monkeypatch.setattr(fast_runtime, "USE_ORJSON", use_orjson)
+    payload = {1: Decimal("12.50"), "at": datetime(2026, 10, 18, 9, 30), "tags": {"a"}}
+
+    assert json.loads(fast_runtime.dumps(payload)) == {
+        "1": 12.5,
+        "at": "2026-10-18T09:30:00",
+        "tags": ["a"],
+    }
+    assert fast_runtime.loads(fast_runtime.dumps(["Сут"])) == ["Сут"]
+
+
+def test_json_response_is_drop_in():
+    response = fast_runtime.json_response({"ok": True}, status=201, headers={"X-Test": "1"})
+
+    assert response.status == 201
+    assert response.content_type == "application/json"
+    assert response.headers["X-Test"] == "1"
+    assert json.loads(response.body) == {"ok": True}
+
+
+async def test_bytes_cache_is_separate_from_values():
+    cache = CacheService(MemoryCacheBackend())
+    await cache.set("key", {"value": 1})
+
+    assert await cache.get_bytes("key") is None
+    assert await cache.set_bytes("key", b'{"value":2}')
+    assert await cache.get_bytes("key") == b'{"value":2}'
+    assert await cache.get("key") == {"value": 1}
+
+
+class _CountsDb:
+    def __init__(self):
+        self.calls = 0
+
+    async def count_offers_by_category_grouped(self, city=None, region=None, district=None):
+        self.calls += 1
+        return {"dairy": 2, "bakery": 1}
+
+
+async def test_cached_categories_are_served_as_bytes(monkeypatch):
+    cache = CacheService(MemoryCacheBackend())
+    monkeypatch.setattr(routes_offers, "get_cache_service", lambda *_: cache)
+    db = _CountsDb()
+    params = {
+        "city": "Tashkent",
+        "region": None,
+        "district": None,
+        "lat": None,
+        "lon": None,
+        "latitude": None,
+        "longitude": None,
+        "max_distance_km": None,
+        "db": db,
+    }
+
+    fresh = await routes_offers.get_categories(**params)
+    cached = await routes_offers.get_categories(**params)
+
+    assert db.calls == 1
+    assert cached.media_type == "application/json"
+    expected = [CategoryResponse.model_validate(c).model_dump(mode="json") for c in fresh]
+    assert json.loads(cached.body) == expected
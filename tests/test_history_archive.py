@@ -0,0 +1,110 @@
+"""Tests for the hot/cold order and booking history split."""
+from __future__ import annotations
+
+from database_pg_module.mixins.archive import ArchiveMixin, history_source
+
+
+def test_history_source_unions_archive_only_when_asked():
+    assert history_source("orders", ("order_id", "user_id")) == "orders"
+    assert history_source("bookings", ("booking_id",), include_archive=True) == (
+        "(SELECT booking_id FROM bookings UNION ALL SELECT booking_id FROM bookings_archive)"
+    )
+
+
+class FakeCatalogCursor:
+    def __init__(self, columns, references, *child_columns):
+        self._results = [[(c,) for c in columns], references]
+        self._results += [[(c,) for c in cols] for cols in child_columns]
+        self._rows = []
+
+    def execute(self, sql, params=None):
+        self._rows = self._results.pop(0)
+
+    def fetchall(self):
+        return self._rows
+
+
+def test_move_sql_copies_hot_columns_and_keeps_referenced_rows():
+    cursor = FakeCatalogCursor(
+        ["order_id", "user_id", "order_status"],
+        [("ratings", "order_id"), ("click_transactions", "order_id")],
+        ["order_id", "position", "title"],
+    )
+
+    query = ArchiveMixin()._archive_move_sql(cursor, "orders")
+
+    assert 'INSERT INTO orders_archive ("order_id", "user_id", "order_status")' in query
+    assert "h.order_status = ANY(%s)" in query
+    assert 'NOT EXISTS (SELECT 1 FROM ratings r WHERE r."order_id" = h.order_id)' in query
+    assert "FROM click_transactions r" in query
+    assert "FOR UPDATE SKIP LOCKED" in query
+    # Cascade children are archived by the same statement
+    assert "DELETE FROM order_items c USING moved m" in query
+    assert 'INSERT INTO order_items_archive ("order_id", "position", "title")' in query
+
+
+class FakeArchiveDb:
+    def __init__(self, orders, bookings):
+        self.orders = orders
+        self.bookings = bookings
+
+    async def get_archived_order(self, order_id):
+        return self.orders.get(order_id)
+
+    async def get_archived_booking(self, booking_id):
+        return self.bookings.get(booking_id)
+
+
+async def test_archived_lookup_prefers_the_users_own_row_on_id_collision():
+    from app.api.orders import _get_archived_entity
+
+    db = FakeArchiveDb({7: {"order_id": 7, "user_id": 1}}, {7: {"booking_id": 7, "user_id": 2}})
+
+    assert (await _get_archived_entity(db, 7, 2))["booking_id"] == 7
+    assert (await _get_archived_entity(db, 7, 1))["order_id"] == 7
+    # Nothing of the caller's: the foreign row comes back for the 403
+    assert (await _get_archived_entity(db, 7, 3))["order_id"] == 7
+    assert await _get_archived_entity(db, 8, 2) is None
+
+
+def test_archive_history_moves_old_finished_orders(db, seller_store):
+    _, store_id = seller_store
+    buyer_id = 400002
+    db.add_user(user_id=buyer_id, username="archive_buyer")
+    with db.get_connection() as conn:
+        cursor = conn.cursor()
+        ids = []
+        for status, age_days in (("completed", 400), ("pending", 400), ("completed", 1)):
+            cursor.execute(
+                """
+                INSERT INTO orders (user_id, store_id, order_status, quantity, total_price,
+                                    created_at, updated_at)
+                VALUES (%s, %s, %s, 1, 1000,
+                        NOW() - make_interval(days => %s), NOW() - make_interval(days => %s))
+                RETURNING order_id
+                """,
+                (buyer_id, store_id, status, age_days, age_days),
+            )
+            ids.append(cursor.fetchone()[0])
+        cursor.execute(
+            "INSERT INTO order_items (order_id, position, title, quantity, price) "
+            "VALUES (%s, 0, 'Bread', 1, 1000)",
+            (ids[0],),
+        )
+
+    moved = db.archive_history(retention_days=30, batch_size=1)
+
+    assert moved["orders"] >= 1
+    old_done, old_pending, recent = ids
+    assert db.get_order(old_done) is None
+    assert db.get_archived_order(old_done)["order_status"] == "completed"
+    assert db.get_order_items([old_done]) == {}
+    assert db.get_order_items([old_done], include_archive=True)[old_done][0]["title"] == "Bread"
+    assert db.get_order(old_pending) is not None
+    assert db.get_order(recent) is not None
+
+    source = history_source("orders", ("order_id", "user_id"), include_archive=True)
+    with db.get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(f"SELECT order_id FROM {source} h WHERE user_id = %s", (buyer_id,))
+        assert sorted(row[0] for row in cursor.fetchall()) == sorted(ids)
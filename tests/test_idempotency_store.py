@@ -0,0 +1,190 @@
+"""Tests for the Redis-first order idempotency store."""
+from __future__ import annotations
+
+import pytest
+
+from app.core import idempotency
+from app.core.idempotency import (
+    PostgresIdempotencyStore,
+    RedisIdempotencyStore,
+    check_or_reserve_key,
+    store_idempotency_response,
+)
+
+
+class FakeRedis:
+    def __init__(self):
+        self.values: dict[str, bytes] = {}
+        self.ttls: dict[str, int] = {}
+        self.fail = False
+
+    def set(self, key, value, nx=False, xx=False, ex=None, keepttl=False):
+        if self.fail:
+            raise ConnectionError("redis down")
+        if nx and key in self.values:
+            return None
+        if xx and key not in self.values:
+            return None
+        self.values[key] = value.encode() if isinstance(value, str) else value
+        if ex is not None:
+            self.ttls[key] = ex
+        elif not keepttl:
+            self.ttls.pop(key, None)
+        return True
+
+    def get(self, key):
+        if self.fail:
+            raise ConnectionError("redis down")
+        return self.values.get(key)
+
+    def delete(self, key):
+        if self.fail:
+            raise ConnectionError("redis down")
+        self.values.pop(key, None)
+
+
+class FakeFallback:
+    def __init__(self):
+        self.calls: list[str] = []
+
+    def reserve(self, key, user_id, request_hash):
+        self.calls.append("reserve")
+        return {"status": "reserved", "key": key}
+
+    def store(self, key, user_id, request_hash, response_body, status_code):
+        self.calls.append("store")
+
+
+@pytest.fixture
+def fake_redis(monkeypatch):
+    client = FakeRedis()
+    monkeypatch.setattr(idempotency, "_redis_client", client)
+    monkeypatch.setattr(idempotency, "_redis_checked", True)
+    return client
+
+
+def test_redis_reserve_then_replay_cached_response(fake_redis):
+    first = check_or_reserve_key(None, " key-1 ", 7, "hash-a")
+    again = check_or_reserve_key(None, "key-1", 7, "hash-a")
+    store_idempotency_response(None, "key-1", 7, "hash-a", {"order_id": 5}, 201)
+    cached = check_or_reserve_key(None, "key-1", 7, "hash-a")
+    conflict = check_or_reserve_key(None, "key-1", 7, "hash-b")
+
+    assert first == {"status": "reserved", "key": "key-1"}
+    assert again["status"] == "in_progress"
+    assert cached == {"status": "cached", "payload": {"order_id": 5}, "status_code": 201}
+    assert conflict["status"] == "conflict"
+    assert fake_redis.ttls["idempotency:7:key-1"] == idempotency.IDEMPOTENCY_TTL_SECONDS
+    assert check_or_reserve_key(None, "key-1", 8, "hash-b")["status"] == "reserved"
+    assert check_or_reserve_key(None, "  ", 7, "hash-a") == {"status": "skip"}
+
+
+def test_redis_errors_fall_back_to_postgres():
+    client = FakeRedis()
+    client.fail = True
+    fallback = FakeFallback()
+    store = RedisIdempotencyStore(client, fallback=fallback)
+
+    assert store.reserve("key-2", 7, "hash")["status"] == "reserved"
+    store.store("key-2", 7, "hash", "{}", 201)
+
+    assert fallback.calls == ["reserve", "store"]
+
+
+def test_failed_redis_store_keeps_the_reservation():
+    client = FakeRedis()
+    fallback = FakeFallback()
+    store = RedisIdempotencyStore(client, fallback=fallback)
+    assert store.reserve("key-3", 7, "hash")["status"] == "reserved"
+
+    def broken_set(*args, **kwargs):
+        raise ConnectionError("redis write failed")
+
+    client.set, working_set = broken_set, client.set
+    store.store("key-3", 7, "hash", "{}", 201)
+    client.set = working_set
+
+    # The order exists: a retry must not run it again
+    assert store.reserve("key-3", 7, "hash")["status"] == "in_progress"
+    assert fallback.calls == ["store"]
+
+
+def test_redis_store_is_retried_once():
+    client = FakeRedis()
+    store = RedisIdempotencyStore(client, fallback=FakeFallback())
+    store.reserve("key-4", 7, "hash")
+    failures = iter([ConnectionError("timeout")])
+    working_set = client.set
+
+    def flaky_set(*args, **kwargs):
+        error = next(failures, None)
+        if error:
+            raise error
+        return working_set(*args, **kwargs)
+
+    client.set = flaky_set
+    store.store("key-4", 7, "hash", '{"order_id": 9}', 201)
+
+    assert store.reserve("key-4", 7, "hash")["status"] == "cached"
+    assert store._fallback.calls == []
+
+
+class FakeCursor:
+    def __init__(self, batches):
+        self.batches = batches
+        self.rowcount = 0
+        self.executed: list[tuple] = []
+
+    def execute(self, sql, params=None):
+        self.executed.append(params)
+        self.rowcount = self.batches.pop(0)
+
+
+class FakeConnection:
+    def __init__(self, cursor):
+        self._cursor = cursor
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def cursor(self):
+        return self._cursor
+
+
+class FakePurgeDb:
+    def __init__(self, batches):
+        self.cursor = FakeCursor(batches)
+        self.connections = 0
+
+    def get_connection(self):
+        self.connections += 1
+        return FakeConnection(self.cursor)
+
+
+def test_purge_deletes_in_batches_until_short_batch():
+    db = FakePurgeDb([100, 100, 40])
+
+    deleted = PostgresIdempotencyStore(db, ttl=60).purge_expired(batch_size=100)
+
+    assert deleted == 240
+    assert db.connections == 3
+    assert db.cursor.executed == [(60, 100)] * 3
+
+
+def test_postgres_reserve_against_database(db, monkeypatch):
+    monkeypatch.setattr(idempotency, "_redis_client", None)
+    monkeypatch.setattr(idempotency, "_redis_checked", True)
+    key = "pg-idempotency-test"
+
+    assert check_or_reserve_key(db, key, 380001, "hash-a")["status"] == "reserved"
+    assert check_or_reserve_key(db, key, 380001, "hash-a")["status"] == "in_progress"
+    store_idempotency_response(db, key, 380001, "hash-a", {"order_id": 9}, 201)
+    assert check_or_reserve_key(db, key, 380001, "hash-a")["payload"] == {"order_id": 9}
+    assert check_or_reserve_key(db, key, 380001, "hash-b")["status"] == "conflict"
+
+    expired_store = PostgresIdempotencyStore(db, ttl=0)
+    assert expired_store.reserve(key, 380001, "hash-b")["status"] == "reserved"
+    assert expired_store.purge_expired(batch_size=10) >= 1
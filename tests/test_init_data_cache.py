@@ -0,0 +1,101 @@
+"""Tests for the verified initData cache."""
+from __future__ import annotations
+
+import hashlib
+import hmac
+import json
+import os
+import time
+from urllib.parse import urlencode
+
+import pytest
+
+os.environ.setdefault("TELEGRAM_BOT_TOKEN", "test-token")
+
+from app.api import partner_panel_simple
+from app.api.webapp.common import validate_init_data
+from app.core.init_data_cache import VerifiedInitDataCache, init_data_cache
+
+BOT_TOKEN = "123456:test-token"
+
+
+def _init_data(auth_date: int, user_id: int = 77) -> str:
+    fields = {
+        "auth_date": str(auth_date),
+        "user": json.dumps({"id": user_id, "first_name": "T"}),
+    }
+    data_check_string = "\n".join(f"{k}={v}" for k, v in sorted(fields.items()))
+    secret_key = hmac.new(b"WebAppData", BOT_TOKEN.encode(), hashlib.sha256).digest()
+    fields["hash"] = hmac.new(secret_key, data_check_string.encode(), hashlib.sha256).hexdigest()
+    return urlencode(fields)
+
+
+@pytest.fixture(autouse=True)
+def _clear_cache():
+    init_data_cache.clear()
+    yield
+    init_data_cache.clear()
+
+
+def test_repeated_validation_is_served_from_cache(monkeypatch):
+    init_data = _init_data(int(time.time()))
+    first = validate_init_data(init_data, BOT_TOKEN)
+
+    def _fail(*args, **kwargs):
+        raise AssertionError("HMAC recomputed for cached initData")
+
+    monkeypatch.setattr("app.api.webapp.common.hmac.new", _fail)
+    second = validate_init_data(init_data, BOT_TOKEN)
+
+    assert first == second
+    assert second["user"]["id"] == 77
+    # Callers get copies, the cached entry stays intact
+    second["user"]["id"] = 1
+    assert validate_init_data(init_data, BOT_TOKEN)["user"]["id"] == 77
+
+
+def test_invalid_init_data_is_not_cached():
+    init_data = _init_data(int(time.time())).replace("hash=", "hash=0")
+
+    assert validate_init_data(init_data, BOT_TOKEN) is None
+    assert init_data_cache.get("webapp", BOT_TOKEN, init_data) is None
+
+
+def test_cached_entry_honours_auth_date_expiry(monkeypatch):
+    cache = VerifiedInitDataCache(maxsize=8, ttl=300)
+    cache.set("webapp", BOT_TOKEN, "init", {"ok": True}, expires_at=time.time() + 10)
+    assert cache.get("webapp", BOT_TOKEN, "init") == {"ok": True}
+    assert cache.get("webapp", "other-token", "init") is None
+
+    monkeypatch.setattr("app.core.init_data_cache.time.time", lambda: time.monotonic() + 1e10)
+    assert cache.get("webapp", BOT_TOKEN, "init") is None
+
+
+@pytest.mark.asyncio
+async def test_partner_context_is_cached_until_invalidated():
+    class FakeDb:
+        def __init__(self):
+            self.calls = 0
+
+        def get_user(self, user_id):
+            self.calls += 1
+            return {"user_id": user_id, "first_name": "P"}
+
+        def get_store_by_owner(self, user_id):
+            self.calls += 1
+            return {"store_id": 5, "status": "active"}
+
+    db = FakeDb()
+    partner_panel_simple.set_partner_db(db)
+    try:
+        user, store = await partner_panel_simple.get_partner_with_store(9)
+        store["status"] = "closed"
+        _, cached_store = await partner_panel_simple.get_partner_with_store(9)
+        assert db.calls == 2
+        assert cached_store["status"] == "active"
+
+        partner_panel_simple.invalidate_partner_cache(9)
+        await partner_panel_simple.get_partner_with_store(9)
+        assert db.calls == 4
+    finally:
+        partner_panel_simple.set_partner_db(None)
@@ -0,0 +1,145 @@
+import asyncio
+import json
+import threading
+import time
+
+import pytest
+from aiohttp.test_utils import make_mocked_request
+
+from app.core.async_db import AsyncDBProxy
+from app.core.loop_monitor import EventLoopLagMonitor
+from app.core.webhook_discovery_routes import build_discovery_handlers
+
+
+@pytest.mark.asyncio
+async def test_lag_monitor_reports_blocking_handler():
+    monitor = EventLoopLagMonitor(interval=0.02, threshold=0.05)
+    monitor.start()
+    await asyncio.sleep(0.05)
+
+    with monitor.track("GET api_slow"):
+        time.sleep(0.15)  # simulate a sync DB call on the loop
+    await asyncio.sleep(0.1)
+    await monitor.stop()
+
+    assert monitor.stalls >= 1
+    assert monitor.max_lag >= 0.1
+    assert any(label == "GET api_slow" for label, _ in monitor.suspects(0.0))
+
+
+@pytest.mark.asyncio
+async def test_async_db_proxy_runs_off_loop():
+    loop_thread = threading.get_ident()
+
+    class SyncDb:
+        def get_thread(self):
+            return threading.get_ident()
+
+    proxy = AsyncDBProxy(SyncDb())
+    assert await proxy.get_thread() != loop_thread
+    assert await proxy.run(lambda: threading.get_ident()) != loop_thread
+
+
+@pytest.mark.asyncio
+async def test_discovery_routes_query_db_off_loop():
+    loop_thread = threading.get_ident()
+
+    class SyncDb:
+        def __init__(self):
+            self.threads = []
+
+        def count_offers_by_category_grouped(self, city=None, region=None, district=None):
+            self.threads.append(threading.get_ident())
+            return {"bakery": 2}
+
+    db = SyncDb()
+    api_categories, _, _ = build_discovery_handlers(db)
+    response = await api_categories(make_mocked_request("GET", "/api/v1/categories"))
+    payload = json.loads(response.text)
+
+    assert {item["id"]: item["count"] for item in payload}["all"] == 2
+    assert db.threads and loop_thread not in db.threads
+
+
+@pytest.mark.asyncio
+async def test_watchdog_captures_blocking_stack_and_exports_metrics():
+    from app.core.metrics import metrics
+
+    monitor = EventLoopLagMonitor(interval=0.02, threshold=0.05, capture_stacks=True)
+    before = metrics.event_loop_blocked.get_avg(handler="GET api_blocking") == 0
+    monitor.start()
+    await asyncio.sleep(0.05)
+
+    def blocking_db_call():
+        time.sleep(0.3)
+
+    with monitor.track("GET api_blocking"):
+        blocking_db_call()
+    await asyncio.sleep(0.1)
+    await monitor.stop()
+
+    assert before
+    assert monitor.last_stack and "blocking_db_call" in monitor.last_stack
+    assert metrics.event_loop_blocked.get_avg(handler="GET api_blocking") >= 0.2
+    assert "fudly_event_loop_lag_seconds" in metrics.export_prometheus()
+
+
+@pytest.mark.parametrize(
+    "text, label",
+    [
+        ("/start ref_42", "command:start"),
+        ("/Help@fudly_bot", "command:help"),
+        ("/whatever_the_user_typed", "command:other"),
+        ("/", "command:other"),
+        ("hello", "message:text"),
+    ],
+)
+def test_update_labels_only_name_known_commands(text, label):
+    from aiogram.types import Update
+
+    from app.middlewares.loop_lag_middleware import LoopLagMiddleware
+
+    update = Update.model_validate(
+        {
+            "update_id": 1,
+            "message": {
+                "message_id": 1,
+                "date": 0,
+                "chat": {"id": 1, "type": "private"},
+                "text": text,
+            },
+        }
+    )
+
+    assert LoopLagMiddleware._label(update) == label
+
+
+@pytest.mark.parametrize(
+    "payload, label",
+    [
+        ("order_confirm_123", "callback:order_confirm"),
+        ("store_page_5_40", "callback:store_page"),
+        ("cart_qty_7_2", "callback:cart_qty"),
+        ("cart_qty_inc_7", "callback:cart_qty_inc"),
+        ("1c_setup_guide", "callback:1c_setup_guide"),
+        ("cat:5:page", "callback:cat"),
+    ],
+)
+def test_callback_labels_drop_ids(payload, label):
+    from aiogram.types import Update
+
+    from app.middlewares.loop_lag_middleware import LoopLagMiddleware
+
+    update = Update.model_validate(
+        {
+            "update_id": 1,
+            "callback_query": {
+                "id": "1",
+                "from": {"id": 1, "is_bot": False, "first_name": "Test"},
+                "chat_instance": "1",
+                "data": payload,
+            },
+        }
+    )
+
+    assert LoopLagMiddleware._label(update) == label
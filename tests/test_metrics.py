@@ -164,3 +164,47 @@ class TestDecorators:
         # Check error was tracked
         assert metrics.errors_total.get(handler="error_handler", error_type="ValueError") >= 1
         assert metrics.requests_total.get(handler="error_handler", status="error") >= 1
+
+
+class TestActiveUserTracker:
+    """Tests for the bucketed active user tracker."""
+
+    def test_counts_distinct_users_per_city_in_window(self):
+        from app.middlewares.metrics_middleware import ActiveUserTracker
+
+        tracker = ActiveUserTracker(window_seconds=600, bucket_seconds=60)
+        tracker.record(1, "Tashkent", now=1000)
+        tracker.record(1, "Tashkent", now=1010)
+        tracker.record(2, "Samarkand", now=1100)
+
+        assert tracker.local_counts(now=1100) == {"Tashkent": 1, "Samarkand": 1, "all": 2}
+        # First bucket drops out of the 10 minute window
+        assert tracker.local_counts(now=1000 + 600) == {"Samarkand": 1, "all": 1}
+
+    @pytest.mark.asyncio
+    async def test_middleware_uses_cached_city_without_db(self):
+        from unittest.mock import MagicMock
+
+        from aiogram.types import Chat, Message, User
+
+        from app.middlewares.metrics_middleware import MetricsMiddleware
+
+        middleware = MetricsMiddleware(gauge_interval=3600)
+        message = Message.model_construct(
+            message_id=1,
+            date=0,
+            chat=Chat(id=42, type="private"),
+            from_user=User(id=42, is_bot=False, first_name="T"),
+        )
+        db = MagicMock()
+
+        async def handler(event, data):
+            return "ok"
+
+        result = await middleware(handler, message, {"db": db, "user_city": "Bukhara"})
+        await middleware.active_users.refresh_gauge()
+        middleware._gauge_task.cancel()
+
+        assert result == "ok"
+        assert not db.method_calls
+        assert metrics.active_users.get(city="Bukhara") >= 1
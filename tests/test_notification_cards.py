@@ -0,0 +1,60 @@
+"""Tests for the precompiled order notification cards."""
+from __future__ import annotations
+
+from app.services import unified_order_service
+from app.services.notification_builder import NotificationBuilder, cached_text
+from app.services.unified_order_service import NotificationTemplates
+
+
+def _seller_card(order_id: int, **overrides) -> str:
+    fields = {
+        "lang": "ru",
+        "order_id": order_id,
+        "status": "preparing",
+        "order_type": "delivery",
+        "items": [{"title": "Bread <fresh>", "quantity": 2, "price": 1500}],
+        "customer_name": "Ann & Bob",
+        "customer_phone": "+998901234567",
+        "total": 0,
+        "delivery_price": 5000,
+        "currency": "UZS",
+    }
+    return NotificationTemplates._build_seller_card(**{**fields, **overrides})
+
+
+def test_seller_cards_share_one_compiled_template():
+    unified_order_service._seller_card_template.cache_clear()
+
+    first = _seller_card(101)
+    second = _seller_card(102, customer_name="Dan")
+
+    info = unified_order_service._seller_card_template.cache_info()
+    assert (info.misses, info.hits) == (1, 1)
+    assert first.startswith(f"📦 {cached_text('ru', 'label_order')} #101 — ")
+    assert "Ann &amp; Bob" in first and "Dan" in second
+    assert "• Bread &lt;fresh&gt; ×2.0" in first
+    assert f"{cached_text('ru', 'label_total')}: 3 000 UZS" in first
+
+
+def test_customer_card_shows_reason_and_code_only_where_they_apply():
+    card = NotificationTemplates._build_customer_card
+    common = {"lang": "uz", "order_id": 7, "order_type": "pickup", "total": 12000}
+
+    rejected = card(status="rejected", reject_reason="No stock", pickup_code="A1", **common)
+    ready = card(status="ready", reject_reason="No stock", pickup_code="<A1>", **common)
+
+    assert " — No stock</b>" in rejected
+    assert "No stock" not in ready
+    assert ready.endswith("\n<code>&lt;A1&gt;</code>")
+    assert f"{cached_text('uz', 'label_amount')}: <b>12,000 UZS</b>" in ready
+
+
+def test_builder_card_header_for_single_order_and_cart():
+    builder = NotificationBuilder("pickup")
+
+    single = builder.build(status="pending", lang="ru", order_id=5)
+    cart = builder.build(status="pending", lang="ru", order_id=5, order_ids=[5, 6])
+
+    assert single.splitlines()[0] == f"🧾 {cached_text('ru', 'label_order')} #5 — Самовывоз"
+    assert cart.splitlines()[0] == f"🧾 {cached_text('ru', 'label_cart')} — Самовывоз"
+    assert cart.splitlines()[-1] == f"{cached_text('ru', 'label_orders')}: #5, #6"
@@ -0,0 +1,151 @@
+"""Tests for the shared streaming offer CSV import."""
+from __future__ import annotations
+
+import io
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.services.auto_discount_service import AutoDiscountService
+from app.services.offer_import import (
+    ImportFormatError,
+    RowSkipped,
+    import_offers_csv,
+)
+
+
+class FakeBulkDb:
+    def __init__(self, fail_on_call: int | None = None):
+        self.batches: list[list[dict]] = []
+        self.fail_on_call = fail_on_call
+
+    def bulk_import_offers(self, store_id, rows, source=None):
+        if self.fail_on_call == len(self.batches):
+            self.batches.append([])
+            raise RuntimeError("boom")
+        self.batches.append(rows)
+        # Rows repeating a SKU merge into one offer
+        codes = [row.get("external_code") for row in rows]
+        return codes.count(None) + len({code for code in codes if code is not None})
+
+
+def _map_row(row):
+    if row["title"] == "skip":
+        raise RowSkipped
+    return {
+        "title": row["title"],
+        "original_price": int(row["original_price"]),
+        "discount_price": int(row["discount_price"]),
+    }
+
+
+def _csv(rows: int) -> bytes:
+    lines = ["title,original_price,discount_price,sku"]
+    lines += [f"Item {i},10000,5000,SKU-{i}" for i in range(rows)]
+    return ("\ufeff" + "\n".join(lines)).encode()
+
+
+async def test_import_streams_in_chunks_and_reports_progress():
+    db = FakeBulkDb()
+    progress: list[int] = []
+
+    result = await import_offers_csv(
+        db,
+        1,
+        io.BytesIO(_csv(5)),
+        _map_row,
+        chunk_size=2,
+        on_progress=lambda r: progress.append(r.total_rows),
+    )
+
+    assert [len(batch) for batch in db.batches] == [2, 2, 1]
+    assert db.batches[0][0]["external_code"] == "SKU-0"
+    assert result.imported == 5
+    assert progress == [2, 4, 5]
+
+
+async def test_row_errors_and_skips_are_reported_per_row():
+    content = "\n".join(
+        [
+            "title,original_price,discount_price",
+            "Good,10000,5000",
+            "skip,1,1",
+            "Pricey,10000,9900",
+            "Broken,abc,1",
+        ]
+    )
+
+    result = await import_offers_csv(FakeBulkDb(), 1, content, _map_row)
+
+    assert (result.total_rows, result.imported, result.skipped, result.failed) == (4, 1, 1, 2)
+    assert [error.row for error in result.errors] == [4, 5]
+    assert result.error_lines(limit=1)[0].startswith("Row 4: ")
+
+
+async def test_failed_chunk_marks_its_rows_failed():
+    result = await import_offers_csv(FakeBulkDb(fail_on_call=0), 1, _csv(3), _map_row, chunk_size=2)
+
+    assert result.imported == 1
+    assert [error.row for error in result.errors] == [2, 3]
+
+
+async def test_repeated_skus_are_reported_as_duplicates():
+    content = _csv(3).decode("utf-8-sig") + "\nItem 0 again,10000,4000,SKU-0"
+
+    result = await import_offers_csv(FakeBulkDb(), 1, content, _map_row)
+
+    assert (result.total_rows, result.imported, result.duplicates) == (4, 3, 1)
+    assert result.skipped == 1
+
+
+async def test_missing_required_columns():
+    with pytest.raises(ImportFormatError):
+        await import_offers_csv(
+            FakeBulkDb(), 1, "title\nMilk", _map_row, required_columns=("title", "photo_file")
+        )
+
+
+async def test_auto_discount_csv_uses_bulk_engine():
+    db = FakeBulkDb()
+    tomorrow = (datetime.now() + timedelta(days=1)).strftime("%Y-%m-%d")
+    content = f"name;price;quantity;expiry_date\nMilk;10 000;3;{tomorrow}\nBad;x;1;{tomorrow}\n;1;1;"
+
+    result = await AutoDiscountService(db).import_from_csv(1, content.encode(), owner_id=1)
+
+    assert result["imported"] == 1
+    assert result["skipped"] == 1
+    assert result["total_errors"] == 1
+    assert result["errors"][0].startswith("Строка 3: ")
+    assert db.batches[0][0]["discount_price"] == 5000
+
+
+async def test_auto_discount_csv_imports_week_tier_rows():
+    db = FakeBulkDb()
+    in_five_days = (datetime.now() + timedelta(days=5)).strftime("%Y-%m-%d")
+    content = f"name;price;quantity;expiry_date\nCheese;10000;2;{in_five_days}"
+
+    result = await AutoDiscountService(db).import_from_csv(1, content.encode(), owner_id=1)
+
+    assert (result["imported"], result["total_errors"]) == (1, 0)
+    assert db.batches[0][0]["discount_price"] == 8000
+
+
+def test_bulk_import_offers_merges_by_sku(db, seller_store):
+    _, store_id = seller_store
+    rows = [
+        {"title": "Bread", "original_price": 4000, "discount_price": 2000, "quantity": 5},
+        {
+            "title": "Milk",
+            "original_price": 10000,
+            "discount_price": 5000,
+            "quantity": 2,
+            "external_code": "SKU-1",
+        },
+    ]
+
+    assert db.bulk_import_offers(store_id, rows, "csv") == 2
+    rows[1]["quantity"] = 7
+    assert db.bulk_import_offers(store_id, rows[1:], "csv") == 1
+
+    offers = db.get_store_offers(store_id, status="active")
+    assert sorted(offer["title"] for offer in offers) == ["Bread", "Milk"]
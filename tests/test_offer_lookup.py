@@ -0,0 +1,79 @@
+"""Tests for batched offer lookups used by cart and checkout."""
+from __future__ import annotations
+
+from app.core.async_db import AsyncDBProxy
+from app.core.offer_lookup import OfferLookup, fetch_offers_by_ids
+
+
+class FakeBatchDb:
+    def __init__(self, offers):
+        self.offers = offers
+        self.batches: list[list[int]] = []
+
+    def get_offers_by_ids(self, offer_ids):
+        self.batches.append(list(offer_ids))
+        return {i: self.offers[i] for i in offer_ids if i in self.offers}
+
+
+class FakeSingleDb:
+    def __init__(self, offers):
+        self.offers = offers
+        self.calls: list[int] = []
+
+    def get_offer(self, offer_id):
+        self.calls.append(offer_id)
+        return self.offers.get(offer_id)
+
+
+def test_fetch_uses_one_batch_query():
+    db = FakeBatchDb({1: {"offer_id": 1}, 2: {"offer_id": 2}})
+
+    offers = fetch_offers_by_ids(db, [2, "1", 2, None, 3])
+
+    assert db.batches == [[2, 1, 3]]
+    assert sorted(offers) == [1, 2]
+
+
+def test_fetch_falls_back_to_single_lookups():
+    db = FakeSingleDb({5: {"offer_id": 5}})
+
+    assert fetch_offers_by_ids(db, [5, 6]) == {5: {"offer_id": 5}}
+    assert db.calls == [5, 6]
+
+
+async def test_lookup_memoizes_hits_and_misses():
+    db = FakeBatchDb({1: {"offer_id": 1}, 2: {"offer_id": 2}})
+    lookup = OfferLookup(AsyncDBProxy(db))
+
+    first = await lookup.aload([1, 3])
+    second = await lookup.aload([1, 2, 3])
+
+    assert list(first) == [1]
+    assert list(second) == [1, 2]
+    assert db.batches == [[1, 3], [2]]
+    assert lookup.get(2) == {"offer_id": 2}
+    assert lookup.load([3]) == {}
+    assert len(db.batches) == 2
+
+
+def test_get_offers_by_ids_joins_store(db, seller_store):
+    _, store_id = seller_store
+    offer_ids = [
+        db.add_offer(
+            store_id=store_id,
+            title=title,
+            original_price=10000,
+            discount_price=5000,
+            quantity=3,
+        )
+        for title in ("Milk", "Bread")
+    ]
+
+    offers = db.get_offers_by_ids(offer_ids + [999999999])
+
+    assert sorted(offers) == sorted(offer_ids)
+    milk = offers[offer_ids[0]]
+    assert milk["title"] == "Milk"
+    assert milk["store_name"] == "Test Store"
+    assert milk["store_address"] == "Test street 1"
+    assert db.get_offers_by_ids([]) == {}
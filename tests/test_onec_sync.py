@@ -0,0 +1,164 @@
+"""Tests for the indexed, bulk 1C catalog sync."""
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+
+from app.integrations.onec_integration import (
+    ONEC_SOURCE,
+    OneCConfig,
+    OneCIntegration,
+    OneCProduct,
+)
+from app.services.auto_discount_service import AutoDiscountService
+
+
+def _product(code: str, days: int, price: int = 10000, quantity: int = 5) -> OneCProduct:
+    return OneCProduct(
+        code=code,
+        name=f"Product {code}",
+        price=price,
+        quantity=quantity,
+        expiry_date=datetime.now() + timedelta(days=days),
+    )
+
+
+class FakeSyncDb:
+    def __init__(self, index: dict[str, dict]):
+        self.index = index
+        self.applied: list[tuple] = []
+
+    def get_external_offer_index(self, store_id, source):
+        return self.index
+
+    def apply_external_offer_sync(self, store_id, source, upserts, deactivate_codes):
+        self.applied.append((store_id, source, upserts, deactivate_codes))
+        inserted = sum(1 for row in upserts if row["external_code"] not in self.index)
+        return {
+            "inserted": inserted,
+            "updated": len(upserts) - inserted,
+            "deactivated": len(deactivate_codes),
+        }
+
+
+def _integration(products: list[OneCProduct]) -> OneCIntegration:
+    integration = OneCIntegration(OneCConfig(base_url="http://1c/", username="u", password="p"))
+
+    async def fetch_expiring_products():
+        return products
+
+    integration.fetch_expiring_products = fetch_expiring_products  # type: ignore[method-assign]
+    return integration
+
+
+async def test_sync_applies_diff_in_one_call():
+    discounts = AutoDiscountService(db=None)
+    unchanged = _product("A", days=1)
+    discount = discounts.calculate_discount(unchanged.expiry_date, unchanged.price)
+    index = {
+        "A": {
+            "status": "active",
+            "title": unchanged.name,
+            "description": discount.urgency_message,
+            "original_price": unchanged.price,
+            "discount_price": discount.discount_price,
+            "quantity": 5.0,
+            "expiry_date": unchanged.expiry_date.date(),
+            "category": "other",
+        },
+        "B": {"status": "active", "title": "Old title", "quantity": 1.0},
+        "GONE": {"status": "active"},
+        "OLD": {"status": "inactive"},
+    }
+    db = FakeSyncDb(index)
+    products = [unchanged, _product("B", days=0), _product("NEW", days=2), _product("FRESH", 30)]
+
+    stats = await _integration(products).sync_to_store(7, db, discounts)
+
+    assert len(db.applied) == 1
+    store_id, source, upserts, deactivate_codes = db.applied[0]
+    assert (store_id, source) == (7, ONEC_SOURCE)
+    assert sorted(row["external_code"] for row in upserts) == ["B", "NEW"]
+    assert deactivate_codes == ["GONE"]
+    assert stats["fetched"] == 4
+    assert (stats["imported"], stats["updated"], stats["unchanged"]) == (1, 1, 1)
+    assert (stats["deactivated"], stats["skipped"], stats["errors"]) == (1, 1, 0)
+    assert {"fetch_ms", "diff_ms", "apply_ms"} <= stats.keys()
+
+
+async def test_empty_fetch_does_not_deactivate():
+    db = FakeSyncDb({"A": {"status": "active"}})
+
+    stats = await _integration([]).sync_to_store(7, db, AutoDiscountService(db=None))
+
+    assert db.applied == []
+    assert stats["deactivated"] == 0
+
+
+class _Response:
+    def __init__(self, items: list[dict]):
+        self.status = 200
+        self._items = items
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def json(self):
+        return {"value": self._items}
+
+
+class _PagedSession:
+    def __init__(self, total: int):
+        self.total = total
+        self.requests: list[dict] = []
+
+    def get(self, url, params):
+        self.requests.append(params)
+        expiry = (datetime.now() + timedelta(days=1)).strftime("%Y-%m-%d")
+        start = params["$skip"]
+        stop = min(start + params["$top"], self.total)
+        items = [
+            {"Код": str(i), "Наименование": f"P{i}", "Цена": 1000, "Количество": 1,
+             "СрокГодности": expiry}
+            for i in range(start, stop)
+        ]
+        return _Response(items)
+
+
+async def test_fetch_pages_through_odata():
+    integration = OneCIntegration(
+        OneCConfig(base_url="http://1c/", username="u", password="p", page_size=2)
+    )
+    session = _PagedSession(total=5)
+
+    products = await integration._fetch_all_pages(session, "http://1c/x", {"$format": "json"})
+
+    assert [p.code for p in products] == ["0", "1", "2", "3", "4"]
+    assert [r["$skip"] for r in session.requests] == [0, 2, 4]
+
+
+def test_apply_external_offer_sync_against_database(db, seller_store):
+    _, store_id = seller_store
+    row = {
+        "external_code": "SKU-1",
+        "title": "Milk",
+        "description": "Last day",
+        "original_price": 10000,
+        "discount_price": 5000,
+        "quantity": 3,
+        "expiry_date": datetime.now().date(),
+        "category": "dairy",
+    }
+
+    first = db.apply_external_offer_sync(store_id, ONEC_SOURCE, [row], [])
+    again = db.apply_external_offer_sync(store_id, ONEC_SOURCE, [{**row, "quantity": 2}], [])
+    index = db.get_external_offer_index(store_id, ONEC_SOURCE)
+
+    assert (first["inserted"], again["updated"]) == (1, 1)
+    assert float(index["SKU-1"]["quantity"]) == 2
+
+    gone = db.apply_external_offer_sync(store_id, ONEC_SOURCE, [], ["SKU-1"])
+    assert gone["deactivated"] == 1
+    assert db.get_external_offer_index(store_id, ONEC_SOURCE)["SKU-1"]["status"] == "inactive"
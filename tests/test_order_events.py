@@ -0,0 +1,215 @@
+"""Tests for the order_events outbox and its relay."""
+from __future__ import annotations
+
+import pytest
+
+from app.services import unified_order_service
+from app.services.order_events import (
+    ORDER_CREATED,
+    STATUS_CHANGED,
+    OrderEventRelay,
+    retry_delay,
+)
+from app.services.unified_order_service import StatusUpdateContext, UnifiedOrderService
+
+
+class OutboxDb:
+    def __init__(self, events=None):
+        self.events = list(events or [])
+        self.status_updates: list[tuple] = []
+        self.completed: list[int] = []
+        self.failed: list[tuple] = []
+
+    def add_order_event(self, cursor, entity_type, entity_id, event_type, payload=None):
+        raise AssertionError("written by update_order_status in its transaction")
+
+    def update_order_status(self, order_id, order_status, outbox_event=None):
+        self.status_updates.append((order_id, order_status, outbox_event))
+        return True
+
+    def claim_order_events(self, limit=20, lease_seconds=120):
+        claimed, self.events = self.events[:limit], self.events[limit:]
+        return claimed
+
+    def complete_order_event(self, event_id):
+        self.completed.append(event_id)
+
+    def fail_order_event(self, event_id, error, retry_in=None, delivered_to=None):
+        self.failed.append((event_id, error, retry_in, delivered_to))
+
+
+def _ctx(entity_id: int = 7) -> StatusUpdateContext:
+    return StatusUpdateContext(
+        entity_id=entity_id,
+        entity_type="order",
+        entity={"order_id": entity_id, "order_status": "pending"},
+        user_id=1,
+        store_id=2,
+        pickup_code=None,
+        current_status_raw="pending",
+        order_type="pickup",
+        payment_method="cash",
+        payment_status=None,
+        payment_proof_photo_id=None,
+        delivery_address=None,
+        delivery_price=0,
+        is_cart=False,
+        cart_items_json=None,
+        offer_id=3,
+        quantity=1,
+        total_price=1000,
+        item_title="Bread",
+        item_price=1000,
+        item_original_price=None,
+    )
+
+
+def _service(db, monkeypatch) -> tuple[UnifiedOrderService, list[dict]]:
+    service = UnifiedOrderService(db, bot=None)
+    notified: list[dict] = []
+
+    async def fake_notify(**kwargs):
+        notified.append(kwargs)
+
+    monkeypatch.setattr(service, "_get_status_update_context", lambda **_: _ctx())
+    monkeypatch.setattr(service, "_notify_status_change", fake_notify)
+    return service, notified
+
+
+async def test_update_status_writes_outbox_event_with_the_status(monkeypatch):
+    monkeypatch.setattr(unified_order_service, "ORDER_EVENTS_ENABLED", True)
+    db = OutboxDb()
+    service, notified = _service(db, monkeypatch)
+
+    assert await service.update_status(7, "order", "preparing") is True
+
+    assert notified == []
+    payload = {
+        "target_status": "preparing",
+        "payment_status": "not_required",
+        "notify_customer": True,
+        "reject_reason": None,
+        "courier_phone": None,
+        "new_status": "preparing",
+    }
+    assert db.status_updates == [(7, "preparing", (STATUS_CHANGED, payload))]
+
+    await service.deliver_status_event("order", 7, payload)
+    assert notified[0]["target_status"] == "preparing"
+    assert notified[0]["realtime"] is False
+
+
+async def test_update_status_notifies_inline_without_outbox(monkeypatch):
+    monkeypatch.setattr(unified_order_service, "ORDER_EVENTS_ENABLED", False)
+    db = OutboxDb()
+    service, notified = _service(db, monkeypatch)
+
+    assert await service.update_status(7, "order", "preparing") is True
+
+    assert db.status_updates == [(7, "preparing", None)]
+    assert [n["target_status"] for n in notified] == ["preparing"]
+
+
+async def test_created_event_rebuilds_store_orders(monkeypatch):
+    service = UnifiedOrderService(OutboxDb(), bot=None)
+    sent: list[dict] = []
+
+    async def fake_notify_created(**kwargs):
+        sent.append(kwargs)
+
+    monkeypatch.setattr(service, "_notify_order_created", fake_notify_created)
+    item = {
+        "store_id": 2,
+        "title": "Bread",
+        "price": 1000,
+        "original_price": 1500,
+        "quantity": 2,
+        "store_name": "Bakery",
+        "store_address": "Main 1",
+    }
+    payload = {
+        "user_id": 1,
+        "order_type": "pickup",
+        "payment_method": "cash",
+        "items": [{**item, "offer_id": 3}, {**item, "offer_id": 4}],
+        "notify_sellers": True,
+        # Offer 4 failed and got no order
+        "orders": [{"order_id": 70, "offer_id": 3, "pickup_code": "AB12"}],
+    }
+
+    await service.deliver_created_event(70, payload)
+
+    (call,) = sent
+    assert call["order_ids"] == [70]
+    assert call["pickup_codes"] == ["AB12"]
+    (line,) = call["stores_orders"][2]
+    assert (line["order_id"], line["offer_id"], line["total"]) == (70, 3, 2000)
+
+
+async def test_relay_retries_only_the_failed_consumer():
+    calls: list[tuple] = []
+
+    def consumer(name, fail_for=None):
+        async def handle(event):
+            if event["entity_id"] == fail_for:
+                raise RuntimeError("telegram down")
+            calls.append((name, event["event_id"]))
+
+        return handle
+
+    consumers = {
+        "websocket": consumer("websocket"),
+        "telegram": consumer("telegram", fail_for=2),
+        "analytics": consumer("analytics"),
+    }
+    event = {"event_type": STATUS_CHANGED, "entity_type": "order", "payload": {}}
+    db = OutboxDb(
+        [
+            {**event, "event_id": 10, "entity_id": 1, "attempts": 1},
+            {**event, "event_id": 11, "entity_id": 2, "attempts": 1},
+            # Retry of an event whose websocket push already went out
+            {**event, "event_id": 12, "entity_id": 3, "attempts": 2, "delivered_to": ["websocket"]},
+        ]
+    )
+
+    assert await OrderEventRelay(db, consumers).run_once() == 3
+
+    assert db.completed == [10, 12]
+    assert db.failed == [
+        (11, "telegram: telegram down", retry_delay(1), ["websocket", "analytics"])
+    ]
+    assert ("websocket", 12) not in calls
+    assert ("telegram", 12) in calls
+
+
+@pytest.mark.parametrize("attempts, retry_in", [(4, retry_delay(4)), (5, None)])
+async def test_relay_gives_up_after_max_attempts(attempts, retry_in):
+    async def failing(event):
+        raise RuntimeError("down")
+
+    db = OutboxDb(
+        [{"event_id": 1, "event_type": ORDER_CREATED, "entity_id": 1, "attempts": attempts}]
+    )
+
+    await OrderEventRelay(db, {"telegram": failing}, max_attempts=5).run_once()
+
+    assert db.failed == [(1, "telegram: down", retry_in, [])]
+
+
+def test_events_of_one_order_are_claimed_in_sequence(db):
+    first = db.enqueue_order_event("order", 410001, STATUS_CHANGED, {"target_status": "preparing"})
+    second = db.enqueue_order_event("order", 410001, STATUS_CHANGED, {"target_status": "ready"})
+    other = db.enqueue_order_event("order", 410002, STATUS_CHANGED, {"target_status": "ready"})
+
+    claimed = [e["event_id"] for e in db.claim_order_events(limit=10)]
+    assert first in claimed and other in claimed and second not in claimed
+    # Leased events are not handed out twice
+    assert db.claim_order_events(limit=10) == []
+
+    db.complete_order_event(first)
+    db.fail_order_event(other, "telegram: down", retry_in=0, delivered_to=["websocket"])
+    events = {e["event_id"]: e for e in db.claim_order_events(limit=10)}
+    assert set(events) == {second, other}
+    assert events[second]["payload"] == {"target_status": "ready"}
+    assert events[second]["attempts"] == 1
+    assert events[other]["delivered_to"] == ["websocket"]
@@ -0,0 +1,82 @@
+"""Tests for normalized cart order lines (order_items)."""
+from __future__ import annotations
+
+import os
+
+os.environ.setdefault("TELEGRAM_BOT_TOKEN", "test-token")
+
+from app.api import partner_panel_simple as panel
+from database_pg_module.mixins.orders import OrderMixin
+
+
+def test_order_item_columns_coerce_cart_items():
+    columns = OrderMixin._order_item_columns(
+        [
+            {"offer_id": "5", "title": "Bread", "quantity": 2, "price": 5000.0},
+            {"offer_id": 6, "title": "Milk", "price": "bad", "original_price": 9000},
+        ]
+    )
+
+    assert columns == (
+        [5, 6],
+        ["Bread", "Milk"],
+        [2.0, 1.0],
+        [5000, 0],
+        [None, 9000],
+    )
+
+
+def test_serialize_prefers_order_items_rows():
+    order = {
+        "order_id": 8,
+        "order_status": "pending",
+        "order_type": "delivery",
+        "total_price": 15000,
+        "cart_items": [{"title": "Stale", "quantity": 1, "price": 1}],
+        "items": [
+            {"offer_id": 1, "title": "Bread", "quantity": 2.0, "price": 5000, "photo_id": None},
+            {"offer_id": 2, "title": "Milk", "quantity": 1.0, "price": 5000, "photo_id": None},
+        ],
+    }
+
+    result = panel._serialize_partner_order(order)
+
+    assert [item["title"] for item in result["items"]] == ["Bread", "Milk"]
+    assert result["items_count"] == 3
+
+
+def test_cart_order_lines_are_written_and_read_per_page(db, seller_store):
+    _, store_id = seller_store
+    offer_ids = [
+        db.add_offer(
+            store_id=store_id,
+            title=title,
+            original_price=10000,
+            discount_price=5000,
+            quantity=10,
+        )
+        for title in ("Bread", "Milk")
+    ]
+    buyer_id = 390002
+    db.add_user(user_id=buyer_id, username="items_buyer")
+
+    ok, order_id, _, _ = db.create_cart_order_atomic(
+        buyer_id,
+        store_id,
+        [
+            {"offer_id": offer_ids[0], "quantity": 2, "price": 5000, "title": "Bread"},
+            {"offer_id": offer_ids[1], "quantity": 1, "price": 5000, "title": "Milk"},
+        ],
+        order_type="pickup",
+    )
+    assert ok
+
+    items = db.get_order_items([order_id, 999999999])
+    assert list(items) == [order_id]
+    assert [(it["offer_id"], it["quantity"]) for it in items[order_id]] == [
+        (offer_ids[0], 2.0),
+        (offer_ids[1], 1.0),
+    ]
+
+    rows, _ = db.get_store_orders_page(store_id, limit=10)
+    assert [it["title"] for it in rows[0]["items"]] == ["Bread", "Milk"]
@@ -0,0 +1,93 @@
+"""Tests for the paginated / delta-sync partner order feed."""
+from __future__ import annotations
+
+import os
+from datetime import datetime
+
+import pytest
+from fastapi import HTTPException
+
+os.environ.setdefault("TELEGRAM_BOT_TOKEN", "test-token")
+
+from app.api import partner_panel_simple as panel
+
+
+def test_orders_cursor_round_trip():
+    moment = datetime(2026, 10, 18, 12, 30, 15, 123456)
+    token = panel._encode_orders_cursor(moment, 42)
+
+    assert "=" not in token
+    assert panel._decode_orders_cursor(token) == (moment, 42)
+
+
+def test_invalid_orders_cursor_is_rejected():
+    with pytest.raises(HTTPException) as exc:
+        panel._decode_orders_cursor("not-a-cursor")
+    assert exc.value.status_code == 400
+
+
+def test_status_filter_parsing():
+    assert panel._parse_status_filter(None) is None
+    assert panel._parse_status_filter("all") is None
+    assert panel._parse_status_filter("pending, preparing,") == ["pending", "preparing"]
+
+
+def test_serialize_cart_order():
+    order = {
+        "order_id": 7,
+        "order_status": "preparing",
+        "order_type": "pickup",
+        "quantity": 3,
+        "total_price": 30000,
+        "created_at": datetime(2026, 10, 18, 9, 0),
+        "updated_at": datetime(2026, 10, 18, 9, 5),
+        "cart_items": '[{"title": "Bread", "quantity": 2, "price": 5000}, {"title": "Milk"}]',
+        "first_name": "Ali",
+        "offer_title": "Bread",
+    }
+
+    result = panel._serialize_partner_order(order)
+
+    assert result["type"] == "booking"
+    assert result["items_count"] == 3
+    assert [item["title"] for item in result["items"]] == ["Bread", "Milk"]
+    assert result["updated_at"] == "2026-10-18 09:05:00"
+    assert result["payment_proof_url"] is None
+
+
+def _seed_orders(db, store_id: int, count: int) -> None:
+    buyer_id = 330002
+    db.add_user(user_id=buyer_id, username="feed_buyer")
+    with db.get_connection() as conn:
+        cursor = conn.cursor()
+        for i in range(count):
+            cursor.execute(
+                """
+                INSERT INTO orders (user_id, store_id, order_status, quantity, total_price,
+                                    created_at, updated_at)
+                VALUES (%s, %s, %s, 1, 1000,
+                        NOW() - make_interval(mins => %s), NOW() - make_interval(mins => %s))
+                """,
+                (buyer_id, store_id, "pending" if i % 2 else "completed", count - i, count - i),
+            )
+
+
+def test_store_orders_page_and_delta(db, seller_store):
+    _, store_id = seller_store
+    _seed_orders(db, store_id, 5)
+
+    first, server_now = db.get_store_orders_page(store_id, limit=2)
+    assert len(first) == 2
+    cursor = (first[-1]["created_at"], first[-1]["order_id"])
+    rest, _ = db.get_store_orders_page(store_id, limit=10, cursor=cursor)
+    ids = [row["order_id"] for row in first + rest]
+    assert len(ids) == len(set(ids)) == 5
+
+    pending, _ = db.get_store_orders_page(store_id, statuses=["pending"], limit=10)
+    assert {row["order_status"] for row in pending} == {"pending"}
+
+    changed, _ = db.get_store_orders_page(store_id, updated_since=server_now, limit=10)
+    assert changed == []
+    db.update_order_status(ids[-1], "cancelled")
+    changed, _ = db.get_store_orders_page(store_id, updated_since=server_now, limit=10)
+    assert [row["order_id"] for row in changed] == [ids[-1]]
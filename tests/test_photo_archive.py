@@ -0,0 +1,104 @@
+"""Tests for ZIP photo archives used by the CSV + ZIP bulk import."""
+from __future__ import annotations
+
+import io
+import zipfile
+from types import SimpleNamespace
+
+import pytest
+from PIL import Image
+
+from app.services import photo_archive
+from app.services.photo_archive import PhotoArchive
+from handlers.seller import bulk_import
+
+
+def _jpeg(size: tuple[int, int]) -> bytes:
+    out = io.BytesIO()
+    Image.new("RGB", size, "red").save(out, format="JPEG")
+    return out.getvalue()
+
+
+@pytest.fixture
+def archive_path(tmp_path):
+    path = tmp_path / "photos.zip"
+    with zipfile.ZipFile(path, "w") as zf:
+        zf.writestr("catalog/Milk.JPG", _jpeg((3000, 1500)))
+        zf.writestr("bread.png", _jpeg((200, 200)))
+        zf.writestr("__MACOSX/catalog/._Milk.JPG", b"resource fork")
+        zf.writestr("notes.txt", b"not a photo")
+    return str(path)
+
+
+def test_index_matches_by_basename_and_stem(archive_path):
+    with PhotoArchive(archive_path) as archive:
+        assert len(archive) == 2
+        assert archive.find("milk.jpg").filename == "catalog/Milk.JPG"
+        assert archive.find(" photos/MILK.jpg ").filename == "catalog/Milk.JPG"
+        assert archive.find("bread.jpg").filename == "bread.png"
+        assert archive.find("cheese.jpg") is None
+        assert archive.find("") is None
+
+
+def test_read_jpeg_downscales(archive_path):
+    with PhotoArchive(archive_path) as archive:
+        data = archive.read_jpeg(archive.find("milk.jpg"))
+
+    with Image.open(io.BytesIO(data)) as image:
+        assert image.format == "JPEG"
+        assert max(image.size) == photo_archive.PHOTO_MAX_SIDE
+
+
+def test_oversized_member_is_rejected(archive_path, monkeypatch):
+    monkeypatch.setattr(photo_archive, "MAX_PHOTO_MEMBER_BYTES", 10)
+    with PhotoArchive(archive_path) as archive:
+        with pytest.raises(ValueError):
+            archive.read_jpeg(archive.find("bread.jpg"))
+
+
+class _FakeMessage:
+    def __init__(self):
+        self.uploads = 0
+        self.edits: list[str] = []
+
+    async def answer_photo(self, photo, **kwargs):
+        self.uploads += 1
+        uploaded = self.uploads
+
+        async def delete():
+            return True
+
+        return SimpleNamespace(photo=[SimpleNamespace(file_id=f"file-{uploaded}")], delete=delete)
+
+    async def edit_text(self, text, **kwargs):
+        self.edits.append(text)
+
+
+class _FakeBulkDb:
+    def __init__(self):
+        self.rows: list[dict] = []
+
+    def bulk_import_offers(self, store_id, rows, source=None):
+        self.rows.extend(rows)
+        return len(rows)
+
+
+async def test_zip_products_are_uploaded_and_written(archive_path, monkeypatch):
+    fake_db = _FakeBulkDb()
+    monkeypatch.setattr(bulk_import, "db", fake_db)
+    products = [
+        [2, {"photo_file": "milk.jpg", "title": "Milk"}],
+        [3, {"photo_file": "cheese.jpg", "title": "Cheese"}],
+        [4, {"photo_file": "bread.jpg", "title": "Bread"}],
+    ]
+    message = _FakeMessage()
+
+    with PhotoArchive(archive_path) as archive:
+        result = await bulk_import._import_zip_products(
+            message, message, archive, 1, products, "ru"
+        )
+
+    assert result.imported == 2
+    assert [error.row for error in result.errors] == [3]
+    assert sorted(row["title"] for row in fake_db.rows) == ["Bread", "Milk"]
+    assert all(row["photo_id"].startswith("file-") for row in fake_db.rows)
@@ -0,0 +1,167 @@
+"""Tests for the cached admin platform statistics snapshot."""
+from __future__ import annotations
+
+import json
+import time
+from contextlib import contextmanager
+from types import SimpleNamespace
+
+from app.services.admin_service import AdminService
+from database_pg_module.mixins.stats import PLATFORM_STATS_KEY, StatsMixin
+
+SNAPSHOT = {
+    "users_total": 10,
+    "users_sellers": 3,
+    "users_customers": 7,
+    "users_today": 1,
+    "users_week": 4,
+    "stores_total": 3,
+    "stores_active": 2,
+    "stores_pending": 1,
+    "stores_rejected": 0,
+    "offers_total": 8,
+    "offers_active": 5,
+    "offers_inactive": 1,
+    "offers_deleted": 2,
+    "offers_top_categories": [["bakery", 3]],
+    "bookings_total": 9,
+    "bookings_pending": 1,
+    "bookings_active": 0,
+    "bookings_confirmed": 1,
+    "bookings_completed": 6,
+    "bookings_cancelled": 2,
+    "bookings_today": 3,
+    "revenue_today": 45000.0,
+}
+
+
+class _SettingsCursor:
+    def __init__(self, settings: dict[str, str]):
+        self.settings = settings
+        self._row = None
+
+    def execute(self, query, params=()):
+        if query.lstrip().startswith("INSERT"):
+            self.settings[params[0]] = params[1]
+        else:
+            value = self.settings.get(params[0])
+            self._row = (value,) if value is not None else None
+
+    def fetchone(self):
+        return self._row
+
+
+class _SettingsConnection:
+    def __init__(self, settings: dict[str, str]):
+        self.settings = settings
+
+    def cursor(self):
+        return _SettingsCursor(self.settings)
+
+
+class FakeStatsDb(StatsMixin):
+    """StatsMixin over an in-memory platform_settings table."""
+
+    def __init__(self, settings: dict[str, str]):
+        self.settings = settings
+        self.computed = 0
+
+    @contextmanager
+    def get_connection(self):
+        yield _SettingsConnection(self.settings)
+
+    def compute_platform_stats(self):
+        self.computed += 1
+        return {**SNAPSHOT, "computed_at": time.time()}
+
+
+def test_snapshot_is_computed_once_and_served_from_memory():
+    db = FakeStatsDb({})
+
+    first = db.get_platform_stats_snapshot(max_age=60)
+    second = db.get_platform_stats_snapshot(max_age=60)
+
+    assert db.computed == 1
+    assert first == second
+    assert json.loads(db.settings[PLATFORM_STATS_KEY])["users_total"] == 10
+    # Callers get copies, so mutating one does not corrupt the cache
+    first["users_total"] = 0
+    assert db.get_platform_stats_snapshot(max_age=60)["users_total"] == 10
+
+
+def test_snapshot_shared_between_processes_and_recomputed_when_stale():
+    settings: dict[str, str] = {}
+    FakeStatsDb(settings).refresh_platform_stats_snapshot()
+
+    other = FakeStatsDb(settings)
+    assert other.get_platform_stats_snapshot(max_age=60)["stores_pending"] == 1
+    assert other.computed == 0
+
+    stale = {**SNAPSHOT, "computed_at": time.time() - 600}
+    settings[PLATFORM_STATS_KEY] = json.dumps(stale)
+    fresh = FakeStatsDb(settings).get_platform_stats_snapshot(max_age=60)
+    assert fresh["computed_at"] > stale["computed_at"]
+
+
+class _AdminStatsDb(FakeStatsDb):
+    def is_admin(self, user_id):
+        return True
+
+
+class _FakeMessage:
+    def __init__(self):
+        self.texts: list[str] = []
+
+    async def edit_text(self, text, **kwargs):
+        self.texts.append(text)
+
+
+class _FakeCallback:
+    def __init__(self):
+        self.from_user = SimpleNamespace(id=1)
+        self.message = _FakeMessage()
+
+    async def answer(self, *args, **kwargs):
+        pass
+
+
+async def test_dashboard_refresh_recomputes_a_fresh_snapshot():
+    from handlers.admin import dashboard
+
+    db = _AdminStatsDb({})
+    db.get_platform_stats_snapshot(max_age=60)
+    dashboard.setup(None, db, None, None, None)
+    callback = _FakeCallback()
+
+    await dashboard.refresh_dashboard(callback)
+
+    assert db.computed == 2
+    assert "Всего: 10" in callback.message.texts[0]
+
+
+def test_get_statistics_keeps_legacy_keys():
+    stats = FakeStatsDb({}).get_statistics()
+
+    assert stats["users"] == 10
+    assert stats["approved_stores"] == 2
+    assert stats["completed_bookings"] == 6
+
+
+def test_admin_service_reads_snapshot():
+    db = FakeStatsDb({})
+    service = AdminService(db=db, use_postgres=True)
+
+    assert service.get_user_stats().week_users == 4
+    assert service.get_store_stats().pending == 1
+    assert service.get_offer_stats().top_categories == [("bakery", 3)]
+    assert service.get_booking_stats().today_revenue == 45000.0
+    assert db.computed == 1
+
+
+def test_compute_platform_stats_against_database(db):
+    stats = db.compute_platform_stats()
+
+    assert stats["users_total"] >= stats["users_sellers"] + stats["users_customers"]
+    assert stats["stores_total"] >= stats["stores_active"] + stats["stores_pending"]
+    assert isinstance(stats["offers_top_categories"], list)
+    assert stats["computed_at"] > 0
@@ -0,0 +1,78 @@
+"""Tests for cached, off-loop QR rendering."""
+from __future__ import annotations
+
+import pytest
+
+from app.core import qr_generator
+
+
+@pytest.fixture
+def render_calls(monkeypatch):
+    calls: list[tuple[str, str, str]] = []
+    real_render = qr_generator.render_qr
+
+    def counting_render(data, style="pickup", fmt="png"):
+        calls.append((data, style, fmt))
+        return real_render(data, style, fmt)
+
+    monkeypatch.setattr(qr_generator, "render_qr", counting_render)
+    monkeypatch.setattr(qr_generator, "_images", qr_generator.LRUCache(maxsize=8))
+    return calls
+
+
+async def test_images_are_rendered_once_per_code_style_and_format(render_calls):
+    png = await qr_generator.get_qr_image("QRTEST1")
+    again = await qr_generator.get_qr_image("QRTEST1")
+    svg = await qr_generator.get_qr_image("QRTEST1", fmt="svg")
+
+    assert png == again
+    assert png.startswith(b"\x89PNG")
+    assert b"<svg" in svg
+    assert render_calls == [("QRTEST1", "pickup", "png"), ("QRTEST1", "pickup", "svg")]
+
+
+async def test_shared_cache_hit_skips_rendering(render_calls):
+    await qr_generator.get_qr_image("QRTEST2")
+    qr_generator._images.clear()
+
+    uri = await qr_generator.get_qr_data_uri("QRTEST2")
+
+    assert uri.startswith("data:image/png;base64,")
+    assert len(render_calls) == 1
+
+
+def test_etag_depends_on_code_style_and_format():
+    etag = qr_generator.qr_etag("AB12CD")
+    assert etag == qr_generator.qr_etag("AB12CD")
+    assert etag.startswith('"') and etag.endswith('"')
+    assert etag != qr_generator.qr_etag("AB12CE")
+    assert etag != qr_generator.qr_etag("AB12CD", fmt="svg")
+    assert etag != qr_generator.qr_etag("AB12CD", style="booking")
+
+
+def test_booking_qr_keeps_bytesio_interface():
+    buffer = qr_generator.generate_booking_qr("AB12CD", 1, bot_username="testbot")
+    assert buffer is not None
+    assert buffer.read(4) == b"\x89PNG"
+    with pytest.raises(ValueError):
+        qr_generator.render_qr("AB12CD", style="unknown")
+
+
+async def test_webhook_qr_image_supports_etag(aiohttp_client, app, mocker):
+    client = await aiohttp_client(app)
+    mocker.patch(
+        "app.core.webhook_orders_routes.load_order_pickup_code",
+        mocker.AsyncMock(return_value="AB12CD"),
+    )
+
+    resp = await client.get("/api/v1/orders/7/qr.png")
+    assert resp.status == 200
+    assert resp.headers["Content-Type"] == "image/png"
+    etag = resp.headers["ETag"]
+    assert (await resp.read()).startswith(b"\x89PNG")
+
+    cached = await client.get("/api/v1/orders/7/qr.png", headers={"If-None-Match": etag})
+    assert cached.status == 304
+
+    unsupported = await client.get("/api/v1/orders/7/qr.gif")
+    assert unsupported.status == 404
@@ -0,0 +1,82 @@
+"""Tests for the shared async rate limiter."""
+from __future__ import annotations
+
+import pytest
+
+from app.core.rate_limiter import AsyncRateLimiter, RateLimitRule
+
+
+class FakeHitScript:
+    """In-memory stand-in for the Lua hit script."""
+
+    def __init__(self) -> None:
+        self.counts: dict[str, int] = {}
+        self.calls = 0
+
+    async def __call__(self, keys, args):
+        self.calls += 1
+        out = []
+        for index, key in enumerate(keys):
+            self.counts[key] = self.counts.get(key, 0) + int(args[index * 2])
+            out.extend((self.counts[key], int(args[index * 2 + 1])))
+        return out
+
+
+def _limiter(script: FakeHitScript) -> AsyncRateLimiter:
+    limiter = AsyncRateLimiter(redis_url="redis://shared", sync_every=5)
+    limiter._script = script
+    return limiter
+
+
+@pytest.mark.asyncio
+async def test_in_memory_limits_without_redis():
+    limiter = AsyncRateLimiter()
+    rules = (RateLimitRule("burst", 3, 10), RateLimitRule("minute", 10, 60))
+
+    results = [await limiter.hit(1, rules) for _ in range(4)]
+
+    assert [allowed for allowed, _, _ in results] == [True, True, True, False]
+    assert results[-1][1] == "burst"
+    assert results[-1][2] >= 1
+
+
+@pytest.mark.asyncio
+async def test_low_traffic_is_batched_into_few_redis_calls():
+    script = FakeHitScript()
+    limiter = _limiter(script)
+    rules = (RateLimitRule("minute", 100, 60),)
+
+    for _ in range(20):
+        assert (await limiter.hit(7, rules))[0]
+
+    assert script.calls == 4
+    assert script.counts["ratelimit:minute:7"] == 20
+
+
+@pytest.mark.asyncio
+async def test_limit_holds_across_replicas():
+    script = FakeHitScript()
+    replicas = [_limiter(script), _limiter(script)]
+    rules = (RateLimitRule("create_order", 10, 60),)
+
+    allowed = 0
+    for i in range(30):
+        ok, _, _ = await replicas[i % 2].hit("1.2.3.4", rules)
+        allowed += ok
+
+    assert allowed == 10
+
+
+@pytest.mark.asyncio
+async def test_falls_back_to_local_counting_on_redis_error():
+    class BrokenScript:
+        async def __call__(self, keys, args):
+            raise ConnectionError("down")
+
+    limiter = AsyncRateLimiter(redis_url="redis://down", sync_every=1)
+    limiter._script = BrokenScript()
+    rules = (RateLimitRule("burst", 2, 10),)
+
+    results = [(await limiter.hit(1, rules))[0] for _ in range(3)]
+
+    assert results == [True, True, False]
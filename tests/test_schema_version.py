@@ -0,0 +1,115 @@
+"""Tests for the versioned runtime schema check and capability probe."""
+from __future__ import annotations
+
+import re
+from pathlib import Path
+
+from app.core import startup_timing
+from app.middlewares.startup_timing_middleware import FirstUpdateMiddleware
+from database_pg_module.mixins.offers import OfferMixin
+from database_pg_module.mixins.search import SearchMixin
+from database_pg_module.schema import SCHEMA_VERSION, SchemaMixin
+
+
+class FakeCursor:
+    def __init__(self, probe_row, version):
+        self.probe_row = probe_row
+        self.version = version
+        self.queries: list[str] = []
+        self._result = None
+
+    def execute(self, query, params=None):
+        self.queries.append(query)
+        if "pg_extension" in query:
+            self._result = self.probe_row
+        elif "FROM schema_version" in query:
+            self._result = (self.version,) if self.version else None
+
+    def fetchone(self):
+        return self._result
+
+
+class FakeConnection:
+    def __init__(self, cursor):
+        self._cursor = cursor
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def cursor(self):
+        return self._cursor
+
+
+class FakeSchemaDb(SchemaMixin, SearchMixin, OfferMixin):
+    def __init__(self, version, probe_row=None):
+        self.cursor = FakeCursor(
+            probe_row or (True, True, ["offers.search_vector", "stores.city_slug"]), version
+        )
+        self.connections = 0
+        self.init_calls: list[bool] = []
+
+    def get_connection(self):
+        self.connections += 1
+        return FakeConnection(self.cursor)
+
+    def init_db(self, skip_if_current=False):
+        self.init_calls.append(skip_if_current)
+        self.cursor.version = SCHEMA_VERSION
+        return True
+
+
+def test_current_schema_skips_ddl():
+    db = FakeSchemaDb(SCHEMA_VERSION)
+
+    assert db.ensure_schema() is False
+    assert db.init_calls == []
+    assert len(db.cursor.queries) == 2
+
+
+def test_outdated_schema_applies_ddl_once():
+    db = FakeSchemaDb("020_offer_external_code")
+
+    assert db.ensure_schema() is True
+    assert db.init_calls == [True]
+    assert db.get_schema_state().version == SCHEMA_VERSION
+    assert FakeSchemaDb(SCHEMA_VERSION).ensure_schema(force=True) is True
+
+
+def test_capabilities_are_probed_once():
+    db = FakeSchemaDb(None, probe_row=(False, True, ["offers.search_vector", "stores.city_slug"]))
+
+    assert db._is_fts_available("offers") is True
+    assert db._is_fts_available("stores") is False
+    assert db._is_trgm_available() is True
+    assert db._get_store_slug_columns() == {"city_slug"}
+    assert db.connections == 1
+    # No version table yet: the version lookup is not attempted
+    assert len(db.cursor.queries) == 1
+
+
+def test_schema_version_matches_alembic_head():
+    versions = Path(__file__).resolve().parents[1] / "migrations_alembic" / "versions"
+    revisions, parents = set(), set()
+    for path in versions.glob("*.py"):
+        source = path.read_text(encoding="utf-8")
+        revisions.update(re.findall(r'^revision: str = "([^"]+)"', source, re.M))
+        parents.update(re.findall(r'^down_revision: [^=]+= "([^"]+)"', source, re.M))
+
+    assert revisions - parents == {SCHEMA_VERSION}
+
+
+async def test_first_update_is_marked_once(monkeypatch):
+    monkeypatch.setattr(startup_timing, "_stages", {})
+    middleware = FirstUpdateMiddleware()
+
+    async def handler(event, data):
+        return "ok"
+
+    assert await middleware(handler, object(), {}) == "ok"
+    first = startup_timing.startup_stages()["first_update"]
+    await middleware(handler, object(), {})
+
+    assert startup_timing.startup_stages() == {"first_update": first}
@@ -38,6 +38,8 @@ UPDATE_ORDER_ALLOWED = {
     "database_protocol.py",
     "database.py",
     "database_pg_module/mixins/orders.py",
+    "tests/test_partner_orders_feed.py",
+    "tests/test_order_events.py",
 }
 
 UPDATE_BOOKING_ALLOWED = {
@@ -48,6 +50,7 @@ UPDATE_BOOKING_ALLOWED = {
     "tests/test_validation.py",
     "tests/test_integration.py",
     "tests/test_e2e_booking_flow.py",
+    "tests/test_store_daily_stats.py",
     "handlers/seller/management/orders.py",
     "handlers/customer/payments.py",
     "handlers/bookings/partner.py",
@@ -66,6 +69,7 @@ CREATE_BOOKING_ATOMIC_ALLOWED = {
     "tests/test_integration.py",
     "tests/test_e2e_booking_flow.py",
     "tests/test_booking_race_condition.py",
+    "tests/test_store_daily_stats.py",
     "scripts/smoke_test_pickup.py",
     "database_protocol.py",
     "database.py",
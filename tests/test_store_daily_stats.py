@@ -0,0 +1,94 @@
+"""Tests for the store_daily_stats rollup."""
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+from decimal import Decimal
+from zoneinfo import ZoneInfo
+
+from app.services.stats import Period, get_partner_stats, period_days
+from database_pg_module.mixins.stats import (
+    BOOKING_REVENUE_STATUSES,
+    STATS_TZ,
+    _status_delta,
+)
+
+TZ = ZoneInfo(STATS_TZ)
+
+
+def test_period_days_maps_periods_to_inclusive_days():
+    now = datetime(2026, 3, 10, 15, 30, tzinfo=TZ)
+    today = now.replace(hour=0, minute=0)
+
+    assert period_days(Period(start=today, end=now, tz=STATS_TZ)) == (now.date(), now.date())
+    week = Period(start=today - timedelta(days=7), end=now, tz=STATS_TZ)
+    assert period_days(week) == ((now - timedelta(days=7)).date(), now.date())
+    # Exclusive midnight end
+    exclusive = Period(start=today - timedelta(days=1), end=today, tz=STATS_TZ)
+    assert period_days(exclusive) == ((now - timedelta(days=1)).date(),) * 2
+
+
+def test_status_delta_counts_transitions_into_and_out_of_revenue_statuses():
+    assert _status_delta("pending", "confirmed", BOOKING_REVENUE_STATUSES) == 1
+    assert _status_delta("confirmed", "completed", BOOKING_REVENUE_STATUSES) == 0
+    assert _status_delta("confirmed", "cancelled", BOOKING_REVENUE_STATUSES) == -1
+    assert _status_delta(None, "cancelled", BOOKING_REVENUE_STATUSES) == 0
+
+
+def _seed_booking(db, store_id):
+    offer_id = db.add_offer(
+        store_id=store_id,
+        title="Bread",
+        description="Fresh",
+        original_price=20000.0,
+        discount_price=10000.0,
+        quantity=10,
+        available_from="08:00",
+        available_until="22:00",
+    )
+    buyer_id = 310002
+    db.add_user(user_id=buyer_id, username="stats_buyer")
+    ok, booking_id, _, _ = db.create_booking_atomic(offer_id, buyer_id, quantity=2)
+    assert ok
+    return booking_id
+
+
+def test_booking_completion_updates_rollup_and_reconcile_matches(db, seller_store):
+    seller_id, store_id = seller_store
+    booking_id = _seed_booking(db, store_id)
+    with db.get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("UPDATE bookings SET status = 'ready' WHERE booking_id = %s", (booking_id,))
+        # A later price change does not reprice the booking
+        cursor.execute(
+            "UPDATE offers SET discount_price = 5000 "
+            "WHERE offer_id = (SELECT offer_id FROM bookings WHERE booking_id = %s)",
+            (booking_id,),
+        )
+
+    db.update_booking_status(booking_id, "completed")
+
+    now = datetime.now(TZ)
+    rows = db.get_store_daily_stats([store_id], now.date(), now.date())
+    assert rows and rows[0]["orders"] == 1
+    assert rows[0]["bookings_completed"] == 1
+    assert Decimal(rows[0]["revenue"]) == Decimal("20000")
+
+    period = Period(start=now.replace(hour=0, minute=0), end=now, tz=STATS_TZ)
+    before = get_partner_stats(db, seller_id, period, STATS_TZ, store_id=store_id)
+    db.reconcile_store_daily_stats(days=1)
+    after = get_partner_stats(db, seller_id, period, STATS_TZ, store_id=store_id)
+    assert before.totals == after.totals
+    assert after.totals.orders == 1
+
+
+def test_store_analytics_reads_booking_counts_from_rollup(db, seller_store):
+    _, store_id = seller_store
+    booking_id = _seed_booking(db, store_id)
+    db.update_booking_status(booking_id, "cancelled")
+
+    analytics = db.get_store_analytics(store_id)
+    assert (analytics["total_bookings"], analytics["cancelled"]) == (1, 1)
+    assert analytics["conversion_rate"] == 0
+
+    db.reconcile_store_daily_stats(days=1)
+    assert db.get_store_analytics(store_id)["total_bookings"] == 1
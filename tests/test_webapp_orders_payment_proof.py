@@ -18,7 +18,9 @@ async def test_webapp_order_rejects_delivery_card(aiohttp_client, app, mocker):
 
     # Stub DB methods used by api_create_order
     db = app["db"]
-    db.get_offer = mocker.Mock(return_value={"offer_id": 1, "store_id": 10, "discount_price": 10000})
+    db.get_offers_by_ids = mocker.Mock(
+        return_value={1: {"offer_id": 1, "store_id": 10, "discount_price": 10000}}
+    )
     db.get_store = mocker.Mock(return_value={"store_id": 10, "delivery_price": 5000, "name": "Test"})
     db.create_cart_order = mocker.Mock()  # not used because unified service is preferred
 
@@ -56,7 +58,9 @@ async def test_webapp_order_rejects_card_with_proof(aiohttp_client, app, mocker)
     )
 
     db = app["db"]
-    db.get_offer = mocker.Mock(return_value={"offer_id": 1, "store_id": 10, "discount_price": 10000})
+    db.get_offers_by_ids = mocker.Mock(
+        return_value={1: {"offer_id": 1, "store_id": 10, "discount_price": 10000}}
+    )
     db.get_store = mocker.Mock(return_value={"store_id": 10, "delivery_price": 5000, "name": "Test"})
     db.create_cart_order = mocker.Mock()
 
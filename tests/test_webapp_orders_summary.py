@@ -6,6 +6,7 @@ import sys
 
 import pytest
 from fastapi import HTTPException
+from starlette.requests import Request
 
 
 def _load_routes_orders():
@@ -23,31 +24,34 @@ def _load_routes_orders():
     return routes_orders
 
 
+def _request() -> Request:
+    return Request({"type": "http", "method": "GET", "path": "/orders/summary", "headers": []})
+
+
 class DummySummaryDb:
     def __init__(
         self,
         *,
         orders: tuple[int, float] = (0, 0.0),
         bookings: tuple[int, float] = (0, 0.0),
-        archive: tuple[int, float] = (0, 0.0),
-        archive_exists: bool = False,
+        orders_archive: tuple[int, float] = (0, 0.0),
+        bookings_archive: tuple[int, float] = (0, 0.0),
     ) -> None:
-        self._orders = orders
-        self._bookings = bookings
-        self._archive = archive
-        self._archive_exists = archive_exists
+        self._totals = {
+            "orders": orders,
+            "bookings": bookings,
+            "orders_archive": orders_archive,
+            "bookings_archive": bookings_archive,
+        }
 
     async def execute(self, query: str, params=None):  # noqa: ANN001 - test double
         normalized = " ".join(str(query).lower().split())
-        if "to_regclass('public.bookings_archive')" in normalized:
-            return [("bookings_archive",)] if self._archive_exists else [(None,)]
-        if "from orders" in normalized:
-            return [self._orders]
-        if "from bookings_archive" in normalized:
-            return [self._archive]
-        if "from bookings" in normalized:
-            return [self._bookings]
-        return [(0, 0.0)]
+        sources = [
+            totals
+            for table, totals in self._totals.items()
+            if f"from {table} " in normalized or f"from {table})" in normalized
+        ]
+        return [(sum(c for c, _ in sources), sum(q for _, q in sources))]
 
 
 @pytest.mark.asyncio
@@ -56,7 +60,7 @@ async def test_orders_summary_requires_authenticated_user():
     db = DummySummaryDb()
 
     with pytest.raises(HTTPException) as exc:
-        await routes_orders.get_orders_summary(db=db, user={"id": 0})
+        await routes_orders.get_orders_summary(request=_request(), db=db, user={"id": 0})
 
     assert exc.value.status_code == 401
 
@@ -67,10 +71,9 @@ async def test_orders_summary_aggregates_orders_and_bookings():
     db = DummySummaryDb(
         orders=(3, 7.0),
         bookings=(2, 4.5),
-        archive_exists=False,
     )
 
-    result = await routes_orders.get_orders_summary(db=db, user={"id": 123})
+    result = await routes_orders.get_orders_summary(request=_request(), db=db, user={"id": 123})
 
     assert result.completed_orders == 5
     assert result.completed_quantity == 11.5
@@ -78,17 +81,17 @@ async def test_orders_summary_aggregates_orders_and_bookings():
 
 
 @pytest.mark.asyncio
-async def test_orders_summary_includes_archive_when_available():
+async def test_orders_summary_includes_archived_orders_and_bookings():
     routes_orders = _load_routes_orders()
     db = DummySummaryDb(
         orders=(1, 2.0),
         bookings=(1, 1.0),
-        archive=(4, 8.0),
-        archive_exists=True,
+        orders_archive=(2, 3.0),
+        bookings_archive=(4, 8.0),
     )
 
-    result = await routes_orders.get_orders_summary(db=db, user={"id": 456})
+    result = await routes_orders.get_orders_summary(request=_request(), db=db, user={"id": 456})
 
-    assert result.completed_orders == 6
-    assert result.completed_quantity == 11.0
+    assert result.completed_orders == 8
+    assert result.completed_quantity == 14.0
     assert result.saved_weight_kg is None
@@ -0,0 +1,225 @@
+"""Tests for pattern-subscribed pub/sub and queued WebSocket fan-out."""
+from __future__ import annotations
+
+import asyncio
+import json
+
+from app.core import websocket
+from app.core.notifications import (
+    Notification,
+    NotificationService,
+    NotificationType,
+    RedisPubSub,
+)
+from app.core.websocket import WebSocketClient
+
+
+class FakeWebSocket:
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+        self.frames: list[str] = []
+        self.closed = False
+        self.close_code = None
+
+    async def send_str(self, text):
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        self.frames.append(text)
+
+    async def close(self, code=None):
+        self.closed = True
+        self.close_code = code
+
+
+class FakeRedis:
+    async def close(self):
+        pass
+
+
+class FakeRedisPubSub:
+    def __init__(self):
+        self.patterns: list[str] = []
+        self.channels: list[str] = []
+        self.messages: asyncio.Queue = asyncio.Queue()
+
+    async def psubscribe(self, pattern):
+        self.patterns.append(pattern)
+
+    async def subscribe(self, channel):
+        self.channels.append(channel)
+
+    async def listen(self):
+        while True:
+            yield await self.messages.get()
+
+    async def close(self):
+        pass
+
+
+def _notification(recipient_id: int = 1) -> Notification:
+    return Notification(
+        type=NotificationType.BOOKING_CONFIRMED,
+        recipient_id=recipient_id,
+        title="Готово",
+        message="Заказ подтверждён",
+    )
+
+
+def test_ws_frame_is_built_once_and_reused_from_the_wire_format():
+    notification = _notification()
+    frame = notification.to_ws_text()
+
+    assert notification.to_ws_text() is frame
+    assert json.loads(frame) == {"type": "notification", "payload": notification.to_dict()}
+    assert Notification.from_json(notification.to_json()).to_ws_text() == frame
+
+
+async def test_redis_backend_uses_one_pattern_per_channel_family():
+    backend = RedisPubSub("redis://unused")
+    backend._redis = FakeRedis()
+    backend._pubsub = FakeRedisPubSub()
+    received: list[tuple[str, int]] = []
+
+    async def handler_a(notification):
+        received.append(("a", notification.recipient_id))
+
+    async def handler_b(notification):
+        received.append(("b", notification.recipient_id))
+
+    await backend.subscribe("user:1", handler_a)
+    await backend.subscribe("user:2", handler_b)
+    await backend.subscribe("global", handler_b)
+    assert backend._pubsub.patterns == ["user:*"]
+    assert backend._pubsub.channels == ["global"]
+
+    for channel, recipient in (("user:3", 3), ("user:1", 1), ("user:2", 2)):
+        await backend._pubsub.messages.put(
+            {
+                "type": "pmessage",
+                "pattern": b"user:*",
+                "channel": channel.encode(),
+                "data": _notification(recipient).to_json().encode(),
+            }
+        )
+    for _ in range(20):
+        if len(received) == 2:
+            break
+        await asyncio.sleep(0.01)
+
+    assert received == [("a", 1), ("b", 2)]
+    await backend.close()
+
+
+async def test_slow_client_does_not_block_others_and_is_closed(monkeypatch):
+    monkeypatch.setattr(websocket, "WS_SEND_QUEUE_SIZE", 2)
+    monkeypatch.setattr(websocket, "WS_SLOW_CONSUMER_POLICY", "close")
+    slow = WebSocketClient(ws=FakeWebSocket(delay=10))
+    fast = WebSocketClient(ws=FakeWebSocket())
+    notification = _notification()
+
+    for _ in range(5):
+        await slow.send_notification(notification)
+        await fast.send_notification(notification)
+        await asyncio.sleep(0)
+    await asyncio.sleep(0.01)
+
+    assert fast.ws.frames == [notification.to_ws_text()] * 5
+    assert slow.ws.closed and slow.ws.close_code == 1013
+    assert slow.dropped >= 1
+    await fast.close()
+
+
+async def test_drop_policy_keeps_newest_frames(monkeypatch):
+    monkeypatch.setattr(websocket, "WS_SEND_QUEUE_SIZE", 2)
+    monkeypatch.setattr(websocket, "WS_SLOW_CONSUMER_POLICY", "drop")
+    client = WebSocketClient(ws=FakeWebSocket())
+
+    for i in range(4):
+        assert client.send_text(str(i))
+    await asyncio.sleep(0.01)
+
+    assert client.ws.frames == ["2", "3"]
+    assert client.dropped == 2
+    await client.close()
+
+
+async def test_hub_indexes_route_and_clean_up_without_scans():
+    hub = websocket.WebSocketManager()
+    alice = await hub.connect(FakeWebSocket(), user_id=1, store_id=7, city="Tashkent")
+    bob = await hub.connect(FakeWebSocket(), user_id=2, city="Samarkand")
+    await asyncio.sleep(0)
+
+    assert await hub.send_to_user(1, {"type": "x"}) == 1
+    assert await hub.send_to_store(7, {"type": "x"}) == 1
+    assert await hub.send_to_city("Samarkand", {"type": "x"}) == 1
+    assert await hub.broadcast({"type": "y"}) == 2
+    await asyncio.sleep(0)
+    assert len(alice.ws.frames) == 4  # welcome + 3
+    assert bob.sent == 3
+
+    await hub._disconnect(alice)
+    assert hub.get_connected_users() == {2}
+    assert await hub.send_to_store(7, {"type": "x"}) == 0
+    assert hub.get_stats()["stores"] == 0
+    await hub.stop()
+    assert hub.get_connection_count() == 0
+
+
+async def test_city_clients_share_one_normalized_subscription():
+    service = NotificationService()
+    hub = websocket.WebSocketManager()
+    hub.set_notification_service(service)
+    first = await hub.connect(FakeWebSocket(), user_id=1, city="Toshkent")
+    second = await hub.connect(FakeWebSocket(), user_id=2, city="Tashkent")
+    await asyncio.sleep(0)
+
+    assert first.city == second.city == "Ташкент"
+    assert list(hub._city_handlers) == ["Ташкент"]
+
+    notification = _notification()
+    await service.notify_city("tashkent", notification)
+    await asyncio.sleep(0)
+    assert first.ws.frames[-1] == second.ws.frames[-1] == notification.to_ws_text()
+
+    await hub._disconnect(first)
+    assert list(hub._city_handlers) == ["Ташкент"]
+    await hub._disconnect(second)
+    assert hub._city_handlers == {}
+    assert service._backend._subscribers == {}
+
+
+class FakeStarletteWebSocket:
+    def __init__(self):
+        self.accepted = False
+        self.texts: list[str] = []
+
+    async def accept(self):
+        self.accepted = True
+
+    async def send_text(self, text):
+        self.texts.append(text)
+
+    async def close(self, code=1000):
+        pass
+
+
+async def test_partner_connections_share_the_hub():
+    from app.api.websocket_manager import ConnectionManager
+
+    hub = websocket.WebSocketManager()
+    manager = ConnectionManager(hub)
+    panel = FakeStarletteWebSocket()
+    await manager.connect(42, panel)
+    app_client = await hub.connect(FakeWebSocket(), user_id=5, store_id=42)
+
+    assert await manager.notify_order_status(42, 100, "ready") == 1
+    await asyncio.sleep(0)
+
+    assert panel.accepted
+    assert json.loads(panel.texts[-1])["data"] == {"order_id": 100, "status": "ready"}
+    assert all("order_status_changed" not in frame for frame in app_client.ws.frames)
+    assert manager.get_stats()["total_connections"] == 1
+
+    manager.disconnect(42, panel)
+    assert await manager.notify_store(42, {"type": "x"}) == 0
+    assert hub.get_connection_count() == 1
@@ -1159,11 +1159,28 @@
         // ============================================
         // ORDERS
         // ============================================
+        const ORDERS_FEED_PAGE_SIZE = 100;
+        let ordersSyncToken = null;
+        let ordersNextCursor = null;
+        let ordersSyncInFlight = null;
+        let ordersActiveTab = 'active';
+
+        function ordersFeedUrl(params) {
+            return `/api/partner/orders/feed?${new URLSearchParams(params).toString()}`;
+        }
+
+        function sortOrdersNewestFirst(list) {
+            return list.sort((a, b) => String(b.created_at || '').localeCompare(String(a.created_at || '')));
+        }
+
         async function loadOrders() {
             showLoading();
             try {
-                const orders = await apiFetch('/api/partner/orders');
-                state.orders = normalizeOrders(orders);
+                const page = await apiFetch(ordersFeedUrl({ limit: ORDERS_FEED_PAGE_SIZE }));
+                state.orders = normalizeOrders(page.orders);
+                ordersSyncToken = page.sync_token;
+                ordersNextCursor = page.next_cursor;
+                ordersActiveTab = 'active';
                 renderOrders();
                 updateNotificationBadge(); // Update badge with new orders count
             } catch (error) {
@@ -1184,6 +1201,64 @@
             }
         }
 
+        async function loadMoreOrders() {
+            if (!ordersNextCursor) return;
+            try {
+                const page = await apiFetch(ordersFeedUrl({
+                    limit: ORDERS_FEED_PAGE_SIZE,
+                    cursor: ordersNextCursor
+                }));
+                const known = new Set(state.orders.map(o => o.order_id));
+                const older = normalizeOrders(page.orders).filter(o => !known.has(o.order_id));
+                state.orders = state.orders.concat(older);
+                ordersNextCursor = page.next_cursor;
+                renderOrders();
+                filterOrderTab(ordersActiveTab);
+            } catch (error) {
+                console.error('Orders page load error:', error);
+                toast('\u041e\u0448\u0438\u0431\u043a\u0430 \u0437\u0430\u0433\u0440\u0443\u0437\u043a\u0438 \u0437\u0430\u043a\u0430\u0437\u043e\u0432', 'error', { description: error?.message || '' });
+            }
+        }
+
+        // Fetch only orders changed since the last sync and merge them in place
+        async function syncOrders() {
+            if (!ordersSyncToken) return loadOrders();
+            if (ordersSyncInFlight) return ordersSyncInFlight;
+
+            ordersSyncInFlight = (async () => {
+                const changed = [];
+                let token = ordersSyncToken;
+                let cursor = null;
+                do {
+                    const params = { limit: ORDERS_FEED_PAGE_SIZE, updated_since: ordersSyncToken };
+                    if (cursor) params.cursor = cursor;
+                    const page = await apiFetch(ordersFeedUrl(params));
+                    changed.push(...normalizeOrders(page.orders));
+                    token = page.sync_token;
+                    cursor = page.next_cursor;
+                } while (cursor);
+                ordersSyncToken = token;
+                if (!changed.length) return;
+
+                const byId = new Map(state.orders.map(o => [o.order_id, o]));
+                changed.forEach(o => byId.set(o.order_id, o));
+                state.orders = sortOrdersNewestFirst(Array.from(byId.values()));
+                if (state.currentView === 'orders') {
+                    renderOrders();
+                    filterOrderTab(ordersActiveTab);
+                }
+                updateNotificationBadge();
+            })();
+
+            try {
+                await ordersSyncInFlight;
+            } catch (error) {
+                console.error('Orders sync error:', error);
+            } finally {
+                ordersSyncInFlight = null;
+            }
+        }
+
         function renderOrders() {
             const list = Array.isArray(state.orders) ? state.orders : [];
             const getStatus = (o) => getOrderStatus(o);
@@ -1234,6 +1309,9 @@
                     <div id=\"ordersContainer\" class=\"orders-panel\">
                         ${renderOrdersList(activeOrders)}
                     </div>
+                    ${ordersNextCursor ? `
+                        <button class=\"btn btn-sm btn-outline\" onclick=\"loadMoreOrders()\">\u0417\u0430\u0433\u0440\u0443\u0437\u0438\u0442\u044c \u0435\u0449\u0451</button>
+                    ` : ''}
                 </div>
             `;
 
@@ -1364,6 +1442,7 @@
 
 
         function filterOrderTab(status) {
+            ordersActiveTab = status;
             document.querySelectorAll('.tab').forEach(tab => {
                 tab.classList.toggle('active', tab.dataset.status === status);
             });
@@ -1583,7 +1662,7 @@
 
                 // Reload to get fresh data and correct button states
                 if (state.currentView === 'orders') {
-                    setTimeout(() => loadOrders(), 500);
+                    syncOrders();
                 }
                 return true;
             } catch (error) {
@@ -1754,7 +1833,7 @@
 
                 // Reload orders
                 if (state.currentView === 'orders') {
-                    setTimeout(() => loadOrders(), 500);
+                    syncOrders();
                 }
             } catch (error) {
                 console.error('Cancel order error:', error);
@@ -4161,9 +4240,9 @@ async function toggleProductAvailability(id) {
                 description: `${orderData.customer_name} • ${formatPrice(orderData.total)}`
             });
 
-            // Reload orders if on orders page
+            // Pull only the changed orders (no full reload)
             if (state.currentView === 'orders') {
-                setTimeout(() => loadOrders(), 500);
+                syncOrders();
             }
 
             // Update badge
@@ -4173,9 +4252,9 @@ async function toggleProductAvailability(id) {
         function handleOrderStatusChanged(data) {
             console.log('📊 Order status changed:', data);
 
-            // Reload orders if on orders page
+            // Pull only the changed orders (no full reload)
             if (state.currentView === 'orders') {
-                setTimeout(() => loadOrders(), 500);
+                syncOrders();
             }
         }
 
@@ -4184,9 +4263,9 @@ async function toggleProductAvailability(id) {
 
             toast(`Заказ #${data.order_id} отменён`, 'warning');
 
-            // Reload orders if on orders page
+            // Pull only the changed orders (no full reload)
             if (state.currentView === 'orders') {
-                setTimeout(() => loadOrders(), 500);
+                syncOrders();
             }
         }
 
@@ -4249,8 +4328,13 @@ async function toggleProductAvailability(id) {
 
             switch (state.currentView) {
                 case 'orders':
-                    console.log('🔄 Auto-refreshing orders...');
-                    return run(loadOrders());
+                    // WebSocket pushes trigger delta syncs; poll only without it
+                    if (websocket && websocket.readyState === WebSocket.OPEN) {
+                        finalize();
+                        return;
+                    }
+                    console.log('🔄 Syncing changed orders...');
+                    return run(syncOrders());
                 case 'dashboard':
                     console.log('🔄 Auto-refreshing dashboard...');
                     return run(loadDashboard());
@@ -210,6 +210,16 @@ export const ordersAPI = {
         return Array.isArray(orders) ? orders.map(normalizeOrder) : orders;
     },
 
+    // Cursor-paginated feed; pass sync_token back as updatedSince for deltas
+    async feed({ status = null, limit = 100, cursor = null, updatedSince = null } = {}) {
+        const params = new URLSearchParams({ limit: String(limit) });
+        if (status) params.set('status', status);
+        if (cursor) params.set('cursor', cursor);
+        if (updatedSince) params.set('updated_since', updatedSince);
+        const page = await apiFetch(`/api/partner/orders/feed?${params.toString()}`);
+        return { ...page, orders: (page.orders || []).map(normalizeOrder) };
+    },
+
     async getById(id) {
         const order = await apiFetch(`/api/partner/orders/${id}`);
         return normalizeOrder(order);